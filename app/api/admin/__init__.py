@@ -0,0 +1,5 @@
+"""Administration API module."""
+
+from .router import router
+
+__all__ = ["router"]
@@ -0,0 +1,51 @@
+"""
+Administration API router for DevPocket.
+
+Diagnostics for operators; every endpoint requires the admin role.
+"""
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from app.auth.dependencies import require_admin
+from app.db.query_insights import query_insights
+
+from .schemas import MessageResponse, QueryInsightsResponse
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["Administration"],
+    dependencies=[Depends(require_admin)],
+    responses={
+        401: {"description": "Authentication required"},
+        403: {"description": "Administrator access required"},
+        500: {"description": "Internal server error"},
+    },
+)
+
+
+@router.get(
+    "/db/queries",
+    response_model=QueryInsightsResponse,
+    summary="Get Query Statistics",
+)
+async def get_query_insights(
+    limit: int = Query(50, ge=1, le=1000, description="Statements returned"),
+    order_by: Literal["total", "mean", "max", "calls", "slow"] = Query(
+        "total", description="Statement ordering"
+    ),
+) -> QueryInsightsResponse:
+    """Per-statement latency, recent slow queries and their sampled plans."""
+    return QueryInsightsResponse(**query_insights.snapshot(limit, order_by))
+
+
+@router.delete(
+    "/db/queries",
+    response_model=MessageResponse,
+    summary="Reset Query Statistics",
+)
+async def reset_query_insights() -> MessageResponse:
+    """Drop collected statement statistics, slow queries and plans."""
+    query_insights.reset()
+    return MessageResponse(message="Query statistics reset")
@@ -0,0 +1,70 @@
+"""
+Pydantic schemas for administration endpoints.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+# Query Insights Schemas
+class QueryPlan(BaseModel):
+    """Schema for a captured EXPLAIN (ANALYZE, BUFFERS) plan."""
+
+    duration_ms: float = Field(..., description="Latency of the sampled execution")
+    captured_at: datetime = Field(..., description="When the plan was captured")
+    plan: dict[str, Any] = Field(..., description="EXPLAIN output in JSON format")
+
+
+class StatementStats(BaseModel):
+    """Schema for statistics of one statement fingerprint."""
+
+    fingerprint_id: str = Field(..., description="Short fingerprint identifier")
+    fingerprint: str = Field(..., description="Normalized SQL text")
+    operation: str = Field(..., description="Statement kind (SELECT, UPDATE, ...)")
+    calls: int = Field(..., description="Executions")
+    slow_calls: int = Field(..., description="Executions over the slow threshold")
+    total_ms: float = Field(..., description="Total execution time")
+    mean_ms: float = Field(..., description="Mean execution time")
+    max_ms: float = Field(..., description="Longest execution time")
+    p50_ms: float | None = Field(default=None, description="Median latency")
+    p95_ms: float | None = Field(default=None, description="95th percentile latency")
+    p99_ms: float | None = Field(default=None, description="99th percentile latency")
+    plan: QueryPlan | None = Field(
+        default=None, description="Latest plan of a sampled slow execution"
+    )
+
+
+class SlowQuery(BaseModel):
+    """Schema for a slow-query log entry."""
+
+    fingerprint_id: str = Field(..., description="Short fingerprint identifier")
+    fingerprint: str = Field(..., description="Normalized SQL text")
+    duration_ms: float = Field(..., description="Execution time")
+    captured_at: datetime = Field(..., description="When the query finished")
+
+
+class QueryInsightsResponse(BaseModel):
+    """Schema for query statistics and slow queries."""
+
+    enabled: bool = Field(..., description="Whether statements are recorded")
+    threshold_ms: float = Field(..., description="Slow query threshold")
+    sample_rate: float = Field(..., description="Share of slow SELECTs explained")
+    explains_dropped: int = Field(
+        ..., description="Sampled slow queries dropped because the queue was full"
+    )
+    statements: list[StatementStats] = Field(..., description="Statement statistics")
+    slow_queries: list[SlowQuery] = Field(
+        ..., description="Recent slow queries, newest first"
+    )
+
+
+# Common Response Schemas
+class MessageResponse(BaseModel):
+    """Schema for simple message responses."""
+
+    message: str = Field(..., description="Response message")
+    timestamp: datetime = Field(
+        default_factory=datetime.utcnow, description="Response timestamp"
+    )
@@ -0,0 +1,320 @@
+"""
+Streaming command export for DevPocket API.
+
+Exports are described by a signed, expiring link instead of a stored file.
+Downloading the link streams rows from a server-side cursor, encodes them
+incrementally and optionally gzip-compresses them on the fly, so memory use
+stays constant however many commands the export contains.
+"""
+
+import abc
+import csv
+import io
+import json
+import uuid
+import zlib
+from collections.abc import AsyncIterator, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from xml.sax.saxutils import escape
+
+from fastapi import HTTPException, status
+from jose import JWTError
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.security import create_access_token, decode_token
+from app.core.logging import logger
+from app.db.database import AsyncSessionLocal
+from app.repositories.command import CommandRepository
+
+from .schemas import CommandExportRequest, OutputFormat
+
+# Export link settings
+EXPORT_TOKEN_TYPE = "command_export"
+EXPORT_LINK_TTL = timedelta(hours=24)
+
+# Streaming settings
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Exported columns, in output order
+EXPORT_COLUMNS = [
+    "id",
+    "session_id",
+    "command",
+    "status",
+    "exit_code",
+    "command_type",
+    "working_directory",
+    "is_dangerous",
+    "executed_at",
+    "created_at",
+    "execution_time",
+]
+EXPORT_OUTPUT_COLUMNS = ["output", "error_output"]
+
+
+def _row_to_record(row: Row[Any], columns: list[str]) -> dict[str, Any]:
+    """Convert a streamed row into a flat, JSON-serializable record."""
+    record: dict[str, Any] = {}
+    for column, value in zip(columns, row):
+        if column == "execution_time":
+            record["duration_ms"] = int(value * 1000) if value is not None else None
+        elif isinstance(value, datetime):
+            record[column] = value.isoformat()
+        elif isinstance(value, uuid.UUID):
+            record[column] = str(value)
+        else:
+            record[column] = value
+    return record
+
+
+def _field_names(columns: list[str]) -> list[str]:
+    """Get record field names for the selected columns."""
+    return ["duration_ms" if c == "execution_time" else c for c in columns]
+
+
+class ExportEncoder(abc.ABC):
+    """Base class for incremental export encoders."""
+
+    media_type = "application/octet-stream"
+    extension = "bin"
+
+    def __init__(self, fields: list[str]):
+        self.fields = fields
+
+    def header(self) -> str:
+        """Text emitted before the first record."""
+        return ""
+
+    @abc.abstractmethod
+    def encode(self, record: dict[str, Any]) -> str:
+        """Encode a single record."""
+
+    def footer(self) -> str:
+        """Text emitted after the last record."""
+        return ""
+
+
+class NDJSONEncoder(ExportEncoder):
+    """Newline-delimited JSON, one command object per line."""
+
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def encode(self, record: dict[str, Any]) -> str:
+        return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+class CSVEncoder(ExportEncoder):
+    """Comma-separated values with a header row."""
+
+    media_type = "text/csv"
+    extension = "csv"
+    delimiter = ","
+
+    def __init__(self, fields: list[str]):
+        super().__init__(fields)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, delimiter=self.delimiter)
+
+    def _write(self, values: list[Any]) -> str:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(values)
+        return self._buffer.getvalue()
+
+    def header(self) -> str:
+        return self._write(self.fields)
+
+    def encode(self, record: dict[str, Any]) -> str:
+        return self._write(
+            ["" if record[f] is None else record[f] for f in self.fields]
+        )
+
+
+class TSVEncoder(CSVEncoder):
+    """Tab-separated columns, used for the table format."""
+
+    media_type = "text/tab-separated-values"
+    extension = "tsv"
+    delimiter = "\t"
+
+
+class TextEncoder(ExportEncoder):
+    """Plain command lines, suitable for replaying as a shell history."""
+
+    media_type = "text/plain"
+    extension = "txt"
+
+    def encode(self, record: dict[str, Any]) -> str:
+        return record["command"].replace("\n", " ") + "\n"
+
+
+class XMLEncoder(ExportEncoder):
+    """Flat XML document with one element per command."""
+
+    media_type = "application/xml"
+    extension = "xml"
+
+    def header(self) -> str:
+        return '<?xml version="1.0" encoding="UTF-8"?>\n<commands>\n'
+
+    def encode(self, record: dict[str, Any]) -> str:
+        fields = "".join(
+            f"<{f}>{escape(str(record[f]))}</{f}>"
+            for f in self.fields
+            if record[f] is not None
+        )
+        return f"  <command>{fields}</command>\n"
+
+    def footer(self) -> str:
+        return "</commands>\n"
+
+
+ENCODERS: dict[OutputFormat, type[ExportEncoder]] = {
+    OutputFormat.JSON: NDJSONEncoder,
+    OutputFormat.CSV: CSVEncoder,
+    OutputFormat.TABLE: TSVEncoder,
+    OutputFormat.TEXT: TextEncoder,
+    OutputFormat.XML: XMLEncoder,
+}
+
+
+class CommandExporter:
+    """Creates export links and streams their content."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        batch_size: int = EXPORT_BATCH_SIZE,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+
+    def create_export_token(
+        self, user_id: str, export_id: str, export_request: CommandExportRequest
+    ) -> tuple[str, datetime]:
+        """Sign an export request into an expiring download token."""
+        expires_at = datetime.now(UTC) + EXPORT_LINK_TTL
+        token = create_access_token(
+            {
+                # Non-UUID subject so the link can never act as an access token
+                "sub": f"export:{export_id}",
+                "type": EXPORT_TOKEN_TYPE,
+                "user_id": user_id,
+                "request": export_request.model_dump(mode="json"),
+            },
+            expires_delta=EXPORT_LINK_TTL,
+        )
+        return token, expires_at
+
+    def load_export_request(
+        self, token: str, export_id: str, user_id: str
+    ) -> CommandExportRequest:
+        """Verify a download token and recover the export request."""
+        try:
+            payload = decode_token(token)
+        except JWTError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Export not found or expired",
+            ) from e
+
+        if (
+            payload.get("type") != EXPORT_TOKEN_TYPE
+            or payload.get("sub") != f"export:{export_id}"
+            or payload.get("user_id") != user_id
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Export not found or expired",
+            )
+
+        return CommandExportRequest.model_validate(payload["request"])
+
+    def filename(self, export_id: str, export_request: CommandExportRequest) -> str:
+        """Get the download filename for an export."""
+        name = f"commands-{export_id}.{ENCODERS[export_request.format].extension}"
+        return f"{name}.gz" if export_request.compress else name
+
+    def media_type(self, export_request: CommandExportRequest) -> str:
+        """Get the response media type for an export."""
+        if export_request.compress:
+            return "application/gzip"
+        return ENCODERS[export_request.format].media_type
+
+    async def count(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        export_request: CommandExportRequest,
+    ) -> int:
+        """Count the commands an export will contain."""
+        total = await CommandRepository(session).count_user_commands_for_export(
+            user_id,
+            session_ids=export_request.session_ids,
+            executed_after=export_request.date_from,
+            executed_before=export_request.date_to,
+            include_errors=export_request.include_errors,
+        )
+        return min(total, export_request.max_commands)
+
+    async def stream(
+        self, user_id: str, export_request: CommandExportRequest
+    ) -> AsyncIterator[bytes]:
+        """Stream an encoded, optionally compressed export."""
+        columns = EXPORT_COLUMNS + (
+            EXPORT_OUTPUT_COLUMNS if export_request.include_output else []
+        )
+        encoder = ENCODERS[export_request.format](_field_names(columns))
+        compressor = (
+            zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+            if export_request.compress
+            else None
+        )
+
+        def emit(text: str) -> bytes:
+            data = text.encode("utf-8")
+            return compressor.compress(data) if compressor else data
+
+        pending: list[str] = [encoder.header()]
+        pending_size = len(pending[0])
+        exported = 0
+
+        # Use a dedicated session: the stream outlives the request handler.
+        async with self.session_factory() as session:
+            rows = CommandRepository(session).stream_user_commands_for_export(
+                user_id,
+                columns,
+                session_ids=export_request.session_ids,
+                executed_after=export_request.date_from,
+                executed_before=export_request.date_to,
+                include_errors=export_request.include_errors,
+                limit=export_request.max_commands,
+                batch_size=self.batch_size,
+            )
+            async for row in rows:
+                encoded = encoder.encode(_row_to_record(row, columns))
+                pending.append(encoded)
+                pending_size += len(encoded)
+                exported += 1
+
+                if pending_size >= self.chunk_size:
+                    chunk = emit("".join(pending))
+                    pending.clear()
+                    pending_size = 0
+                    if chunk:
+                        yield chunk
+
+        pending.append(encoder.footer())
+        chunk = emit("".join(pending))
+        if compressor:
+            chunk += compressor.flush()
+        if chunk:
+            yield chunk
+
+        logger.info(f"Command export streamed {exported} commands for user {user_id}")
@@ -5,17 +5,20 @@ Handles all command-related endpoints including history, analytics,
 search operations, and command insights.
 """
 
-from datetime import UTC
+import uuid
+from datetime import UTC, datetime
 from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.dependencies import get_current_active_user
 from app.core.logging import logger
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.user import User
 
+from .export import CommandExporter
 from .schemas import (
     # Batch operations
     BulkCommandOperation,
@@ -66,7 +69,7 @@ router = APIRouter(
 )
 async def get_command_history(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     session_id: str | None = Query(None, description="Filter by session ID"),
     offset: int = Query(default=0, ge=0, description="Pagination offset"),
     limit: int = Query(default=100, ge=1, le=500, description="Pagination limit"),
@@ -124,7 +127,7 @@ async def delete_command(
 async def search_commands(
     search_request: CommandSearchRequest,
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> CommandListResponse:
     """Search commands with advanced filtering and full-text search."""
     service = CommandService(db)
@@ -150,7 +153,7 @@ async def search_commands(
 )
 async def get_usage_stats(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> CommandUsageStats:
     """Get comprehensive command usage statistics and analytics."""
     service = CommandService(db)
@@ -165,7 +168,7 @@ async def get_usage_stats(
 )
 async def get_session_stats(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     session_id: str | None = Query(None, description="Filter by specific session"),
 ) -> list[SessionCommandStats]:
     """Get command statistics grouped by session."""
@@ -181,7 +184,7 @@ async def get_session_stats(
 )
 async def get_frequent_commands(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     days: int = Query(default=30, ge=1, le=365, description="Analysis period in days"),
     min_usage: int = Query(default=3, ge=1, le=100, description="Minimum usage count"),
 ) -> FrequentCommandsResponse:
@@ -242,70 +245,7 @@ async def bulk_command_operations(
 ) -> BulkCommandResponse:
     """Perform bulk operations on multiple commands."""
     service = CommandService(db)
-
-    success_count = 0
-    error_count = 0
-    results = []
-
-    for command_id in operation.command_ids:
-        try:
-            if operation.operation == "delete":
-                await service.delete_command(current_user, command_id)
-                results.append(
-                    {
-                        "command_id": command_id,
-                        "status": "success",
-                        "operation": "delete",
-                    }
-                )
-                success_count += 1
-
-            elif operation.operation == "archive":
-                # Archive operation (mark as archived, don't delete)
-                # This would be implemented based on business requirements
-                results.append(
-                    {
-                        "command_id": command_id,
-                        "status": "success",
-                        "operation": "archive",
-                    }
-                )
-                success_count += 1
-
-            else:
-                raise ValueError(f"Unsupported operation: {operation.operation}")
-
-        except HTTPException as e:
-            results.append(
-                {
-                    "command_id": command_id,
-                    "status": "error",
-                    "error": e.detail,
-                    "operation": operation.operation,
-                }
-            )
-            error_count += 1
-
-        except Exception as e:
-            results.append(
-                {
-                    "command_id": command_id,
-                    "status": "error",
-                    "error": str(e),
-                    "operation": operation.operation,
-                }
-            )
-            error_count += 1
-
-    message = f"Bulk {operation.operation} completed: {success_count} successful, {error_count} failed"
-
-    return BulkCommandResponse(
-        success_count=success_count,
-        error_count=error_count,
-        results=results,
-        operation=operation.operation,
-        message=message,
-    )
+    return await service.bulk_command_operation(current_user.id, operation)
 
 
 # Export and Reporting Endpoints
@@ -324,40 +264,22 @@ async def export_commands(
 ) -> CommandExportResponse:
     """Export command history in various formats."""
     try:
-        # This is a simplified implementation
-        # In production, this would create a background job for large exports
-
-        import uuid
-        from datetime import datetime
-
+        exporter = CommandExporter()
+        user_id = str(current_user.id)
         export_id = str(uuid.uuid4())
 
-        # Get commands based on export criteria
-        search_request = CommandSearchRequest(
-            query=None,
-            command_type=None,
-            min_duration_ms=None,
-            max_duration_ms=None,
-            working_directory=None,
-            session_id=None,
-            executed_after=export_request.date_from,
-            executed_before=export_request.date_to,
-            limit=export_request.max_commands,
-            offset=0,
+        # The export is streamed on download; only a signed link is issued here
+        token, expires_at = exporter.create_export_token(
+            user_id, export_id, export_request
         )
-
-        service = CommandService(db)
-        commands, total = await service.search_commands(current_user, search_request)
-
-        # In production, this would generate the actual export file
-        # and store it in a file storage service
+        total = await exporter.count(db, user_id, export_request)
 
         return CommandExportResponse(
             export_id=export_id,
-            status="completed",
-            total_commands=len(commands),
-            file_url=f"/api/commands/exports/{export_id}/download",
-            expires_at=datetime.now(UTC).replace(hour=23, minute=59, second=59),
+            status="ready",
+            total_commands=total,
+            file_url=f"/api/commands/exports/{export_id}/download?token={token}",
+            expires_at=expires_at,
             created_at=datetime.now(UTC),
         )
 
@@ -369,6 +291,30 @@ async def export_commands(
         ) from e
 
 
+@router.get(
+    "/exports/{export_id}/download",
+    summary="Download Command Export",
+    description="Stream a previously requested command export",
+    response_class=StreamingResponse,
+)
+async def download_command_export(
+    export_id: str,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    token: str = Query(..., description="Export link token"),
+) -> StreamingResponse:
+    """Stream a previously requested command export."""
+    exporter = CommandExporter()
+    user_id = str(current_user.id)
+    export_request = exporter.load_export_request(token, export_id, user_id)
+
+    filename = exporter.filename(export_id, export_request)
+    return StreamingResponse(
+        exporter.stream(user_id, export_request),
+        media_type=exporter.media_type(export_request),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 # Analysis and Insights Endpoints
 
 
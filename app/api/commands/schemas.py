@@ -391,8 +391,9 @@ class CommandExportRequest(BaseModel):
     include_output: bool = Field(default=False, description="Include command output")
     include_errors: bool = Field(default=True, description="Include error commands")
     format: OutputFormat = Field(default=OutputFormat.JSON, description="Export format")
+    compress: bool = Field(default=True, description="Gzip-compress the export")
     max_commands: int = Field(
-        default=10000, ge=1, le=50000, description="Maximum commands"
+        default=10000, ge=1, le=10_000_000, description="Maximum commands"
     )
 
 
@@ -455,7 +456,9 @@ class BulkCommandOperation(BaseModel):
     command_ids: Annotated[
         list[str], Field(min_length=1, max_length=1000, description="Command IDs")
     ]
-    operation: str = Field(..., description="Operation: delete, archive, export")
+    operation: str = Field(
+        ..., description="Operation: delete, archive, unarchive, tag, reclassify"
+    )
     parameters: dict[str, Any] | None = Field(None, description="Operation parameters")
 
 
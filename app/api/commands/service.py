@@ -7,7 +7,9 @@ Contains business logic for command history, analytics, search, and related oper
 import re
 from collections import Counter, defaultdict
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
 from typing import Any, cast
+from uuid import UUID as PyUUID
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -18,6 +20,8 @@ from app.repositories.command import CommandRepository
 from app.repositories.session import SessionRepository
 
 from .schemas import (
+    BulkCommandOperation,
+    BulkCommandResponse,
     CommandHistoryEntry,
     CommandHistoryResponse,
     CommandMetrics,
@@ -33,6 +37,31 @@ from .schemas import (
     SessionCommandStats,
 )
 
+# Template normalization rules, applied in order
+_TEMPLATE_RULES = [
+    (re.compile(r"/[/\w.-]*"), "/path"),  # File paths
+    (re.compile(r"\b\d+\b"), "N"),  # Numbers
+    (re.compile(r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b"), "IP"),  # IPs
+    (re.compile(r"https?://[^\s]+"), "URL"),  # URLs
+]
+
+
+@lru_cache(maxsize=65536)
+def command_template(command: str) -> str:
+    """Normalize a command into its template by replacing variable parts.
+
+    Results are cached per process, since the same command lines recur
+    across history entries and across analysis requests.
+    """
+    template = command
+    for pattern, replacement in _TEMPLATE_RULES:
+        template = pattern.sub(replacement, template)
+    return template
+
+
+# Operations supported by bulk_command_operation
+BULK_OPERATIONS = ("delete", "archive", "unarchive", "tag", "reclassify")
+
 
 class CommandService:
     """Service class for command management."""
@@ -323,6 +352,108 @@ class CommandService:
                 detail="Failed to delete command",
             ) from e
 
+    async def bulk_command_operation(
+        self, user_id: str | PyUUID, operation: BulkCommandOperation
+    ) -> BulkCommandResponse:
+        """Apply one operation to a set of commands with set-based statements.
+
+        Ownership of the whole ID set is validated with a single query and the
+        change is applied with one statement per chunk, committed once.
+        """
+        op_name = operation.operation
+        results: dict[str, dict[str, Any]] = {}
+
+        def fail(command_id: str, error: str) -> None:
+            results[command_id] = {
+                "command_id": command_id,
+                "status": "error",
+                "error": error,
+                "operation": op_name,
+            }
+
+        valid_ids: dict[PyUUID, list[str]] = defaultdict(list)
+        for command_id in operation.command_ids:
+            try:
+                valid_ids[PyUUID(command_id)].append(command_id)
+            except ValueError:
+                fail(command_id, "Invalid command ID")
+
+        try:
+            if op_name not in BULK_OPERATIONS:
+                raise ValueError(f"Unsupported operation: {op_name}")
+
+            params = operation.parameters or {}
+            tags = params.get("tags")
+            if op_name == "tag" and (
+                not isinstance(tags, list)
+                or not all(isinstance(tag, str) for tag in tags)
+            ):
+                raise ValueError("Tag operation requires a 'tags' list of strings")
+
+            owned = await self.command_repo.get_owned_commands(user_id, list(valid_ids))
+            owned_ids = [row.id for row in owned]
+
+            if op_name == "delete":
+                await self.command_repo.bulk_delete_commands(owned_ids)
+            elif op_name in ("archive", "unarchive"):
+                await self.command_repo.bulk_update_commands(
+                    owned_ids, {"is_archived": op_name == "archive"}
+                )
+            elif op_name == "tag":
+                await self.command_repo.bulk_update_commands(
+                    owned_ids, {"tags": sorted(set(tags))}
+                )
+            else:
+                await self.command_repo.bulk_set_command_types(
+                    {row.id: self._classify_command(row.command).value for row in owned}
+                )
+
+            await self.session.commit()
+
+        except ValueError as e:
+            for command_ids in valid_ids.values():
+                for command_id in command_ids:
+                    fail(command_id, str(e))
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Error in bulk {op_name} operation: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to perform bulk {op_name}",
+            ) from e
+        else:
+            found = set(owned_ids)
+            for uuid_value, command_ids in valid_ids.items():
+                for command_id in command_ids:
+                    if uuid_value in found:
+                        results[command_id] = {
+                            "command_id": command_id,
+                            "status": "success",
+                            "operation": op_name,
+                        }
+                    else:
+                        fail(command_id, "Command not found")
+
+        ordered = [results[command_id] for command_id in operation.command_ids]
+        success_count = sum(1 for r in ordered if r["status"] == "success")
+        error_count = len(ordered) - success_count
+
+        logger.info(
+            f"Bulk {op_name} by user {user_id}: "
+            f"{success_count} successful, {error_count} failed"
+        )
+
+        return BulkCommandResponse(
+            success_count=success_count,
+            error_count=error_count,
+            results=ordered,
+            operation=op_name,
+            message=(
+                f"Bulk {op_name} completed: "
+                f"{success_count} successful, {error_count} failed"
+            ),
+        )
+
     async def get_usage_stats(self, user_id: str) -> CommandUsageStats:
         """Get comprehensive command usage statistics."""
         try:
@@ -500,32 +631,22 @@ class CommandService:
                     generated_at=datetime.now(UTC),
                 )
 
-            # Analyze command patterns
+            # Analyze command patterns in a single pass
             command_analysis = self._analyze_command_patterns(commands, min_usage)
 
-            frequent_commands = []
-            for pattern, data in command_analysis.items():
-                if data["count"] >= min_usage:
-                    # Calculate sessions used
-                    sessions_used = len(
-                        {
-                            cmd.session_id
-                            for cmd in commands
-                            if self._matches_pattern(cmd.command, pattern)
-                        }
-                    )
-
-                    frequent_cmd = FrequentCommand(
-                        command_template=pattern,
-                        usage_count=data["count"],
-                        last_used=data["last_used"],
-                        success_rate=data["success_rate"],
-                        average_duration_ms=data["average_duration"],
-                        variations=data["variations"][:10],  # Limit variations
-                        sessions_used=sessions_used,
-                        command_type=self._classify_command(pattern),
-                    )
-                    frequent_commands.append(frequent_cmd)
+            frequent_commands = [
+                FrequentCommand(
+                    command_template=pattern,
+                    usage_count=data["count"],
+                    last_used=data["last_used"],
+                    success_rate=data["success_rate"],
+                    average_duration_ms=data["average_duration"],
+                    variations=data["variations"][:10],  # Limit variations
+                    sessions_used=data["sessions_used"],
+                    command_type=self._classify_command(pattern),
+                )
+                for pattern, data in command_analysis.items()
+            ]
 
             # Sort by usage count
             frequent_commands.sort(key=lambda x: x.usage_count, reverse=True)
@@ -721,6 +842,21 @@ class CommandService:
                 detail="Failed to get command metrics",
             ) from e
 
+    def classify(self, command: str) -> dict[str, Any]:
+        """
+        Classify a command the way the command API does.
+
+        Args:
+            command: Command line
+
+        Returns:
+            ``command_type`` and ``is_dangerous`` column values
+        """
+        return {
+            "command_type": self._classify_command(command).value,
+            "is_dangerous": self._is_dangerous_command(command),
+        }
+
     # Private helper methods
 
     def _classify_command(self, command: str) -> CommandType:
@@ -741,30 +877,36 @@ class CommandService:
     def _analyze_command_patterns(
         self, commands: list[Command], min_usage: int
     ) -> dict[str, dict[str, Any]]:
-        """Analyze commands to find patterns and templates."""
+        """Analyze commands to find patterns and templates.
+
+        Each command is normalized once; counts, sessions, variations and
+        durations are accumulated in the same sweep.
+        """
         pattern_data: defaultdict[str, dict[str, Any]] = defaultdict(
             lambda: {
                 "count": 0,
-                "variations": [],
+                "variations": {},
+                "sessions": set(),
                 "success_count": 0,
-                "durations": [],
+                "duration_total": 0,
+                "duration_count": 0,
                 "last_used": None,
             }
         )
 
         for cmd in commands:
             # Create a pattern by replacing variable parts
-            pattern = self._create_command_pattern(cmd.command)
-
-            data = pattern_data[pattern]
+            data = pattern_data[command_template(cmd.command)]
             data["count"] += 1
-            data["variations"].append(cmd.command)
+            data["variations"][cmd.command] = None
+            data["sessions"].add(cmd.session_id)
 
             if cmd.exit_code == 0:
                 data["success_count"] += 1
 
             if cmd.duration_ms:
-                data["durations"].append(cmd.duration_ms)
+                data["duration_total"] += cmd.duration_ms
+                data["duration_count"] += 1
 
             if cmd.executed_at and (
                 not data["last_used"] or cmd.executed_at > data["last_used"]
@@ -772,46 +914,30 @@ class CommandService:
                 data["last_used"] = cmd.executed_at
 
         # Calculate derived metrics
-        result = {}
-        for pattern, data in pattern_data.items():
-            if data["count"] >= min_usage:
-                result[pattern] = {
-                    "count": data["count"],
-                    "variations": list(set(data["variations"])),
-                    "success_rate": (data["success_count"] / data["count"]) * 100,
-                    "average_duration": (
-                        sum(data["durations"]) / len(data["durations"])
-                        if data["durations"]
-                        else 0
-                    ),
-                    "last_used": data["last_used"],
-                }
-
-        return result
+        return {
+            pattern: {
+                "count": data["count"],
+                "variations": list(data["variations"]),
+                "sessions_used": len(data["sessions"]),
+                "success_rate": (data["success_count"] / data["count"]) * 100,
+                "average_duration": (
+                    data["duration_total"] / data["duration_count"]
+                    if data["duration_count"]
+                    else 0
+                ),
+                "last_used": data["last_used"],
+            }
+            for pattern, data in pattern_data.items()
+            if data["count"] >= min_usage
+        }
 
     def _create_command_pattern(self, command: str) -> str:
         """Create a command pattern by replacing variable parts."""
-        # Simple pattern creation - replace paths, numbers, and common variables
-        pattern = command
-
-        # Replace file paths
-        pattern = re.sub(r"/[/\w.-]*", "/path", pattern)
-
-        # Replace numbers
-        pattern = re.sub(r"\b\d+\b", "N", pattern)
-
-        # Replace IP addresses
-        pattern = re.sub(r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b", "IP", pattern)
-
-        # Replace URLs
-        pattern = re.sub(r"https?://[^\s]+", "URL", pattern)
-
-        return pattern
+        return command_template(command)
 
     def _matches_pattern(self, command: str, pattern: str) -> bool:
         """Check if command matches the given pattern."""
-        cmd_pattern = self._create_command_pattern(command)
-        return cmd_pattern == pattern
+        return command_template(command) == pattern
 
     def _get_file_operation_suggestions(self, context: str) -> list[CommandSuggestion]:
         """Generate file operation command suggestions."""
@@ -8,7 +8,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.dependencies import get_current_active_user
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.user import User
 
 from .schemas import (
@@ -67,7 +67,7 @@ async def delete_account(
 @router.get("/stats", response_model=dict[str, Any], summary="Get Account Statistics")
 async def get_account_stats(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> dict[str, Any]:
     """Get current user's account statistics and usage information."""
     service = ProfileService(db)
@@ -12,7 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.dependencies import get_current_active_user
 from app.core.logging import logger
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.user import User
 
 from .schemas import (
@@ -199,7 +199,7 @@ async def execute_command(
 async def get_session_history(
     session_id: str,
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     limit: int = Query(default=100, ge=1, le=1000, description="History entries limit"),
     offset: int = Query(default=0, ge=0, description="History offset"),
 ) -> SessionHistoryResponse:
@@ -238,7 +238,7 @@ async def check_session_health(
 async def search_sessions(
     search_request: SessionSearchRequest,
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> SessionListResponse:
     """Search terminal sessions with advanced filters."""
     service = SessionService(db)
@@ -260,7 +260,7 @@ async def search_sessions(
 )
 async def get_session_stats(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> SessionStats:
     """Get comprehensive terminal session usage statistics."""
     service = SessionService(db)
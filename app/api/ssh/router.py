@@ -11,7 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.dependencies import get_current_active_user
 from app.core.logging import logger
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.user import User
 
 from .schemas import (
@@ -156,7 +156,7 @@ async def delete_ssh_profile(
 async def search_ssh_profiles(
     search_request: SSHProfileSearchRequest,
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> SSHProfileListResponse:
     """Search SSH profiles with filters and pagination."""
     service = SSHProfileService(db)
@@ -178,7 +178,7 @@ async def search_ssh_profiles(
 )
 async def get_ssh_profile_stats(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> SSHProfileStats:
     """Get SSH profile usage statistics and analytics."""
     service = SSHProfileService(db)
@@ -287,7 +287,7 @@ async def delete_ssh_key(
 async def search_ssh_keys(
     search_request: SSHKeySearchRequest,
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> SSHKeyListResponse:
     """Search SSH keys with filters and pagination."""
     service = SSHKeyService(db)
@@ -309,7 +309,7 @@ async def search_ssh_keys(
 )
 async def get_ssh_key_stats(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> SSHKeyStats:
     """Get SSH key usage statistics and analytics."""
     service = SSHKeyService(db)
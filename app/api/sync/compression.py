@@ -0,0 +1,90 @@
+"""
+Response compression for sync endpoints.
+
+Sync pages can carry hundreds of JSON documents. Responses larger than
+``settings.sync_compression_min_bytes`` are compressed with zstd (when the
+optional ``zstandard`` package is installed) or gzip, whichever the client
+prefers among those it accepts; smaller ones are sent as-is, where the
+compression overhead would outweigh the savings.
+"""
+
+import gzip
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Content encodings this process can produce, best first."""
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Pick a content encoding from an ``Accept-Encoding`` header.
+
+    Args:
+        accept_encoding: Header value, e.g. ``"gzip, zstd;q=0.9"``
+
+    Returns:
+        The supported encoding with the highest q-value, or None
+    """
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    candidates = [
+        (accepted.get(encoding, accepted.get("*", 0.0)), -rank, encoding)
+        for rank, encoding in enumerate(supported_encodings())
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a response body with a negotiated encoding."""
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def json_response(request: Request, model: BaseModel) -> Response:
+    """
+    Serialize a response model, compressing it when it is large enough.
+
+    Args:
+        request: Incoming request (for ``Accept-Encoding``)
+        model: Response body
+
+    Returns:
+        JSON response, possibly with a ``Content-Encoding``
+    """
+    body = model.model_dump_json().encode()
+    headers = {"Vary": "Accept-Encoding"}
+
+    if len(body) >= settings.sync_compression_min_bytes:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is not None:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -4,17 +4,21 @@ Multi-Device Synchronization API router for DevPocket.
 
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.dependencies import get_current_active_user
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.user import User
 
+from .compression import json_response
 from .schemas import (
     MessageResponse,
+    SyncConflictReport,
     SyncDataRequest,
     SyncDataResponse,
+    SyncPatchRequest,
+    SyncPatchResponse,
     SyncStats,
 )
 from .service import SyncService
@@ -33,12 +37,36 @@ router = APIRouter(
 @router.get("/data", response_model=SyncDataResponse, summary="Get Sync Data")
 async def get_sync_data(
     request: SyncDataRequest,
+    http_request: Request,
     current_user: Annotated[User, Depends(get_current_active_user)],
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> SyncDataResponse:
-    """Retrieve synchronization data for device."""
+) -> Response:
+    """Retrieve synchronization data for device (compressed when large)."""
     service = SyncService(db)
-    return await service.sync_data(current_user, request)
+    result = await service.sync_data(current_user, request)
+    return json_response(http_request, result)
+
+
+@router.patch(
+    "/data/{sync_type}/{sync_key}",
+    response_model=SyncPatchResponse,
+    summary="Patch Sync Item",
+    responses={
+        404: {"description": "Sync item not found"},
+        409: {"description": "Sync item changed since the base version"},
+        422: {"description": "Patch does not apply"},
+    },
+)
+async def patch_sync_item(
+    sync_type: str,
+    sync_key: str,
+    request: SyncPatchRequest,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> SyncPatchResponse:
+    """Apply a JSON Patch to one sync item instead of uploading it whole."""
+    service = SyncService(db)
+    return await service.patch_sync_item(current_user, sync_type, sync_key, request)
 
 
 @router.post("/data", response_model=MessageResponse, summary="Upload Sync Data")
@@ -53,10 +81,25 @@ async def upload_sync_data(
     return MessageResponse(message="Sync data uploaded successfully")
 
 
+@router.get(
+    "/conflicts",
+    response_model=list[SyncConflictReport],
+    summary="Get Sync Conflicts",
+)
+async def get_sync_conflicts(
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    sync_type: str | None = Query(None, description="Only this sync type"),
+) -> list[SyncConflictReport]:
+    """List unresolved conflicts with the fields that differ."""
+    service = SyncService(db)
+    return await service.get_conflict_report(current_user, sync_type)
+
+
 @router.get("/stats", response_model=SyncStats, summary="Get Sync Statistics")
 async def get_sync_stats(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> SyncStats:
     """Get synchronization statistics."""
     service = SyncService(db)
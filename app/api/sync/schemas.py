@@ -8,6 +8,10 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+# Changes returned per sync page
+SYNC_PAGE_SIZE = 500
+MAX_SYNC_PAGE_SIZE = 1000
+
 
 class SyncStatus(str, Enum):
     """Synchronization status."""
@@ -38,9 +42,30 @@ class SyncDataRequest(BaseModel):
     device_id: str = Field(..., description="Unique device identifier")
     device_name: str = Field(..., description="Human-readable device name")
     last_sync_timestamp: datetime | None = Field(
-        None, description="Last synchronization time"
+        None, description="Last synchronization time (used when no cursor is given)"
+    )
+    cursor: str | None = Field(
+        None, description="Cursor from the previous response to resume after"
+    )
+    limit: int = Field(
+        default=SYNC_PAGE_SIZE,
+        ge=1,
+        le=MAX_SYNC_PAGE_SIZE,
+        description="Maximum number of changes to return",
     )
     include_deleted: bool = Field(default=False, description="Include deleted items")
+    data_filter: dict[str, Any] | None = Field(
+        default=None,
+        description="Only return items whose data contains this JSON object",
+        examples=[{"host": "server.example.com"}],
+    )
+    known_versions: dict[str, int] | None = Field(
+        default=None,
+        description=(
+            "Versions the device already holds, by sync key; those items come "
+            "back as a patch against that version when it is smaller"
+        ),
+    )
 
 
 class SyncDataResponse(BaseModel):
@@ -58,6 +83,31 @@ class SyncDataResponse(BaseModel):
     conflict_type: str | None = Field(
         default=None, description="Type of conflict if any"
     )
+    next_cursor: str | None = Field(
+        default=None, description="Cursor to request the next page with"
+    )
+    has_more: bool = Field(default=False, description="More changes are pending")
+
+
+class SyncPatchRequest(BaseModel):
+    """Schema for a field-level update of one sync item."""
+
+    base_version: int = Field(..., ge=1, description="Version the patch applies to")
+    patch: list[dict[str, Any]] = Field(
+        ...,
+        description="JSON Patch (RFC 6902) operations",
+        examples=[[{"op": "replace", "path": "/font_size", "value": 14}]],
+    )
+    device_id: str = Field(..., description="Unique device identifier")
+    device_type: str = Field(default="web", description="Device type")
+
+
+class SyncPatchResponse(BaseModel):
+    """Schema for a patched sync item."""
+
+    sync_key: str = Field(..., description="Sync item key")
+    version: int = Field(..., description="New version")
+    change_seq: int = Field(..., description="Position in the change sequence")
 
 
 class SyncConflictResolution(BaseModel):
@@ -72,6 +122,21 @@ class SyncConflictResolution(BaseModel):
     )
 
 
+class SyncConflictReport(BaseModel):
+    """Schema for one unresolved sync conflict."""
+
+    sync_type: str = Field(..., description="Sync item type")
+    sync_key: str = Field(..., description="Sync item key")
+    version: int = Field(..., description="Stored version")
+    source_device_id: str = Field(..., description="Device of the stored version")
+    conflict_created_at: str | None = Field(
+        None, description="When the conflicting change arrived"
+    )
+    changed_fields: list[str] = Field(
+        default=[], description="Top-level fields that differ"
+    )
+
+
 # Device Management Schemas
 class DeviceInfo(BaseModel):
     """Schema for device information."""
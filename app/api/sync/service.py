@@ -2,6 +2,9 @@
 Multi-device synchronization service for DevPocket API.
 """
 
+import base64
+import binascii
+import json
 from datetime import UTC, datetime, timedelta
 from typing import Any
 from uuid import UUID as PyUUID
@@ -10,6 +13,7 @@ import redis.asyncio as aioredis
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.json_patch import apply_patch
 from app.core.logging import logger
 from app.models.sync import SyncData
 from app.models.user import User
@@ -17,14 +21,80 @@ from app.repositories.sync import SyncDataRepository
 
 from .schemas import (
     DeviceRegistration,
+    SyncConflictReport,
     SyncConflictResolution,
     SyncDataRequest,
     SyncDataResponse,
+    SyncDataType,
+    SyncPatchRequest,
+    SyncPatchResponse,
     SyncStats,
 )
 from .services.conflict_resolver import ConflictResolver
 from .services.pubsub_manager import PubSubManager
 
+_CURSOR_PREFIX = "seq:"
+
+
+def encode_sync_cursor(change_seq: int) -> str:
+    """Encode a change sequence position as an opaque cursor."""
+    raw = f"{_CURSOR_PREFIX}{change_seq}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> int:
+    """
+    Decode a cursor produced by encode_sync_cursor.
+
+    Args:
+        cursor: Opaque cursor
+
+    Returns:
+        The change sequence position
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid sync cursor") from e
+    if not raw.startswith(_CURSOR_PREFIX) or not raw[len(_CURSOR_PREFIX) :].isdigit():
+        raise ValueError("Invalid sync cursor")
+    return int(raw[len(_CURSOR_PREFIX) :])
+
+
+def _sync_item_payload(
+    item: SyncData, known_version: int | None = None
+) -> dict[str, Any]:
+    """
+    Serialize a sync item for a sync response.
+
+    Args:
+        item: Sync item
+        known_version: Version the device holds, if any
+
+    Returns:
+        The item with its full ``data``, or with ``base_version`` and
+        ``patch`` when a patch from the known version is smaller
+    """
+    payload = {
+        "sync_key": item.sync_key,
+        "version": item.version,
+        "is_deleted": item.is_deleted,
+        "last_modified_at": item.last_modified_at.isoformat(),
+        "source_device_id": item.source_device_id,
+        "change_seq": item.change_seq,
+    }
+
+    patch = item.patch_since(known_version) if known_version else None
+    if patch is not None and len(json.dumps(patch)) < len(json.dumps(item.data)):
+        payload["base_version"] = known_version
+        payload["patch"] = patch
+    else:
+        payload["data"] = item.data
+    return payload
+
 
 class SyncService:
     """Service class for multi-device synchronization."""
@@ -102,33 +172,77 @@ class SyncService:
                 request = request_or_data
                 assert isinstance(request, SyncDataRequest)  # Type assertion for mypy
 
-                # Get data based on last sync timestamp
-                last_sync = request.last_sync_timestamp or datetime.min.replace(
-                    tzinfo=UTC
+                # Resume after the cursor; first pulls may start from a timestamp
+                try:
+                    after_seq = (
+                        decode_sync_cursor(request.cursor) if request.cursor else 0
+                    )
+                except ValueError as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+                    ) from e
+                modified_since = None if request.cursor else request.last_sync_timestamp
+                sync_types = (
+                    None
+                    if SyncDataType.ALL in request.data_types
+                    else [data_type.value for data_type in request.data_types]
                 )
-                sync_data = await self.sync_repo.get_sync_changes_since(
-                    user.id, last_sync
+
+                # One extra row tells whether another page follows
+                changes = await self.sync_repo.get_changes_after(
+                    user.id,
+                    after_seq,
+                    request.limit + 1,
+                    sync_types=sync_types,
+                    include_deleted=request.include_deleted,
+                    modified_since=modified_since,
+                    data_contains=request.data_filter,
                 )
+                has_more = len(changes) > request.limit
+                changes = changes[: request.limit]
 
                 # Organize data by type
                 organized_data: dict[str, Any] = {}
                 for data_type in request.data_types:
                     organized_data[data_type.value] = []
+                known_versions = request.known_versions or {}
+                for item in changes:
+                    organized_data.setdefault(item.sync_type, []).append(
+                        _sync_item_payload(item, known_versions.get(item.sync_key))
+                    )
 
-                total_items = len(sync_data)
                 conflicts: list[dict[str, Any]] = []  # Would detect conflicts here
 
-                # Get device count
-                device_count = await self.sync_repo.count_user_devices(user.id)
+                # Devices seen within the presence retention period
+                await self.pubsub_manager.register_device_activity(
+                    user.id, request.device_id
+                )
+                presence = self.pubsub_manager.presence
+                device_count = await presence.count_active(
+                    user.id, within_seconds=presence.retention_seconds
+                )
+
+                # An empty page resumes from the user's latest change, so a
+                # first pull by timestamp does not replay history next time
+                if changes:
+                    next_seq = changes[-1].change_seq
+                else:
+                    next_seq = max(
+                        after_seq, await self.sync_repo.get_last_change_seq(user.id)
+                    )
 
                 return SyncDataResponse(
                     data=organized_data,
                     sync_timestamp=datetime.now(UTC),
-                    total_items=total_items,
+                    total_items=len(changes),
                     conflicts=conflicts,
                     device_count=device_count,
+                    next_cursor=encode_sync_cursor(next_seq),
+                    has_more=has_more,
                 )
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error syncing data: {e}")
             raise HTTPException(
@@ -136,6 +250,61 @@ class SyncService:
                 detail="Failed to synchronize data",
             ) from e
 
+    async def patch_sync_item(
+        self, user: User, sync_type: str, sync_key: str, request: SyncPatchRequest
+    ) -> SyncPatchResponse:
+        """
+        Apply a field-level patch to one sync item.
+
+        Args:
+            user: Owner of the item
+            sync_type: Item type
+            sync_key: Item key
+            request: Patch and the version it was made against
+
+        Returns:
+            The item's new version
+
+        Raises:
+            HTTPException: 404 if the item does not exist, 409 if it has
+                moved past ``base_version``, 422 if the patch does not apply
+        """
+        item = await self.sync_repo.get_sync_item(
+            user.id, sync_type, sync_key, for_update=True
+        )
+        if item is None or item.is_deleted:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Sync item not found"
+            )
+        if item.version != request.base_version:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=(
+                    f"Sync item is at version {item.version}, "
+                    f"patch was made against {request.base_version}"
+                ),
+            )
+
+        try:
+            new_data = apply_patch(item.data, request.patch)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+            ) from e
+        if not isinstance(new_data, dict):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Patched document must be an object",
+            )
+
+        item.update_data(new_data, request.device_id, request.device_type)
+        await self.session.flush()
+        response = SyncPatchResponse(
+            sync_key=item.sync_key, version=item.version, change_seq=item.change_seq
+        )
+        await self.session.commit()
+        return response
+
     async def upload_sync_data(self, user: User, data: dict[str, Any]) -> bool:
         """Upload synchronization data from device."""
         try:
@@ -160,6 +329,21 @@ class SyncService:
                 detail="Failed to upload sync data",
             ) from e
 
+    async def get_conflict_report(
+        self, user: User, sync_type: str | None = None
+    ) -> list[SyncConflictReport]:
+        """Get the user's unresolved sync conflicts."""
+        try:
+            report = await self.sync_repo.get_conflict_report(user.id, sync_type)
+            return [SyncConflictReport(**entry) for entry in report]
+
+        except Exception as e:
+            logger.error(f"Error getting conflict report: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to get sync conflicts",
+            ) from e
+
     async def get_sync_stats(self, user: User) -> SyncStats:
         """Get synchronization statistics."""
         try:
@@ -170,7 +354,7 @@ class SyncService:
                 successful_syncs=stats.get("successful_syncs", 0),
                 failed_syncs=stats.get("failed_syncs", 0),
                 last_sync=stats.get("last_sync"),
-                active_devices=stats.get("active_devices", 0),
+                active_devices=await self.pubsub_manager.presence.count_active(user.id),
                 total_conflicts=stats.get("total_conflicts", 0),
                 resolved_conflicts=stats.get("resolved_conflicts", 0),
             )
@@ -265,9 +449,8 @@ class SyncService:
                 sync_enabled=True,
             )
 
-            # Register device activity in Redis
-            if self.redis_client:
-                await self.pubsub_manager.register_device_activity(user_id, device_id)
+            # Record the device's first heartbeat
+            await self.pubsub_manager.register_device_activity(user_id, device_id)
 
             return result
 
@@ -4,7 +4,8 @@ Sync services package for DevPocket API.
 
 from .command_sync import CommandSyncService
 from .conflict_resolver import ConflictResolver
-from .pubsub_manager import PubSubManager
+from .presence import DevicePresence, device_presence
+from .pubsub_manager import PubSubManager, PubSubRouter, pubsub_router
 from .settings_sync import SettingsSyncService
 from .ssh_sync import SSHProfileSyncService
 
@@ -12,6 +13,10 @@ __all__ = [
     "CommandSyncService",
     "SSHProfileSyncService",
     "PubSubManager",
+    "PubSubRouter",
+    "pubsub_router",
+    "DevicePresence",
+    "device_presence",
     "SettingsSyncService",
     "ConflictResolver",
 ]
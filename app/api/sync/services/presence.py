@@ -0,0 +1,322 @@
+"""
+Per-device presence tracking for synchronization.
+
+Each user has a Redis sorted set ``presence:{user_id}`` of device ID ->
+last heartbeat (Unix time). A heartbeat is one ZADD (O(log n)), "active in
+the last N seconds" is a ZRANGEBYSCORE/ZCOUNT over the tail of the set, and
+lookups for many users are pipelined into a single round trip. Every device
+keeps its own score, so a device that stops sending heartbeats drops out of
+range queries right away and is removed by the periodic trim, however
+active the user's other devices are.
+
+``presence:users`` indexes users by their latest heartbeat; the trim walks
+it in pipelined batches and then drops users idle past the retention
+period, whose keys have also expired by then. The walk pages by score with
+a (score, member) cursor, so a heartbeat that moves a user during the walk
+only makes it visit that user again, never skip one. The periodic trim
+takes a ``SET NX EX`` lock first, so one worker walks the index per
+interval. Without Redis, presence is kept in process memory.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator, Iterable
+from typing import Any
+from uuid import UUID as PyUUID
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.logging import logger
+
+PRESENCE_KEY_PREFIX = "presence"
+PRESENCE_INDEX_KEY = "presence:users"
+PRESENCE_TRIM_LOCK_KEY = "presence:trim:lock"
+
+# Users trimmed per pipelined round trip
+PRESENCE_TRIM_BATCH_SIZE = 500
+
+
+def presence_key(user_id: str | PyUUID) -> str:
+    """Sorted-set key holding a user's device heartbeats."""
+    return f"{PRESENCE_KEY_PREFIX}:{user_id}"
+
+
+def _decode(value: str | bytes) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class DevicePresence:
+    """Device last-seen tracking backed by per-user sorted sets."""
+
+    def __init__(
+        self,
+        window_seconds: int | None = None,
+        retention_seconds: int | None = None,
+        trim_interval_seconds: int | None = None,
+    ):
+        self.window_seconds = window_seconds or settings.presence_window_seconds
+        self.retention_seconds = (
+            retention_seconds or settings.presence_retention_seconds
+        )
+        self.trim_interval_seconds = (
+            trim_interval_seconds or settings.presence_trim_interval_seconds
+        )
+        self.redis: aioredis.Redis | None = None
+
+        # user -> device -> last seen, used when Redis is not configured
+        self._local: dict[str, dict[str, float]] = {}
+        self._trim_task: asyncio.Task | None = None
+
+    async def heartbeat(
+        self, user_id: str | PyUUID, device_id: str, at: float | None = None
+    ) -> None:
+        """
+        Record that a device was just seen.
+
+        Args:
+            user_id: Device owner
+            device_id: Device ID
+            at: Heartbeat time (Unix seconds), defaults to now
+        """
+        user_id = str(user_id)
+        now = time.time() if at is None else at
+
+        if self.redis is None:
+            self._local.setdefault(user_id, {})[device_id] = now
+            return
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zadd(presence_key(user_id), {device_id: now})
+                pipe.expire(presence_key(user_id), self.retention_seconds)
+                pipe.zadd(PRESENCE_INDEX_KEY, {user_id: now})
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error recording device heartbeat: {e}")
+
+    def _since(self, within_seconds: int | None) -> float:
+        window = self.window_seconds if within_seconds is None else within_seconds
+        return time.time() - window
+
+    async def active_devices_many(
+        self, user_ids: Iterable[str | PyUUID], within_seconds: int | None = None
+    ) -> dict[str, list[str]]:
+        """
+        Get the devices of several users seen within a window.
+
+        Args:
+            user_ids: Users to look up
+            within_seconds: Window length, defaults to ``window_seconds``
+
+        Returns:
+            User ID -> device IDs, least recently seen first
+        """
+        user_ids = [str(user_id) for user_id in user_ids]
+        since = self._since(within_seconds)
+
+        if self.redis is None:
+            return {
+                user_id: [
+                    device_id
+                    for device_id, seen in sorted(
+                        self._local.get(user_id, {}).items(), key=lambda kv: kv[1]
+                    )
+                    if seen >= since
+                ]
+                for user_id in user_ids
+            }
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.zrangebyscore(presence_key(user_id), since, "+inf")
+                results = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error getting active devices: {e}")
+            return {user_id: [] for user_id in user_ids}
+
+        return {
+            user_id: [_decode(device_id) for device_id in devices]
+            for user_id, devices in zip(user_ids, results, strict=True)
+        }
+
+    async def active_devices(
+        self, user_id: str | PyUUID, within_seconds: int | None = None
+    ) -> list[str]:
+        """Get a user's devices seen within a window."""
+        devices = await self.active_devices_many([user_id], within_seconds)
+        return devices[str(user_id)]
+
+    async def count_active(
+        self, user_id: str | PyUUID, within_seconds: int | None = None
+    ) -> int:
+        """Count a user's devices seen within a window."""
+        user_id = str(user_id)
+        since = self._since(within_seconds)
+
+        if self.redis is None:
+            return sum(
+                1 for seen in self._local.get(user_id, {}).values() if seen >= since
+            )
+
+        try:
+            return await self.redis.zcount(presence_key(user_id), since, "+inf")
+        except Exception as e:
+            logger.error(f"Error counting active devices: {e}")
+            return 0
+
+    async def trim(
+        self, user_ids: Iterable[str | PyUUID] | None = None, now: float | None = None
+    ) -> int:
+        """
+        Remove heartbeats older than the retention period.
+
+        Args:
+            user_ids: Users to trim, defaults to every indexed user
+            now: Current time (Unix seconds), defaults to now
+
+        Returns:
+            Number of device entries removed
+        """
+        cutoff = (time.time() if now is None else now) - self.retention_seconds
+
+        redis_client = self.redis
+        if redis_client is None:
+            return self._trim_local(user_ids, cutoff)
+
+        if user_ids is not None:
+            return await self._trim_users(
+                redis_client, [str(user_id) for user_id in user_ids], cutoff
+            )
+
+        removed = 0
+        async for batch in self._scan_index(redis_client):
+            removed += await self._trim_users(redis_client, batch, cutoff)
+
+        # Users idle past the cutoff have nothing left to trim
+        await redis_client.zremrangebyscore(PRESENCE_INDEX_KEY, "-inf", f"({cutoff}")
+        return removed
+
+    @staticmethod
+    async def _scan_index(
+        redis_client: aioredis.Redis,
+    ) -> AsyncIterator[list[str]]:
+        """
+        Yield every indexed user in batches, in (score, member) order.
+
+        Each page starts at the score of the last user seen and drops the
+        entries up to it, so users re-scored by a heartbeat mid-walk are
+        seen again later instead of shifting an offset past others.
+        """
+        cursor: tuple[float, str] | None = None
+        seen_at_cursor = 0
+        while True:
+            rows = await redis_client.zrangebyscore(
+                PRESENCE_INDEX_KEY,
+                "-inf" if cursor is None else cursor[0],
+                "+inf",
+                start=0,
+                num=PRESENCE_TRIM_BATCH_SIZE + seen_at_cursor,
+                withscores=True,
+            )
+            entries = [(float(score), _decode(member)) for member, score in rows]
+            batch = [entry for entry in entries if cursor is None or entry > cursor]
+            if not batch:
+                return
+
+            yield [user_id for _, user_id in batch]
+
+            cursor = batch[-1]
+            # Users tied with the cursor are fetched again by the next page
+            seen_at_cursor = sum(
+                1 for entry in entries if entry[0] == cursor[0] and entry <= cursor
+            )
+
+    async def _claim_trim(self, redis_client: aioredis.Redis) -> bool:
+        """Take the cross-worker trim lock for one interval."""
+        return bool(
+            await redis_client.set(
+                PRESENCE_TRIM_LOCK_KEY,
+                "1",
+                nx=True,
+                ex=self.trim_interval_seconds,
+            )
+        )
+
+    @staticmethod
+    async def _trim_users(
+        redis_client: aioredis.Redis, user_ids: list[str], cutoff: float
+    ) -> int:
+        """Remove stale entries of the given users in one round trip."""
+        if not user_ids:
+            return 0
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.zremrangebyscore(presence_key(user_id), "-inf", f"({cutoff}")
+            return sum(await pipe.execute())
+
+    def _trim_local(
+        self, user_ids: Iterable[str | PyUUID] | None, cutoff: float
+    ) -> int:
+        removed = 0
+        targets = list(self._local) if user_ids is None else [str(u) for u in user_ids]
+        for user_id in targets:
+            devices = self._local.get(user_id)
+            if devices is None:
+                continue
+            for device_id in [d for d, seen in devices.items() if seen < cutoff]:
+                del devices[device_id]
+                removed += 1
+            if not devices:
+                del self._local[user_id]
+        return removed
+
+    async def start(self, redis_client: aioredis.Redis | None) -> None:
+        """Use a Redis client and start the periodic trim."""
+        self.redis = redis_client
+        if self._trim_task is None or self._trim_task.done():
+            self._trim_task = asyncio.create_task(self._trim_periodically())
+
+    async def stop(self) -> None:
+        """Stop the periodic trim."""
+        if self._trim_task:
+            self._trim_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._trim_task
+            self._trim_task = None
+
+    async def _trim_periodically(self) -> None:
+        """Trim stale heartbeats forever, sleeping between runs."""
+        while True:
+            await asyncio.sleep(self.trim_interval_seconds)
+            try:
+                # Another worker already walked the index this interval
+                if self.redis is not None and not await self._claim_trim(self.redis):
+                    continue
+                removed = await self.trim()
+                if removed:
+                    logger.debug(f"Trimmed {removed} stale device heartbeats")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Device presence trim failed: {e}")
+
+    def clear(self) -> None:
+        """Drop presence kept in process memory."""
+        self._local.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Get presence settings and local state."""
+        return {
+            "backend": "redis" if self.redis is not None else "memory",
+            "window_seconds": self.window_seconds,
+            "retention_seconds": self.retention_seconds,
+            "local_users": len(self._local),
+        }
+
+
+# Global device presence instance
+device_presence = DevicePresence()
@@ -1,7 +1,21 @@
 """
 Redis pub/sub manager for real-time synchronization notifications.
+
+Each worker holds a single pub/sub connection, owned by ``pubsub_router``.
+It pattern-subscribes once to every sync and device channel and routes
+incoming messages in memory through a channel -> listeners index, so
+subscribing a connected device is a dict update rather than a Redis
+round trip, and fan-out to thousands of devices costs one Redis connection
+per worker instead of one per user.
+
+Committed writes to sync items are published as ``sync_changes`` messages
+on the owner's channel, which the terminal WebSocket pushes to subscribed
+devices.
 """
 
+import asyncio
+import contextlib
+import inspect
 import json
 from collections.abc import Callable
 from datetime import datetime
@@ -9,19 +23,205 @@ from typing import Any
 from uuid import UUID as PyUUID
 
 import redis.asyncio as aioredis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 
 from app.core.logging import logger
+from app.models.sync import PENDING_SYNC_CHANGES
+
+from .presence import DevicePresence, device_presence
+
+# Channel patterns the shared connection subscribes to
+SYNC_CHANNEL_PATTERNS: tuple[str, ...] = ("sync:*", "device:*")
+
+Listener = Callable[[dict[str, Any]], Any]
+
+
+class PubSubRouter:
+    """One pattern subscription per worker, routed to local listeners."""
+
+    def __init__(self, patterns: tuple[str, ...] = SYNC_CHANNEL_PATTERNS):
+        self.patterns = patterns
+        self.redis: aioredis.Redis | None = None
+        # channel -> listener -> reference count
+        self._listeners: dict[str, dict[Listener, int]] = {}
+        self._listener_task: asyncio.Task | None = None
+
+        # Metrics
+        self.received = 0
+        self.delivered = 0
+
+    def subscribe(self, channel: str, listener: Listener) -> None:
+        """
+        Route messages published on a channel to a listener.
+
+        Subscribing the same listener again only adds a reference; it is
+        called once per message until every reference is released.
+
+        Args:
+            channel: Channel name
+            listener: Callable (sync or async) taking the decoded message
+        """
+        listeners = self._listeners.setdefault(channel, {})
+        listeners[listener] = listeners.get(listener, 0) + 1
+
+    def unsubscribe(self, channel: str, listener: Listener) -> None:
+        """
+        Release one reference of a listener on a channel.
+
+        Args:
+            channel: Channel name
+            listener: Listener passed to ``subscribe``
+        """
+        listeners = self._listeners.get(channel)
+        if not listeners or listener not in listeners:
+            return
+
+        listeners[listener] -= 1
+        if listeners[listener] <= 0:
+            del listeners[listener]
+            if not listeners:
+                del self._listeners[channel]
+
+    def listener_count(self, channel: str) -> int:
+        """Number of distinct listeners on a channel."""
+        return len(self._listeners.get(channel, ()))
+
+    async def dispatch(self, channel: str, data: str | bytes | dict) -> int:
+        """
+        Deliver one message to the channel's local listeners.
+
+        Args:
+            channel: Channel the message was published on
+            data: JSON message, or an already decoded one
+
+        Returns:
+            Number of listeners the message was delivered to
+        """
+        self.received += 1
+        listeners = self._listeners.get(channel)
+        if not listeners:
+            return 0
+
+        # Decode once for every listener
+        if isinstance(data, bytes):
+            data = data.decode()
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                logger.warning("Dropping non-JSON message on %s", channel)
+                return 0
+
+        pending = []
+        # Copy: listeners may unsubscribe while being called
+        for listener in list(listeners):
+            try:
+                result = listener(data)
+            except Exception as e:
+                logger.error("Error in message listener on %s: %s", channel, e)
+                continue
+            if inspect.isawaitable(result):
+                pending.append(result)
+
+        # A slow listener does not hold up the others
+        if pending:
+            results = await asyncio.gather(*pending, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error("Error in message listener on %s: %s", channel, result)
+
+        self.delivered += len(listeners)
+        return len(listeners)
+
+    async def start(self, redis_client: aioredis.Redis) -> None:
+        """Open the shared subscription (idempotent)."""
+        self.redis = redis_client
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen(redis_client))
+
+    async def stop(self) -> None:
+        """Close the shared subscription."""
+        if self._listener_task:
+            self._listener_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener_task
+            self._listener_task = None
+
+    async def _listen(self, redis_client: aioredis.Redis) -> None:
+        """Route pattern messages, resubscribing after errors."""
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.psubscribe(*self.patterns)
+                logger.info("Subscribed to sync channels: %s", self.patterns)
+
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    channel = message.get("channel")
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    await self.dispatch(channel, message.get("data"))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Sync pub/sub listener error: {e}")
+                await asyncio.sleep(1)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
+    def clear(self) -> None:
+        """Drop every local listener."""
+        self._listeners.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Get routing metrics."""
+        return {
+            "channels": len(self._listeners),
+            "listeners": sum(len(ls) for ls in self._listeners.values()),
+            "received": self.received,
+            "delivered": self.delivered,
+            "listening": bool(self._listener_task and not self._listener_task.done()),
+        }
 
 
 class PubSubManager:
     """Manager for Redis pub/sub operations for real-time sync notifications."""
 
-    def __init__(self, redis_client: aioredis.Redis | None = None):
+    def __init__(
+        self,
+        redis_client: aioredis.Redis | None = None,
+        router: PubSubRouter | None = None,
+        presence: DevicePresence | None = None,
+    ):
         self.redis_client = redis_client
-        self._subscribers: dict[str, Callable] = {}
+        self.router = router or pubsub_router
+        self.presence = presence or device_presence
+        # Listeners this manager added to the shared router, per channel
+        self._subscribers: dict[str, list[Listener]] = {}
+
+    def _add_listener(self, channel: str, callback: Listener) -> None:
+        self.router.subscribe(channel, callback)
+        self._subscribers.setdefault(channel, []).append(callback)
+
+    def _remove_listeners(self, channel: str, callback: Listener | None) -> None:
+        """Release this manager's listeners (or one of them) on a channel."""
+        callbacks = self._subscribers.get(channel, [])
+        released = [cb for cb in callbacks if callback is None or cb == callback]
+        if callback is not None:
+            released = released[:1]
+
+        for cb in released:
+            self.router.unsubscribe(channel, cb)
+            callbacks.remove(cb)
+        if not callbacks:
+            self._subscribers.pop(channel, None)
 
     async def subscribe_user_sync(
-        self, user_id: str | PyUUID, callback: Callable[[dict], None] | None = None
+        self, user_id: str | PyUUID, callback: Listener | None = None
     ) -> None:
         """Subscribe to sync notifications for a specific user."""
         try:
@@ -30,38 +230,73 @@ class PubSubManager:
 
             channel = f"sync:user:{user_id}"
 
-            if self.redis_client:
-                pubsub = self.redis_client.pubsub()
-                await pubsub.subscribe(channel)
+            if callback:
+                self._add_listener(channel, callback)
+                logger.debug("Subscribed to sync channel: %s", channel)
 
-                if callback:
-                    self._subscribers[channel] = callback
+        except Exception as e:
+            logger.error(f"Error subscribing to user sync: {e}")
+            raise
 
-                logger.info(f"Subscribed to sync channel: {channel}")
+    async def unsubscribe_user_sync(
+        self, user_id: str | PyUUID, callback: Listener | None = None
+    ) -> None:
+        """
+        Unsubscribe from sync notifications for a specific user.
+
+        Args:
+            user_id: User ID
+            callback: Listener to release; all of this manager's listeners
+                on the channel when omitted
+        """
+        try:
+            if isinstance(user_id, PyUUID):
+                user_id = str(user_id)
+
+            channel = f"sync:user:{user_id}"
+            self._remove_listeners(channel, callback)
+            logger.debug("Unsubscribed from sync channel: %s", channel)
 
         except Exception as e:
-            logger.error(f"Error subscribing to user sync: {e}")
+            logger.error(f"Error unsubscribing from user sync: {e}")
             raise
 
-    async def unsubscribe_user_sync(self, user_id: str | PyUUID) -> None:
-        """Unsubscribe from sync notifications for a specific user."""
+    async def publish_sync_changes(
+        self, user_id: str | PyUUID, changes: list[dict[str, Any]]
+    ) -> bool:
+        """
+        Publish committed sync item changes to all of a user's devices.
+
+        Without Redis the message is only routed to this process' listeners.
+
+        Args:
+            user_id: Owner of the changed items
+            changes: Change summaries (``SyncData.change_summary``)
+
+        Returns:
+            True if the message was published to Redis
+        """
         try:
             if isinstance(user_id, PyUUID):
                 user_id = str(user_id)
 
             channel = f"sync:user:{user_id}"
+            message = {
+                "type": "sync_changes",
+                "user_id": user_id,
+                "changes": changes,
+                "timestamp": datetime.now().isoformat(),
+            }
 
             if self.redis_client:
-                pubsub = self.redis_client.pubsub()
-                await pubsub.unsubscribe(channel)
-
-                if channel in self._subscribers:
-                    del self._subscribers[channel]
+                await self.redis_client.publish(channel, json.dumps(message))
+                return True
 
-                logger.info(f"Unsubscribed from sync channel: {channel}")
+            await self.router.dispatch(channel, message)
+            return False
 
         except Exception as e:
-            logger.error(f"Error unsubscribing from user sync: {e}")
+            logger.error(f"Error publishing sync changes: {e}")
             raise
 
     async def publish_sync_update(
@@ -155,7 +390,7 @@ class PubSubManager:
         self,
         user_id: str | PyUUID,
         device_id: str,
-        callback: Callable[[dict], None] | None = None,
+        callback: Listener | None = None,
     ) -> None:
         """Subscribe to device-specific sync notifications."""
         try:
@@ -164,19 +399,38 @@ class PubSubManager:
 
             channel = f"sync:user:{user_id}:device:{device_id}"
 
-            if self.redis_client:
-                pubsub = self.redis_client.pubsub()
-                await pubsub.subscribe(channel)
+            if callback:
+                self._add_listener(channel, callback)
+                logger.debug("Subscribed to device channel: %s", channel)
 
-                if callback:
-                    self._subscribers[channel] = callback
+        except Exception as e:
+            logger.error(f"Error subscribing to device channel: {e}")
+            raise
 
-                logger.info(f"Subscribed to device channel: {channel}")
+    async def unsubscribe_device_channel(
+        self,
+        user_id: str | PyUUID,
+        device_id: str,
+        callback: Listener | None = None,
+    ) -> None:
+        """Unsubscribe from device-specific sync notifications."""
+        try:
+            if isinstance(user_id, PyUUID):
+                user_id = str(user_id)
+
+            channel = f"sync:user:{user_id}:device:{device_id}"
+            self._remove_listeners(channel, callback)
+            logger.debug("Unsubscribed from device channel: %s", channel)
 
         except Exception as e:
-            logger.error(f"Error subscribing to device channel: {e}")
+            logger.error(f"Error unsubscribing from device channel: {e}")
             raise
 
+    async def close(self) -> None:
+        """Release every listener this manager subscribed."""
+        for channel in list(self._subscribers):
+            self._remove_listeners(channel, None)
+
     async def publish_to_device(
         self, user_id: str | PyUUID, device_id: str, message_data: dict[str, Any]
     ) -> bool:
@@ -206,73 +460,73 @@ class PubSubManager:
             raise
 
     async def listen_for_messages(self) -> None:
-        """Listen for incoming pub/sub messages and route to callbacks."""
+        """Start routing the shared subscription's messages to listeners."""
         if not self.redis_client:
             return
 
-        try:
-            pubsub = self.redis_client.pubsub()
+        await self.router.start(self.redis_client)
 
-            async for message in pubsub.listen():
-                if message["type"] == "message":
-                    channel = message["channel"]
-                    data = json.loads(message["data"])
+    async def get_active_devices(
+        self, user_id: str | PyUUID, within_seconds: int | None = None
+    ) -> list[str]:
+        """Get the devices of a user seen within the presence window."""
+        return await self.presence.active_devices(user_id, within_seconds)
 
-                    if channel in self._subscribers:
-                        callback = self._subscribers[channel]
-                        try:
-                            await callback(data) if callable(callback) else None
-                        except Exception as e:
-                            logger.error(f"Error in message callback: {e}")
+    async def register_device_activity(
+        self, user_id: str | PyUUID, device_id: str
+    ) -> None:
+        """Record a heartbeat for a device."""
+        await self.presence.heartbeat(user_id, device_id)
+
+    async def cleanup_inactive_devices(self, user_id: str | PyUUID) -> int:
+        """Remove a user's devices not seen within the retention period."""
+        try:
+            return await self.presence.trim([user_id])
 
         except Exception as e:
-            logger.error(f"Error listening for messages: {e}")
-            raise
+            logger.error(f"Error cleaning up inactive devices: {e}")
+            return 0
 
-    async def get_active_devices(self, user_id: str | PyUUID) -> list[str]:
-        """Get list of active devices for a user based on recent activity."""
-        try:
-            if isinstance(user_id, PyUUID):
-                user_id = str(user_id)
 
-            # Use Redis to track active devices (simple implementation)
-            if self.redis_client:
-                devices = await self.redis_client.smembers(f"active_devices:{user_id}")
-                return list(devices) if devices else []
+# Global pub/sub router instance
+pubsub_router = PubSubRouter()
 
-            return []
 
-        except Exception as e:
-            logger.error(f"Error getting active devices: {e}")
-            return []
+# Publish tasks in flight (kept referenced until done)
+_publish_tasks: set[asyncio.Task] = set()
 
-    async def register_device_activity(
-        self, user_id: str | PyUUID, device_id: str, ttl: int = 3600
-    ) -> None:
-        """Register device activity with TTL for auto-cleanup."""
+
+async def _publish_committed_changes(changes: dict[str, list[dict[str, Any]]]) -> None:
+    manager = PubSubManager(pubsub_router.redis)
+    for user_id, user_changes in changes.items():
         try:
-            if isinstance(user_id, PyUUID):
-                user_id = str(user_id)
+            await manager.publish_sync_changes(user_id, user_changes)
+        except Exception:
+            # Devices still see the change on their next pull
+            continue
 
-            active_devices_key = f"active_devices:{user_id}"
 
-            if self.redis_client:
-                await self.redis_client.sadd(active_devices_key, device_id)
-                await self.redis_client.expire(active_devices_key, ttl)
+@event.listens_for(Session, "after_commit")
+def _on_commit(session: Session) -> None:
+    """Publish the sync changes a transaction wrote once it has committed."""
+    pending = session.info.pop(PENDING_SYNC_CHANGES, None)
+    if not pending:
+        return
 
-        except Exception as e:
-            logger.error(f"Error registering device activity: {e}")
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # Synchronous use (scripts, migrations); nobody is listening
 
-    async def cleanup_inactive_devices(self, user_id: str | PyUUID) -> None:
-        """Clean up inactive devices from the active list."""
-        try:
-            if isinstance(user_id, PyUUID):
-                user_id = str(user_id)
+    changes: dict[str, list[dict[str, Any]]] = {}
+    for user_id, change in pending:
+        changes.setdefault(user_id, []).append(change)
 
-            if self.redis_client:
-                # Redis TTL will handle automatic cleanup
-                # This method can be extended for more complex cleanup logic
-                pass
+    task = loop.create_task(_publish_committed_changes(changes))
+    _publish_tasks.add(task)
+    task.add_done_callback(_publish_tasks.discard)
 
-        except Exception as e:
-            logger.error(f"Error cleaning up inactive devices: {e}")
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session: Session) -> None:
+    session.info.pop(PENDING_SYNC_CHANGES, None)
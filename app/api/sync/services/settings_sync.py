@@ -10,7 +10,6 @@ from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import logger
-from app.models.sync import SyncData
 from app.repositories.sync import SyncDataRepository
 
 
@@ -64,70 +63,62 @@ class SettingsSyncService:
         try:
             user_id = self._normalize_user_id(user_id)
 
-            updated_settings = []
-            conflicts = []
-
             # Filter to only syncable settings
             syncable_updates = {
                 k: v for k, v in settings_update.items() if k in self.syncable_settings
             }
 
-            for setting_key, setting_value in syncable_updates.items():
-                sync_key = f"user_setting_{user_id}_{setting_key}"
-
-                # For tests without database, skip sync operations
-                if not hasattr(self, "sync_repo") or self.sync_repo is None:
-                    updated_settings.append(setting_key)
-                    continue
-
-                # Get existing setting sync data
-                existing_sync = await self.sync_repo.get_by_sync_key(user_id, sync_key)
-
-                if existing_sync:
-                    # Check for conflicts
-                    if self._has_setting_conflict(
-                        existing_sync.data, {"value": setting_value}
-                    ):
-                        conflicts.append(
-                            {
-                                "setting_key": setting_key,
-                                "local_value": existing_sync.data.get("value"),
-                                "remote_value": setting_value,
-                                "sync_key": sync_key,
-                            }
-                        )
-                        continue
-
-                    # Update existing setting
-                    new_data = {
-                        "value": setting_value,
-                        "modified_at": datetime.now(UTC).isoformat(),
-                        "setting_type": type(setting_value).__name__,
-                    }
-                    existing_sync.update_data(
-                        new_data,
-                        settings_update.get("device_id", "unknown"),
-                        settings_update.get("device_type", "unknown"),
-                    )
-                    await self.sync_repo.update(existing_sync)
-                else:
-                    # Create new setting sync
-                    setting_data = {
-                        "value": setting_value,
-                        "modified_at": datetime.now(UTC).isoformat(),
-                        "setting_type": type(setting_value).__name__,
-                    }
-                    sync_data = SyncData.create_sync_item(
-                        user_id=user_id,
-                        sync_type="user_setting",
-                        sync_key=sync_key,
-                        data=setting_data,
-                        device_id=settings_update.get("device_id", "unknown"),
-                        device_type=settings_update.get("device_type", "unknown"),
-                    )
-                    await self.sync_repo.create(sync_data)
+            # For tests without database, skip sync operations
+            if self.sync_repo is None:
+                return SettingsSyncResult(
+                    updated_settings=list(syncable_updates),
+                    total_settings=len(syncable_updates),
+                )
+
+            modified_at = datetime.now(UTC).isoformat()
+            setting_keys = {
+                f"user_setting_{user_id}_{setting_key}": setting_key
+                for setting_key in syncable_updates
+            }
+            rows = [
+                {
+                    "sync_type": "user_setting",
+                    "sync_key": sync_key,
+                    "data": {
+                        "value": syncable_updates[setting_key],
+                        "modified_at": modified_at,
+                        "setting_type": type(syncable_updates[setting_key]).__name__,
+                    },
+                    "source_device_id": settings_update.get("device_id", "unknown"),
+                    "source_device_type": settings_update.get("device_type", "unknown"),
+                }
+                for sync_key, setting_key in setting_keys.items()
+            ]
+
+            # One prefetch for conflict checks, one upsert for the rest
+            result = await self.sync_repo.bulk_upsert_sync_items(
+                user_id,
+                rows,
+                is_conflict=lambda existing, row: self._has_setting_conflict(
+                    existing.data, row["data"]
+                ),
+            )
 
-                updated_settings.append(setting_key)
+            conflicts = [
+                {
+                    "setting_key": setting_keys[row["sync_key"]],
+                    "local_value": existing.data.get("value"),
+                    "remote_value": row["data"]["value"],
+                    "sync_key": row["sync_key"],
+                }
+                for existing, row in result.conflicts
+            ]
+            conflicted = {conflict["setting_key"] for conflict in conflicts}
+            updated_settings = [
+                setting_key
+                for setting_key in syncable_updates
+                if setting_key not in conflicted
+            ]
 
             if self.session:
                 await self.session.commit()
@@ -10,7 +10,6 @@ from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import logger
-from app.models.sync import SyncData
 from app.repositories.ssh_profile import SSHProfileRepository
 from app.repositories.sync import SyncDataRepository
 
@@ -50,56 +49,42 @@ class SSHProfileSyncService:
         try:
             user_id = self._normalize_user_id(user_id)
 
-            synced_count = 0
-            conflicts = []
-            synced_data = []
-
-            for profile_data in profiles:
-                profile_name = profile_data.get("name", "")
-                sync_key = f"ssh_profile_{user_id}_{profile_name}"
-
-                # For tests without database, skip sync operations
-                if not hasattr(self, "sync_repo") or self.sync_repo is None:
-                    synced_count += 1
-                    synced_data.append(profile_data)
-                    continue
-
-                # Check if profile already exists
-                existing_sync = await self.sync_repo.get_by_sync_key(user_id, sync_key)
-
-                if existing_sync:
-                    # Check for conflicts
-                    if self._has_profile_conflict(existing_sync.data, profile_data):
-                        conflicts.append(
-                            {
-                                "sync_key": sync_key,
-                                "local_data": existing_sync.data,
-                                "remote_data": profile_data,
-                            }
-                        )
-                        continue
-
-                    # Update existing profile
-                    existing_sync.update_data(
-                        profile_data,
-                        profile_data.get("device_id", "unknown"),
-                        profile_data.get("device_type", "unknown"),
-                    )
-                    await self.sync_repo.update(existing_sync)
-                else:
-                    # Create new sync entry
-                    sync_data = SyncData.create_sync_item(
-                        user_id=user_id,
-                        sync_type="ssh_profile",
-                        sync_key=sync_key,
-                        data=profile_data,
-                        device_id=profile_data.get("device_id", "unknown"),
-                        device_type=profile_data.get("device_type", "unknown"),
-                    )
-                    await self.sync_repo.create(sync_data)
+            # For tests without database, skip sync operations
+            if self.sync_repo is None:
+                return SSHProfileSyncResult(
+                    synced_count=len(profiles), synced_data=list(profiles)
+                )
+
+            rows = [
+                {
+                    "sync_type": "ssh_profile",
+                    "sync_key": f"ssh_profile_{user_id}_{profile_data.get('name', '')}",
+                    "data": profile_data,
+                    "source_device_id": profile_data.get("device_id", "unknown"),
+                    "source_device_type": profile_data.get("device_type", "unknown"),
+                }
+                for profile_data in profiles
+            ]
+
+            # One prefetch for conflict checks, one upsert for the rest
+            result = await self.sync_repo.bulk_upsert_sync_items(
+                user_id,
+                rows,
+                is_conflict=lambda existing, row: self._has_profile_conflict(
+                    existing.data, row["data"]
+                ),
+            )
 
-                synced_data.append(profile_data)
-                synced_count += 1
+            conflicts = [
+                {
+                    "sync_key": row["sync_key"],
+                    "local_data": existing.data,
+                    "remote_data": row["data"],
+                }
+                for existing, row in result.conflicts
+            ]
+            synced_data = [item.data for item in result.written]
+            synced_count = len(synced_data)
 
             if self.session:
                 await self.session.commit()
@@ -123,49 +108,37 @@ class SSHProfileSyncService:
         try:
             user_id = self._normalize_user_id(user_id)
 
-            synced_count = 0
-            synced_data = []
-
-            for key_data in ssh_keys:
-                # Security: Remove private key if present
-                safe_key_data = {
+            # Security: Remove private key if present
+            safe_keys = [
+                {
                     k: v
                     for k, v in key_data.items()
                     if k not in ["private_key", "private_key_path"]
                 }
+                for key_data in ssh_keys
+            ]
 
-                key_name = safe_key_data.get("name", "")
-                sync_key = f"ssh_key_{user_id}_{key_name}"
-
-                # For tests without database, skip sync operations
-                if self.sync_repo is None:
-                    synced_count += 1
-                    synced_data.append(safe_key_data)
-                    continue
-
-                # Check if key already exists
-                existing_sync = await self.sync_repo.get_by_sync_key(user_id, sync_key)
-
-                if existing_sync:
-                    existing_sync.update_data(
-                        safe_key_data,
-                        safe_key_data.get("device_id", "unknown"),
-                        safe_key_data.get("device_type", "unknown"),
-                    )
-                    await self.sync_repo.update(existing_sync)
-                else:
-                    sync_data = SyncData.create_sync_item(
-                        user_id=user_id,
-                        sync_type="ssh_key",
-                        sync_key=sync_key,
-                        data=safe_key_data,
-                        device_id=safe_key_data.get("device_id", "unknown"),
-                        device_type=safe_key_data.get("device_type", "unknown"),
-                    )
-                    await self.sync_repo.create(sync_data)
+            # For tests without database, skip sync operations
+            if self.sync_repo is None:
+                return SSHProfileSyncResult(
+                    synced_count=len(safe_keys), synced_data=safe_keys
+                )
 
-                synced_data.append(safe_key_data)
-                synced_count += 1
+            result = await self.sync_repo.bulk_upsert_sync_items(
+                user_id,
+                [
+                    {
+                        "sync_type": "ssh_key",
+                        "sync_key": f"ssh_key_{user_id}_{key_data.get('name', '')}",
+                        "data": key_data,
+                        "source_device_id": key_data.get("device_id", "unknown"),
+                        "source_device_type": key_data.get("device_type", "unknown"),
+                    }
+                    for key_data in safe_keys
+                ],
+            )
+            synced_data = [item.data for item in result.written]
+            synced_count = len(synced_data)
 
             if self.session:
                 await self.session.commit()
@@ -14,6 +14,7 @@ from .dependencies import (
     get_optional_current_user,
     require_auth,
 )
+from .password_hasher import PasswordHasher, password_hasher
 from .security import (
     blacklist_token,
     create_access_token,
@@ -39,6 +40,9 @@ __all__ = [
     "blacklist_token",
     "generate_password_reset_token",
     "verify_password_reset_token",
+    # Off-loop password hashing
+    "PasswordHasher",
+    "password_hasher",
     # Dependencies
     "get_current_user",
     "get_current_active_user",
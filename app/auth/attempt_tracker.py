@@ -0,0 +1,292 @@
+"""
+Authentication attempt tracking for DevPocket API.
+
+Failed logins are counted per (client IP, account) and per account in
+fixed-size counters that expire with their window, either in Redis (shared
+by every worker) or in a bounded in-process LRU. A client that reaches the
+pair limit is refused for that account until its window expires, without
+the password being checked. Once an account reaches the failure limit -
+typically from several clients - a lock key is set for the lockout period.
+The users row is only written when a lock engages, so a credential-stuffing
+burst costs counter increments, not UPDATEs on the users table.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+@dataclass(frozen=True)
+class AttemptResult:
+    """Counters after recording a failed attempt."""
+
+    pair_failures: int
+    account_failures: int
+    lockout_seconds: int
+    newly_locked: bool
+
+    @property
+    def is_locked(self) -> bool:
+        return self.lockout_seconds > 0
+
+
+class AttemptStore:
+    """
+    In-memory attempt counters.
+
+    Each key holds ``[count, expires_at]`` in a bounded LRU, so memory stays
+    fixed no matter how many identifiers an attacker cycles through.
+    Counters are per process; use RedisAttemptStore with several workers.
+    """
+
+    def __init__(self, max_keys: int | None = None) -> None:
+        self._store: OrderedDict[str, list[float]] = OrderedDict()
+        self.max_keys = max_keys or settings.auth_attempt_max_keys
+
+    def _live(self, key: str, now: float) -> list[float] | None:
+        entry = self._store.get(key)
+        if entry is not None and entry[1] <= now:
+            del self._store[key]
+            return None
+        return entry
+
+    def _increment(self, key: str, ttl: int, now: float) -> int:
+        entry = self._live(key, now)
+        if entry is None:
+            entry = [0, now + ttl]
+        entry[0] += 1
+        self._store[key] = entry
+        self._store.move_to_end(key)
+        return int(entry[0])
+
+    def record_failure(
+        self,
+        pair_key: str,
+        account_key: str,
+        lock_key: str,
+        window: int,
+        max_failures: int,
+        lockout: int,
+    ) -> AttemptResult:
+        """Count a failure and lock the account once it reaches the limit."""
+        now = time.time()
+        pair_failures = self._increment(pair_key, window, now)
+        account_failures = self._increment(account_key, window, now)
+
+        newly_locked = False
+        if account_failures >= max_failures and self._live(lock_key, now) is None:
+            self._store[lock_key] = [1, now + lockout]
+            newly_locked = True
+
+        while len(self._store) > self.max_keys:
+            self._store.popitem(last=False)
+
+        return AttemptResult(
+            pair_failures=pair_failures,
+            account_failures=account_failures,
+            lockout_seconds=self.lock_remaining(lock_key),
+            newly_locked=newly_locked,
+        )
+
+    def lock_remaining(self, lock_key: str) -> int:
+        """Seconds left on a lock, 0 if not locked."""
+        now = time.time()
+        entry = self._live(lock_key, now)
+        return max(int(entry[1] - now), 1) if entry else 0
+
+    def failures(self, key: str) -> int:
+        """Current value of a failure counter."""
+        entry = self._live(key, time.time())
+        return int(entry[0]) if entry else 0
+
+    def clear(self, *keys: str) -> None:
+        """Delete counters."""
+        for key in keys:
+            self._store.pop(key, None)
+
+    def reset(self) -> None:
+        """Forget all counters."""
+        self._store.clear()
+
+
+# Count a failure against the (IP, account) and account counters and set
+# the lock key when the account reaches the limit, in one atomic call.
+RECORD_FAILURE_SCRIPT = """
+local window = tonumber(ARGV[1])
+local pair = redis.call('INCR', KEYS[1])
+if pair == 1 then
+    redis.call('EXPIRE', KEYS[1], window)
+end
+local account = redis.call('INCR', KEYS[2])
+if account == 1 then
+    redis.call('EXPIRE', KEYS[2], window)
+end
+local newly_locked = 0
+if account >= tonumber(ARGV[2]) then
+    if redis.call('SET', KEYS[3], '1', 'EX', ARGV[3], 'NX') then
+        newly_locked = 1
+    end
+end
+return {pair, account, redis.call('TTL', KEYS[3]), newly_locked}
+"""
+
+
+class RedisAttemptStore:
+    """Redis attempt counters shared by every worker and node."""
+
+    def __init__(self, redis_client: aioredis.Redis, prefix: str = "authattempt"):
+        self.redis = redis_client
+        self.prefix = prefix
+        self._script = redis_client.register_script(RECORD_FAILURE_SCRIPT)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def record_failure(
+        self,
+        pair_key: str,
+        account_key: str,
+        lock_key: str,
+        window: int,
+        max_failures: int,
+        lockout: int,
+    ) -> AttemptResult:
+        """Count a failure and lock the account once it reaches the limit."""
+        pair, account, lock_ttl, newly_locked = await self._script(
+            keys=[self._key(pair_key), self._key(account_key), self._key(lock_key)],
+            args=[window, max_failures, lockout],
+        )
+        return AttemptResult(
+            pair_failures=int(pair),
+            account_failures=int(account),
+            lockout_seconds=max(int(lock_ttl), 0),
+            newly_locked=bool(newly_locked),
+        )
+
+    async def failures(self, key: str) -> int:
+        """Current value of a failure counter."""
+        value = await self.redis.get(self._key(key))
+        return int(value) if value else 0
+
+    async def clear(self, *keys: str) -> None:
+        """Delete counters."""
+        await self.redis.delete(*(self._key(key) for key in keys))
+
+
+class AuthAttemptTracker:
+    """
+    Failed-login tracker and lockout front end.
+
+    Uses the Redis store once a client is configured and the in-memory
+    store otherwise, or while Redis is failing.
+    """
+
+    def __init__(self, memory_store: AttemptStore) -> None:
+        self.memory_store = memory_store
+        self.redis_store: RedisAttemptStore | None = None
+
+    def set_redis_client(self, redis_client: aioredis.Redis | None) -> None:
+        """Enable (or with None, disable) the shared Redis store."""
+        self.redis_store = RedisAttemptStore(redis_client) if redis_client else None
+
+    @staticmethod
+    def _keys(client_ip: str | None, identifier: str) -> tuple[str, str, str]:
+        identifier = identifier.lower()
+        return (
+            f"pair:{client_ip or 'unknown'}:{identifier}",
+            f"account:{identifier}",
+            f"lock:{identifier}",
+        )
+
+    async def record_failure(
+        self, client_ip: str | None, identifier: str
+    ) -> AttemptResult:
+        """
+        Record a failed authentication attempt.
+
+        Args:
+            client_ip: Client IP address
+            identifier: Account identifier (user ID, or the submitted login)
+
+        Returns:
+            Counters and lock state after this failure
+        """
+        args = (
+            *self._keys(client_ip, identifier),
+            settings.auth_failure_window_seconds,
+            settings.auth_max_failed_attempts,
+            settings.auth_lockout_seconds,
+        )
+        if self.redis_store is not None:
+            try:
+                return await self.redis_store.record_failure(*args)
+            except Exception as e:
+                logger.error(f"Redis attempt tracker error, using local counters: {e}")
+
+        return self.memory_store.record_failure(*args)
+
+    async def _failures(self, key: str) -> int:
+        if self.redis_store is not None:
+            try:
+                return await self.redis_store.failures(key)
+            except Exception as e:
+                logger.error(f"Redis attempt tracker error, using local counters: {e}")
+
+        return self.memory_store.failures(key)
+
+    async def failures(self, identifier: str) -> int:
+        """
+        Get the recent failed attempts of an account.
+
+        Args:
+            identifier: Account identifier
+
+        Returns:
+            Failures within the current window
+        """
+        _, account_key, _ = self._keys(None, identifier)
+        return await self._failures(account_key)
+
+    async def is_throttled(self, client_ip: str | None, identifier: str) -> bool:
+        """
+        Check whether a client has failed too often on an account.
+
+        Args:
+            client_ip: Client IP address
+            identifier: Account identifier
+
+        Returns:
+            True if the client reached the pair limit within the window
+        """
+        pair_key, _, _ = self._keys(client_ip, identifier)
+        return await self._failures(pair_key) >= settings.auth_max_pair_failures
+
+    async def reset(self, identifier: str, client_ip: str | None = None) -> None:
+        """
+        Clear an account's failures and lock, e.g. after a successful login.
+
+        Args:
+            identifier: Account identifier
+            client_ip: Also clear the counter for this client IP
+        """
+        pair_key, account_key, lock_key = self._keys(client_ip, identifier)
+        keys = (
+            (pair_key, account_key, lock_key) if client_ip else (account_key, lock_key)
+        )
+
+        self.memory_store.clear(*keys)
+        if self.redis_store is not None:
+            try:
+                await self.redis_store.clear(*keys)
+            except Exception as e:
+                logger.error(f"Redis attempt tracker error: {e}")
+
+
+# Global attempt store and tracker
+auth_attempt_store = AttemptStore()
+auth_attempts = AuthAttemptTracker(auth_attempt_store)
@@ -18,8 +18,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.security import is_token_blacklisted, verify_token
 from app.core.logging import logger
+from app.core.principal_cache import principal_cache
 from app.db.database import get_db
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.repositories.user import UserRepository
 
 # OAuth2 scheme configuration
@@ -97,6 +98,10 @@ async def get_current_user(
     """
     Get the current authenticated user from JWT token.
 
+    Verified claims and a snapshot of the user are kept in the principal
+    cache, so repeat requests with the same token skip the blacklist lookup,
+    the JWT decode and the user query.
+
     Args:
         db: Database session
         token: JWT token from request
@@ -112,16 +117,25 @@ async def get_current_user(
         raise AuthenticationError("Authentication token required")
 
     try:
-        # Check if token is blacklisted
-        if await is_token_blacklisted(token):
-            logger.warning("Attempted use of blacklisted token")
-            raise AuthenticationError("Token has been revoked")
-
-        # Decode and verify token
-        payload = verify_token(token)
-        if not payload:
-            logger.warning("Invalid or expired token")
-            raise AuthenticationError("Invalid or expired token")
+        # Reuse claims verified earlier in this request (middleware) or in a
+        # recent one; revoked tokens are evicted from the cache
+        principal = principal_cache.get(token)
+        if principal is not None:
+            user = await principal_cache.load_user(principal, db)
+            if user is not None:
+                return user
+            payload = principal.claims
+        else:
+            # Check if token is blacklisted
+            if await is_token_blacklisted(token):
+                logger.warning("Attempted use of blacklisted token")
+                raise AuthenticationError("Token has been revoked")
+
+            # Decode and verify token
+            payload = verify_token(token)
+            if not payload:
+                logger.warning("Invalid or expired token")
+                raise AuthenticationError("Invalid or expired token")
 
         # Extract user identifier
         user_id = payload.get("sub")
@@ -147,6 +161,9 @@ async def get_current_user(
             logger.warning(f"User not found for ID: {user_id}")
             raise AuthenticationError("User not found")
 
+        principal_cache.store_claims(token, payload)
+        principal_cache.store_user(token, user)
+
         logger.debug(f"User authenticated: {user.username}")
         return user
 
@@ -276,6 +293,33 @@ def require_enterprise_tier() -> Callable:
     return _require_enterprise
 
 
+async def require_admin(
+    current_user: Annotated[User, Depends(get_current_active_user)],
+) -> User:
+    """
+    Require the admin role for access.
+
+    Args:
+        current_user: The authenticated user
+
+    Returns:
+        The user if they are an administrator
+
+    Raises:
+        HTTPException: If the user is not an administrator
+    """
+    if current_user.role != UserRole.ADMIN:
+        logger.warning(
+            f"Non-admin user attempted admin access: {current_user.username}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required",
+        )
+
+    return current_user
+
+
 async def get_user_from_token(token: str, db: AsyncSession) -> User | None:
     """
     Utility function to get user from a token directly.
@@ -0,0 +1,206 @@
+"""
+Off-loop password hashing for DevPocket API.
+
+bcrypt is deliberately slow (~100-300 ms per hash at production cost), so
+calling it inside a request handler stalls the event loop and every
+WebSocket terminal served by the same worker. PasswordHasher runs hashing on
+a bounded worker pool instead: at most ``max_workers`` hashes run at once,
+at most ``max_queue`` more may wait, and anything beyond that is rejected
+with 503 rather than queued without limit.
+
+The bcrypt backend releases the GIL, so a thread pool gives real
+parallelism; a process pool can be selected for backends that do not.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.auth.security import pwd_context
+from app.core.config import settings
+from app.core.logging import logger
+
+T = TypeVar("T")
+
+
+def _hash(password: str) -> str:
+    """Hash a password (runs in the worker pool)."""
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> tuple[bool, str | None]:
+    """Verify a password and rehash it if its parameters are outdated."""
+    try:
+        return pwd_context.verify_and_update(password, hashed)
+    except (ValueError, TypeError):
+        # Malformed or unknown hash
+        return False, None
+
+
+class PasswordHasher:
+    """Runs password hashing on a bounded pool off the event loop."""
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_queue: int | None = None,
+        use_processes: bool | None = None,
+    ):
+        self.max_workers = max_workers or settings.password_hash_workers
+        self.max_queue = (
+            max_queue if max_queue is not None else settings.password_hash_max_queue
+        )
+        self.use_processes = (
+            use_processes
+            if use_processes is not None
+            else settings.password_hash_use_processes
+        )
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        # Metrics
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    def _get_executor(self) -> Executor:
+        """Create the worker pool on first use."""
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a hashing function on the pool, respecting the queue bound."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._loop = loop
+
+        if self._slots.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            logger.warning(
+                f"Password hashing queue full ({self.queued} waiting), "
+                "rejecting request"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy. Please try again shortly.",
+                headers={"Retry-After": "1"},
+            )
+
+        enqueued_at = time.perf_counter()
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        started_at = time.perf_counter()
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+            self.completed += 1
+            self._total_wait += started_at - enqueued_at
+            self._total_run += time.perf_counter() - started_at
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password off the event loop.
+
+        Args:
+            password: The plain text password to hash
+
+        Returns:
+            The hashed password
+        """
+        try:
+            return await self._run(_hash, password)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Password hashing failed: {e}")
+            raise ValueError("Failed to hash password") from e
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """
+        Verify a password against its hash off the event loop.
+
+        Args:
+            password: The plain text password to verify
+            hashed: The stored password hash
+
+        Returns:
+            True if password matches, False otherwise
+        """
+        valid, _ = await self.verify_and_update(password, hashed)
+        return valid
+
+    async def verify_and_update(
+        self, password: str, hashed: str
+    ) -> tuple[bool, str | None]:
+        """
+        Verify a password and produce a replacement hash when needed.
+
+        A new hash is returned when the stored one uses outdated parameters
+        (e.g. fewer bcrypt rounds than configured), so callers can upgrade
+        it transparently on successful login.
+
+        Args:
+            password: The plain text password to verify
+            hashed: The stored password hash
+
+        Returns:
+            Tuple of (password is valid, new hash or None)
+        """
+        try:
+            return await self._run(_verify_and_update, password, hashed)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Password verification failed: {e}")
+            return False, None
+
+    def stats(self) -> dict[str, Any]:
+        """Get pool and queue-depth metrics."""
+        return {
+            "workers": self.max_workers,
+            "pool": "process" if self.use_processes else "thread",
+            "queue_depth": self.queued,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": (
+                self._total_wait / self.completed * 1000 if self.completed else 0.0
+            ),
+            "avg_hash_ms": (
+                self._total_run / self.completed * 1000 if self.completed else 0.0
+            ),
+        }
+
+    def shutdown(self) -> None:
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher()
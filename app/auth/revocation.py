@@ -0,0 +1,334 @@
+"""
+Token revocation for DevPocket API.
+
+Revoked tokens are identified by their ``jti`` claim. A revocation is
+written to Redis twice: as a ``blacklist:jti:<jti>`` key that expires with
+the token (the authoritative record) and as an entry on a Redis stream.
+Every worker replays and then tails that stream into a compact in-memory
+Bloom filter, so checking a token that was never revoked - by far the
+common case - needs no network I/O at all. Only a filter hit (a real
+revocation or a rare false positive) is confirmed against Redis.
+
+Confirmed answers are remembered in a small LRU, which is what lets the
+synchronous check used by ``verify_token`` agree with the async check that
+ran before it. A sync check on an unconfirmed filter hit fails closed.
+Negative answers are forgotten whenever the stream is replayed or the
+listener loses it, since revocations may have been missed meanwhile.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Any
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.logging import logger
+
+REVOKED_KEY_PREFIX = "blacklist:jti:"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string items."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(
+            8,
+            math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)),
+        )
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> list[int]:
+        """Derive bit positions with double hashing of one digest."""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class RevocationList:
+    """Per-worker view of revoked token IDs backed by Redis."""
+
+    def __init__(
+        self,
+        capacity: int | None = None,
+        error_rate: float | None = None,
+        stream: str | None = None,
+        confirmed_size: int = 10000,
+    ):
+        self.capacity = capacity or settings.token_revocation_filter_capacity
+        self.error_rate = error_rate or settings.token_revocation_filter_error_rate
+        self.stream = stream or settings.token_revocation_stream
+        self.confirmed_size = confirmed_size
+        self.redis: aioredis.Redis | None = None
+
+        self._filter = BloomFilter(self.capacity, self.error_rate)
+        self._confirmed: OrderedDict[str, bool] = OrderedDict()
+        self._last_id = "0-0"
+        self._synced = False
+        self._listener_task: asyncio.Task | None = None
+
+        # Metrics
+        self.filter_negatives = 0
+        self.redis_checks = 0
+        self.false_positives = 0
+
+    @property
+    def synced(self) -> bool:
+        """Whether the filter reflects the whole revocation stream."""
+        return self._synced
+
+    def _remember(self, jti: str, revoked: bool) -> None:
+        self._confirmed[jti] = revoked
+        self._confirmed.move_to_end(jti)
+        while len(self._confirmed) > self.confirmed_size:
+            self._confirmed.popitem(last=False)
+
+    def _forget_unrevoked(self) -> None:
+        """Drop confirmed negatives; they may predate a missed revocation."""
+        self._confirmed = OrderedDict(
+            (jti, revoked) for jti, revoked in self._confirmed.items() if revoked
+        )
+
+    def _apply(self, jti: str, exp: float | None) -> None:
+        """Add a revocation read from the stream to the local filter."""
+        if exp is not None and exp <= time.time():
+            return
+        self._filter.add(jti)
+        self._remember(jti, True)
+
+    def is_revoked_sync(self, jti: str) -> bool:
+        """
+        Check a token ID without network I/O.
+
+        Args:
+            jti: Token ID
+
+        Returns:
+            True if the token is (or may be) revoked, False otherwise
+        """
+        if jti in self._confirmed:
+            return self._confirmed[jti]
+
+        if not self._synced:
+            # Without the stream there is nothing local to go on; the async
+            # check falls back to Redis for every token in this state
+            return False
+
+        if jti not in self._filter:
+            self.filter_negatives += 1
+            return False
+
+        logger.warning("Unconfirmed revocation filter hit in sync token check")
+        return True
+
+    async def is_revoked(self, jti: str) -> bool:
+        """
+        Check a token ID, confirming filter hits against Redis.
+
+        Args:
+            jti: Token ID
+
+        Returns:
+            True if the token is revoked, False otherwise
+        """
+        if jti in self._confirmed:
+            self._confirmed.move_to_end(jti)
+            return self._confirmed[jti]
+
+        if self._synced and jti not in self._filter:
+            self.filter_negatives += 1
+            return False
+
+        if not self.redis:
+            return False
+
+        try:
+            self.redis_checks += 1
+            revoked = await self.redis.exists(f"{REVOKED_KEY_PREFIX}{jti}") > 0
+        except Exception as e:
+            logger.error(f"Error checking token revocation: {e}")
+            return False
+
+        if self._synced and not revoked:
+            self.false_positives += 1
+        self._remember(jti, revoked)
+        return revoked
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """
+        Revoke a token ID until the token expires.
+
+        Args:
+            jti: Token ID
+            expires_at: Token expiry as a Unix timestamp
+        """
+        ttl = int(expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        self._apply(jti, expires_at)
+        if not self.redis:
+            logger.warning("Redis client not available for token revocation")
+            return
+
+        await self.redis.setex(f"{REVOKED_KEY_PREFIX}{jti}", ttl, "blacklisted")
+        try:
+            # Entries older than the longest token lifetime only refer to
+            # expired tokens, so the stream is trimmed by ID (= time)
+            min_id = int(
+                (time.time() - settings.jwt_refresh_expiration_days * 86400) * 1000
+            )
+            await self.redis.xadd(
+                self.stream,
+                {"jti": jti, "exp": str(int(expires_at))},
+                minid=min_id,
+                approximate=True,
+            )
+        except Exception as e:
+            logger.error(f"Error publishing token revocation: {e}")
+
+    async def sync(self) -> int:
+        """
+        Rebuild the filter by replaying the revocation stream.
+
+        Returns:
+            Number of unexpired revocations loaded
+        """
+        redis_client = self.redis
+        if redis_client is None:
+            raise RuntimeError("Redis client not available for token revocation")
+
+        now = time.time()
+        live: list[str] = []
+        last_id = "0-0"
+        start = "-"
+
+        while True:
+            entries = await redis_client.xrange(self.stream, min=start, count=1000)
+            if not entries:
+                break
+            for entry_id, fields in entries:
+                last_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+                jti, exp = self._parse_entry(fields)
+                if jti and (exp is None or exp > now):
+                    live.append(jti)
+            start = f"({last_id}"
+
+        # Leave headroom so the rebuilt filter does not fill up straight away
+        while self.capacity < len(live) * 2:
+            self.capacity *= 2
+
+        rebuilt = BloomFilter(self.capacity, self.error_rate)
+        for jti in live:
+            rebuilt.add(jti)
+
+        self._filter = rebuilt
+        self._forget_unrevoked()
+        self._last_id = last_id
+        self._synced = True
+        logger.info(f"Token revocation filter loaded with {len(live)} entries")
+        return len(live)
+
+    @staticmethod
+    def _parse_entry(fields: dict[Any, Any]) -> tuple[str | None, float | None]:
+        """Extract (jti, exp) from a stream entry."""
+        decoded = {
+            (k.decode() if isinstance(k, bytes) else k): (
+                v.decode() if isinstance(v, bytes) else v
+            )
+            for k, v in fields.items()
+        }
+        exp = decoded.get("exp")
+        return decoded.get("jti"), float(exp) if exp else None
+
+    async def start(self, redis_client: aioredis.Redis) -> None:
+        """Load the filter and start tailing the revocation stream."""
+        self.redis = redis_client
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen(redis_client))
+
+    async def stop(self) -> None:
+        """Stop tailing the revocation stream."""
+        if self._listener_task:
+            self._listener_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener_task
+            self._listener_task = None
+        self._synced = False
+
+    async def _listen(self, redis_client: aioredis.Redis) -> None:
+        """Tail the stream, resyncing after errors or when the filter fills."""
+        while True:
+            try:
+                if not self._synced or self._filter.is_full:
+                    await self.sync()
+
+                response = await redis_client.xread(
+                    {self.stream: self._last_id}, count=1000, block=5000
+                )
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        self._last_id = (
+                            entry_id.decode()
+                            if isinstance(entry_id, bytes)
+                            else entry_id
+                        )
+                        jti, exp = self._parse_entry(fields)
+                        if jti:
+                            self._apply(jti, exp)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Token revocation listener error: {e}")
+                self._synced = False
+                self._forget_unrevoked()
+                await asyncio.sleep(1)
+
+    def reset(self) -> None:
+        """Forget all local state (the Redis records are untouched)."""
+        self._filter = BloomFilter(self.capacity, self.error_rate)
+        self._confirmed.clear()
+        self._last_id = "0-0"
+        self._synced = False
+
+    def stats(self) -> dict[str, Any]:
+        """Get filter metrics."""
+        return {
+            "synced": self._synced,
+            "entries": self._filter.count,
+            "capacity": self._filter.capacity,
+            "filter_bytes": len(self._filter._bits),
+            "hash_count": self._filter.hash_count,
+            "filter_negatives": self.filter_negatives,
+            "redis_checks": self.redis_checks,
+            "false_positives": self.false_positives,
+        }
+
+
+# Global revocation list instance
+revocation_list = RevocationList()
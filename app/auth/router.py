@@ -5,8 +5,8 @@ Handles all authentication-related endpoints including user registration,
 login, token management, and password operations.
 """
 
-from datetime import datetime, timedelta
-from typing import Annotated, Any
+from datetime import UTC, datetime, timedelta
+from typing import Annotated
 
 from fastapi import (
     APIRouter,
@@ -20,7 +20,9 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.attempt_tracker import auth_attempts
 from app.auth.dependencies import get_current_active_user, get_current_user
+from app.auth.password_hasher import password_hasher
 from app.auth.schemas import (
     AccountLockInfo,
     EmailVerificationRequest,
@@ -40,13 +42,12 @@ from app.auth.security import (
     create_refresh_token,
     decode_token,
     generate_password_reset_token,
-    hash_password,
-    verify_password,
     verify_password_reset_token,
 )
 from app.core.config import settings
 from app.core.logging import logger
 from app.db.database import get_db
+from app.middleware.rate_limit import rate_limiter
 from app.models.user import User
 from app.repositories.user import UserRepository
 
@@ -62,16 +63,14 @@ router = APIRouter(
 )
 
 
-# Rate limiting storage (in production, use Redis)
-_rate_limit_storage: dict[str, Any] = {}
-
-
-def check_rate_limit(
+async def check_rate_limit(
     request: Request, key: str, max_attempts: int = 5, window: int = 900
 ) -> bool:
     """
-    Simple in-memory rate limiting check.
-    In production, this should use Redis for distributed rate limiting.
+    Rate limiting check for authentication endpoints.
+
+    Uses the shared rate limiter, so limits hold across workers when Redis
+    is configured.
 
     Args:
         request: FastAPI request object
@@ -82,27 +81,13 @@ def check_rate_limit(
     Returns:
         True if request is allowed, False if rate limited
     """
-    now = datetime.now()
     client_ip = request.client.host if request.client else "unknown"
-    rate_key = f"{client_ip}:{key}"
-
-    if rate_key not in _rate_limit_storage:
-        _rate_limit_storage[rate_key] = []
-
-    # Clean old attempts
-    _rate_limit_storage[rate_key] = [
-        attempt_time
-        for attempt_time in _rate_limit_storage[rate_key]
-        if (now - attempt_time).total_seconds() < window
-    ]
+    rate_key = f"auth:{client_ip}:{key}"
 
-    # Check if rate limited
-    if len(_rate_limit_storage[rate_key]) >= max_attempts:
-        return False
-
-    # Record this attempt
-    _rate_limit_storage[rate_key].append(now)
-    return True
+    [(is_allowed, _, _)] = await rate_limiter.add_requests(
+        [(rate_key, window, max_attempts)]
+    )
+    return is_allowed
 
 
 async def send_password_reset_email(email: str) -> None:
@@ -147,7 +132,7 @@ async def register_user(
     """Register a new user account."""
 
     # Rate limiting for registration
-    if not check_rate_limit(
+    if not await check_rate_limit(
         request, f"register:{user_data.email}", max_attempts=3, window=3600
     ):
         raise HTTPException(
@@ -183,8 +168,8 @@ async def register_user(
                 detail="Username already taken",
             )
 
-        # Hash password
-        password_hash = hash_password(user_data.password)
+        # Hash password off the event loop
+        password_hash = await password_hasher.hash(user_data.password)
 
         # Create user
         user = User(
@@ -247,7 +232,7 @@ async def login_user(
     """Authenticate user and return JWT tokens."""
 
     # Rate limiting for login attempts
-    if request and not check_rate_limit(
+    if request and not await check_rate_limit(
         request, f"login:{form_data.username}", max_attempts=5, window=900
     ):
         raise HTTPException(
@@ -263,15 +248,48 @@ async def login_user(
         if not user:
             user = await user_repo.get_by_email(form_data.username)
 
+        # Failures are counted per account, or per submitted login if unknown
+        client_ip = request.client.host if request and request.client else None
+        identifier = str(user.id) if user else form_data.username
+
+        # Refuse a client that keeps failing on this account before hashing
+        if await auth_attempts.is_throttled(client_ip, identifier):
+            logger.warning(
+                f"Throttled login attempt for: {form_data.username}",
+                extra={"client_ip": client_ip},
+            )
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many failed login attempts. Please try again later.",
+            )
+
         # Check if user exists and password is correct
-        if not user or not verify_password(form_data.password, user.password_hash):
-            # Increment failed login attempts if user exists
-            if user:
-                user.increment_failed_login()
+        password_valid, upgraded_hash = False, None
+        if user:
+            password_valid, upgraded_hash = await password_hasher.verify_and_update(
+                form_data.password, user.password_hash
+            )
+
+        if not user or not password_valid:
+            attempt = await auth_attempts.record_failure(client_ip, identifier)
+
+            # Only a lock that just engaged is written to the users row
+            if user and attempt.newly_locked:
+                user.failed_login_attempts = attempt.account_failures
+                user.locked_until = datetime.now(UTC) + timedelta(
+                    seconds=attempt.lockout_seconds
+                )
                 await user_repo.update(user)
                 await db.commit()
 
-            logger.warning(f"Failed login attempt for: {form_data.username}")
+            logger.warning(
+                f"Failed login attempt for: {form_data.username}",
+                extra={
+                    "client_ip": client_ip,
+                    "pair_failures": attempt.pair_failures,
+                    "account_failures": attempt.account_failures,
+                },
+            )
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
@@ -299,7 +317,12 @@ async def login_user(
                 detail="Email verification required",
             )
 
+        # Upgrade the stored hash if hashing parameters have changed
+        if upgraded_hash:
+            user.password_hash = upgraded_hash
+
         # Reset failed login attempts and update last login
+        await auth_attempts.reset(identifier, client_ip)
         user.reset_failed_login()
         await user_repo.update(user)
         await db.commit()
@@ -478,7 +501,7 @@ async def forgot_password(
     """Send password reset email."""
 
     # Rate limiting for password reset
-    if not check_rate_limit(
+    if not await check_rate_limit(
         request, f"reset:{request_data.email}", max_attempts=3, window=3600
     ):
         raise HTTPException(
@@ -545,12 +568,13 @@ async def reset_password(
             )
 
         # Update password
-        user.password_hash = hash_password(reset_data.new_password)
+        user.password_hash = await password_hasher.hash(reset_data.new_password)
         user.failed_login_attempts = 0  # Reset failed attempts
         user.locked_until = None  # Unlock account if locked
 
         await user_repo.update(user)
         await db.commit()
+        await auth_attempts.reset(str(user.id))
 
         logger.info(f"Password reset successful for: {user.email}")
 
@@ -581,7 +605,7 @@ async def change_password(
 
     try:
         # Verify current password
-        if not verify_password(
+        if not await password_hasher.verify(
             password_data.current_password, current_user.password_hash
         ):
             raise HTTPException(
@@ -590,7 +614,9 @@ async def change_password(
             )
 
         # Update password
-        current_user.password_hash = hash_password(password_data.new_password)
+        current_user.password_hash = await password_hasher.hash(
+            password_data.new_password
+        )
 
         user_repo = UserRepository(db)
         await user_repo.update(current_user)
@@ -623,10 +649,12 @@ async def get_account_status(
     current_user: Annotated[User, Depends(get_current_user)],
 ) -> AccountLockInfo:
     """Get account lock status information."""
+    # Failed attempts are tracked outside the database until a lock engages
+    failed_attempts = await auth_attempts.failures(str(current_user.id))
     return AccountLockInfo(
         is_locked=current_user.is_locked(),
         locked_until=current_user.locked_until,
-        failed_attempts=current_user.failed_login_attempts,
+        failed_attempts=max(failed_attempts, current_user.failed_login_attempts),
     )
 
 
@@ -648,7 +676,7 @@ async def request_email_verification(
     """Send email verification email."""
 
     # Rate limiting for email verification
-    if not check_rate_limit(
+    if not await check_rate_limit(
         request, f"verify:{request_data.email}", max_attempts=3, window=3600
     ):
         raise HTTPException(
@@ -6,6 +6,7 @@ token blacklisting, and password reset functionality.
 """
 
 import secrets
+import uuid
 from datetime import UTC, datetime, timedelta
 from typing import Any
 from uuid import UUID
@@ -19,14 +20,19 @@ from jose.exceptions import (
 )
 from passlib.context import CryptContext
 
+from app.auth.revocation import revocation_list
+from app.auth.token_verifier import token_verifier
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.principal_cache import principal_cache
 
-# Password hashing context
+# Password hashing context. Hashes made with fewer rounds than configured are
+# flagged by needs_update(), so raising BCRYPT_ROUNDS upgrades them on login.
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
     bcrypt__rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
 )
 
 # Redis client for token blacklisting (will be set during app startup)
@@ -37,6 +43,7 @@ def set_redis_client(redis_client: aioredis.Redis) -> None:
     """Set the Redis client for token blacklisting."""
     global _redis_client
     _redis_client = redis_client
+    revocation_list.redis = redis_client
 
 
 # Password Security Functions
@@ -127,6 +134,7 @@ def create_access_token(
         {
             "exp": int(expire.timestamp()),
             "iat": int(datetime.now(UTC).timestamp()),
+            "jti": uuid.uuid4().hex,
             "type": to_encode.get(
                 "type", "access"
             ),  # Allow custom types, default to access
@@ -180,6 +188,7 @@ def create_refresh_token(
         {
             "exp": int(expire.timestamp()),
             "iat": int(datetime.now(UTC).timestamp()),
+            "jti": uuid.uuid4().hex,
             "type": "refresh",
         }
     )
@@ -213,10 +222,8 @@ def decode_token(token: str) -> dict[str, Any]:
         JWTError: If token is invalid, expired, or malformed
     """
     try:
-        payload = jwt.decode(
-            token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
-        )
-        return payload
+        # Signature checks are skipped for tokens verified earlier
+        return token_verifier.decode(token)
 
     except ExpiredSignatureError:
         logger.warning("JWT token has expired")
@@ -245,8 +252,9 @@ def verify_token(token: str) -> dict[str, Any] | None:
     try:
         payload = decode_token(token)
 
-        # Check if token is blacklisted
-        if is_token_blacklisted_sync(token):
+        # Check if token is revoked (local filter, no network I/O)
+        jti = payload.get("jti")
+        if jti and revocation_list.is_revoked_sync(jti):
             logger.warning("Attempted use of blacklisted token")
             return None
 
@@ -256,16 +264,35 @@ def verify_token(token: str) -> dict[str, Any] | None:
         return None
 
 
+def _token_jti(token: str) -> str | None:
+    """Read the jti claim of a token without verifying it."""
+    claims = token_verifier.cached_claims(token)
+    if claims is not None:
+        return claims.get("jti")
+    try:
+        return jwt.get_unverified_claims(token).get("jti")
+    except JWTError:
+        return None
+
+
 async def is_token_blacklisted(token: str) -> bool:
     """
     Check if a token is blacklisted (async version).
 
+    Tokens carrying a jti are checked against the local revocation filter
+    and only filter hits are confirmed in Redis. Tokens issued without a jti
+    fall back to the per-token Redis key.
+
     Args:
         token: The JWT token to check
 
     Returns:
         True if token is blacklisted, False otherwise
     """
+    jti = _token_jti(token)
+    if jti:
+        return await revocation_list.is_revoked(jti)
+
     if not _redis_client:
         logger.warning("Redis client not available for token blacklist check")
         return False
@@ -278,10 +305,12 @@ async def is_token_blacklisted(token: str) -> bool:
         return False
 
 
-def is_token_blacklisted_sync(_token: str) -> bool:
+def is_token_blacklisted_sync(token: str) -> bool:
     """
     Synchronous version of token blacklist check.
-    Used in verify_token for backwards compatibility.
+
+    Uses only the local revocation filter, so it never blocks. It agrees
+    with is_token_blacklisted for any token the async check has seen.
 
     Args:
         token: The JWT token to check
@@ -289,9 +318,11 @@ def is_token_blacklisted_sync(_token: str) -> bool:
     Returns:
         True if token is blacklisted, False otherwise
     """
-    # For synchronous check, we'll assume not blacklisted
-    # This is a limitation but prevents blocking operations
-    return False
+    jti = _token_jti(token)
+    if not jti:
+        # Tokens issued without a jti can only be checked asynchronously
+        return False
+    return revocation_list.is_revoked_sync(jti)
 
 
 async def blacklist_token(token: str, expires_at: datetime | None = None) -> None:
@@ -324,9 +355,16 @@ async def blacklist_token(token: str, expires_at: datetime | None = None) -> Non
         ttl = int((expires_at - datetime.now(UTC)).total_seconds())
 
         if ttl > 0:
-            await _redis_client.setex(f"blacklist:{token}", ttl, "blacklisted")
+            jti = _token_jti(token)
+            if jti:
+                await revocation_list.revoke(jti, expires_at.timestamp())
+            else:
+                await _redis_client.setex(f"blacklist:{token}", ttl, "blacklisted")
             logger.info("Token blacklisted successfully")
 
+        # Drop the token from every worker's principal cache
+        await principal_cache.invalidate_token(token)
+
     except Exception as e:
         logger.error(f"Error blacklisting token: {e}")
 
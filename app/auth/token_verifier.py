@@ -0,0 +1,179 @@
+"""
+JWT verification service for DevPocket API.
+
+A request's access token is verified by the authentication middleware, the
+``get_current_user`` dependency and, for terminals, the WebSocket handshake.
+TokenVerifier makes the repeats cheap:
+
+- the signing key is parsed once into a key object instead of on every
+  decode (python-jose otherwise re-parses string keys per call);
+- validated claims are kept in an LRU keyed by the token's SHA-256 digest
+  until the token's own ``exp``, so a repeat check is a dict lookup;
+- PyJWT (with the cryptography backend) is used when installed, which
+  verifies noticeably faster than python-jose. Errors are always raised as
+  python-jose exceptions so callers need not care which backend ran.
+
+Revocation is deliberately not cached here; ``verify_token`` checks it on
+every call.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+from jose import jwk
+from jose import jwt as jose_jwt
+from jose.exceptions import ExpiredSignatureError, JWSSignatureError, JWTError
+
+from app.core.config import settings
+from app.core.logging import logger
+
+try:
+    import jwt as pyjwt
+except ImportError:  # pragma: no cover - optional dependency
+    pyjwt = None
+
+
+class JoseBackend:
+    """Verify tokens with python-jose using a pre-constructed key."""
+
+    name = "jose"
+
+    def __init__(self, secret_key: str, algorithm: str):
+        self.algorithm = algorithm
+        self._key = jwk.construct(secret_key, algorithm)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        return jose_jwt.decode(token, self._key, algorithms=[self.algorithm])
+
+
+class PyJWTBackend:
+    """Verify tokens with PyJWT, mapping its errors to python-jose ones."""
+
+    name = "pyjwt"
+
+    def __init__(self, secret_key: str, algorithm: str):
+        self.algorithm = algorithm
+        self._jwt = pyjwt.PyJWT()
+        self._key = pyjwt.get_algorithm_by_name(algorithm).prepare_key(secret_key)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        try:
+            return self._jwt.decode(
+                token,
+                self._key,
+                algorithms=[self.algorithm],
+                options={"verify_aud": False},
+            )
+        except pyjwt.ExpiredSignatureError as e:
+            raise ExpiredSignatureError("Signature has expired.") from e
+        except pyjwt.InvalidSignatureError as e:
+            raise JWSSignatureError("Signature verification failed.") from e
+        except pyjwt.InvalidTokenError as e:
+            raise JWTError(str(e)) from e
+
+
+def _create_backend(
+    backend: str, secret_key: str, algorithm: str
+) -> JoseBackend | PyJWTBackend:
+    """Pick a verification backend ("auto", "pyjwt" or "jose")."""
+    if backend in ("auto", "pyjwt") and pyjwt is not None:
+        return PyJWTBackend(secret_key, algorithm)
+    if backend == "pyjwt":
+        logger.warning("PyJWT not installed, falling back to python-jose")
+    return JoseBackend(secret_key, algorithm)
+
+
+class TokenVerifier:
+    """Verify JWTs and remember validated claims until they expire."""
+
+    def __init__(
+        self,
+        secret_key: str | None = None,
+        algorithm: str | None = None,
+        backend: str | None = None,
+        cache_size: int | None = None,
+    ):
+        self.backend = _create_backend(
+            backend or settings.jwt_verifier_backend,
+            secret_key or settings.jwt_secret_key,
+            algorithm or settings.jwt_algorithm,
+        )
+        self.cache_size = (
+            cache_size if cache_size is not None else settings.jwt_verify_cache_size
+        )
+        self._cache: OrderedDict[bytes, tuple[dict[str, Any], float]] = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """
+        Verify a token's signature and claims.
+
+        Args:
+            token: The JWT token to verify
+
+        Returns:
+            A copy of the token payload
+
+        Raises:
+            JWTError: If the token is invalid, expired or malformed
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            claims, expires_at = cached
+            if expires_at > time.time():
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return dict(claims)
+            del self._cache[key]
+            raise ExpiredSignatureError("Signature has expired.")
+
+        self.misses += 1
+        claims = self.backend.decode(token)
+
+        # Tokens without exp never expire, so they are not cached
+        exp = claims.get("exp")
+        if self.cache_size > 0 and isinstance(exp, int | float):
+            self._cache[key] = (claims, float(exp))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return dict(claims)
+
+    def cached_claims(self, token: str) -> dict[str, Any] | None:
+        """
+        Get the claims of a token verified earlier, without decoding it.
+
+        Args:
+            token: The JWT token
+
+        Returns:
+            The cached payload if present and unexpired, None otherwise
+        """
+        cached = self._cache.get(hashlib.sha256(token.encode()).digest())
+        if cached is None or cached[1] <= time.time():
+            return None
+        return cached[0]
+
+    def clear(self) -> None:
+        """Drop all cached claims."""
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Get verifier metrics."""
+        return {
+            "backend": self.backend.name,
+            "entries": len(self._cache),
+            "max_entries": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global token verifier instance
+token_verifier = TokenVerifier()
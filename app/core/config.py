@@ -103,6 +103,26 @@ class Settings(BaseSettings):
     database_user: str = "devpocket_user"
     database_password: str = "devpocket_password"
 
+    # Connection pool, one per worker and database server; every session and
+    # raw query of the worker draws from it
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 300
+    # Optional read replica for read-only endpoints (history, stats, search)
+    database_replica_url: str | None = None
+    # Connecting through PgBouncer in transaction pooling mode: no
+    # server-side prepared statement caching, unique statement names
+    db_pgbouncer_mode: bool = False
+    # Per-statement query statistics (opt-in). Statements slower than the
+    # threshold are logged; this share of slow SELECTs is re-run in the
+    # background with EXPLAIN (ANALYZE, BUFFERS)
+    query_insights_enabled: bool = False
+    slow_query_threshold_ms: float = 200.0
+    slow_query_explain_sample_rate: float = 0.1
+    slow_query_explain_timeout_seconds: float = 10.0
+    slow_query_log_size: int = 200
+
     # Redis settings
     redis_url: str = "redis://localhost:6379/0"
     redis_host: str = "localhost"
@@ -114,6 +134,8 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_expiration_hours: int = 24
     jwt_refresh_expiration_days: int = 30
+    jwt_verifier_backend: str = "auto"  # "auto" (PyJWT if installed), "pyjwt" or "jose"
+    jwt_verify_cache_size: int = 10000  # Verified-claims LRU (0 disables it)
 
     # CORS settings
     cors_origins: str | list[
@@ -132,6 +154,33 @@ class Settings(BaseSettings):
     bcrypt_rounds: int = 12
     max_connections_per_ip: int = 100
     rate_limit_per_minute: int = 60
+    rate_limit_backend: str = "redis"  # "redis" (shared) or "memory" (per process)
+    rate_limit_max_keys: int = 100000
+
+    # Failed-login tracking and account lockout
+    auth_max_failed_attempts: int = 5
+    # Failures one client may make on one account before it is refused
+    # without a password check; set below auth_max_failed_attempts to stop
+    # a single client before it locks the account for everybody else
+    auth_max_pair_failures: int = 5
+    auth_failure_window_seconds: int = 900
+    auth_lockout_seconds: int = 900
+    auth_attempt_max_keys: int = 100000
+
+    # Password hashing pool
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 256
+    password_hash_use_processes: bool = False
+
+    # Authenticated-principal cache (0 TTL disables it)
+    principal_cache_ttl_seconds: int = 30
+    principal_cache_max_entries: int = 10000
+    principal_cache_channel: str = "auth:principal-invalidate"
+
+    # Token revocation filter
+    token_revocation_stream: str = "auth:revocations"
+    token_revocation_filter_capacity: int = 100000
+    token_revocation_filter_error_rate: float = 0.001
 
     # SSH settings
     ssh_timeout: int = 30
@@ -143,9 +192,52 @@ class Settings(BaseSettings):
     max_command_length: int = 1000
     max_output_size: int = 1048576  # 1MB
 
+    # Shell-integration command capture
+    command_capture_enabled: bool = True
+    command_capture_batch_size: int = 100
+    command_capture_flush_ms: int = 500
+    command_capture_max_pending: int = 10000
+
+    # Sync push over the terminal WebSocket: changes are batched per
+    # connection for this long, or until this many are pending
+    sync_push_debounce_ms: int = 50
+    sync_push_max_batch: int = 100
+
+    # Device presence: devices with a heartbeat within the window count as
+    # active; heartbeats older than the retention period are trimmed
+    presence_window_seconds: int = 300
+    presence_retention_seconds: int = 86400
+    presence_trim_interval_seconds: int = 600
+
+    # Sync responses at least this large are gzip/zstd-compressed when the
+    # client accepts it
+    sync_compression_min_bytes: int = 1024
+
+    # Data retention settings
+    retention_enabled: bool = False
+    retention_interval_seconds: int = 3600
+    retention_batch_size: int = 5000
+    retention_detach_only: bool = False
+    partition_premake_months: int = 3
+    partition_maintenance_interval_seconds: int = 3600
+    command_retention_days: int = 90
+    session_retention_days: int = 180
+    sync_retention_days: int = 90
+
     # Logging settings
     log_level: str = "INFO"
     log_format: str = "json"
+    log_queue_size: int = 10000
+    # Each logger/level/message template may log this many records per
+    # interval; the rest are dropped and counted (0 disables sampling)
+    log_sample_burst: int = 20
+    log_sample_interval_seconds: float = 10.0
+
+    # Metrics (served at /metrics in Prometheus text format). Scrapes must
+    # send "Authorization: Bearer <metrics_token>"; without a token the
+    # endpoint is only served in debug mode
+    metrics_enabled: bool = True
+    metrics_token: str = ""
 
     # Development settings
     reload: bool = True
@@ -0,0 +1,151 @@
+"""
+JSON Patch (RFC 6902) helpers for DevPocket API.
+
+Sync items are whole JSON documents. Devices that already hold an item
+exchange field-level patches instead, so editing one field of a large
+settings or profile document moves bytes in proportion to the edit.
+
+``make_patch`` produces ``add``/``remove``/``replace`` operations; objects
+are diffed key by key and arrays are replaced whole. ``apply_patch`` also
+accepts ``test`` operations and ``-`` / index paths into arrays.
+"""
+
+import copy
+from typing import Any
+
+# Operations are lists of {"op", "path"[, "value"]} dicts
+Patch = list[dict[str, Any]]
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _split_pointer(path: str) -> list[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer: {path!r}")
+    return [_unescape(token) for token in path[1:].split("/")]
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> Patch:
+    """
+    Diff two JSON documents.
+
+    Args:
+        old: Document the patch applies to
+        new: Document the patch produces
+        path: JSON pointer of the documents (for recursion)
+
+    Returns:
+        Operations turning ``old`` into ``new``; empty if they are equal
+    """
+    if old == new:
+        return []
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return [{"op": "replace", "path": path, "value": new}]
+
+    patch: Patch = []
+    for key in old:
+        if key not in new:
+            patch.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+    for key, value in new.items():
+        child = f"{path}/{_escape(key)}"
+        if key not in old:
+            patch.append({"op": "add", "path": child, "value": value})
+        else:
+            patch.extend(make_patch(old[key], value, child))
+    return patch
+
+
+def _parent(doc: Any, tokens: list[str]) -> Any:
+    for token in tokens:
+        if isinstance(doc, dict) and token in doc:
+            doc = doc[token]
+        elif isinstance(doc, list) and token.isdigit() and int(token) < len(doc):
+            doc = doc[int(token)]
+        else:
+            raise ValueError(f"Path not found: /{'/'.join(tokens)}")
+    return doc
+
+
+def _list_index(container: list, token: str, *, append: bool = False) -> int:
+    if append and token == "-":
+        return len(container)
+    if not token.isdigit():
+        raise ValueError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (not append and index == len(container)):
+        raise ValueError(f"Array index out of range: {index}")
+    return index
+
+
+def apply_patch(doc: Any, patch: Patch) -> Any:
+    """
+    Apply a patch to a copy of a document.
+
+    Args:
+        doc: Document to patch (not modified)
+        patch: Operations to apply in order
+
+    Returns:
+        The patched document
+
+    Raises:
+        ValueError: If an operation is malformed, its path does not exist or
+            a ``test`` operation fails
+    """
+    result = copy.deepcopy(doc)
+    for operation in patch:
+        op = operation.get("op")
+        if op not in ("add", "remove", "replace", "test"):
+            raise ValueError(f"Unsupported patch operation: {op!r}")
+        if op != "remove" and "value" not in operation:
+            raise ValueError(f"Missing value for {op} operation")
+
+        tokens = _split_pointer(operation.get("path", ""))
+        value = copy.deepcopy(operation.get("value"))
+
+        if not tokens:
+            if op == "test":
+                if result != value:
+                    raise ValueError("Test operation failed at root")
+                continue
+            if op == "remove":
+                raise ValueError("Cannot remove the document root")
+            result = value
+            continue
+
+        container = _parent(result, tokens[:-1])
+        token = tokens[-1]
+
+        if isinstance(container, dict):
+            if op != "add" and token not in container:
+                raise ValueError(f"Path not found: {operation['path']}")
+            if op == "remove":
+                del container[token]
+            elif op == "test":
+                if container[token] != value:
+                    raise ValueError(f"Test operation failed at {operation['path']}")
+            else:
+                container[token] = value
+        elif isinstance(container, list):
+            index = _list_index(container, token, append=op == "add")
+            if op == "add":
+                container.insert(index, value)
+            elif op == "remove":
+                del container[index]
+            elif op == "test":
+                if container[index] != value:
+                    raise ValueError(f"Test operation failed at {operation['path']}")
+            else:
+                container[index] = value
+        else:
+            raise ValueError(f"Path not found: {operation['path']}")
+
+    return result
@@ -1,14 +1,138 @@
 """
 Logging configuration for DevPocket API.
+
+Records are put on a bounded queue by a QueueHandler and written to stdout
+by a background QueueListener thread, so a burst of log lines never blocks
+the event loop on the stream; if the writer falls behind, records are
+dropped and counted rather than queued without bound.
+
+Repeated messages are sampled per logger, level and message template. Pass
+arguments separately (``logger.error("Read failed: %s", e)``) instead of
+using f-strings: the message is then only formatted when the record is
+actually emitted, and the template is what identifies a hot message.
 """
 
+import atexit
+import copy
+import json
 import logging
+import queue
 import sys
+from collections import OrderedDict
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
 from app.core.config import settings
 
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+}
+
+_listener: QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: dict[str, Any] = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value
+
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = record.stack_info
+
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate limit repeated log messages.
+
+    Each (logger, level, message template) may log ``burst`` records per
+    ``interval`` seconds. Further records in the interval are dropped, and
+    the number dropped is attached as ``suppressed`` to the first record let
+    through afterwards. CRITICAL records are never sampled.
+    """
+
+    def __init__(self, burst: int, interval: float, max_keys: int = 4096):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_keys = max_keys
+        # key -> [window start, records logged, records suppressed]
+        self._windows: OrderedDict[tuple[Any, ...], list[float]] = OrderedDict()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.CRITICAL:
+            return True
+
+        key = (record.name, record.levelno, record.msg)
+        window = self._windows.get(key)
+        if window is None or record.created - window[0] >= self.interval:
+            suppressed = int(window[2]) if window else 0
+            window = [record.created, 0, 0]
+            self._windows[key] = window
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+            if suppressed:
+                record.suppressed = suppressed
+
+        if window[1] >= self.burst:
+            window[2] += 1
+            return False
+        window[1] += 1
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking on a full queue."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the message arguments before the record crosses threads.
+
+        Unlike the base class this leaves formatting to the writer's
+        formatter, so extra fields and tracebacks stay structured.
+
+        Args:
+            record: Record being logged
+
+        Returns:
+            A copy safe to hand to the writer thread
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 
 def setup_logging() -> logging.Logger:
     """
@@ -17,34 +141,71 @@ def setup_logging() -> logging.Logger:
     Returns:
         logging.Logger: Configured logger instance
     """
+    global _listener
 
     # Create logger
     logger = logging.getLogger("devpocket")
     logger.setLevel(getattr(logging, settings.log_level.upper()))
 
-    # Create console handler
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(getattr(logging, settings.log_level.upper()))
+    # Replace the pipeline of an earlier call
+    shutdown_logging()
+    for existing in list(logger.handlers):
+        logger.removeHandler(existing)
 
-    # Create formatter
+    # Console writer, run by the listener thread
+    stream_handler = logging.StreamHandler(sys.stdout)
     if settings.log_format == "json":
-        formatter = logging.Formatter(
-            '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "logger": "%(name)s", "message": "%(message)s"}'
-        )
+        stream_handler.setFormatter(JsonFormatter())
     else:
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        stream_handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
         )
 
-    handler.setFormatter(formatter)
+    # Queue handler seen by callers
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    if settings.log_sample_burst > 0:
+        handler.addFilter(
+            SamplingFilter(
+                settings.log_sample_burst, settings.log_sample_interval_seconds
+            )
+        )
     logger.addHandler(handler)
 
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+
     # Prevent duplicate logs
     logger.propagate = False
 
     return logger
 
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _log_event(
+    logger: logging.Logger,
+    level: int,
+    data: dict[str, Any],
+    message: str,
+    *args: Any,
+) -> None:
+    """Log an event message with its fields attached as ``event``."""
+    if not logger.isEnabledFor(level):
+        return
+    if data.get("user_id"):
+        message += " - User: %s"
+        args = (*args, data["user_id"])
+    logger.log(level, message, *args, extra={"event": data})
+
+
 def log_request(
     method: str,
     url: str,
@@ -62,8 +223,6 @@ def log_request(
         duration: Request duration in seconds
         user_id: Optional user ID
     """
-    logger = logging.getLogger("devpocket.requests")
-
     log_data = {
         "method": method,
         "url": url,
@@ -74,15 +233,16 @@ def log_request(
     if user_id:
         log_data["user_id"] = user_id
 
-    if settings.log_format == "json":
-        import json
-
-        logger.info(json.dumps(log_data))
-    else:
-        logger.info(
-            f"{method} {url} - {status_code} - {duration:.3f}s"
-            + (f" - User: {user_id}" if user_id else "")
-        )
+    _log_event(
+        logging.getLogger("devpocket.requests"),
+        logging.INFO,
+        log_data,
+        "%s %s - %s - %.3fs",
+        method,
+        url,
+        status_code,
+        duration,
+    )
 
 
 def log_websocket_event(
@@ -97,22 +257,19 @@ def log_websocket_event(
         user_id: Optional user ID
         **kwargs: Additional event data
     """
-    logger = logging.getLogger("devpocket.websocket")
-
     log_data = {"event_type": event_type, "session_id": session_id, **kwargs}
 
     if user_id:
         log_data["user_id"] = user_id
 
-    if settings.log_format == "json":
-        import json
-
-        logger.info(json.dumps(log_data))
-    else:
-        logger.info(
-            f"WebSocket {event_type} - Session: {session_id}"
-            + (f" - User: {user_id}" if user_id else "")
-        )
+    _log_event(
+        logging.getLogger("devpocket.websocket"),
+        logging.INFO,
+        log_data,
+        "WebSocket %s - Session: %s",
+        event_type,
+        session_id,
+    )
 
 
 def log_error(
@@ -128,8 +285,6 @@ def log_error(
         context: Additional context information
         user_id: Optional user ID
     """
-    logger = logging.getLogger("devpocket.errors")
-
     log_data = {
         "error_type": type(error).__name__,
         "error_message": str(error),
@@ -139,15 +294,14 @@ def log_error(
     if user_id:
         log_data["user_id"] = user_id
 
-    if settings.log_format == "json":
-        import json
-
-        logger.error(json.dumps(log_data))
-    else:
-        logger.error(
-            f"Error: {type(error).__name__} - {error!s}"
-            + (f" - User: {user_id}" if user_id else "")
-        )
+    _log_event(
+        logging.getLogger("devpocket.errors"),
+        logging.ERROR,
+        log_data,
+        "Error: %s - %s",
+        type(error).__name__,
+        error,
+    )
 
 
 def log_ssh_event(
@@ -167,8 +321,6 @@ def log_ssh_event(
         user_id: Optional user ID
         **kwargs: Additional event data
     """
-    logger = logging.getLogger("devpocket.ssh")
-
     log_data = {
         "event_type": event_type,
         "session_id": session_id,
@@ -179,15 +331,15 @@ def log_ssh_event(
     if user_id:
         log_data["user_id"] = user_id
 
-    if settings.log_format == "json":
-        import json
-
-        logger.info(json.dumps(log_data))
-    else:
-        logger.info(
-            f"SSH {event_type} - Session: {session_id} - Host: {host}"
-            + (f" - User: {user_id}" if user_id else "")
-        )
+    _log_event(
+        logging.getLogger("devpocket.ssh"),
+        logging.INFO,
+        log_data,
+        "SSH %s - Session: %s - Host: %s",
+        event_type,
+        session_id,
+        host,
+    )
 
 
 def log_ai_event(
@@ -209,8 +361,6 @@ def log_ai_event(
         user_id: Optional user ID
         **kwargs: Additional event data
     """
-    logger = logging.getLogger("devpocket.ai")
-
     log_data = {
         "event_type": event_type,
         "model": model,
@@ -224,15 +374,15 @@ def log_ai_event(
     if user_id:
         log_data["user_id"] = user_id
 
-    if settings.log_format == "json":
-        import json
-
-        logger.info(json.dumps(log_data))
-    else:
-        logger.info(
-            f"AI {event_type} - Model: {model} - Prompt: {prompt_length} chars"
-            + (f" - User: {user_id}" if user_id else "")
-        )
+    _log_event(
+        logging.getLogger("devpocket.ai"),
+        logging.INFO,
+        log_data,
+        "AI %s - Model: %s - Prompt: %s chars",
+        event_type,
+        model,
+        prompt_length,
+    )
 
 
 def get_current_time() -> datetime:
@@ -262,3 +412,4 @@ class DevPocketLogger:
 # Initialize logger
 base_logger = setup_logging()
 logger = DevPocketLogger(base_logger)
+atexit.register(shutdown_logging)
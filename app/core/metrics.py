@@ -0,0 +1,409 @@
+"""
+Application metrics for DevPocket API.
+
+A deliberately small metrics core that renders the Prometheus text format
+at ``/metrics``. Recording an event is a dict lookup and an integer add:
+
+- Counters and gauges keep one number per label set.
+- Histograms are HDR-style log-linear: every power of two microseconds is
+  split into 8 sub-buckets, so recorded latencies keep ~12% precision
+  from 1 µs to hours in a fixed array of 256 counts per label set. They
+  are folded into the usual ``le`` buckets only when scraped.
+
+Nothing takes a lock. Metrics are updated from the event loop thread;
+an update from a worker thread may rarely lose an increment, which is an
+accepted trade-off for keeping the hot path well under a microsecond.
+prometheus-client was avoided for that reason - its per-child lock and
+linear bucket scan cost 1.5-4 µs per observation.
+
+Values are per process. Under several gunicorn workers a scrape reaches
+one of them, so every sample carries a ``worker`` label (the process ID)
+and each worker's counters stay monotonic; query them per worker and sum,
+e.g. ``sum without (worker) (rate(http_requests_total[5m]))``.
+"""
+
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+# Log-linear histogram layout: 2**SUB_BITS sub-buckets per power of two
+SUB_BITS = 3
+SUB_BUCKETS = 1 << SUB_BITS
+BUCKET_COUNT = 256
+
+# Bucket bounds exported to Prometheus (seconds)
+EXPORT_BUCKETS: tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+def _bucket_index(microseconds: int) -> int:
+    """Map a duration in microseconds to its log-linear bucket."""
+    shift = microseconds.bit_length() - SUB_BITS - 1
+    if shift <= 0:
+        return microseconds
+    index = (shift << SUB_BITS) + (microseconds >> shift)
+    return index if index < BUCKET_COUNT else BUCKET_COUNT - 1
+
+
+def _bucket_upper_bound(index: int) -> float:
+    """Exclusive upper bound of a bucket, in seconds."""
+    if index < SUB_BUCKETS * 2:
+        return (index + 1) / 1_000_000
+    shift = (index >> SUB_BITS) - 1
+    mantissa = index - (shift << SUB_BITS)
+    return ((mantissa + 1) << shift) / 1_000_000
+
+
+# Export slot of every fine bucket: the first ``le`` bound that covers it
+_EXPORT_SLOTS = [
+    next(
+        (
+            slot
+            for slot, bound in enumerate(EXPORT_BUCKETS)
+            if _bucket_upper_bound(index) <= bound
+        ),
+        len(EXPORT_BUCKETS),
+    )
+    for index in range(BUCKET_COUNT)
+]
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[Any, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return f"{{{pairs}}}"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter per label set."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self._values: dict[tuple[Any, ...], float] = {}
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        """Increment the counter for a label set."""
+        values = self._values
+        values[labels] = values.get(labels, 0) + amount
+
+    def value(self, *labels: Any) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(
+        self, const_names: tuple[str, ...] = (), const_values: tuple[Any, ...] = ()
+    ) -> Iterator[str]:
+        names = (*const_names, *self.label_names)
+        for labels, value in self._values.items():
+            yield (
+                f"{self.name}{_format_labels(names, (*const_values, *labels))} "
+                f"{_format_value(value)}"
+            )
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class Gauge(Counter):
+    """Value that can go up and down per label set."""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, *labels: Any) -> None:
+        """Set the gauge for a label set."""
+        self._values[labels] = value
+
+    def dec(self, *labels: Any, amount: float = 1) -> None:
+        """Decrement the gauge for a label set."""
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram:
+    """HDR-style latency histogram per label set."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        # labels -> [bucket counts, sum, count]
+        self._children: dict[tuple[Any, ...], list[Any]] = {}
+
+    def observe(self, seconds: float, *labels: Any) -> None:
+        """Record a duration for a label set."""
+        child = self._children.get(labels)
+        if child is None:
+            child = self._children[labels] = [[0] * BUCKET_COUNT, 0.0, 0]
+
+        # Inlined _bucket_index; this is the hot path
+        microseconds = int(seconds * 1_000_000)
+        shift = microseconds.bit_length() - SUB_BITS - 1
+        if shift <= 0:
+            index = microseconds if microseconds > 0 else 0
+        else:
+            index = (shift << SUB_BITS) + (microseconds >> shift)
+            if index >= BUCKET_COUNT:
+                index = BUCKET_COUNT - 1
+
+        child[0][index] += 1
+        child[1] += seconds
+        child[2] += 1
+
+    @contextmanager
+    def time(self, *labels: Any) -> Iterator[None]:
+        """Time a block of code."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: Any) -> int:
+        child = self._children.get(labels)
+        return child[2] if child else 0
+
+    def quantile(self, q: float, *labels: Any) -> float | None:
+        """
+        Estimate a quantile from the recorded buckets.
+
+        Args:
+            q: Quantile between 0 and 1
+            labels: Label values
+
+        Returns:
+            Upper bound of the bucket holding the quantile, in seconds
+        """
+        child = self._children.get(labels)
+        if not child or not child[2]:
+            return None
+        rank = q * child[2]
+        seen = 0
+        for index, count in enumerate(child[0]):
+            seen += count
+            if count and seen >= rank:
+                return _bucket_upper_bound(index)
+        return _bucket_upper_bound(BUCKET_COUNT - 1)
+
+    def samples(
+        self, const_names: tuple[str, ...] = (), const_values: tuple[Any, ...] = ()
+    ) -> Iterator[str]:
+        label_names = (*const_names, *self.label_names)
+        bucket_names = (*label_names, "le")
+        for child_labels, (buckets, total, count) in self._children.items():
+            slots = [0] * (len(EXPORT_BUCKETS) + 1)
+            for index, bucket_count in enumerate(buckets):
+                if bucket_count:
+                    slots[_EXPORT_SLOTS[index]] += bucket_count
+
+            labels = (*const_values, *child_labels)
+            cumulative = 0
+            for bound, slot_count in zip((*EXPORT_BUCKETS, "+Inf"), slots, strict=True):
+                cumulative += slot_count
+                yield (
+                    f"{self.name}_bucket"
+                    f"{_format_labels(bucket_names, (*labels, bound))} {cumulative}"
+                )
+            label_text = _format_labels(label_names, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(total)}"
+            yield f"{self.name}_count{label_text} {count}"
+
+    def clear(self) -> None:
+        self._children.clear()
+
+
+@contextmanager
+def track_call(counter: Counter, histogram: Histogram, *labels: Any) -> Iterator[None]:
+    """
+    Time a call and count it with an ``ok``/``error`` outcome label.
+
+    Args:
+        counter: Counter whose last label is the outcome
+        histogram: Latency histogram
+        labels: Label values shared by both metrics
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        histogram.observe(time.perf_counter() - start, *labels)
+        counter.inc(*labels, outcome)
+
+
+def instrument_redis(client: Any) -> None:
+    """
+    Record metrics for every command sent through a Redis client.
+
+    Args:
+        client: redis.asyncio client
+    """
+    execute_command = client.execute_command
+
+    async def timed_execute_command(*args: Any, **options: Any) -> Any:
+        command = str(args[0]).upper() if args else "UNKNOWN"
+        start = time.perf_counter()
+        try:
+            result = await execute_command(*args, **options)
+        except Exception:
+            redis_commands.inc(command, "error")
+            raise
+        redis_command_duration.observe(time.perf_counter() - start, command)
+        redis_commands.inc(command, "ok")
+        return result
+
+    client.execute_command = timed_execute_command
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self, worker_label: str | None = None) -> None:
+        """
+        Initialize the registry.
+
+        Args:
+            worker_label: Name of a label carrying the process ID on every
+                sample, or None for no such label
+        """
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self.worker_label = worker_label
+
+    def _register(self, metric: Any) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labels: tuple[str, ...] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(
+        self, name: str, documentation: str, labels: tuple[str, ...] = ()
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self, name: str, documentation: str, labels: tuple[str, ...] = ()
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        # Read at render time: with --preload the registry is created
+        # before gunicorn forks its workers
+        const_names: tuple[str, ...] = ()
+        const_values: tuple[Any, ...] = ()
+        if self.worker_label:
+            const_names, const_values = (self.worker_label,), (os.getpid(),)
+
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(metric.samples(const_names, const_values))
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Reset every metric's values."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+# Global metrics registry
+metrics = MetricsRegistry(worker_label="worker")
+
+# HTTP
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests", ("method", "route", "status")
+)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+
+# Database
+db_queries = metrics.counter("db_queries_total", "Database queries", ("operation",))
+db_query_duration = metrics.histogram(
+    "db_query_duration_seconds", "Database query latency", ("operation",)
+)
+db_slow_queries = metrics.counter(
+    "db_slow_queries_total", "Database queries over the slow threshold", ("operation",)
+)
+db_pool_acquire_duration = metrics.histogram(
+    "db_pool_acquire_duration_seconds", "Wait for a pooled connection", ("pool",)
+)
+db_pool_timeouts = metrics.counter(
+    "db_pool_timeouts_total", "Pooled connection checkouts that timed out", ("pool",)
+)
+db_pool_connections = metrics.gauge(
+    "db_pool_connections", "Pooled database connections", ("pool", "state")
+)
+
+# Redis
+redis_commands = metrics.counter(
+    "redis_commands_total", "Redis commands", ("command", "outcome")
+)
+redis_command_duration = metrics.histogram(
+    "redis_command_duration_seconds", "Redis command latency", ("command",)
+)
+
+# SSH
+ssh_connects = metrics.counter(
+    "ssh_connects_total", "SSH connection attempts", ("kind", "outcome")
+)
+ssh_connect_duration = metrics.histogram(
+    "ssh_connect_duration_seconds", "SSH connection latency", ("kind",)
+)
+
+# AI (OpenRouter)
+ai_requests = metrics.counter(
+    "ai_requests_total", "OpenRouter requests", ("operation", "outcome")
+)
+ai_request_duration = metrics.histogram(
+    "ai_request_duration_seconds", "OpenRouter request latency", ("operation",)
+)
+
+# WebSocket
+websocket_frames = metrics.counter(
+    "websocket_frames_total", "WebSocket frames", ("route", "direction")
+)
+websocket_connections = metrics.gauge(
+    "websocket_connections", "Open WebSocket connections", ("route",)
+)
@@ -0,0 +1,363 @@
+"""
+Authenticated-principal cache for DevPocket API.
+
+Every authenticated request used to check the token blacklist in Redis,
+decode the JWT and load the user from Postgres. PrincipalCache keeps a
+short-lived, bounded LRU of token -> (verified claims, user snapshot) so
+that work happens once per token per TTL instead of once per request:
+
+- AuthenticationMiddleware verifies the token and stores the claims; the
+  ``get_current_user`` dependency then reuses them for the same request.
+- The dependency stores a column snapshot of the loaded user; later
+  requests rebuild a session-attached User from it without a query.
+
+Entries are evicted across workers through Redis pub/sub whenever a user is
+updated, locked or deleted, or one of their tokens is blacklisted. User
+changes are evicted once their transaction commits, so no worker can cache
+the old row again between the eviction and the commit. The TTL bounds
+staleness if an invalidation message is ever missed.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import redis.asyncio as aioredis
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.user import User
+
+# Session.info key holding the users changed in the current transaction
+PENDING_USER_INVALIDATIONS = "pending_user_invalidations"
+
+
+def token_key(token: str) -> str:
+    """Hash a token for use as a cache key and invalidation message."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+@dataclass
+class CachedPrincipal:
+    """Verified claims and (once loaded) a user snapshot for one token."""
+
+    claims: dict[str, Any]
+    expires_at: float
+    user_snapshot: dict[str, Any] | None = None
+
+    @property
+    def user_id(self) -> str | None:
+        return self.claims.get("sub")
+
+
+class PrincipalCache:
+    """Short-TTL LRU of token -> principal with pub/sub invalidation."""
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        channel: str | None = None,
+    ):
+        self.max_entries = max_entries or settings.principal_cache_max_entries
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else settings.principal_cache_ttl_seconds
+        )
+        self.channel = channel or settings.principal_cache_channel
+        self.redis: aioredis.Redis | None = None
+
+        self._entries: OrderedDict[str, CachedPrincipal] = OrderedDict()
+        self._keys_by_user: dict[str, set[str]] = {}
+        self._listener_task: asyncio.Task | None = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, token: str) -> CachedPrincipal | None:
+        """
+        Get the cached principal for a token.
+
+        Args:
+            token: Raw JWT token
+
+        Returns:
+            The cached principal, or None on a miss or expired entry
+        """
+        if not self.enabled:
+            return None
+
+        key = token_key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._evict(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store_claims(self, token: str, claims: dict[str, Any]) -> None:
+        """
+        Cache the verified claims of a token.
+
+        The entry never outlives the token itself.
+
+        Args:
+            token: Raw JWT token
+            claims: Decoded and verified token payload
+        """
+        if not self.enabled:
+            return
+
+        key = token_key(token)
+        ttl = self.ttl_seconds
+        exp = claims.get("exp")
+        if isinstance(exp, int | float):
+            ttl = min(ttl, exp - time.time())
+        if ttl <= 0:
+            return
+
+        existing = self._entries.get(key)
+        if existing is not None and existing.claims == claims:
+            return
+
+        self._evict(key)
+        self._entries[key] = CachedPrincipal(
+            claims=claims, expires_at=time.monotonic() + ttl
+        )
+        user_id = claims.get("sub")
+        if user_id:
+            self._keys_by_user.setdefault(str(user_id), set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def store_user(self, token: str, user: User) -> None:
+        """
+        Attach a snapshot of the loaded user to a cached token.
+
+        Args:
+            token: Raw JWT token whose claims are already cached
+            user: User loaded for this token
+        """
+        entry = self._entries.get(token_key(token))
+        if entry is None or str(entry.user_id) != str(user.id):
+            return
+
+        state = inspect(user)
+        entry.user_snapshot = {
+            attr.key: state.dict[attr.key]
+            for attr in state.mapper.column_attrs
+            if attr.key in state.dict
+        }
+
+    async def load_user(self, entry: CachedPrincipal, db: AsyncSession) -> User | None:
+        """
+        Rebuild a session-attached User from a cached snapshot.
+
+        The instance is merged without loading, so no query is issued and
+        changes made by the caller are flushed as usual.
+
+        Args:
+            entry: Cached principal with a user snapshot
+            db: Database session to attach the user to
+
+        Returns:
+            The user, or None if no snapshot is cached
+        """
+        if entry.user_snapshot is None:
+            return None
+
+        user = User(**entry.user_snapshot)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+    def _evict(self, key: str) -> None:
+        """Remove one entry and its user index reference."""
+        entry = self._entries.pop(key, None)
+        if entry is None or not entry.user_id:
+            return
+
+        keys = self._keys_by_user.get(str(entry.user_id))
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[str(entry.user_id)]
+
+    def evict_user(self, user_id: str) -> int:
+        """Evict every cached token of a user in this process."""
+        keys = self._keys_by_user.pop(str(user_id), set())
+        for key in keys:
+            self._entries.pop(key, None)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def evict_token(self, key: str) -> bool:
+        """Evict one cached token (by token key) in this process."""
+        if key not in self._entries:
+            return False
+        self._evict(key)
+        self.invalidations += 1
+        return True
+
+    async def invalidate_user(self, user_id: str) -> None:
+        """Evict a user's principals here and in every other worker."""
+        self.evict_user(str(user_id))
+        await self._publish(f"user:{user_id}")
+
+    async def invalidate_token(self, token: str) -> None:
+        """Evict a token's principal here and in every other worker."""
+        key = token_key(token)
+        self.evict_token(key)
+        await self._publish(f"token:{key}")
+
+    async def _publish(self, message: str) -> None:
+        """Broadcast an invalidation message."""
+        if not self.redis or not self.enabled:
+            return
+
+        try:
+            await self.redis.publish(self.channel, message)
+        except Exception as e:
+            logger.error(f"Error publishing principal invalidation: {e}")
+
+    def handle_message(self, message: str) -> None:
+        """Apply an invalidation message received from another worker."""
+        kind, _, value = message.partition(":")
+        if kind == "user":
+            self.evict_user(value)
+        elif kind == "token":
+            self.evict_token(value)
+        elif kind == "all":
+            self.clear()
+
+    async def start(self, redis_client: aioredis.Redis) -> None:
+        """Start listening for invalidation messages."""
+        self.redis = redis_client
+        if not self.enabled:
+            return
+
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen(redis_client))
+
+    async def stop(self) -> None:
+        """Stop the invalidation listener."""
+        if self._listener_task:
+            self._listener_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener_task
+            self._listener_task = None
+
+    async def _listen(self, redis_client: aioredis.Redis) -> None:
+        """Apply invalidation messages, resubscribing after errors."""
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Anything cached before (re)subscribing may have missed
+                # an invalidation
+                self.clear()
+
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message.get("data")
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    self.handle_message(str(data))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Principal invalidation listener error: {e}")
+                await asyncio.sleep(1)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
+    def clear(self) -> None:
+        """Drop every cached principal in this process."""
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache()
+
+
+def note_user_invalidation(session_info: dict, user_id: Any) -> None:
+    """
+    Note a changed user for eviction after the transaction commits.
+
+    Args:
+        session_info: ``Session.info`` of the writing session
+        user_id: ID of the changed user
+    """
+    session_info.setdefault(PENDING_USER_INVALIDATIONS, set()).add(str(user_id))
+
+
+# Invalidation tasks in flight (kept referenced until done)
+_invalidation_tasks: set[asyncio.Task] = set()
+
+
+async def _invalidate_committed_users(user_ids: set[str]) -> None:
+    for user_id in user_ids:
+        await principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session: Session) -> None:
+    """Evict the users a transaction changed once it has committed."""
+    user_ids = session.info.pop(PENDING_USER_INVALIDATIONS, None)
+    if not user_ids:
+        return
+
+    for user_id in user_ids:
+        principal_cache.evict_user(user_id)
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # Synchronous use (scripts, migrations); nobody is listening
+
+    task = loop.create_task(_invalidate_committed_users(user_ids))
+    _invalidation_tasks.add(task)
+    task.add_done_callback(_invalidation_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session: Session) -> None:
+    session.info.pop(PENDING_USER_INVALIDATIONS, None)
@@ -7,40 +7,17 @@ from typing import Any
 
 from fastapi import HTTPException, Request, status
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 
+# Password hashing is shared with the auth module so both use the configured
+# cost; async code should use app.auth.password_hasher instead.
+from app.auth.security import (  # noqa: F401
+    hash_password,
+    pwd_context,
+    verify_password,
+)
+from app.auth.token_verifier import token_verifier
 from app.core.config import settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    """
-    Hash a password using bcrypt.
-
-    Args:
-        password: Plain text password
-
-    Returns:
-        str: Hashed password
-    """
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """
-    Verify a password against a hash.
-
-    Args:
-        plain_password: Plain text password
-        hashed_password: Hashed password
-
-    Returns:
-        bool: True if password is correct
-    """
-    return pwd_context.verify(plain_password, hashed_password)
-
 
 def create_access_token(
     data: dict[str, Any], expires_delta: timedelta | None = None
@@ -117,9 +94,7 @@ def verify_token(token: str, token_type: str = "access") -> dict[str, Any]:
         HTTPException: If token is invalid or expired
     """
     try:
-        payload = jwt.decode(
-            token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
-        )
+        payload = token_verifier.decode(token)
 
         # Check token type
         if payload.get("type") != token_type:
@@ -1,20 +1,55 @@
 """
 Database connection and session management for DevPocket API.
+
+Each worker owns a single connection pool per database server: ``engine``
+for the primary and, when ``database_replica_url`` is set, ``read_engine``
+for a read replica. ORM sessions, background workers and the raw asyncpg
+queries of ``db_manager`` all draw from these pools, so a worker holds at
+most ``db_pool_size + db_max_overflow`` connections to each server. Checkout
+waits, timeouts and in-use/idle/overflow counts are exported as
+``db_pool_*`` metrics.
+
+Read-only endpoints (history, stats, search) take their session from
+``get_read_db``, which uses the replica when one is configured and the
+primary otherwise. With ``db_pgbouncer_mode`` the asyncpg driver neither
+caches prepared statements nor reuses their names, as PgBouncer in
+transaction pooling mode requires.
+
+Statement statistics and slow-query plans are collected by
+``query_insights`` when ``query_insights_enabled`` is set.
 """
 
-from collections.abc import AsyncGenerator
+import contextlib
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
 from typing import Any
+from uuid import uuid4
 
 import asyncpg
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import (
+    db_pool_acquire_duration,
+    db_pool_connections,
+    db_pool_timeouts,
+    db_queries,
+    db_query_duration,
+)
+from app.db.query_insights import query_insights
+
+# Statement kinds reported by the query metrics
+QUERY_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
 
 
 class Base(DeclarativeBase):
@@ -23,17 +58,117 @@ class Base(DeclarativeBase):
     pass
 
 
-# Create async engine
-engine = create_async_engine(
-    settings.database_url.replace("postgresql://", "postgresql+asyncpg://"),
-    echo=settings.app_debug,
-    pool_size=20,
-    max_overflow=0,
-    pool_pre_ping=True,
-    pool_recycle=300,
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool exporting checkout waits and connection counts."""
+
+    # Value of the ``pool`` metrics label
+    metrics_name = "primary"
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            db_pool_timeouts.inc(self.metrics_name)
+            raise
+        finally:
+            db_pool_acquire_duration.observe(
+                time.perf_counter() - start, self.metrics_name
+            )
+        self._record_usage()
+        return connection
+
+    def _do_return_conn(self, record: Any) -> None:
+        super()._do_return_conn(record)
+        self._record_usage()
+
+    def _record_usage(self) -> None:
+        db_pool_connections.set(self.checkedout(), self.metrics_name, "in_use")
+        db_pool_connections.set(self.checkedin(), self.metrics_name, "idle")
+        db_pool_connections.set(max(self.overflow(), 0), self.metrics_name, "overflow")
+
+
+def _start_query_timer(conn: Any, **_kw: Any) -> None:
+    """Record when a statement is sent, for the query metrics."""
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _record_query_metrics(
+    conn: Any,
+    statement: str,
+    parameters: Any = None,
+    executemany: bool = False,
+    **_kw: Any,
+) -> None:
+    """Count the statement and record its latency by operation."""
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    operation = statement.split(None, 1)[0].upper() if statement else "OTHER"
+    if operation not in QUERY_OPERATIONS:
+        operation = "OTHER"
+    db_query_duration.observe(elapsed, operation)
+    db_queries.inc(operation)
+    if query_insights.enabled:
+        query_insights.record(statement, parameters, elapsed, executemany)
+
+
+def _discard_query_timer(exception_context: Any) -> None:
+    """Drop the timer of a statement that failed."""
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+        db_queries.inc("ERROR")
+
+
+def create_database_engine(url: str, name: str = "primary") -> AsyncEngine:
+    """
+    Create an instrumented engine with the configured pool.
+
+    Args:
+        url: Database URL (``postgresql://`` or ``postgresql+asyncpg://``)
+        name: Pool name used as the ``pool`` metrics label
+
+    Returns:
+        Async engine
+    """
+    connect_args: dict[str, Any] = {}
+    if settings.db_pgbouncer_mode:
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    database_engine = create_async_engine(
+        url.replace("postgresql://", "postgresql+asyncpg://"),
+        echo=settings.app_debug,
+        poolclass=type(
+            f"{name.title()}Pool", (InstrumentedPool,), {"metrics_name": name}
+        ),
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=True,
+        pool_recycle=settings.db_pool_recycle,
+        connect_args=connect_args,
+    )
+
+    sync_engine = database_engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _start_query_timer, named=True)
+    event.listen(sync_engine, "after_cursor_execute", _record_query_metrics, named=True)
+    event.listen(sync_engine, "handle_error", _discard_query_timer)
+
+    return database_engine
+
+
+# Engines: the primary, and the read replica (the primary when none is set)
+engine = create_database_engine(settings.database_url)
+read_engine = (
+    create_database_engine(settings.database_replica_url, "replica")
+    if settings.database_replica_url
+    else engine
 )
 
-# Create async session factory
+# Create async session factories
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -41,56 +176,69 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
     autocommit=False,
 )
+ReadAsyncSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+    autocommit=False,
+)
 
 
 class DatabaseManager:
-    """Database connection manager."""
-
-    def __init__(self) -> None:
-        self._pool: asyncpg.Pool = None
+    """Raw asyncpg access on top of the shared connection pools."""
 
     async def connect(self) -> None:
-        """Create database connection pool."""
+        """Open a first connection to each database server."""
         try:
-            # asyncpg expects postgresql:// not postgresql+asyncpg://
-            db_url = settings.database_url.replace(
-                "postgresql+asyncpg://", "postgresql://"
+            for database_engine in self.engines():
+                async with database_engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+            logger.info(
+                "Database connection pool ready "
+                f"(size={settings.db_pool_size}, "
+                f"max_overflow={settings.db_max_overflow}, "
+                f"replica={read_engine is not engine}, "
+                f"pgbouncer={settings.db_pgbouncer_mode})"
             )
-            self._pool = await asyncpg.create_pool(
-                db_url,
-                min_size=10,
-                max_size=20,
-                max_queries=50000,
-                max_inactive_connection_lifetime=300,
-                setup=self._setup_connection,
-            )
-            logger.info("Database connection pool created successfully")
         except Exception as e:
-            logger.error(f"Failed to create database connection pool: {e}")
+            logger.error(f"Failed to connect to the database: {e}")
             raise
 
     async def disconnect(self) -> None:
-        """Close database connection pool."""
-        if self._pool:
-            await self._pool.close()
-            logger.info("Database connection pool closed")
-
-    async def _setup_connection(self, connection: asyncpg.Connection) -> None:
-        """Set up database connection with custom types and settings."""
-        # Set timezone
-        await connection.execute("SET timezone TO 'UTC'")
-
-        # Set JSON serialization
-        await connection.set_type_codec(
-            "json",
-            encoder=lambda x: x,
-            decoder=lambda x: x,
-            schema="pg_catalog",
-        )
-
-    async def execute_query(self, query: str, *args: Any) -> list:
+        """Close every pooled connection."""
+        for database_engine in self.engines():
+            await database_engine.dispose()
+        logger.info("Database connection pool closed")
+
+    @staticmethod
+    def engines() -> list[AsyncEngine]:
+        """Engines of the primary and (if configured) the read replica."""
+        return [engine] if read_engine is engine else [engine, read_engine]
+
+    @contextlib.asynccontextmanager
+    async def acquire(
+        self, read_only: bool = False
+    ) -> AsyncIterator[asyncpg.Connection]:
+        """
+        Borrow an asyncpg connection from the shared pool.
+
+        Args:
+            read_only: Use the read replica when one is configured
+
+        Yields:
+            asyncpg.Connection: Driver connection, returned to the pool on exit
+        """
+        database_engine = read_engine if read_only else engine
+        async with database_engine.connect() as connection:
+            raw_connection = await connection.get_raw_connection()
+            yield raw_connection.driver_connection
+
+    async def execute_query(
+        self, query: str, *args: Any, read_only: bool = False
+    ) -> list:
         """Execute a SELECT query and return results."""
-        async with self._pool.acquire() as connection:
+        async with self.acquire(read_only=read_only) as connection:
             try:
                 result = await connection.fetch(query, *args)
                 return [dict(record) for record in result]
@@ -100,7 +248,7 @@ class DatabaseManager:
 
     async def execute_command(self, query: str, *args: Any) -> str:
         """Execute an INSERT/UPDATE/DELETE command and return status."""
-        async with self._pool.acquire() as connection:
+        async with self.acquire() as connection:
             try:
                 result = await connection.execute(query, *args)
                 return str(result)
@@ -110,7 +258,7 @@ class DatabaseManager:
 
     async def execute_transaction(self, queries: list) -> bool:
         """Execute multiple queries in a transaction."""
-        async with self._pool.acquire() as connection, connection.transaction():
+        async with self.acquire() as connection, connection.transaction():
             try:
                 for query, args in queries:
                     await connection.execute(query, *args)
@@ -119,12 +267,20 @@ class DatabaseManager:
                 logger.error(f"Database transaction error: {e}")
                 raise
 
-    @property
-    def pool(self) -> asyncpg.Pool:
-        """Get the connection pool."""
-        if not self._pool:
-            raise RuntimeError("Database not connected. Call connect() first.")
-        return self._pool
+    def pool_stats(self) -> dict[str, dict[str, int]]:
+        """Get connection counts of each pool (queue pools only)."""
+        pools = [database_engine.pool for database_engine in self.engines()]
+        return {
+            getattr(pool, "metrics_name", "primary"): {
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": settings.db_max_overflow,
+            }
+            for pool in pools
+            if isinstance(pool, QueuePool)
+        }
 
 
 # Global database manager instance
@@ -149,14 +305,17 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
-async def get_db_pool() -> asyncpg.Pool:
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency to get database connection pool.
+    Dependency to get a session for read-only endpoints.
 
-    Returns:
-        asyncpg.Pool: Database connection pool
+    Uses the read replica when one is configured; nothing is committed.
+
+    Yields:
+        AsyncSession: Database session
     """
-    return db_manager.pool
+    async with ReadAsyncSessionLocal() as session:
+        yield session
 
 
 async def create_tables() -> None:
@@ -181,8 +340,6 @@ async def check_database_connection() -> bool:
         bool: True if connection is working
     """
     try:
-        from sqlalchemy import text
-
         async with AsyncSessionLocal() as session:
             await session.execute(text("SELECT 1"))
         return True
@@ -191,6 +348,25 @@ async def check_database_connection() -> bool:
         return False
 
 
+async def try_advisory_xact_lock(session: AsyncSession, lock_id: int) -> bool:
+    """
+    Try to take a transaction-level advisory lock without waiting.
+
+    The lock is released when the session's transaction ends.
+
+    Args:
+        session: Database session
+        lock_id: Application-wide lock identifier
+
+    Returns:
+        True if the lock was acquired, False if another session holds it
+    """
+    result = await session.execute(
+        text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": lock_id}
+    )
+    return bool(result.scalar())
+
+
 async def init_database() -> None:
     """Initialize database with required data."""
     try:
@@ -0,0 +1,229 @@
+"""
+Monthly range partition management for DevPocket API.
+
+Large append-only tables (currently ``commands``) are range-partitioned by
+``created_at`` with one partition per calendar month plus a ``DEFAULT``
+partition. Retention then becomes a matter of detaching and dropping whole
+partitions instead of deleting rows one by one.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import logger
+
+_RANGE_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass(frozen=True)
+class PartitionInfo:
+    """A single partition of a range-partitioned table."""
+
+    name: str
+    lower: datetime | None
+    upper: datetime | None
+
+    @property
+    def is_default(self) -> bool:
+        """Whether this is the catch-all DEFAULT partition."""
+        return self.lower is None and self.upper is None
+
+
+def month_start(value: datetime) -> datetime:
+    """Get the first instant of the month containing ``value`` (UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    value = value.astimezone(UTC)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Shift a month-start datetime by a number of months."""
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    """Get the conventional partition name for a month, e.g. commands_p202501."""
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def parse_partition_bound(bound: str) -> tuple[datetime | None, datetime | None]:
+    """Parse a ``pg_get_expr(relpartbound)`` range expression."""
+    match = _RANGE_BOUND_RE.search(bound)
+    if not match:
+        # DEFAULT partition
+        return None, None
+    lower, upper = (datetime.fromisoformat(v) for v in match.groups())
+    return lower, upper
+
+
+async def is_partitioned(session: AsyncSession, table: str) -> bool:
+    """Check whether a table is a partitioned parent table."""
+    result = await session.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :table AND pg_table_is_visible(c.oid))"
+        ),
+        {"table": table},
+    )
+    return bool(result.scalar())
+
+
+async def list_partitions(session: AsyncSession, table: str) -> list[PartitionInfo]:
+    """List the partitions of a table, oldest first, DEFAULT last."""
+    result = await session.execute(
+        text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :table AND pg_table_is_visible(parent.oid)"
+        ),
+        {"table": table},
+    )
+
+    partitions = [
+        PartitionInfo(name, *parse_partition_bound(bound))
+        for name, bound in result.all()
+    ]
+    return sorted(
+        partitions,
+        key=lambda p: (p.is_default, p.lower or datetime.min.replace(tzinfo=UTC)),
+    )
+
+
+async def ensure_monthly_partitions(
+    session: AsyncSession,
+    table: str,
+    months_ahead: int = 3,
+    now: datetime | None = None,
+    column: str = "created_at",
+) -> list[str]:
+    """
+    Create missing monthly partitions from the current month onwards.
+
+    Rows of a new month that already landed in the DEFAULT partition are
+    moved into the new partition before it is attached, since PostgreSQL
+    refuses to add a range the DEFAULT partition holds rows for.
+
+    Args:
+        session: Database session
+        table: Partitioned parent table
+        months_ahead: Number of future months to pre-create
+        now: Reference time (defaults to the current time)
+        column: Partition key column
+
+    Returns:
+        Names of the partitions that were created
+    """
+    current = month_start(now or datetime.now(UTC))
+    partitions = await list_partitions(session, table)
+    existing = {p.name for p in partitions}
+    default = next((p.name for p in partitions if p.is_default), None)
+    created: list[str] = []
+
+    for offset in range(months_ahead + 1):
+        lower = add_months(current, offset)
+        name = partition_name(table, lower)
+        if name in existing:
+            continue
+
+        upper = add_months(lower, 1)
+        bounds = f"FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        in_range = (
+            f"\"{column}\" >= '{lower.isoformat()}' "
+            f"AND \"{column}\" < '{upper.isoformat()}'"
+        )
+
+        stranded = (
+            default is not None
+            and (
+                await session.execute(
+                    text(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE {in_range})')
+                )
+            ).scalar()
+        )
+
+        if stranded:
+            await session.execute(
+                text(
+                    f'CREATE TABLE "{name}" '
+                    f'(LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+                )
+            )
+            await session.execute(
+                text(
+                    f'WITH moved AS (DELETE FROM "{default}" WHERE {in_range} '
+                    f'RETURNING *) INSERT INTO "{name}" SELECT * FROM moved'
+                )
+            )
+            await session.execute(
+                text(
+                    f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES {bounds}'
+                )
+            )
+            logger.info(f"Moved rows of {name} out of {default}")
+        else:
+            await session.execute(
+                text(
+                    f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+                    f"FOR VALUES {bounds}"
+                )
+            )
+        created.append(name)
+
+    if created:
+        logger.info(f"Created partitions for {table}: {', '.join(created)}")
+    return created
+
+
+async def drop_partitions_before(
+    session: AsyncSession,
+    table: str,
+    cutoff: datetime,
+    detach_only: bool = False,
+) -> list[str]:
+    """
+    Detach (and by default drop) partitions entirely older than the cutoff.
+
+    A partition is only removed when its upper bound is at or before the
+    cutoff, so rows newer than the cutoff are never touched. Rows in the
+    boundary partition and in the DEFAULT partition are left for a
+    row-level cleanup.
+
+    Args:
+        session: Database session
+        table: Partitioned parent table
+        cutoff: Retention cutoff
+        detach_only: Keep detached partitions as standalone tables for archiving
+
+    Returns:
+        Names of the partitions that were detached or dropped
+    """
+    if cutoff.tzinfo is None:
+        cutoff = cutoff.replace(tzinfo=UTC)
+
+    removed: list[str] = []
+    for partition in await list_partitions(session, table):
+        if partition.is_default or partition.upper is None:
+            continue
+        if partition.upper > cutoff:
+            continue
+
+        await session.execute(
+            text(f'ALTER TABLE "{table}" DETACH PARTITION "{partition.name}"')
+        )
+        if not detach_only:
+            await session.execute(text(f'DROP TABLE "{partition.name}"'))
+        removed.append(partition.name)
+
+    if removed:
+        action = "Detached" if detach_only else "Dropped"
+        logger.info(f"{action} partitions of {table}: {', '.join(removed)}")
+    return removed
@@ -0,0 +1,355 @@
+"""
+Per-statement query statistics and slow-query plans.
+
+When ``query_insights_enabled`` is set, every statement sent through the
+engines is reduced to a fingerprint (the SQL text with parameters, literals
+and repeated value lists collapsed) and counted with a latency histogram.
+Statements slower than ``slow_query_threshold_ms`` are added to a bounded
+slow-query log and counted in ``db_slow_queries_total``.
+
+A sampled share of slow SELECTs is queued and re-run by a background task
+as ``EXPLAIN (ANALYZE, BUFFERS)`` with the original parameters, inside a
+read-only transaction that is always rolled back and under a statement
+timeout. Locking reads (``FOR UPDATE`` / ``FOR SHARE`` ...) are never
+replayed: they are usually slow because they waited on a lock, and the
+replay would wait on (or take) the same lock. The
+request that ran the slow query never waits for the plan; when the queue
+is full the sample is dropped. The latest plan of each fingerprint is kept.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import random
+import re
+from collections import deque
+from collections.abc import Callable, Sequence
+from contextlib import AbstractAsyncContextManager
+from datetime import UTC, datetime
+from typing import Any
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import Histogram, db_slow_queries
+
+# Distinct fingerprints tracked; later ones are counted under OTHER_FINGERPRINT
+MAX_FINGERPRINTS = 1000
+OTHER_FINGERPRINT = "(other)"
+
+# Slow statements waiting for EXPLAIN; samples beyond this are dropped
+EXPLAIN_QUEUE_SIZE = 32
+
+# Raw statement text -> fingerprint entries cached before the cache is reset
+FINGERPRINT_CACHE_SIZE = 4096
+
+# Statements re-run with EXPLAIN ANALYZE; they must not write
+EXPLAINABLE_OPERATIONS = frozenset({"SELECT"})
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|\?")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_GROUPS = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+_LOCKING_CLAUSE = re.compile(
+    r"\bFOR\s+(?:UPDATE|NO\s+KEY\s+UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE
+)
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a statement so executions with different values match.
+
+    Args:
+        statement: SQL text as sent to the driver
+
+    Returns:
+        Statement with placeholders and literals replaced by ``?`` and
+        value lists collapsed to ``(...)``
+    """
+    text = _STRING_LITERAL.sub("?", statement)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _VALUE_LIST.sub("(...)", text)
+    text = _REPEATED_GROUPS.sub(r"\1", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def fingerprint_id(fingerprint_text: str) -> str:
+    """Short stable identifier of a fingerprint."""
+    return hashlib.sha1(fingerprint_text.encode()).hexdigest()[:12]
+
+
+def _operation(statement: str) -> str:
+    return statement.split(None, 1)[0].upper() if statement else "OTHER"
+
+
+def is_explainable(statement: str) -> bool:
+    """Whether a statement may be re-run under EXPLAIN ANALYZE."""
+    if _operation(statement) not in EXPLAINABLE_OPERATIONS:
+        return False
+    return _LOCKING_CLAUSE.search(statement) is None
+
+
+class QueryInsights:
+    """Statement statistics, slow-query log and sampled query plans."""
+
+    def __init__(
+        self,
+        enabled: bool | None = None,
+        threshold_ms: float | None = None,
+        sample_rate: float | None = None,
+        log_size: int | None = None,
+    ):
+        self.enabled = settings.query_insights_enabled if enabled is None else enabled
+        self.threshold_ms = (
+            settings.slow_query_threshold_ms if threshold_ms is None else threshold_ms
+        )
+        self.sample_rate = (
+            settings.slow_query_explain_sample_rate
+            if sample_rate is None
+            else sample_rate
+        )
+
+        # fingerprint -> [calls, total seconds, max seconds, slow calls]
+        self._statements: dict[str, list[Any]] = {}
+        self._latency = Histogram(
+            "db_statement_duration_seconds", "Statement latency", ("fingerprint",)
+        )
+        self._fingerprints: dict[str, str] = {}
+        self._slow: deque[dict[str, Any]] = deque(
+            maxlen=log_size or settings.slow_query_log_size
+        )
+        self._plans: dict[str, dict[str, Any]] = {}
+        self.explains_dropped = 0
+
+        self._queue: asyncio.Queue | None = None
+        self._explain_task: asyncio.Task | None = None
+        self._acquire: (
+            Callable[[], AbstractAsyncContextManager[asyncpg.Connection]] | None
+        ) = None
+
+    def _fingerprint(self, statement: str) -> str:
+        cached = self._fingerprints.get(statement)
+        if cached is None:
+            if len(self._fingerprints) >= FINGERPRINT_CACHE_SIZE:
+                self._fingerprints.clear()
+            cached = self._fingerprints[statement] = fingerprint(statement)
+        return cached
+
+    def record(
+        self,
+        statement: str,
+        parameters: Any,
+        seconds: float,
+        executemany: bool = False,
+    ) -> None:
+        """
+        Record an executed statement.
+
+        Args:
+            statement: SQL text as sent to the driver
+            parameters: Driver parameters of the statement
+            seconds: Execution time
+            executemany: Whether the statement ran for several parameter sets
+        """
+        operation = _operation(statement)
+        if operation == "EXPLAIN":
+            return
+
+        key = self._fingerprint(statement)
+        stats = self._statements.get(key)
+        if stats is None:
+            if len(self._statements) >= MAX_FINGERPRINTS:
+                key = OTHER_FINGERPRINT
+                stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = [0, 0.0, 0.0, 0]
+        stats[0] += 1
+        stats[1] += seconds
+        if seconds > stats[2]:
+            stats[2] = seconds
+        self._latency.observe(seconds, key)
+
+        duration_ms = seconds * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        stats[3] += 1
+        db_slow_queries.inc(operation)
+        self._slow.append(
+            {
+                "fingerprint_id": fingerprint_id(key),
+                "fingerprint": key,
+                "duration_ms": round(duration_ms, 3),
+                "captured_at": datetime.now(UTC),
+            }
+        )
+
+        if (
+            self._queue is not None
+            and not executemany
+            and key != OTHER_FINGERPRINT
+            and random.random() < self.sample_rate
+            and is_explainable(statement)
+        ):
+            try:
+                self._queue.put_nowait(
+                    (key, statement, tuple(parameters or ()), duration_ms)
+                )
+            except asyncio.QueueFull:
+                self.explains_dropped += 1
+
+    async def explain(
+        self, statement: str, parameters: Sequence[Any] = ()
+    ) -> dict[str, Any]:
+        """
+        Run a read-only statement under EXPLAIN (ANALYZE, BUFFERS).
+
+        The statement runs in a read-only transaction that is rolled back.
+
+        Args:
+            statement: SQL text with ``$n`` placeholders
+            parameters: Values of the placeholders
+
+        Returns:
+            The JSON plan (``Plan``, ``Planning Time``, ``Execution Time``)
+        """
+        if self._acquire is None:
+            raise RuntimeError("Query insights have not been started")
+        if not is_explainable(statement):
+            raise ValueError("Only non-locking SELECT statements are explained")
+
+        timeout_ms = int(settings.slow_query_explain_timeout_seconds * 1000)
+        async with self._acquire() as connection:
+            transaction = connection.transaction(readonly=True)
+            await transaction.start()
+            try:
+                await connection.execute(f"SET LOCAL statement_timeout = {timeout_ms}")
+                result = await connection.fetchval(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}",
+                    *parameters,
+                )
+            finally:
+                await transaction.rollback()
+
+        plan = json.loads(result) if isinstance(result, str) else result
+        return plan[0]
+
+    async def _explain_samples(self, queue: asyncio.Queue) -> None:
+        """Capture plans of queued slow statements, one at a time."""
+        while True:
+            key, statement, parameters, duration_ms = await queue.get()
+            try:
+                plan = await self.explain(statement, parameters)
+                self._plans[key] = {
+                    "duration_ms": round(duration_ms, 3),
+                    "captured_at": datetime.now(UTC),
+                    "plan": plan,
+                }
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Slow query EXPLAIN failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def start(
+        self, acquire: Callable[[], AbstractAsyncContextManager[asyncpg.Connection]]
+    ) -> None:
+        """
+        Start capturing plans of sampled slow queries.
+
+        Args:
+            acquire: Returns a context manager lending a driver connection
+        """
+        self._acquire = acquire
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+        if self._explain_task is None or self._explain_task.done():
+            self._explain_task = asyncio.create_task(self._explain_samples(self._queue))
+
+    async def stop(self) -> None:
+        """Stop capturing plans; queued samples are discarded."""
+        if self._explain_task:
+            self._explain_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._explain_task
+            self._explain_task = None
+        self._queue = None
+
+    async def drain(self) -> None:
+        """Wait until every queued sample has been explained."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def snapshot(self, limit: int = 50, order_by: str = "total") -> dict[str, Any]:
+        """
+        Get statement statistics, recent slow queries and captured plans.
+
+        Args:
+            limit: Number of statements and slow queries returned
+            order_by: Statement ordering: ``total``, ``mean``, ``max``,
+                ``calls`` or ``slow``
+
+        Returns:
+            Settings, statements (most expensive first) and slow queries
+            (most recent first)
+        """
+        statements = []
+        for key, (calls, total, longest, slow_calls) in self._statements.items():
+            plan = self._plans.get(key)
+            statements.append(
+                {
+                    "fingerprint_id": fingerprint_id(key),
+                    "fingerprint": key,
+                    "operation": _operation(key),
+                    "calls": calls,
+                    "slow_calls": slow_calls,
+                    "total_ms": round(total * 1000, 3),
+                    "mean_ms": round(total * 1000 / calls, 3),
+                    "max_ms": round(longest * 1000, 3),
+                    "p50_ms": self._quantile_ms(0.5, key),
+                    "p95_ms": self._quantile_ms(0.95, key),
+                    "p99_ms": self._quantile_ms(0.99, key),
+                    "plan": plan,
+                }
+            )
+
+        sort_keys = {
+            "total": "total_ms",
+            "mean": "mean_ms",
+            "max": "max_ms",
+            "calls": "calls",
+            "slow": "slow_calls",
+        }
+        sort_key = sort_keys.get(order_by, "total_ms")
+        statements.sort(key=lambda s: s[sort_key], reverse=True)
+
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "sample_rate": self.sample_rate,
+            "explains_dropped": self.explains_dropped,
+            "statements": statements[:limit],
+            "slow_queries": list(reversed(self._slow))[:limit],
+        }
+
+    def _quantile_ms(self, q: float, key: str) -> float | None:
+        value = self._latency.quantile(q, key)
+        return None if value is None else round(value * 1000, 3)
+
+    def reset(self) -> None:
+        """Drop all statistics, slow queries and plans."""
+        self._statements.clear()
+        self._latency.clear()
+        self._slow.clear()
+        self._plans.clear()
+        self.explains_dropped = 0
+
+
+# Global query insights instance
+query_insights = QueryInsights()
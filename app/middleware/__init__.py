@@ -7,11 +7,13 @@ security headers, and other cross-cutting concerns.
 
 from .auth import AuthenticationMiddleware
 from .cors import setup_cors
+from .metrics import MetricsMiddleware
 from .rate_limit import RateLimitMiddleware
 from .security import SecurityHeadersMiddleware
 
 __all__ = [
     "AuthenticationMiddleware",
+    "MetricsMiddleware",
     "RateLimitMiddleware",
     "SecurityHeadersMiddleware",
     "setup_cors",
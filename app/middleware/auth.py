@@ -5,17 +5,18 @@ Provides request-level authentication processing, user context injection,
 and authentication logging for protected routes.
 """
 
-from collections.abc import Callable
+import logging
 from typing import Any
 
-from fastapi import HTTPException, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.auth.security import is_token_blacklisted_sync, verify_token
+from app.auth.security import is_token_blacklisted, verify_token
 from app.core.logging import logger
+from app.core.principal_cache import principal_cache
+from app.middleware.context import RequestContext, get_request_context
 
 
-class AuthenticationMiddleware(BaseHTTPMiddleware):
+class AuthenticationMiddleware:
     """
     Authentication middleware for processing JWT tokens.
 
@@ -23,167 +24,141 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
     1. Extracts JWT tokens from requests
     2. Validates token format and signature
     3. Checks token blacklist status
-    4. Adds user context to request state
-    5. Logs authentication events
+    4. Adds user context to the shared request context and request state
+    5. Logs authentication failures and error responses
+
+    It is a plain ASGI middleware and ignores WebSocket scopes, which
+    authenticate in the WebSocket router.
     """
 
-    def __init__(self, app: Any, skip_paths: list | None = None) -> None:
+    def __init__(self, app: ASGIApp, skip_paths: list | None = None) -> None:
         """
         Initialize authentication middleware.
 
         Args:
-            app: FastAPI application instance
+            app: ASGI application to wrap
             skip_paths: List of paths to skip authentication for
         """
-        super().__init__(app)
+        self.app = app
 
         # Default paths that don't require authentication
-        self.skip_paths = skip_paths or [
-            "/",
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-            "/health",
-            "/api/auth/login",
-            "/api/auth/register",
-            "/api/auth/forgot-password",
-            "/api/auth/reset-password",
-        ]
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        self.skip_paths = set(
+            skip_paths
+            or [
+                "/",
+                "/docs",
+                "/redoc",
+                "/openapi.json",
+                "/health",
+                "/metrics",
+                "/api/auth/login",
+                "/api/auth/register",
+                "/api/auth/forgot-password",
+                "/api/auth/reset-password",
+            ]
+        )
+        self.skip_prefixes = ("/static/", "/assets/", "/_health")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request through authentication middleware.
 
         Args:
-            request: FastAPI request object
-            call_next: Next middleware/handler in chain
-
-        Returns:
-            HTTP response
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        # Skip authentication for certain paths
-        if self._should_skip_auth(request):
-            response: Response = await call_next(request)
-            return response
-
-        # Extract token from request
-        token = self._extract_token(request)
-
-        if token:
-            try:
-                # Verify token
-                payload = await self._verify_token(token)
-
-                if payload:
-                    # Add user context to request state
-                    request.state.user_id = payload.get("sub")
-                    request.state.user_email = payload.get("email")
-                    request.state.subscription_tier = payload.get("subscription_tier")
-                    request.state.token_payload = payload
-                    request.state.is_authenticated = True
-
-                    logger.debug(
-                        f"User authenticated via middleware: {payload.get('sub')}"
-                    )
-                else:
-                    request.state.is_authenticated = False
-                    logger.debug("Invalid token in authentication middleware")
-
-            except Exception as e:
-                logger.warning(f"Authentication middleware error: {e}")
-                request.state.is_authenticated = False
-        else:
-            request.state.is_authenticated = False
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Add request timing for monitoring
-        import time
+        context = get_request_context(scope)
 
-        start_time = time.time()
+        if not self._should_skip_auth(context.path):
+            await self._authenticate(context)
+
+        # Mirror the context on request.state for existing consumers
+        state = scope["state"]
+        state["is_authenticated"] = context.is_authenticated
+        if context.is_authenticated:
+            state["user_id"] = context.user_id
+            state["user_email"] = context.user_email
+            state["subscription_tier"] = context.subscription_tier
+            state["token_payload"] = context.token_payload
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
         try:
-            response = await call_next(request)
-
-            # Log successful requests with authentication info
-            process_time = time.time() - start_time
-            self._log_request(request, response, process_time)
-
-            return response
-
-        except HTTPException as e:
-            # Log authentication-related HTTP exceptions
-            if e.status_code in (401, 403):
-                logger.warning(
-                    f"Authentication failed for {request.url.path}: {e.detail}",
-                    extra={
-                        "status_code": e.status_code,
-                        "path": str(request.url.path),
-                        "method": request.method,
-                        "client_ip": self._get_client_ip(request),
-                        "user_agent": request.headers.get("user-agent", "unknown"),
-                    },
-                )
-            raise
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._log_request(context, status_code)
+
+    async def _authenticate(self, context: RequestContext) -> None:
+        """Verify the request token and record the principal on the context."""
+        token = self._extract_token(context)
+        if not token:
+            return
+
+        try:
+            payload = await self._verify_token(token)
         except Exception as e:
-            # Log unexpected errors
-            logger.error(
-                f"Unexpected error in authentication middleware: {e}",
-                extra={
-                    "path": str(request.url.path),
-                    "method": request.method,
-                    "client_ip": self._get_client_ip(request),
-                },
-            )
-            raise
-
-    def _should_skip_auth(self, request: Request) -> bool:
+            logger.warning("Authentication middleware error: %s", e)
+            return
+
+        if not payload:
+            logger.debug("Invalid token in authentication middleware")
+            return
+
+        context.token = token
+        context.token_payload = payload
+        context.user_id = payload.get("sub")
+        context.user_email = payload.get("email")
+        context.subscription_tier = payload.get("subscription_tier")
+        context.is_authenticated = True
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("User authenticated via middleware: %s", context.user_id)
+
+    def _should_skip_auth(self, path: str) -> bool:
         """
-        Check if authentication should be skipped for this request.
+        Check if authentication should be skipped for this path.
 
         Args:
-            request: FastAPI request object
+            path: Request path
 
         Returns:
             True if authentication should be skipped
         """
-        path = request.url.path
-
-        # Check exact matches
-        if path in self.skip_paths:
-            return True
+        return path in self.skip_paths or path.startswith(self.skip_prefixes)
 
-        # Check prefix matches for certain paths
-        skip_prefixes = ["/static/", "/assets/", "/_health"]
-        if any(path.startswith(prefix) for prefix in skip_prefixes):
-            return True
-
-        return False
-
-    def _extract_token(self, request: Request) -> str | None:
+    def _extract_token(self, context: RequestContext) -> str | None:
         """
         Extract JWT token from request.
 
         Args:
-            request: FastAPI request object
+            context: Shared request context
 
         Returns:
             JWT token if found, None otherwise
         """
         # Try Authorization header first
-        auth_header = request.headers.get("Authorization")
+        auth_header = context.headers.get("authorization")
         if auth_header and auth_header.startswith("Bearer "):
             return auth_header.split(" ", 1)[1]
 
         # Try query parameter (for WebSocket upgrades)
-        token_param = request.query_params.get("token")
+        token_param = context.query_param("token")
         if token_param:
             return token_param
 
         # Try cookie
-        token_cookie = request.cookies.get("access_token")
-        if token_cookie:
-            return token_cookie
-
-        return None
+        return context.cookies.get("access_token") or None
 
     async def _verify_token(self, token: str) -> dict | None:
         """
@@ -196,76 +171,57 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
             Token payload if valid, None otherwise
         """
         try:
-            # Check if token is blacklisted (sync version for middleware)
-            if is_token_blacklisted_sync(token):
+            # Claims verified by an earlier request are reused as-is
+            principal = principal_cache.get(token)
+            if principal is not None:
+                return principal.claims
+
+            if await is_token_blacklisted(token):
                 logger.warning("Blacklisted token used in middleware")
                 return None
 
-            # Verify and decode token
+            # Verify and decode token, then share the result with the
+            # get_current_user dependency for this request
             payload = verify_token(token)
+            if payload:
+                principal_cache.store_claims(token, payload)
             return payload
 
         except Exception as e:
-            logger.debug(f"Token verification failed in middleware: {e}")
+            logger.debug("Token verification failed in middleware: %s", e)
             return None
 
-    def _get_client_ip(self, request: Request) -> str:
-        """
-        Get client IP address from request.
-
-        Args:
-            request: FastAPI request object
-
-        Returns:
-            Client IP address
-        """
-        # Check for forwarded IP headers (for proxy/load balancer scenarios)
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip
-
-        # Fallback to direct client IP
-        return request.client.host if request.client else "unknown"
-
-    def _log_request(
-        self, request: Request, response: Response, process_time: float
-    ) -> None:
+    def _log_request(self, context: RequestContext, status_code: int) -> None:
         """
         Log request details for monitoring and debugging.
 
+        Error responses are always logged; successful requests only when
+        debug logging is enabled, so the common path builds no log record.
+
         Args:
-            request: FastAPI request object
-            response: FastAPI response object
-            process_time: Request processing time in seconds
+            context: Shared request context
+            status_code: Response status code
         """
-        # Only log detailed info for authenticated requests or errors
-        if (
-            getattr(request.state, "is_authenticated", False)
-            or response.status_code >= 400
-        ):
-            log_data = {
-                "method": request.method,
-                "path": str(request.url.path),
-                "status_code": response.status_code,
-                "process_time": round(process_time, 4),
-                "client_ip": self._get_client_ip(request),
-                "user_agent": request.headers.get("user-agent", "unknown")[
-                    :200
-                ],  # Truncate long user agents
-                "is_authenticated": getattr(request.state, "is_authenticated", False),
-            }
-
-            if getattr(request.state, "user_id", None):
-                log_data["user_id"] = request.state.user_id
-                log_data["subscription_tier"] = getattr(
-                    request.state, "subscription_tier", "unknown"
-                )
-
-            if response.status_code >= 400:
-                logger.warning("Request completed with error", extra=log_data)
-            else:
-                logger.info("Request completed successfully", extra=log_data)
+        if status_code < 400 and not logger.isEnabledFor(logging.DEBUG):
+            return
+
+        log_data: dict[str, Any] = {
+            "method": context.method,
+            "path": context.path,
+            "status_code": status_code,
+            "process_time": round(context.elapsed, 4),
+            "client_ip": context.client_ip,
+            "user_agent": context.user_agent[:200],  # Truncate long user agents
+            "is_authenticated": context.is_authenticated,
+        }
+
+        if context.user_id:
+            log_data["user_id"] = context.user_id
+            log_data["subscription_tier"] = context.subscription_tier or "unknown"
+
+        if status_code in (401, 403):
+            logger.warning("Authentication failed for %s", context.path, extra=log_data)
+        elif status_code >= 400:
+            logger.warning("Request completed with error", extra=log_data)
+        else:
+            logger.debug("Request completed successfully", extra=log_data)
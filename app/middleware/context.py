@@ -0,0 +1,109 @@
+"""
+Per-request context shared by the DevPocket API middleware.
+
+The middleware stack is written as plain ASGI callables. Instead of each
+layer building its own Request object and re-parsing headers, the first
+layer to see a request creates one RequestContext, stores it in the scope
+state and every later layer (and route, via ``request.state.context``)
+reuses it.
+"""
+
+import time
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from typing import Any
+from urllib.parse import parse_qs
+
+from starlette.types import Scope
+
+
+@dataclass
+class RequestContext:
+    """Request facts computed once and shared across middleware."""
+
+    path: str
+    method: str
+    headers: dict[str, str]
+    query_string: bytes
+    client_host: str | None
+    start_time: float = field(default_factory=time.perf_counter)
+
+    # Filled in by AuthenticationMiddleware
+    token: str | None = None
+    token_payload: dict[str, Any] | None = None
+    user_id: str | None = None
+    user_email: str | None = None
+    subscription_tier: str | None = None
+    is_authenticated: bool = False
+
+    _client_ip: str | None = field(default=None, repr=False)
+    _cookies: dict[str, str] | None = field(default=None, repr=False)
+
+    @property
+    def client_ip(self) -> str:
+        """Client IP address, honouring proxy headers."""
+        if self._client_ip is None:
+            forwarded_for = self.headers.get("x-forwarded-for")
+            if forwarded_for:
+                self._client_ip = forwarded_for.split(",")[0].strip()
+            else:
+                self._client_ip = (
+                    self.headers.get("x-real-ip") or self.client_host or "unknown"
+                )
+        return self._client_ip
+
+    @property
+    def user_agent(self) -> str:
+        return self.headers.get("user-agent", "unknown")
+
+    @property
+    def cookies(self) -> dict[str, str]:
+        """Request cookies, parsed on first use."""
+        if self._cookies is None:
+            cookie = SimpleCookie()
+            cookie.load(self.headers.get("cookie", ""))
+            self._cookies = {key: morsel.value for key, morsel in cookie.items()}
+        return self._cookies
+
+    def query_param(self, name: str) -> str | None:
+        """Get a single query parameter value."""
+        if not self.query_string:
+            return None
+        values = parse_qs(self.query_string.decode("latin-1")).get(name)
+        return values[0] if values else None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the context was created."""
+        return time.perf_counter() - self.start_time
+
+
+def get_request_context(scope: Scope) -> RequestContext:
+    """
+    Get the request context for an HTTP scope, creating it on first use.
+
+    The context lives in the scope state, so it is also reachable as
+    ``request.state.context`` from routes and dependencies.
+
+    Args:
+        scope: ASGI HTTP scope
+
+    Returns:
+        The shared request context
+    """
+    state = scope.setdefault("state", {})
+    context: RequestContext | None = state.get("context")
+    if context is None:
+        client = scope.get("client")
+        context = RequestContext(
+            path=scope["path"],
+            method=scope["method"],
+            headers={
+                name.decode("latin-1"): value.decode("latin-1")
+                for name, value in scope["headers"]
+            },
+            query_string=scope.get("query_string", b""),
+            client_host=client[0] if client else None,
+        )
+        state["context"] = context
+    return context
@@ -237,4 +237,4 @@ def setup_cors_for_environment(app: FastAPI, environment: str = "development") -
 
     app.add_middleware(CORSMiddleware, **config)
 
-    logger.info(f"CORS configured for {environment} environment")
+    logger.info("CORS configured for %s environment", environment)
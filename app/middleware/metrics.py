@@ -0,0 +1,119 @@
+"""
+Metrics middleware for DevPocket API.
+
+Records request counts and latency per route template (``/api/ssh/{id}``
+rather than the concrete path, which keeps label cardinality bounded) and
+counts WebSocket frames per route.
+"""
+
+import time
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    http_request_duration,
+    http_requests,
+    websocket_connections,
+    websocket_frames,
+)
+
+# Route label for requests that matched no route
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Request metrics middleware.
+
+    Should be the outermost middleware so the recorded latency covers the
+    whole stack.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize metrics middleware.
+
+        Args:
+            app: ASGI application to wrap
+        """
+        self.app = app
+        self._route_templates: dict[Any, str] | None = None
+
+    def _route_template(self, scope: Scope) -> str:
+        """Resolve the route template of the endpoint that handled a request."""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+
+        if self._route_templates is None:
+            # Routes are final once the app serves requests; build the map once
+            router = scope.get("router")
+            routes = getattr(router, "routes", [])
+            self._route_templates = {
+                route.endpoint: route.path
+                for route in routes
+                if getattr(route, "endpoint", None) is not None
+            }
+
+        return self._route_templates.get(endpoint, UNMATCHED_ROUTE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Record metrics for an HTTP request or WebSocket connection.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] == "websocket":
+            await self._websocket(scope, receive, send)
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = self._route_template(scope)
+            http_request_duration.observe(
+                time.perf_counter() - start, scope["method"], route
+            )
+            http_requests.inc(scope["method"], route, status_code)
+
+    async def _websocket(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Count frames in both directions on a WebSocket connection."""
+        # The route is known once the router has dispatched the connection
+        route = UNMATCHED_ROUTE
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "websocket.receive":
+                websocket_frames.inc(route, "in")
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal route
+            if message["type"] == "websocket.send":
+                websocket_frames.inc(route, "out")
+            elif message["type"] == "websocket.accept":
+                route = self._route_template(scope)
+                websocket_connections.inc(route)
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            if route != UNMATCHED_ROUTE:
+                websocket_connections.dec(route)
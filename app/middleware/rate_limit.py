@@ -6,26 +6,88 @@ to prevent abuse and ensure fair usage of the API.
 """
 
 import time
-from collections import defaultdict, deque
-from typing import Any, ClassVar
+from collections import OrderedDict
+from typing import ClassVar
 
-from fastapi import HTTPException, Request, Response, status
-from starlette.middleware.base import BaseHTTPMiddleware
+import redis.asyncio as aioredis
+from fastapi import Response, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.config import settings
 from app.core.logging import logger
+from app.middleware.context import get_request_context
+
+# A rate limit check: (key, window in seconds, limit)
+RateLimitCheck = tuple[str, int, int]
+
+# Result of one check: (is_allowed, current_count, remaining_requests)
+RateLimitResult = tuple[bool, int, int]
 
 
 class RateLimitStore:
     """
-    In-memory rate limit storage.
-    In production, this should be replaced with Redis for distributed rate limiting.
+    In-memory sliding-window-counter rate limit storage.
+
+    Each key keeps the counts of the current and previous fixed window and
+    estimates the sliding window as ``previous * overlap + current``, so a
+    request costs O(1) time and every key O(1) memory. Keys live in a
+    bounded LRU, which replaces periodic cleanup sweeps. Limits are per
+    process; use RedisRateLimitStore when running several workers.
     """
 
-    def __init__(self) -> None:
-        # Store format: {key: deque([(timestamp, count), ...])}
-        self._store: dict[str, deque[tuple[float, int]]] = defaultdict(deque)
-        self._cleanup_interval = 60  # Clean up old entries every 60 seconds
-        self._last_cleanup = time.time()
+    def __init__(self, max_keys: int | None = None) -> None:
+        # Store format: {key: [window_index, current_count, previous_count]}
+        self._store: OrderedDict[str, list[int]] = OrderedDict()
+        self.max_keys = max_keys or settings.rate_limit_max_keys
+
+    def _estimate(self, key: str, window: int, now: float) -> tuple[list[int], int]:
+        """Roll the key's windows forward and estimate the sliding count."""
+        index = int(now // window)
+        entry = self._store.get(key)
+        if entry is None:
+            entry = [index, 0, 0]
+        elif entry[0] != index:
+            entry[2] = entry[1] if entry[0] == index - 1 else 0
+            entry[1] = 0
+            entry[0] = index
+
+        weight = 1 - (now - index * window) / window
+        return entry, int(entry[2] * weight) + entry[1]
+
+    def add_requests(self, checks: list[RateLimitCheck]) -> list[RateLimitResult]:
+        """
+        Record a request against several limits at once.
+
+        The request is counted against every key only if all limits allow
+        it, so a rejected request never consumes quota.
+
+        Args:
+            checks: List of (key, window, limit) tuples
+
+        Returns:
+            One (is_allowed, current_count, remaining_requests) per check
+        """
+        now = time.time()
+        estimates = [
+            (key, limit, *self._estimate(key, window, now))
+            for key, window, limit in checks
+        ]
+        allowed = all(count < limit for _, limit, _, count in estimates)
+
+        results = []
+        for key, limit, entry, count in estimates:
+            if allowed:
+                entry[1] += 1
+                count += 1
+            self._store[key] = entry
+            self._store.move_to_end(key)
+            results.append((allowed, count, max(limit - count, 0)))
+
+        while len(self._store) > self.max_keys:
+            self._store.popitem(last=False)
+
+        return results
 
     def add_request(
         self, key: str, window: int = 60, limit: int = 100
@@ -41,57 +103,135 @@ class RateLimitStore:
         Returns:
             Tuple of (is_allowed, current_count, remaining_requests)
         """
-        now = time.time()
+        allowed, count, remaining = self.add_requests([(key, window, limit)])[0]
+        if not allowed:
+            return False, count, 0
+        return True, count, remaining
+
+    def reset(self) -> None:
+        """Forget all counters."""
+        self._store.clear()
+
+
+# Sliding window counter over all checks in one atomic call. A request is
+# counted against every key only if all limits allow it. KEYS holds the
+# current and previous window key of each check, in that order, and ARGV
+# the time of the request followed by each check's window and limit, so the
+# script only touches keys it was passed. Windows follow the caller's clock,
+# as in RateLimitStore.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local allowed = 1
+local state = {}
+
+for i = 1, #KEYS / 2 do
+    local current_key = KEYS[i * 2 - 1]
+    local window = tonumber(ARGV[i * 2])
+    local limit = tonumber(ARGV[i * 2 + 1])
+    local current = tonumber(redis.call('GET', current_key) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[i * 2]) or '0')
+    local weight = 1 - (now % window) / window
+    local count = math.floor(previous * weight) + current
+    if count >= limit then
+        allowed = 0
+    end
+    state[i] = {current_key, window, limit, count}
+end
+
+local result = {allowed}
+for i, entry in ipairs(state) do
+    local count = entry[4]
+    if allowed == 1 then
+        redis.call('INCR', entry[1])
+        redis.call('EXPIRE', entry[1], entry[2] * 2)
+        count = count + 1
+    end
+    result[#result + 1] = count
+end
+return result
+"""
 
-        # Clean up old entries periodically
-        self._cleanup_if_needed(now)
 
-        # Get request queue for this key
-        requests = self._store[key]
+class RedisRateLimitStore:
+    """
+    Redis sliding-window-counter rate limit storage.
 
-        # Remove old requests outside the window
-        while requests and requests[0][0] < now - window:
-            requests.popleft()
+    All checks for a request (e.g. IP and user) run in one Lua script call,
+    so limits are shared by every worker and node at the cost of a single
+    round trip.
+    """
 
-        # Count current requests in window
-        current_count = sum(count for _, count in requests)
+    def __init__(self, redis_client: aioredis.Redis, prefix: str = "ratelimit"):
+        self.redis = redis_client
+        self.prefix = prefix
+        self._script = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
 
-        # Check if limit is exceeded
-        if current_count >= limit:
-            return False, current_count, 0
+    async def add_requests(self, checks: list[RateLimitCheck]) -> list[RateLimitResult]:
+        """
+        Record a request against several limits in one round trip.
 
-        # Add this request
-        requests.append((now, 1))
-        remaining = limit - current_count - 1
+        Args:
+            checks: List of (key, window, limit) tuples
+
+        Returns:
+            One (is_allowed, current_count, remaining_requests) per check
+        """
+        now = time.time()
+        keys: list[str] = []
+        args: list[float] = [now]
+        for key, window, limit in checks:
+            index = int(now // window)
+            keys.extend(
+                (f"{self.prefix}:{key}:{index}", f"{self.prefix}:{key}:{index - 1}")
+            )
+            args.extend((window, limit))
 
-        return True, current_count + 1, remaining
+        allowed, *counts = await self._script(keys=keys, args=args)
 
-    def _cleanup_if_needed(self, now: float) -> None:
-        """Clean up old entries to prevent memory leaks."""
-        if now - self._last_cleanup > self._cleanup_interval:
-            self._cleanup_old_entries(now)
-            self._last_cleanup = now
+        return [
+            (bool(allowed), int(count), max(limit - int(count), 0))
+            for (_, _, limit), count in zip(checks, counts, strict=True)
+        ]
 
-    def _cleanup_old_entries(self, now: float, max_age: int = 3600) -> None:
-        """Remove entries older than max_age seconds."""
-        cutoff = now - max_age
-        keys_to_remove = []
 
-        for key, requests in self._store.items():
-            # Remove old requests
-            while requests and requests[0][0] < cutoff:
-                requests.popleft()
+class RateLimiter:
+    """
+    Rate limiter front end.
 
-            # Remove empty queues
-            if not requests:
-                keys_to_remove.append(key)
+    Uses the Redis store once a client is configured and the in-memory
+    store otherwise, or while Redis is failing.
+    """
 
-        for key in keys_to_remove:
-            del self._store[key]
+    def __init__(self, memory_store: RateLimitStore) -> None:
+        self.memory_store = memory_store
+        self.redis_store: RedisRateLimitStore | None = None
 
+    def set_redis_client(self, redis_client: aioredis.Redis | None) -> None:
+        """Enable (or with None, disable) the shared Redis store."""
+        self.redis_store = RedisRateLimitStore(redis_client) if redis_client else None
+
+    async def add_requests(self, checks: list[RateLimitCheck]) -> list[RateLimitResult]:
+        """
+        Record a request against several limits.
+
+        Args:
+            checks: List of (key, window, limit) tuples
+
+        Returns:
+            One (is_allowed, current_count, remaining_requests) per check
+        """
+        if self.redis_store is not None:
+            try:
+                return await self.redis_store.add_requests(checks)
+            except Exception as e:
+                logger.error("Redis rate limiter error, using local limits: %s", e)
 
-# Global rate limit store
+        return self.memory_store.add_requests(checks)
+
+
+# Global rate limit store and limiter
 rate_limit_store = RateLimitStore()
+rate_limiter = RateLimiter(rate_limit_store)
 
 
 class RateLimitConfig:
@@ -151,7 +291,7 @@ class RateLimitConfig:
         return cls.DEFAULT_LIMITS.get(endpoint_type, cls.DEFAULT_LIMITS["api"])
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """
     Rate limiting middleware for API requests.
 
@@ -161,115 +301,102 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     3. Considers subscription tiers for authenticated users
     4. Returns 429 Too Many Requests when limits are exceeded
     5. Adds rate limit headers to responses
+
+    It is a plain ASGI middleware and ignores WebSocket scopes.
     """
 
-    def __init__(self, app: Any, enabled: bool = True) -> None:
+    def __init__(self, app: ASGIApp, enabled: bool = True) -> None:
         """
         Initialize rate limiting middleware.
 
         Args:
-            app: FastAPI application instance
+            app: ASGI application to wrap
             enabled: Whether rate limiting is enabled
         """
-        super().__init__(app)
+        self.app = app
         self.enabled = enabled
 
         # Paths that are exempt from rate limiting
-        self.exempt_paths = ["/health", "/docs", "/redoc", "/openapi.json"]
+        self.exempt_paths = {"/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
 
-    async def dispatch(self, request: Request, call_next: Any) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request through rate limiting middleware.
 
         Args:
-            request: FastAPI request object
-            call_next: Next middleware/handler in chain
-
-        Returns:
-            HTTP response with rate limit headers
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        if not self.enabled or self._is_exempt(request):
-            response: Response = await call_next(request)
-            return response
+        if (
+            scope["type"] != "http"
+            or not self.enabled
+            or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
 
-        try:
-            # Determine endpoint type and rate limits
-            endpoint_type = self._get_endpoint_type(request)
-            client_ip = self._get_client_ip(request)
-            user_id = getattr(request.state, "user_id", None)
-            subscription_tier = getattr(request.state, "subscription_tier", None)
-
-            # Check rate limits
-            ip_allowed, ip_count, ip_remaining = self._check_ip_rate_limit(
-                client_ip, endpoint_type
-            )
+        context = get_request_context(scope)
+        endpoint_type = self._get_endpoint_type(context.path)
 
-            user_allowed, user_count, user_remaining = True, 0, 1000
-            if user_id:
-                (
-                    user_allowed,
-                    user_count,
-                    user_remaining,
-                ) = self._check_user_rate_limit(
-                    user_id, endpoint_type, subscription_tier
-                )
-
-            # Use the most restrictive limit
-            is_allowed = ip_allowed and user_allowed
-            remaining = min(ip_remaining, user_remaining)
-            current_count = max(ip_count, user_count)
-
-            if not is_allowed:
-                logger.warning(
-                    f"Rate limit exceeded for {client_ip}",
-                    extra={
-                        "client_ip": client_ip,
-                        "user_id": user_id,
-                        "endpoint_type": endpoint_type,
-                        "path": request.url.path,
-                        "ip_count": ip_count,
-                        "user_count": user_count,
-                    },
-                )
-
-                return self._create_rate_limit_response(
-                    current_count, remaining, endpoint_type
+        try:
+            # Check IP and user limits together
+            checks = [self._ip_check(context.client_ip, endpoint_type)]
+            if context.user_id:
+                checks.append(
+                    self._user_check(
+                        context.user_id, endpoint_type, context.subscription_tier
+                    )
                 )
-
-            # Process request
-            response = await call_next(request)
-
-            # Add rate limit headers
-            self._add_rate_limit_headers(
-                response, current_count, remaining, endpoint_type
+            results = await rate_limiter.add_requests(checks)
+        except Exception as e:
+            logger.error("Rate limit middleware error: %s", e)
+            # Don't fail requests due to rate limiting errors
+            await self.app(scope, receive, send)
+            return
+
+        # Use the most restrictive limit
+        is_allowed = all(allowed for allowed, _, _ in results)
+        current_count = max(count for _, count, _ in results)
+        remaining = min(left for _, _, left in results)
+
+        if not is_allowed:
+            logger.warning(
+                f"Rate limit exceeded for {context.client_ip}",
+                extra={
+                    "client_ip": context.client_ip,
+                    "user_id": context.user_id,
+                    "endpoint_type": endpoint_type,
+                    "path": context.path,
+                    "counts": [count for _, count, _ in results],
+                },
             )
+            response = self._create_rate_limit_response(
+                current_count, remaining, endpoint_type
+            )
+            await response(scope, receive, send)
+            return
 
-            return response
+        rate_limit_headers = self._rate_limit_headers(remaining, endpoint_type)
 
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Rate limit middleware error: {e}")
-            # Don't fail requests due to rate limiting errors
-            fallback_response: Response = await call_next(request)
-            return fallback_response
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], *rate_limit_headers]
+            await send(message)
 
-    def _is_exempt(self, request: Request) -> bool:
-        """Check if request is exempt from rate limiting."""
-        return request.url.path in self.exempt_paths
+        await self.app(scope, receive, send_with_headers)
 
-    def _get_endpoint_type(self, request: Request) -> str:
+    def _get_endpoint_type(self, path: str) -> str:
         """
         Determine endpoint type for rate limiting.
 
         Args:
-            request: FastAPI request object
+            path: Request path
 
         Returns:
             Endpoint type string
         """
-        path = request.url.path
-
         if path.startswith("/api/auth/"):
             return "auth"
         elif path.startswith("/api/ai/"):
@@ -281,45 +408,28 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         else:
             return "global"
 
-    def _get_client_ip(self, request: Request) -> str:
-        """Get client IP address."""
-        # Check forwarded headers
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip
-
-        return request.client.host if request.client else "unknown"
-
-    def _check_ip_rate_limit(
-        self, ip: str, endpoint_type: str
-    ) -> tuple[bool, int, int]:
+    def _ip_check(self, ip: str, endpoint_type: str) -> RateLimitCheck:
         """
-        Check IP-based rate limit.
+        Build the IP-based rate limit check.
 
         Args:
             ip: Client IP address
             endpoint_type: Type of endpoint being accessed
 
         Returns:
-            Tuple of (is_allowed, current_count, remaining)
+            Tuple of (key, window, limit)
         """
         limit = RateLimitConfig.get_limit(endpoint_type)
-        key = f"ip:{ip}:{endpoint_type}"
+        return f"ip:{ip}:{endpoint_type}", 60, limit
 
-        return rate_limit_store.add_request(key, window=60, limit=limit)
-
-    def _check_user_rate_limit(
+    def _user_check(
         self,
         user_id: str,
         endpoint_type: str,
         subscription_tier: str | None,
-    ) -> tuple[bool, int, int]:
+    ) -> RateLimitCheck:
         """
-        Check user-based rate limit.
+        Build the user-based rate limit check.
 
         Args:
             user_id: User identifier
@@ -327,23 +437,22 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             subscription_tier: User's subscription tier
 
         Returns:
-            Tuple of (is_allowed, current_count, remaining)
+            Tuple of (key, window, limit)
         """
         limit = RateLimitConfig.get_limit(endpoint_type, subscription_tier)
-        key = f"user:{user_id}:{endpoint_type}"
-
-        return rate_limit_store.add_request(key, window=60, limit=limit)
+        return f"user:{user_id}:{endpoint_type}", 60, limit
 
     def _create_rate_limit_response(
         self, current_count: int, remaining: int, endpoint_type: str
     ) -> Response:
         """Create rate limit exceeded response."""
         limit = RateLimitConfig.get_limit(endpoint_type)
+        reset_at = int(time.time()) + 60
 
         headers = {
             "X-RateLimit-Limit": str(limit),
             "X-RateLimit-Remaining": str(remaining),
-            "X-RateLimit-Reset": str(int(time.time()) + 60),
+            "X-RateLimit-Reset": str(reset_at),
             "Retry-After": "60",
         }
 
@@ -355,28 +464,25 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 "details": {
                     "limit": limit,
                     "current": current_count,
-                    "reset_at": int(time.time()) + 60,
+                    "reset_at": reset_at,
                 },
             }
         }
 
-        return Response(
-            content=str(error_response),
+        return JSONResponse(
+            content=error_response,
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             headers=headers,
-            media_type="application/json",
         )
 
-    def _add_rate_limit_headers(
-        self,
-        response: Response,
-        _current_count: int,
-        remaining: int,
-        endpoint_type: str,
-    ) -> None:
-        """Add rate limit headers to response."""
+    def _rate_limit_headers(
+        self, remaining: int, endpoint_type: str
+    ) -> list[tuple[bytes, bytes]]:
+        """Build raw rate limit headers for a response."""
         limit = RateLimitConfig.get_limit(endpoint_type)
 
-        response.headers["X-RateLimit-Limit"] = str(limit)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(time.time()) + 60)
+        return [
+            (b"x-ratelimit-limit", str(limit).encode()),
+            (b"x-ratelimit-remaining", str(remaining).encode()),
+            (b"x-ratelimit-reset", str(int(time.time()) + 60).encode()),
+        ]
@@ -5,15 +5,221 @@ Adds security headers to all responses to protect against common web vulnerabili
 and improve the overall security posture of the application.
 """
 
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Any
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
+from app.core.logging import logger
 
+RawHeaders = tuple[tuple[bytes, bytes], ...]
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+# Route classes by path prefix; exact paths take precedence over prefixes
+ROUTE_PREFIXES: tuple[tuple[str, str], ...] = (
+    ("/docs", "docs"),
+    ("/redoc", "docs"),
+    ("/static/", "static"),
+    ("/api/", "api"),
+    ("/api/auth/", "auth"),
+)
+ROUTE_EXACT_PATHS: tuple[tuple[str, str], ...] = (
+    ("/api/auth/login", "auth_sensitive"),
+    ("/api/auth/register", "auth_sensitive"),
+)
+
+# Security headers that also make sense on a WebSocket upgrade response
+WEBSOCKET_HEADERS = frozenset(
+    {"Server", "Strict-Transport-Security", "X-Content-Type-Options"}
+)
+
+ERROR_BODY = b'{"error": {"code": 500, "message": "Internal server error"}}'
+
+
+@dataclass(frozen=True)
+class HeaderBundle:
+    """
+    Immutable raw headers for one route class.
+
+    When the response sets none of the bundle's headers - the usual case -
+    applying it is a single list extend. Otherwise existing values win,
+    except for the ``replace`` headers which always take the bundle value.
+    """
+
+    route_class: str
+    headers: RawHeaders
+    names: frozenset[bytes]
+    replace: frozenset[bytes] = frozenset()
+    # Header name -> header whose presence suppresses it (default: itself)
+    guards: Mapping[bytes, bytes] = field(default_factory=dict)
+
+    def apply(self, headers: list[tuple[bytes, bytes]]) -> None:
+        """
+        Add the bundle to raw response headers in place.
+
+        Args:
+            headers: Raw headers of an ``http.response.start`` message
+        """
+        names = self.names
+        if not any(name.lower() in names for name, _ in headers):
+            headers.extend(self.headers)
+            return
+
+        present = {name.lower() for name, _ in headers}
+        if self.replace & present:
+            headers[:] = [h for h in headers if h[0].lower() not in self.replace]
+        for name, value in self.headers:
+            if name in self.replace or self.guards.get(name, name) not in present:
+                headers.append((name, value))
+
+
+class PrefixTrie:
+    """Character trie resolving a path to the value of its longest prefix."""
+
+    __slots__ = ("children", "value", "exact")
+
+    def __init__(self) -> None:
+        self.children: dict[str, PrefixTrie] = {}
+        self.value: Any = None
+        self.exact: Any = None
+
+    def insert(self, prefix: str, value: Any, exact: bool = False) -> None:
+        """
+        Register a value for a path prefix.
+
+        Args:
+            prefix: Path prefix (or full path when exact is True)
+            value: Value returned for matching paths
+            exact: Only match the path itself, not paths below it
+        """
+        node = self
+        for char in prefix:
+            node = node.children.setdefault(char, PrefixTrie())
+        if exact:
+            node.exact = value
+        else:
+            node.value = value
+
+    def lookup(self, path: str, default: Any = None) -> Any:
+        """
+        Find the value for a path.
+
+        Args:
+            path: Request path
+            default: Value returned when no prefix matches
+
+        Returns:
+            The exact-path value, else the longest-prefix value, else default
+        """
+        node = self
+        match = default
+        for char in path:
+            child = node.children.get(char)
+            if child is None:
+                return match
+            node = child
+            if node.value is not None:
+                match = node.value
+        return node.exact if node.exact is not None else match
+
+
+def compile_header_bundles(
+    headers: dict[str, str], debug: bool = False
+) -> dict[str, HeaderBundle]:
+    """
+    Compile the security headers of every route class.
+
+    Runs once at startup, so CSP selection and header encoding never happen
+    on the request path.
+
+    Args:
+        headers: Security headers to send
+        debug: Whether in debug mode
+
+    Returns:
+        Header bundle per route class, including "default" and "websocket"
+    """
+    version = settings.app_version.encode("latin-1")
+
+    def build(route_class: str, path: str) -> HeaderBundle:
+        raw: list[tuple[bytes, bytes]] = []
+        replace: set[bytes] = set()
+        guards: dict[bytes, bytes] = {}
+
+        def add(name: str, value: str, guard: str | None = None) -> None:
+            raw_name = name.lower().encode("latin-1")
+            raw.append((raw_name, value.encode("latin-1")))
+            if guard:
+                guards[raw_name] = guard.encode("latin-1")
+
+        # Security headers (don't override headers that are already set)
+        for header, value in headers.items():
+            if header == "Content-Security-Policy":
+                # Use path-specific CSP for Content-Security-Policy
+                value = SecurityConfig.get_csp_for_path(path, debug=debug)
+            add(header, value)
+
+        if route_class in ("api", "auth", "auth_sensitive"):
+            # For API endpoints, allow any origin unless CORS already decided
+            add("Access-Control-Allow-Origin", "*")
+
+            # API responses should not be cached by default
+            add("Cache-Control", "no-cache, no-store, must-revalidate")
+            add("Pragma", "no-cache", guard="cache-control")
+            add("Expires", "0", guard="cache-control")
+
+        # Add security headers for authentication endpoints
+        if route_class in ("auth", "auth_sensitive"):
+            add("X-Auth-Service", "DevPocket")
+            replace.add(b"x-auth-service")
+
+            # Additional security for sensitive endpoints
+            if route_class == "auth_sensitive":
+                add("X-Robots-Tag", "noindex, nofollow, noarchive, nosnippet")
+                replace.add(b"x-robots-tag")
+
+        # Add API versioning header
+        raw.append((b"x-api-version", version))
+        replace.add(b"x-api-version")
+
+        return HeaderBundle(
+            route_class=route_class,
+            headers=tuple(raw),
+            names=frozenset(name for name, _ in raw),
+            replace=frozenset(replace),
+            guards=MappingProxyType(guards),
+        )
+
+    bundles = {
+        "default": build("default", "/"),
+        "docs": build("docs", "/docs"),
+        "static": build("static", "/static/"),
+        "api": build("api", "/api/"),
+        "auth": build("auth", "/api/auth/"),
+        "auth_sensitive": build("auth_sensitive", "/api/auth/login"),
+    }
+
+    websocket_headers = (
+        *(
+            (header.lower().encode("latin-1"), value.encode("latin-1"))
+            for header, value in headers.items()
+            if header in WEBSOCKET_HEADERS
+        ),
+        (b"x-api-version", version),
+    )
+    bundles["websocket"] = HeaderBundle(
+        route_class="websocket",
+        headers=websocket_headers,
+        names=frozenset(name for name, _ in websocket_headers),
+        replace=frozenset({b"x-api-version"}),
+    )
+
+    return bundles
+
+
+class SecurityHeadersMiddleware:
     """
     Security headers middleware.
 
@@ -23,17 +229,21 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     - Content type sniffing
     - HTTPS downgrade attacks
     - Information disclosure
+
+    Headers are compiled at startup into one immutable bundle per route
+    class (docs, API, auth, static, WebSocket upgrade), found through a
+    prefix trie, so each response only extends its raw header list.
     """
 
-    def __init__(self, app: Any, headers: dict[str, str] | None = None) -> None:
+    def __init__(self, app: ASGIApp, headers: dict[str, str] | None = None) -> None:
         """
         Initialize security headers middleware.
 
         Args:
-            app: FastAPI application instance
+            app: ASGI application to wrap
             headers: Custom headers to add (overrides defaults)
         """
-        super().__init__(app)
+        self.app = app
 
         # Default security headers
         self.default_headers = {
@@ -68,139 +278,106 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
                 }
             )
 
-        # Content Security Policy for web endpoints
-        if settings.app_debug:
-            # Relaxed CSP for development
-            csp = (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
-                "style-src 'self' 'unsafe-inline'; "
-                "img-src 'self' data: https:; "
-                "font-src 'self'; "
-                "connect-src 'self' ws: wss:; "
-                "object-src 'none'; "
-                "base-uri 'self'"
-            )
-        else:
-            # Strict CSP for production
-            csp = (
-                "default-src 'self'; "
-                "script-src 'self'; "
-                "style-src 'self'; "
-                "img-src 'self' data: https://devpocket.app; "
-                "font-src 'self'; "
-                "connect-src 'self' wss://api.devpocket.app; "
-                "object-src 'none'; "
-                "base-uri 'self'; "
-                "form-action 'self'; "
-                "frame-ancestors 'none'"
-            )
-
-        self.default_headers["Content-Security-Policy"] = csp
+        # Content Security Policy; the value is chosen per route class
+        self.default_headers[
+            "Content-Security-Policy"
+        ] = SecurityConfig.get_csp_for_path("/", debug=settings.app_debug)
 
         # Use custom headers if provided, otherwise use defaults
         self.headers = headers if headers is not None else self.default_headers
 
-    async def dispatch(self, request: Request, call_next: Any) -> Response:
+        # Compile header bundles and index them by path
+        self.bundles = compile_header_bundles(self.headers, debug=settings.app_debug)
+        self._routes = PrefixTrie()
+        for prefix, route_class in ROUTE_PREFIXES:
+            self._routes.insert(prefix, self.bundles[route_class])
+        for path, route_class in ROUTE_EXACT_PATHS:
+            self._routes.insert(path, self.bundles[route_class], exact=True)
+
+    def bundle_for_path(self, path: str) -> HeaderBundle:
+        """Get the header bundle for a request path."""
+        return self._routes.lookup(path, self.bundles["default"])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Add security headers to response.
+        Add security headers to the response.
 
         Args:
-            request: FastAPI request object
-            call_next: Next middleware/handler in chain
-
-        Returns:
-            Response with security headers added
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        try:
-            response: Response = await call_next(request)
-
-            # Add security headers
-            for header, value in self.headers.items():
-                # Don't override headers that are already set
-                if header not in response.headers:
-                    # Use path-specific CSP for Content-Security-Policy
-                    if header == "Content-Security-Policy":
-                        path_specific_csp = SecurityConfig.get_csp_for_path(
-                            request.url.path, debug=settings.app_debug
-                        )
-                        response.headers[header] = path_specific_csp
-                    else:
-                        response.headers[header] = value
-
-            # Add API-specific headers
-            self._add_api_headers(request, response)
-
-            return response
+        if scope["type"] == "websocket":
+            await self.app(scope, receive, self._websocket_send(send))
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        bundle = self.bundle_for_path(scope["path"])
+        response_started = False
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                message["headers"] = self._response_headers(
+                    scope, message.get("headers", []), bundle
+                )
+            await send(message)
 
+        try:
+            await self.app(scope, receive, send_with_headers)
         except Exception as e:
+            if response_started:
+                raise
+
             # Even if there's an error, we want to add security headers
-            # to the error response
-            response = Response(
-                content='{"error": {"code": 500, "message": "Internal server error"}}',
-                status_code=500,
-                media_type="application/json",
+            # to the error response. Log the error but don't expose it.
+            logger.error("Security middleware error: %s", e)
+
+            headers = [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(ERROR_BODY)).encode()),
+            ]
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 500,
+                    "headers": self._response_headers(scope, headers, bundle),
+                }
             )
+            await send({"type": "http.response.body", "body": ERROR_BODY})
 
-            for header, value in self.headers.items():
-                if header == "Content-Security-Policy":
-                    path_specific_csp = SecurityConfig.get_csp_for_path(
-                        request.url.path, debug=settings.app_debug
-                    )
-                    response.headers[header] = path_specific_csp
-                else:
-                    response.headers[header] = value
-
-            # Log the error but don't expose it
-            import logging
-
-            logging.error(f"Security middleware error: {e}")
-
-            return response
-
-    def _add_api_headers(self, request: Request, response: Response) -> None:
-        """
-        Add API-specific security headers.
-
-        Args:
-            request: FastAPI request object
-            response: FastAPI response object
-        """
-        # Add CORS headers if not already present (handled by CORS middleware)
-        if (
-            "Access-Control-Allow-Origin" not in response.headers
-            and request.url.path.startswith("/api/")
-        ):
-            # For API endpoints, we might want specific CORS handling
-            response.headers["Access-Control-Allow-Origin"] = "*"
-
-        # Add cache control headers for API responses
-        if (
-            request.url.path.startswith("/api/")
-            and "Cache-Control" not in response.headers
-        ):
-            # API responses should not be cached by default
-            response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-            response.headers["Pragma"] = "no-cache"
-            response.headers["Expires"] = "0"
+    def _websocket_send(self, send: Send) -> Send:
+        """Wrap send to add the upgrade bundle to ``websocket.accept``."""
+        bundle = self.bundles["websocket"]
 
-        # Add security headers for authentication endpoints
-        if request.url.path.startswith("/api/auth/"):
-            response.headers["X-Auth-Service"] = "DevPocket"
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "websocket.accept":
+                headers = list(message.get("headers") or [])
+                bundle.apply(headers)
+                message["headers"] = headers
+            await send(message)
 
-            # Additional security for sensitive endpoints
-            if request.url.path in ["/api/auth/login", "/api/auth/register"]:
-                response.headers[
-                    "X-Robots-Tag"
-                ] = "noindex, nofollow, noarchive, nosnippet"
+        return send_with_headers
 
-        # Add API versioning header
-        response.headers["X-API-Version"] = settings.app_version
+    @staticmethod
+    def _response_headers(
+        scope: Scope,
+        headers: Iterable[tuple[bytes, bytes]],
+        bundle: HeaderBundle,
+    ) -> list[tuple[bytes, bytes]]:
+        """Build raw response headers with the bundle applied."""
+        headers = list(headers)
+        bundle.apply(headers)
 
         # Add request ID header for debugging (if available in request state)
-        request_id = getattr(request.state, "request_id", None)
+        request_id = scope.get("state", {}).get("request_id")
         if request_id:
-            response.headers["X-Request-ID"] = request_id
+            headers.append((b"x-request-id", str(request_id).encode("latin-1")))
+
+        return headers
 
 
 class SecurityConfig:
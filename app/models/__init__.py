@@ -5,7 +5,7 @@ SQLAlchemy models for DevPocket API.
 from .command import Command
 from .session import Session
 from .ssh_profile import SSHKey, SSHProfile
-from .sync import SyncData
+from .sync import SyncData, SyncSequence
 from .user import User, UserSettings
 
 __all__ = [
@@ -16,4 +16,5 @@ __all__ = [
     "SSHProfile",
     "SSHKey",
     "SyncData",
+    "SyncSequence",
 ]
@@ -53,6 +53,10 @@ class BaseModel(Base, UUIDMixin, TimestampMixin):
 
     __abstract__ = True
 
+    # Fetch server-generated values (timestamps, defaults) with RETURNING on
+    # INSERT and UPDATE, so flushed instances never need a refresh
+    __mapper_args__: ClassVar[dict[str, Any]] = {"eager_defaults": True}
+
     def to_dict(self) -> dict[str, Any]:
         """Convert model instance to dictionary."""
         return {
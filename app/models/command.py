@@ -2,12 +2,13 @@
 Command model for DevPocket API.
 """
 
+import re
 from datetime import datetime
 from datetime import timezone as tz
 from typing import TYPE_CHECKING
 from uuid import UUID as PyUUID
 
-from sqlalchemy import Boolean, Float, ForeignKey, Index, Integer, String, Text
+from sqlalchemy import JSON, Boolean, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -17,9 +18,37 @@ if TYPE_CHECKING:
     from .session import Session
 
 
+# Substrings marking a command line as likely to contain a secret
+SENSITIVE_PATTERNS = (
+    "password",
+    "passwd",
+    "secret",
+    "key",
+    "token",
+    "auth",
+    "credential",
+    "api_key",
+    "private",
+    "ssh-keygen",
+)
+
+# Password passed inline to a MySQL client (``mysql -pS3cret``)
+_INLINE_MYSQL_PASSWORD = re.compile(r"\bmysql(?:dump|admin)?\b.*\s-p\S")
+
+
+def contains_sensitive_content(command: str) -> bool:
+    """Check if a command line contains sensitive information."""
+    command_lower = command.lower()
+    if any(pattern in command_lower for pattern in SENSITIVE_PATTERNS):
+        return True
+    return _INLINE_MYSQL_PASSWORD.search(command_lower) is not None
+
+
 class Command(BaseModel):
     """Command model representing executed terminal commands."""
 
+    # Range-partitioned by month on created_at in PostgreSQL (migration
+    # 9a4f2c6d8b17); the database primary key there is (id, created_at).
     __tablename__ = "commands"
 
     # Foreign key to session
@@ -124,6 +153,12 @@ class Command(BaseModel):
         nullable=False, default=False, server_default="false"
     )  # Commands containing passwords, keys, etc.
 
+    # History organization
+    is_archived: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, server_default="false", index=True
+    )
+    tags: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
+
     # Relationships
     session: Mapped["Session"] = relationship("Session", back_populates="commands")
 
@@ -279,21 +314,7 @@ class Command(BaseModel):
 
     def check_sensitive_content(self) -> bool:
         """Check if command contains sensitive information."""
-        command_lower = self.command.lower()
-        sensitive_patterns = [
-            "password",
-            "passwd",
-            "secret",
-            "key",
-            "token",
-            "auth",
-            "credential",
-            "api_key",
-            "private",
-            "ssh-keygen",
-        ]
-
-        return any(pattern in command_lower for pattern in sensitive_patterns)
+        return contains_sensitive_content(self.command)
 
     def __repr__(self) -> str:
         return f"<Command(id={self.id}, session_id={self.session_id}, command='{self.command[:50]}...', status={self.status})>"
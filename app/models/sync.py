@@ -1,21 +1,55 @@
 """
 Sync data model for DevPocket API.
+
+Every write to a sync item stamps it with the next value of its user's
+change sequence (``sync_sequences``). Delta sync pages through a user's
+items in ``change_seq`` order, so a device resumes exactly after the last
+change it received regardless of clock skew between app nodes. The
+sequence row stays locked until the writing transaction commits, so a
+user's changes become visible in sequence order and a reader never skips
+past one that commits late.
+
+Every change is also noted on its session (``note_sync_changes``) so that
+connected devices can be told about it once the transaction commits.
+
+Besides the latest full document an item keeps a short chain of JSON
+patches (``deltas``), one per version, so a device that holds a recent
+version can be sent only the fields that changed since.
+
+Documents are stored as JSONB with a GIN (``jsonb_path_ops``) index, so
+content lookups (``@>`` containment, ``@@`` JSON path predicates) and
+conflict reports run inside Postgres instead of over loaded rows.
 """
 
+from collections.abc import Iterable
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 from uuid import UUID as PyUUID
 
-from sqlalchemy import JSON, Boolean, ForeignKey, Integer, String
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    event,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID, insert
+from sqlalchemy.orm import Mapped, mapped_column, object_session, relationship
+
+from app.core.json_patch import Patch, make_patch
 
-from .base import BaseModel
+from .base import Base, BaseModel
 
 if TYPE_CHECKING:
     from .user import User
 
 
+# Patches kept per item; older versions are sent the full document
+SYNC_DELTA_CHAIN_LENGTH = 10
+
+
 class SyncData(BaseModel):
     """Sync data model for cross-device synchronization."""
 
@@ -39,7 +73,7 @@ class SyncData(BaseModel):
     )  # Unique identifier for the synced item
 
     # Data content
-    data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    data: Mapped[dict] = mapped_column(JSONB, nullable=False)
 
     # Sync status
     version: Mapped[int] = mapped_column(
@@ -63,9 +97,13 @@ class SyncData(BaseModel):
 
     # Conflict resolution
     conflict_data: Mapped[dict | None] = mapped_column(
-        JSON, nullable=True
+        JSONB(none_as_null=True), nullable=True
     )  # Store conflicting versions for manual resolution
 
+    # Recent patches, oldest first: {"version": n, "patch": [...]} turns
+    # version n - 1 into version n
+    deltas: Mapped[list | None] = mapped_column(JSONB(none_as_null=True), nullable=True)
+
     resolved_at: Mapped[datetime | None] = mapped_column(nullable=True)
 
     # Sync timestamps
@@ -77,12 +115,18 @@ class SyncData(BaseModel):
         nullable=False, server_default="now()"
     )
 
+    # Position in the user's change sequence, assigned on every write
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="sync_data")
 
     # Methods
     def mark_as_deleted(self, device_id: str, device_type: str) -> None:
         """Mark sync data as deleted."""
+        self.deltas = self.deltas_after(self.data)
         self.is_deleted = True
         self.source_device_id = device_id
         self.source_device_type = device_type
@@ -91,6 +135,7 @@ class SyncData(BaseModel):
 
     def update_data(self, new_data: dict, device_id: str, device_type: str) -> None:
         """Update sync data with new content."""
+        self.deltas = self.deltas_after(new_data)
         self.data = new_data
         self.source_device_id = device_id
         self.source_device_type = device_type
@@ -109,6 +154,7 @@ class SyncData(BaseModel):
         self, chosen_data: dict, device_id: str, device_type: str
     ) -> None:
         """Resolve a data conflict by choosing one version."""
+        self.deltas = self.deltas_after(chosen_data)
         self.data = chosen_data
         self.conflict_data = None
         self.resolved_at = datetime.now()
@@ -116,6 +162,62 @@ class SyncData(BaseModel):
         self.source_device_type = device_type
         self.version += 1
 
+    def deltas_after(self, new_data: dict) -> list[dict[str, Any]]:
+        """
+        Build the patch chain for the next version.
+
+        Args:
+            new_data: Document of the next version
+
+        Returns:
+            The current chain plus the patch to ``new_data``, trimmed to
+            ``SYNC_DELTA_CHAIN_LENGTH`` entries
+        """
+        chain = list(self.deltas or [])
+        chain.append(
+            {
+                "version": (self.version or 1) + 1,
+                "patch": make_patch(self.data, new_data),
+            }
+        )
+        return chain[-SYNC_DELTA_CHAIN_LENGTH:]
+
+    def patch_since(self, base_version: int) -> Patch | None:
+        """
+        Get the operations turning ``base_version`` into the current data.
+
+        Args:
+            base_version: Version the device holds
+
+        Returns:
+            The concatenated patches, or None if the chain no longer
+            reaches back to ``base_version``
+        """
+        if base_version == self.version:
+            return []
+        if base_version > self.version:
+            return None
+
+        steps = [
+            delta for delta in self.deltas or [] if delta["version"] > base_version
+        ]
+        if [delta["version"] for delta in steps] != list(
+            range(base_version + 1, self.version + 1)
+        ):
+            return None
+        return [operation for delta in steps for operation in delta["patch"]]
+
+    def change_summary(self) -> dict[str, Any]:
+        """Compact description of the item's latest change."""
+        return {
+            "sync_type": self.sync_type,
+            "sync_key": self.sync_key,
+            "change_seq": self.change_seq,
+            "version": self.version,
+            "is_deleted": self.is_deleted,
+            "source_device_id": self.source_device_id,
+        }
+
     @property
     def has_conflict(self) -> bool:
         """Check if this sync data has unresolved conflicts."""
@@ -150,3 +252,105 @@ class SyncData(BaseModel):
 
     def __repr__(self) -> str:
         return f"<SyncData(id={self.id}, user_id={self.user_id}, sync_type={self.sync_type}, sync_key={self.sync_key})>"
+
+
+class SyncSequence(Base):
+    """Per-user counter that orders sync changes."""
+
+    __tablename__ = "sync_sequences"
+
+    user_id: Mapped[PyUUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    last_value: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+
+
+def reserve_change_seqs(user_id: PyUUID, count: int = 1) -> Any:
+    """
+    Build a statement that reserves the next ``count`` change sequence values.
+
+    Args:
+        user_id: Owner of the changes
+        count: Number of values to reserve
+
+    Returns:
+        Statement returning the last reserved value; the reserved range is
+        ``last_value - count + 1`` to ``last_value``
+    """
+    stmt = insert(SyncSequence).values(user_id=user_id, last_value=count)
+    return stmt.on_conflict_do_update(
+        index_elements=[SyncSequence.user_id],
+        set_={"last_value": SyncSequence.last_value + count},
+    ).returning(SyncSequence.last_value)
+
+
+# Session.info key holding the changes written in the current transaction
+PENDING_SYNC_CHANGES = "pending_sync_changes"
+
+
+def note_sync_changes(session_info: dict, items: Iterable[SyncData]) -> None:
+    """
+    Note written sync items for notification after the transaction commits.
+
+    Args:
+        session_info: ``Session.info`` of the writing session
+        items: Items whose change sequence was just assigned
+    """
+    pending = session_info.setdefault(PENDING_SYNC_CHANGES, [])
+    pending.extend((str(item.user_id), item.change_summary()) for item in items)
+
+
+@event.listens_for(SyncData, "before_insert")
+@event.listens_for(SyncData, "before_update")
+def _assign_change_seq(_mapper: Any, connection: Any, target: SyncData) -> None:
+    target.change_seq = connection.execute(
+        reserve_change_seqs(target.user_id)
+    ).scalar_one()
+
+
+@event.listens_for(SyncData, "after_insert")
+@event.listens_for(SyncData, "after_update")
+def _note_change(_mapper: Any, _connection: Any, target: SyncData) -> None:
+    # After the flush so that column defaults (version, is_deleted) are set
+    session = object_session(target)
+    if session is not None:
+        note_sync_changes(session.info, [target])
+
+
+# One item per user, type and key (the bulk upsert conflict target)
+Index(
+    "uq_sync_data_user_type_key",
+    SyncData.user_id,
+    SyncData.sync_type,
+    SyncData.sync_key,
+    unique=True,
+)
+# Delta sync reads a user's changes in sequence order
+Index(
+    "idx_sync_data_user_change_seq",
+    SyncData.user_id,
+    SyncData.change_seq,
+    unique=True,
+)
+# Timestamp scans (pending changes, recent activity)
+Index("idx_sync_data_user_modified", SyncData.user_id, SyncData.last_modified_at)
+# Containment and JSON path lookups on document content
+Index(
+    "idx_sync_data_data_gin",
+    SyncData.data,
+    postgresql_using="gin",
+    postgresql_ops={"data": "jsonb_path_ops"},
+)
+# Unresolved conflicts (conflict reports)
+Index(
+    "idx_sync_data_open_conflicts",
+    SyncData.user_id,
+    SyncData.sync_type,
+    postgresql_where=SyncData.conflict_data.is_not(None)
+    & SyncData.resolved_at.is_(None),
+)
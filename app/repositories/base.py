@@ -1,18 +1,62 @@
 """
 Base repository class with common database operations.
+
+Writes avoid extra round trips: models fetch server-generated values with
+``RETURNING`` (``eager_defaults``), so nothing is refreshed after a flush;
+bulk inserts are sent as batched multi-row INSERTs and bulk updates as one
+``UPDATE ... FROM (VALUES ...)`` per set of updated columns. Services group
+several writes into one commit with ``unit_of_work``.
 """
 
+import contextlib
+from collections.abc import AsyncIterator
 from typing import Any, Generic, TypeVar
 from uuid import UUID as PyUUID
 
-from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy import and_, column, delete, func, or_, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
 from app.models.base import BaseModel
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
 
+# Rows removed per statement by retention cleanups
+CLEANUP_BATCH_SIZE = 5000
+
+# session.info key holding the unit-of-work nesting depth
+UNIT_OF_WORK_DEPTH = "unit_of_work_depth"
+
+
+@contextlib.asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Group writes into a single commit.
+
+    Commits when the outermost unit of work exits and rolls back if it
+    raises; nested units of work join the outer one.
+
+    Args:
+        session: Session the writes go through
+
+    Yields:
+        AsyncSession: The same session
+    """
+    depth = session.info.get(UNIT_OF_WORK_DEPTH, 0)
+    session.info[UNIT_OF_WORK_DEPTH] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            await session.commit()
+    except Exception:
+        if depth == 0:
+            await session.rollback()
+        raise
+    finally:
+        session.info[UNIT_OF_WORK_DEPTH] = depth
+
 
 class BaseRepository(Generic[ModelType]):
     """Base repository class with common CRUD operations."""
@@ -43,7 +87,6 @@ class BaseRepository(Generic[ModelType]):
 
         self.session.add(instance)
         await self.session.flush()
-        await self.session.refresh(instance)
         return instance
 
     async def get_by_id(self, id: str | PyUUID) -> ModelType | None:
@@ -121,18 +164,18 @@ class BaseRepository(Generic[ModelType]):
             if not update_data:
                 return await self.get_by_id(id_or_instance)
 
+            # A loaded instance is updated in place by a single flush
+            instance = self._get_loaded(id_or_instance)
+            if instance is not None:
+                return await self.update(instance, **update_data)
+
             result = await self.session.execute(
                 update(self.model)
                 .where(self.model.id == id_or_instance)
                 .values(**update_data)
                 .returning(self.model)
             )
-
-            updated_instance = result.scalar_one_or_none()
-            if updated_instance:
-                await self.session.refresh(updated_instance)
-
-            return updated_instance
+            return result.scalar_one_or_none()
         else:
             # New behavior: update instance directly
             instance = id_or_instance
@@ -142,9 +185,8 @@ class BaseRepository(Generic[ModelType]):
                 if hasattr(instance, key) and key not in ["id", "created_at"]:
                     setattr(instance, key, value)
 
-            # Mark as dirty and flush
+            # Flush; server-side values come back with RETURNING
             await self.session.flush()
-            await self.session.refresh(instance)
             return instance
 
     async def delete(self, id: str | PyUUID) -> bool:
@@ -203,37 +245,79 @@ class BaseRepository(Generic[ModelType]):
     async def bulk_create(
         self, instances_data: list[dict[str, Any]]
     ) -> list[ModelType]:
-        """Create multiple model instances."""
+        """Create multiple model instances with batched multi-row INSERTs."""
         instances = [self.model(**data) for data in instances_data]
         self.session.add_all(instances)
         await self.session.flush()
-
-        # Refresh all instances to get updated data
-        for instance in instances:
-            await self.session.refresh(instance)
-
         return instances
 
     async def bulk_update(
         self, updates: list[dict[str, Any]], id_field: str = "id"
     ) -> int:
-        """Update multiple model instances."""
-        updated_count = 0
+        """
+        Update multiple model instances.
 
+        Rows updating the same columns are sent as a single
+        ``UPDATE ... FROM (VALUES ...)`` statement. Instances of updated rows
+        already loaded in the session are updated in place.
+
+        Args:
+            updates: Column values per row, each including ``id_field``
+            id_field: Column identifying the rows
+
+        Returns:
+            Number of rows updated
+        """
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
         for update_data in updates:
             if id_field not in update_data:
                 continue
+            fields = tuple(sorted(k for k in update_data if k != id_field))
+            if fields:
+                groups.setdefault(fields, []).append(update_data)
+
+        updated_count = 0
+        mapped_columns = self.model.__mapper__.columns
+        for fields, rows in groups.items():
+            names = (id_field, *fields)
+            rows_values = values(
+                *(column(name, mapped_columns[name].type) for name in names),
+                name="data",
+            ).data([tuple(row[name] for name in names) for row in rows])
 
-            id_value = update_data.pop(id_field)
             result = await self.session.execute(
                 update(self.model)
-                .where(getattr(self.model, id_field) == id_value)
-                .values(**update_data)
+                .where(getattr(self.model, id_field) == rows_values.c[id_field])
+                .values({name: rows_values.c[name] for name in fields})
+                .execution_options(synchronize_session=False)
             )
-            updated_count += result.rowcount
+            updated_count += result.rowcount or 0
+
+            if id_field == "id":
+                self._apply_to_loaded(rows, fields)
 
         return updated_count
 
+    def _get_loaded(self, id: str | PyUUID) -> ModelType | None:
+        """Get the instance with this ID if it is loaded in the session."""
+        if isinstance(id, str):
+            try:
+                id = PyUUID(id)
+            except ValueError:
+                return None
+        instance = self.session.identity_map.get(identity_key(self.model, id))
+        return instance if isinstance(instance, self.model) else None
+
+    def _apply_to_loaded(
+        self, rows: list[dict[str, Any]], fields: tuple[str, ...]
+    ) -> None:
+        """Copy updated values onto instances loaded in the session."""
+        for row in rows:
+            instance = self._get_loaded(row["id"])
+            if instance is not None:
+                for name in fields:
+                    set_committed_value(instance, name, row[name])
+
     async def bulk_delete(self, ids: list[str]) -> int:
         """Delete multiple model instances by IDs."""
         if not ids:
@@ -244,6 +328,35 @@ class BaseRepository(Generic[ModelType]):
         )
         return result.rowcount
 
+    async def delete_batch(
+        self, *conditions: Any, limit: int = CLEANUP_BATCH_SIZE
+    ) -> int:
+        """
+        Delete up to ``limit`` rows matching the conditions in one statement.
+
+        Issues ``DELETE ... WHERE id IN (SELECT id ... LIMIT n)`` so large
+        cleanups run as a series of short, set-based statements instead of
+        loading and deleting rows one by one.
+        """
+        chunk = select(self.model.id).where(and_(*conditions)).limit(limit)
+        result = await self.session.execute(
+            delete(self.model)
+            .where(self.model.id.in_(chunk.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    async def delete_in_batches(
+        self, *conditions: Any, batch_size: int = CLEANUP_BATCH_SIZE
+    ) -> int:
+        """Delete all rows matching the conditions, one batch at a time."""
+        deleted = 0
+        while True:
+            count = await self.delete_batch(*conditions, limit=batch_size)
+            deleted += count
+            if count < batch_size:
+                return deleted
+
     async def get_with_relationships(
         self, id: str, relationships: list[str]
     ) -> ModelType | None:
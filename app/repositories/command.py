@@ -2,17 +2,18 @@
 Command repository for DevPocket API.
 """
 
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta
 from typing import Any
 from uuid import UUID as PyUUID
 
-from sqlalchemy import and_, desc, func, or_, select
+from sqlalchemy import Row, and_, delete, desc, func, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.command import Command
 
-from .base import BaseRepository
+from .base import CLEANUP_BATCH_SIZE, BaseRepository
 
 
 class CommandRepository(BaseRepository[Command]):
@@ -125,7 +126,6 @@ class CommandRepository(BaseRepository[Command]):
 
         self.session.add(cmd)
         await self.session.flush()
-        await self.session.refresh(cmd)
 
         return cmd
 
@@ -135,7 +135,6 @@ class CommandRepository(BaseRepository[Command]):
         if command:
             command.start_execution()
             await self.session.flush()
-            await self.session.refresh(command)
         return command
 
     async def complete_command_execution(
@@ -150,7 +149,6 @@ class CommandRepository(BaseRepository[Command]):
         if command:
             command.complete_execution(exit_code, output, error_output)
             await self.session.flush()
-            await self.session.refresh(command)
         return command
 
     async def cancel_command(self, command_id: str) -> Command | None:
@@ -159,7 +157,6 @@ class CommandRepository(BaseRepository[Command]):
         if command:
             command.cancel_execution()
             await self.session.flush()
-            await self.session.refresh(command)
         return command
 
     async def timeout_command(self, command_id: str) -> Command | None:
@@ -168,7 +165,6 @@ class CommandRepository(BaseRepository[Command]):
         if command:
             command.timeout_execution()
             await self.session.flush()
-            await self.session.refresh(command)
         return command
 
     async def search_commands(
@@ -329,6 +325,106 @@ class CommandRepository(BaseRepository[Command]):
         result = await self.session.execute(query)
         return result.scalar() or 0
 
+    def _export_conditions(
+        self,
+        user_id: str | PyUUID,
+        session_ids: list[str] | None = None,
+        executed_after: datetime | None = None,
+        executed_before: datetime | None = None,
+        include_errors: bool = True,
+    ) -> list[Any]:
+        """Build the WHERE conditions shared by export counting and streaming."""
+        from app.models.session import Session
+
+        conditions: list[Any] = [Session.user_id == user_id]
+
+        if session_ids:
+            conditions.append(Command.session_id.in_(session_ids))
+        if executed_after:
+            conditions.append(Command.executed_at >= executed_after)
+        if executed_before:
+            conditions.append(Command.executed_at <= executed_before)
+        if not include_errors:
+            conditions.append(Command.status != "error")
+            conditions.append(or_(Command.exit_code.is_(None), Command.exit_code == 0))
+
+        return conditions
+
+    async def count_user_commands_for_export(
+        self,
+        user_id: str | PyUUID,
+        session_ids: list[str] | None = None,
+        executed_after: datetime | None = None,
+        executed_before: datetime | None = None,
+        include_errors: bool = True,
+    ) -> int:
+        """Count the commands an export with the given filters would contain."""
+        from app.models.session import Session
+
+        query = (
+            select(func.count(Command.id))
+            .join(Session, Command.session_id == Session.id)
+            .where(
+                and_(
+                    *self._export_conditions(
+                        user_id,
+                        session_ids=session_ids,
+                        executed_after=executed_after,
+                        executed_before=executed_before,
+                        include_errors=include_errors,
+                    )
+                )
+            )
+        )
+
+        result = await self.session.execute(query)
+        return result.scalar() or 0
+
+    async def stream_user_commands_for_export(
+        self,
+        user_id: str | PyUUID,
+        columns: list[str],
+        session_ids: list[str] | None = None,
+        executed_after: datetime | None = None,
+        executed_before: datetime | None = None,
+        include_errors: bool = True,
+        limit: int | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Row[Any]]:
+        """
+        Stream command rows for export from a server-side cursor.
+
+        Only the requested columns are selected and rows are fetched
+        ``batch_size`` at a time, so memory use does not grow with the
+        number of exported commands.
+        """
+        from app.models.session import Session
+
+        query = (
+            select(*(getattr(Command, column) for column in columns))
+            .join(Session, Command.session_id == Session.id)
+            .where(
+                and_(
+                    *self._export_conditions(
+                        user_id,
+                        session_ids=session_ids,
+                        executed_after=executed_after,
+                        executed_before=executed_before,
+                        include_errors=include_errors,
+                    )
+                )
+            )
+            .order_by(Command.created_at, Command.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        if limit:
+            query = query.limit(limit)
+
+        result = await self.session.stream(query)
+        async for row in result:
+            yield row
+
     async def get_user_commands(
         self,
         user_id: str | PyUUID,
@@ -548,25 +644,112 @@ class CommandRepository(BaseRepository[Command]):
 
         return [{"command": row[0], "usage_count": row[1]} for row in result.fetchall()]
 
-    async def cleanup_old_commands(
-        self, days_old: int = 90, keep_successful: bool = True
+    async def get_owned_commands(
+        self, user_id: str | PyUUID, command_ids: list[PyUUID]
+    ) -> list[Row[Any]]:
+        """Get (id, command) rows for the given IDs that belong to the user."""
+        from app.models.session import Session
+
+        if not command_ids:
+            return []
+
+        result = await self.session.execute(
+            select(Command.id, Command.command)
+            .join(Session, Command.session_id == Session.id)
+            .where(and_(Session.user_id == user_id, Command.id.in_(command_ids)))
+        )
+        return list(result.all())
+
+    async def bulk_delete_commands(
+        self, command_ids: list[PyUUID], chunk_size: int = 500
     ) -> int:
-        """Delete old commands to save space."""
-        cutoff_date = datetime.now() - timedelta(days=days_old)
+        """Delete commands by ID with one DELETE statement per chunk."""
+        deleted = 0
+        for start in range(0, len(command_ids), chunk_size):
+            chunk = command_ids[start : start + chunk_size]
+            result = await self.session.execute(
+                delete(Command)
+                .where(Command.id.in_(chunk))
+                .execution_options(synchronize_session=False)
+            )
+            deleted += result.rowcount
+        return deleted
+
+    async def bulk_update_commands(
+        self,
+        command_ids: list[PyUUID],
+        values: dict[str, Any],
+        chunk_size: int = 500,
+    ) -> int:
+        """Apply the same column values to commands, one UPDATE per chunk."""
+        updated = 0
+        for start in range(0, len(command_ids), chunk_size):
+            chunk = command_ids[start : start + chunk_size]
+            result = await self.session.execute(
+                update(Command)
+                .where(Command.id.in_(chunk))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        return updated
+
+    async def bulk_set_command_types(self, command_types: dict[PyUUID, str]) -> int:
+        """Set per-command types with a single executemany UPDATE."""
+        if not command_types:
+            return 0
+
+        await self.session.execute(
+            update(Command),
+            [
+                {"id": command_id, "command_type": command_type}
+                for command_id, command_type in command_types.items()
+            ],
+        )
+        return len(command_types)
+
+    async def bulk_insert_commands(self, records: list[dict[str, Any]]) -> int:
+        """Insert many commands with a single executemany INSERT."""
+        if not records:
+            return 0
+
+        await self.session.execute(insert(Command), records)
+        return len(records)
 
-        conditions = [Command.created_at < cutoff_date]
+    @staticmethod
+    def _old_command_conditions(cutoff: datetime, keep_successful: bool) -> list:
+        """Build retention conditions for old commands."""
+        conditions = [Command.created_at < cutoff]
 
         if keep_successful:
             conditions.extend([Command.status != "success", Command.exit_code != 0])
 
-        result = await self.session.execute(select(Command).where(and_(*conditions)))
+        return conditions
 
-        old_commands = list(result.scalars().all())
+    async def delete_old_commands_batch(
+        self,
+        cutoff: datetime,
+        keep_successful: bool = True,
+        limit: int = CLEANUP_BATCH_SIZE,
+    ) -> int:
+        """Delete one chunk of commands created before the cutoff."""
+        return await self.delete_batch(
+            *self._old_command_conditions(cutoff, keep_successful), limit=limit
+        )
 
-        for command in old_commands:
-            await self.session.delete(command)
+    async def cleanup_old_commands(
+        self,
+        days_old: int = 90,
+        keep_successful: bool = True,
+        batch_size: int = CLEANUP_BATCH_SIZE,
+    ) -> int:
+        """Delete old commands to save space."""
+        cutoff_date = datetime.now() - timedelta(days=days_old)
 
-        return len(old_commands)
+        return await self.delete_in_batches(
+            *self._old_command_conditions(cutoff_date, keep_successful),
+            batch_size=batch_size,
+        )
 
     async def get_recent_commands(
         self, user_id: str, hours: int = 24, limit: int = 50
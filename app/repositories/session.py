@@ -12,7 +12,7 @@ from sqlalchemy.orm import selectinload
 
 from app.models.session import Session
 
-from .base import BaseRepository
+from .base import CLEANUP_BATCH_SIZE, BaseRepository
 
 if TYPE_CHECKING:
     from sqlalchemy.sql.elements import BinaryExpression
@@ -245,7 +245,6 @@ class SessionRepository(BaseRepository[Session]):
 
         self.session.add(session)
         await self.session.flush()
-        await self.session.refresh(session)
 
         return session
 
@@ -441,22 +440,37 @@ class SessionRepository(BaseRepository[Session]):
         # as the actual implementation would depend on the Command model
         return 0
 
-    async def cleanup_old_sessions(
-        self, days_old: int = 90, keep_active: bool = True
-    ) -> int:
-        """Delete old sessions to save space."""
-        cutoff_date = datetime.now() - timedelta(days=days_old)
-
-        conditions: list[BinaryExpression[bool]] = [Session.created_at < cutoff_date]
+    @staticmethod
+    def _old_session_conditions(cutoff: datetime, keep_active: bool) -> list:
+        """Build retention conditions for old sessions."""
+        conditions: list[BinaryExpression[bool]] = [Session.created_at < cutoff]
 
         if keep_active:
-            conditions.append(Session.is_active is False)
+            conditions.append(Session.is_active.is_(False))
 
-        result = await self.session.execute(select(Session).where(and_(*conditions)))
+        return conditions
 
-        old_sessions = list(result.scalars().all())
+    async def delete_old_sessions_batch(
+        self,
+        cutoff: datetime,
+        keep_active: bool = True,
+        limit: int = CLEANUP_BATCH_SIZE,
+    ) -> int:
+        """Delete one chunk of sessions created before the cutoff."""
+        return await self.delete_batch(
+            *self._old_session_conditions(cutoff, keep_active), limit=limit
+        )
 
-        for session in old_sessions:
-            await self.session.delete(session)
+    async def cleanup_old_sessions(
+        self,
+        days_old: int = 90,
+        keep_active: bool = True,
+        batch_size: int = CLEANUP_BATCH_SIZE,
+    ) -> int:
+        """Delete old sessions to save space."""
+        cutoff_date = datetime.now() - timedelta(days=days_old)
 
-        return len(old_sessions)
+        return await self.delete_in_batches(
+            *self._old_session_conditions(cutoff_date, keep_active),
+            batch_size=batch_size,
+        )
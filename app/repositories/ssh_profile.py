@@ -92,7 +92,6 @@ class SSHProfileRepository(BaseRepository[SSHProfile]):
 
         self.session.add(profile)
         await self.session.flush()
-        await self.session.refresh(profile)
 
         return profile
 
@@ -104,7 +103,6 @@ class SSHProfileRepository(BaseRepository[SSHProfile]):
         if profile:
             profile.record_connection_attempt(success)
             await self.session.flush()
-            await self.session.refresh(profile)
         return profile
 
     async def get_profiles_by_host(
@@ -270,7 +268,6 @@ class SSHKeyRepository(BaseRepository[SSHKey]):
 
         self.session.add(key)
         await self.session.flush()
-        await self.session.refresh(key)
 
         return key
 
@@ -280,7 +277,6 @@ class SSHKeyRepository(BaseRepository[SSHKey]):
         if key:
             key.record_usage()
             await self.session.flush()
-            await self.session.refresh(key)
         return key
 
     async def get_keys_by_type(
@@ -2,17 +2,38 @@
 Sync data repository for DevPocket API.
 """
 
-from datetime import datetime, timedelta
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
 from typing import Any
-from uuid import UUID
+from uuid import UUID, uuid4
 from uuid import UUID as PyUUID
 
-from sqlalchemy import and_, desc, func, select
+from sqlalchemy import and_, cast, desc, func, select, tuple_
+from sqlalchemy.dialects.postgresql import JSONPATH, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.sync import SyncData
+from app.models.sync import (
+    SyncData,
+    SyncSequence,
+    note_sync_changes,
+    reserve_change_seqs,
+)
 
-from .base import BaseRepository
+from .base import CLEANUP_BATCH_SIZE, BaseRepository
+
+# Rows per prefetch / INSERT .. ON CONFLICT statement, well below asyncpg's
+# 32767 bind parameter limit
+UPSERT_BATCH_SIZE = 1000
+
+
+@dataclass
+class BulkSyncResult:
+    """Outcome of a bulk sync write."""
+
+    written: list[SyncData] = field(default_factory=list)
+    # (existing item, incoming row) pairs that were not written
+    conflicts: list[tuple[SyncData, dict[str, Any]]] = field(default_factory=list)
 
 
 class SyncDataRepository(BaseRepository[SyncData]):
@@ -46,18 +67,24 @@ class SyncDataRepository(BaseRepository[SyncData]):
         return list(result.scalars().all())
 
     async def get_sync_item(
-        self, user_id: str | PyUUID, sync_type: str, sync_key: str
+        self,
+        user_id: str | PyUUID,
+        sync_type: str,
+        sync_key: str,
+        for_update: bool = False,
     ) -> SyncData | None:
-        """Get a specific sync item."""
-        result = await self.session.execute(
-            select(SyncData).where(
-                and_(
-                    SyncData.user_id == user_id,
-                    SyncData.sync_type == sync_type,
-                    SyncData.sync_key == sync_key,
-                )
+        """Get a specific sync item, optionally locking it."""
+        query = select(SyncData).where(
+            and_(
+                SyncData.user_id == user_id,
+                SyncData.sync_type == sync_type,
+                SyncData.sync_key == sync_key,
             )
         )
+        if for_update:
+            query = query.with_for_update()
+
+        result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
     async def create_or_update_sync_item(
@@ -86,7 +113,6 @@ class SyncDataRepository(BaseRepository[SyncData]):
                 existing_item.update_data(data, device_id, device_type)
 
             await self.session.flush()
-            await self.session.refresh(existing_item)
             return existing_item
         else:
             # Create new item
@@ -95,7 +121,6 @@ class SyncDataRepository(BaseRepository[SyncData]):
             )
             self.session.add(new_item)
             await self.session.flush()
-            await self.session.refresh(new_item)
             return new_item
 
     async def delete_sync_item(
@@ -150,7 +175,6 @@ class SyncDataRepository(BaseRepository[SyncData]):
         if sync_item and sync_item.has_conflict:
             sync_item.resolve_conflict(chosen_data, device_id, device_type)
             await self.session.flush()
-            await self.session.refresh(sync_item)
 
         return sync_item
 
@@ -178,6 +202,68 @@ class SyncDataRepository(BaseRepository[SyncData]):
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
+    async def get_changes_after(
+        self,
+        user_id: str | PyUUID,
+        after_seq: int,
+        limit: int,
+        sync_types: list[str] | None = None,
+        include_deleted: bool = True,
+        modified_since: datetime | None = None,
+        data_contains: dict[str, Any] | None = None,
+    ) -> list[SyncData]:
+        """
+        Get a page of a user's changes in change sequence order.
+
+        Args:
+            user_id: User ID
+            after_seq: Return changes after this sequence value
+            limit: Maximum number of changes to return
+            sync_types: Only return these sync types
+            include_deleted: Include deleted items (tombstones)
+            modified_since: Only return items modified after this time
+            data_contains: Only return items whose data contains this
+                JSON object (``@>``)
+
+        Returns:
+            Changes ordered by ``change_seq``
+        """
+        query = select(SyncData).where(
+            and_(SyncData.user_id == user_id, SyncData.change_seq > after_seq)
+        )
+
+        if sync_types:
+            query = query.where(SyncData.sync_type.in_(sync_types))
+
+        if not include_deleted:
+            query = query.where(SyncData.is_deleted.is_(False))
+
+        if modified_since is not None:
+            query = query.where(SyncData.last_modified_at > modified_since)
+
+        if data_contains:
+            query = query.where(SyncData.data.contains(data_contains))
+
+        query = query.order_by(SyncData.change_seq).limit(limit)
+
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_last_change_seq(self, user_id: str | PyUUID) -> int:
+        """
+        Get the last committed change sequence value of a user.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            The user's latest change sequence value, 0 if nothing was written
+        """
+        result = await self.session.execute(
+            select(SyncSequence.last_value).where(SyncSequence.user_id == user_id)
+        )
+        return result.scalar_one_or_none() or 0
+
     async def get_device_sync_data(
         self,
         user_id: str,
@@ -204,6 +290,134 @@ class SyncDataRepository(BaseRepository[SyncData]):
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
+    async def get_sync_items_by_keys(
+        self, user_id: str | PyUUID, keys: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], SyncData]:
+        """
+        Get sync items by (sync_type, sync_key) in as few queries as possible.
+
+        Args:
+            user_id: User ID
+            keys: (sync_type, sync_key) pairs
+
+        Returns:
+            Existing items keyed by (sync_type, sync_key)
+        """
+        items: dict[tuple[str, str], SyncData] = {}
+        for start in range(0, len(keys), UPSERT_BATCH_SIZE):
+            result = await self.session.execute(
+                select(SyncData).where(
+                    SyncData.user_id == user_id,
+                    tuple_(SyncData.sync_type, SyncData.sync_key).in_(
+                        keys[start : start + UPSERT_BATCH_SIZE]
+                    ),
+                )
+            )
+            for item in result.scalars():
+                items[(item.sync_type, item.sync_key)] = item
+        return items
+
+    async def bulk_upsert_sync_items(
+        self,
+        user_id: PyUUID,
+        rows: list[dict[str, Any]],
+        is_conflict: Callable[[SyncData, dict[str, Any]], bool] | None = None,
+    ) -> BulkSyncResult:
+        """
+        Create or update many sync items with one upsert per batch.
+
+        Conflicts are resolved and patch chains extended for the whole batch
+        in memory against a single prefetch of the existing items; everything
+        else is written with ``INSERT .. ON CONFLICT (user_id, sync_type,
+        sync_key) DO UPDATE .. RETURNING``.
+
+        Args:
+            user_id: User ID
+            rows: Items with sync_type, sync_key, data, source_device_id and
+                source_device_type; a later row for the same key wins
+            is_conflict: Called with the existing item and an incoming row;
+                rows it flags are returned as conflicts and not written
+
+        Returns:
+            Written items and unwritten conflicts
+        """
+        unique_rows = {(row["sync_type"], row["sync_key"]): row for row in rows}
+
+        result = BulkSyncResult()
+        existing = (
+            await self.get_sync_items_by_keys(user_id, list(unique_rows))
+            if unique_rows
+            else {}
+        )
+        to_write = []
+        for key, row in unique_rows.items():
+            current = existing.get(key)
+            if current is None:
+                to_write.append({**row, "deltas": None})
+            elif is_conflict is not None and is_conflict(current, row):
+                result.conflicts.append((current, row))
+            else:
+                to_write.append({**row, "deltas": current.deltas_after(row["data"])})
+
+        for start in range(0, len(to_write), UPSERT_BATCH_SIZE):
+            result.written.extend(
+                await self._upsert_batch(
+                    user_id, to_write[start : start + UPSERT_BATCH_SIZE]
+                )
+            )
+
+        return result
+
+    async def _upsert_batch(
+        self, user_id: PyUUID, rows: list[dict[str, Any]]
+    ) -> list[SyncData]:
+        """Upsert one batch of sync items, stamping each with a change sequence."""
+        seq_result = await self.session.execute(reserve_change_seqs(user_id, len(rows)))
+        first_seq = seq_result.scalar_one() - len(rows) + 1
+        now = datetime.now(UTC)
+
+        stmt = insert(SyncData).values(
+            [
+                {
+                    "id": uuid4(),
+                    "user_id": user_id,
+                    "sync_type": row["sync_type"],
+                    "sync_key": row["sync_key"],
+                    "data": row["data"],
+                    "version": 1,
+                    "is_deleted": False,
+                    "source_device_id": row["source_device_id"],
+                    "source_device_type": row["source_device_type"],
+                    "synced_at": now,
+                    "last_modified_at": now,
+                    "change_seq": first_seq + index,
+                    "deltas": row.get("deltas"),
+                }
+                for index, row in enumerate(rows)
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SyncData.user_id, SyncData.sync_type, SyncData.sync_key],
+            set_={
+                "data": stmt.excluded.data,
+                "version": SyncData.version + 1,
+                "is_deleted": False,
+                "source_device_id": stmt.excluded.source_device_id,
+                "source_device_type": stmt.excluded.source_device_type,
+                "last_modified_at": stmt.excluded.last_modified_at,
+                "change_seq": stmt.excluded.change_seq,
+                "deltas": stmt.excluded.deltas,
+                "updated_at": func.now(),
+            },
+        ).returning(SyncData)
+
+        result = await self.session.execute(
+            stmt, execution_options={"populate_existing": True}
+        )
+        items = list(result.scalars().all())
+        note_sync_changes(self.session.info, items)
+        return items
+
     async def bulk_sync_create(
         self,
         user_id: str,
@@ -212,20 +426,37 @@ class SyncDataRepository(BaseRepository[SyncData]):
         device_type: str,
     ) -> list[SyncData]:
         """Bulk create/update sync items."""
-        created_items = []
-
-        for item_data in sync_items:
-            sync_item = await self.create_or_update_sync_item(
-                user_id=user_id,
-                sync_type=item_data["sync_type"],
-                sync_key=item_data["sync_key"],
-                data=item_data["data"],
-                device_id=device_id,
-                device_type=device_type,
+        recently = datetime.now(UTC) - timedelta(seconds=1)
+
+        def is_conflict(existing: SyncData, row: dict[str, Any]) -> bool:
+            # Same rule as create_or_update_sync_item
+            return (
+                existing.last_modified_at > recently
+                and existing.source_device_id != device_id
+                and existing.data != row["data"]
             )
-            created_items.append(sync_item)
 
-        return created_items
+        result = await self.bulk_upsert_sync_items(
+            UUID(str(user_id)),
+            [
+                {
+                    "sync_type": item_data["sync_type"],
+                    "sync_key": item_data["sync_key"],
+                    "data": item_data["data"],
+                    "source_device_id": device_id,
+                    "source_device_type": device_type,
+                }
+                for item_data in sync_items
+            ],
+            is_conflict=is_conflict,
+        )
+
+        for existing, row in result.conflicts:
+            existing.create_conflict(row["data"])
+        if result.conflicts:
+            await self.session.flush()
+
+        return result.written + [existing for existing, _ in result.conflicts]
 
     async def get_sync_stats(self, user_id: str | PyUUID) -> dict:
         """Get sync statistics for a user."""
@@ -274,27 +505,14 @@ class SyncDataRepository(BaseRepository[SyncData]):
             "device_breakdown": {row[0]: row[1] for row in device_breakdown.fetchall()},
         }
 
-    async def count_user_devices(self, user_id: str | PyUUID) -> int:
-        """Count the number of unique devices for a user."""
-        result = await self.session.execute(
-            select(func.count(func.distinct(SyncData.source_device_id))).where(
-                SyncData.user_id == user_id
-            )
-        )
-        return result.scalar() or 0
-
-    async def cleanup_old_sync_data(
-        self,
-        user_id: str | None = None,
-        days_old: int = 90,
-        sync_type: str | None = None,
-    ) -> int:
-        """Clean up old sync data."""
-        cutoff_date = datetime.now() - timedelta(days=days_old)
-
+    @staticmethod
+    def _old_sync_conditions(
+        cutoff: datetime, user_id: str | None, sync_type: str | None
+    ) -> list:
+        """Build retention conditions for deleted sync data."""
         conditions = [
-            SyncData.last_modified_at < cutoff_date,
-            SyncData.is_deleted is True,
+            SyncData.last_modified_at < cutoff,
+            SyncData.is_deleted.is_(True),
         ]
 
         if user_id:
@@ -303,19 +521,34 @@ class SyncDataRepository(BaseRepository[SyncData]):
         if sync_type:
             conditions.append(SyncData.sync_type == sync_type)
 
-        from sqlalchemy import BinaryExpression
+        return conditions
 
-        typed_conditions: list[BinaryExpression[bool]] = conditions
-        result = await self.session.execute(
-            select(SyncData).where(and_(*typed_conditions))
+    async def delete_old_sync_data_batch(
+        self,
+        cutoff: datetime,
+        user_id: str | None = None,
+        sync_type: str | None = None,
+        limit: int = CLEANUP_BATCH_SIZE,
+    ) -> int:
+        """Delete one chunk of deleted sync data last modified before the cutoff."""
+        return await self.delete_batch(
+            *self._old_sync_conditions(cutoff, user_id, sync_type), limit=limit
         )
 
-        old_items = list(result.scalars().all())
-
-        for item in old_items:
-            await self.session.delete(item)
+    async def cleanup_old_sync_data(
+        self,
+        user_id: str | None = None,
+        days_old: int = 90,
+        sync_type: str | None = None,
+        batch_size: int = CLEANUP_BATCH_SIZE,
+    ) -> int:
+        """Clean up old sync data."""
+        cutoff_date = datetime.now() - timedelta(days=days_old)
 
-        return len(old_items)
+        return await self.delete_in_batches(
+            *self._old_sync_conditions(cutoff_date, user_id, sync_type),
+            batch_size=batch_size,
+        )
 
     async def get_recent_activity(
         self, user_id: str, hours: int = 24, limit: int = 50
@@ -394,6 +627,111 @@ class SyncDataRepository(BaseRepository[SyncData]):
         )
         return list(result.scalars().all())
 
+    async def find_by_data(
+        self,
+        user_id: str | PyUUID,
+        contains: dict[str, Any] | None = None,
+        json_path: str | None = None,
+        sync_type: str | None = None,
+        include_deleted: bool = False,
+        limit: int | None = None,
+    ) -> list[SyncData]:
+        """
+        Find sync items by document content.
+
+        Both filters are answered from the GIN index on ``data``.
+
+        Args:
+            user_id: User ID
+            contains: JSON object the data must contain (``@>``), e.g.
+                ``{"host": "example.com"}``
+            json_path: JSON path predicate the data must match (``@@``),
+                e.g. ``'$.port != 22'``
+            sync_type: Only return this sync type
+            include_deleted: Include deleted items
+            limit: Maximum number of items to return
+
+        Returns:
+            Matching items, most recently changed first
+        """
+        query = select(SyncData).where(SyncData.user_id == user_id)
+
+        if contains is not None:
+            query = query.where(SyncData.data.contains(contains))
+        if json_path is not None:
+            query = query.where(SyncData.data.path_match(cast(json_path, JSONPATH)))
+        if sync_type:
+            query = query.where(SyncData.sync_type == sync_type)
+        if not include_deleted:
+            query = query.where(SyncData.is_deleted.is_(False))
+
+        query = query.order_by(desc(SyncData.change_seq))
+        if limit is not None:
+            query = query.limit(limit)
+
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_ssh_profiles_for_host(
+        self, user_id: str | PyUUID, host: str
+    ) -> list[SyncData]:
+        """Get the synced SSH profiles that point at a host."""
+        return await self.find_by_data(
+            user_id, contains={"host": host}, sync_type="ssh_profile"
+        )
+
+    async def get_conflict_report(
+        self, user_id: str | PyUUID, sync_type: str | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Summarize unresolved conflicts without loading their documents.
+
+        The top-level fields that differ between the stored and the
+        conflicting document are worked out in Postgres.
+
+        Args:
+            user_id: User ID
+            sync_type: Only report this sync type
+
+        Returns:
+            One entry per conflicted item with sync_type, sync_key, version,
+            source_device_id, conflict_created_at and changed_fields
+        """
+        conflicting = SyncData.conflict_data["conflicting_data"]
+        key = func.jsonb_object_keys(SyncData.data.concat(conflicting)).column_valued(
+            "key"
+        )
+        changed_fields = (
+            select(func.array_agg(key))
+            .where(SyncData.data[key].is_distinct_from(conflicting[key]))
+            .scalar_subquery()
+        )
+
+        query = select(
+            SyncData.sync_type,
+            SyncData.sync_key,
+            SyncData.version,
+            SyncData.source_device_id,
+            SyncData.conflict_data["conflict_created_at"].astext.label(
+                "conflict_created_at"
+            ),
+            changed_fields.label("changed_fields"),
+        ).where(
+            SyncData.user_id == user_id,
+            SyncData.conflict_data.is_not(None),
+            SyncData.resolved_at.is_(None),
+        )
+        if sync_type:
+            query = query.where(SyncData.sync_type == sync_type)
+
+        query = query.order_by(SyncData.sync_type, SyncData.sync_key)
+
+        result = await self.session.execute(query)
+        return [
+            {**row._asdict(), "changed_fields": sorted(row.changed_fields or [])}
+            for row in result
+        ]
+
     async def get_by_sync_type(
         self, user_id: str | PyUUID, sync_type: str
     ) -> list[SyncData]:
@@ -4,11 +4,13 @@ User repository for DevPocket API.
 
 from datetime import datetime
 from typing import Any
+from uuid import UUID as PyUUID
 
 from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.principal_cache import note_user_invalidation
 from app.models.user import User, UserSettings
 
 from .base import BaseRepository
@@ -20,6 +22,23 @@ class UserRepository(BaseRepository[User]):
     def __init__(self, session: AsyncSession):
         super().__init__(User, session)
 
+    async def update(
+        self, id_or_instance: str | PyUUID | User, **kwargs: Any
+    ) -> User | None:
+        """Update a user and evict their cached principals on commit."""
+        updated_user = await super().update(id_or_instance, **kwargs)
+        user_id = (
+            id_or_instance.id if isinstance(id_or_instance, User) else id_or_instance
+        )
+        note_user_invalidation(self.session.info, user_id)
+        return updated_user
+
+    async def delete(self, id: str | PyUUID) -> bool:
+        """Delete a user and evict their cached principals on commit."""
+        deleted = await super().delete(id)
+        note_user_invalidation(self.session.info, id)
+        return deleted
+
     async def get_by_email(self, email: str) -> User | None:
         """Get user by email address."""
         result = await self.session.execute(select(User).where(User.email == email))
@@ -73,17 +92,11 @@ class UserRepository(BaseRepository[User]):
             hashed_password=password_hash,
             **kwargs,
         )
+        # Default settings are inserted in the same flush
+        user.settings = UserSettings()
         self.session.add(user)
         await self.session.flush()
 
-        # Create default settings
-        settings = UserSettings(user_id=user.id)
-        self.session.add(settings)
-        await self.session.flush()
-
-        # Refresh to get the relationships
-        await self.session.refresh(user, ["settings"])
-
         return user
 
     async def is_email_taken(
@@ -159,6 +172,7 @@ class UserRepository(BaseRepository[User]):
         for user in expired_users:
             user.locked_until = None
             user.failed_login_attempts = 0
+            note_user_invalidation(self.session.info, user.id)
 
         return len(expired_users)
 
@@ -231,7 +245,7 @@ class UserRepository(BaseRepository[User]):
 
         user.increment_failed_login()
         await self.session.flush()
-        await self.session.refresh(user)
+        note_user_invalidation(self.session.info, user.id)
         return user
 
     async def deactivate_user(self, user_id: str) -> bool:
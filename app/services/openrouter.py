@@ -5,6 +5,7 @@ Provides BYOK (Bring Your Own Key) integration with OpenRouter API
 for AI-powered command suggestions, explanations, and error analysis.
 """
 
+import time
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from typing import Any
@@ -13,6 +14,7 @@ import httpx
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import ai_request_duration, ai_requests
 
 
 @dataclass
@@ -38,6 +40,27 @@ class AIError:
     timestamp: datetime
 
 
+class MetricsTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport that records OpenRouter call counts and latency."""
+
+    def __init__(self, base_path: str, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.base_path = base_path
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        operation = request.url.path.removeprefix(self.base_path) or "/"
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await super().handle_async_request(request)
+            if response.status_code < 400:
+                outcome = "ok"
+            return response
+        finally:
+            ai_request_duration.observe(time.perf_counter() - start, operation)
+            ai_requests.inc(operation, outcome)
+
+
 class OpenRouterService:
     """Service for OpenRouter API integration."""
 
@@ -77,7 +100,7 @@ class OpenRouterService:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._http_client() as client:
                 # Test with a simple models list request
                 response = await client.get(f"{self.base_url}/models", headers=headers)
 
@@ -298,7 +321,7 @@ class OpenRouterService:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._http_client() as client:
                 response = await client.get(f"{self.base_url}/models", headers=headers)
 
                 if response.status_code == 200:
@@ -347,7 +370,7 @@ class OpenRouterService:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._http_client() as client:
                 response = await client.get(
                     f"{self.base_url}/auth/key", headers=headers
                 )
@@ -378,6 +401,13 @@ class OpenRouterService:
 
     # Private helper methods
 
+    def _http_client(self) -> httpx.AsyncClient:
+        """Create an HTTP client whose calls are recorded in the AI metrics."""
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=MetricsTransport(httpx.URL(self.base_url).path),
+        )
+
     async def _make_completion_request(
         self,
         api_key: str,
@@ -408,7 +438,7 @@ class OpenRouterService:
         start_time = datetime.now(UTC)
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._http_client() as client:
                 response = await client.post(
                     f"{self.base_url}/chat/completions",
                     headers=headers,
@@ -0,0 +1,250 @@
+"""
+Data retention worker for DevPocket API.
+
+Periodically removes expired commands, sessions and deleted sync data. For
+range-partitioned tables expired months are detached and dropped as a single
+DDL operation; whatever remains (the boundary month, the DEFAULT partition or
+unpartitioned tables) is removed with short, chunked set-based deletes that
+commit between chunks to keep transactions and WAL bursts small.
+
+Upcoming monthly partitions are created by a separate, always-on worker so
+that new rows never pile up in the DEFAULT partition when retention is off,
+and a failed creation cannot roll back the partition drops.
+
+Both workers run in every application process. Each run first takes a
+Postgres advisory lock without waiting, so only one process across the
+deployment does the work and the others skip that run.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.database import AsyncSessionLocal, try_advisory_xact_lock
+from app.db.partitions import (
+    drop_partitions_before,
+    ensure_monthly_partitions,
+    is_partitioned,
+)
+from app.repositories.command import CommandRepository
+from app.repositories.session import SessionRepository
+from app.repositories.sync import SyncDataRepository
+
+# Advisory lock IDs serializing runs across processes
+RETENTION_LOCK_ID = 0x52455401
+PARTITION_LOCK_ID = 0x50415201
+
+
+@dataclass
+class RetentionReport:
+    """Outcome of a single retention run."""
+
+    skipped: bool = False
+    dropped_partitions: list[str] = field(default_factory=list)
+    deleted_commands: int = 0
+    deleted_sessions: int = 0
+    deleted_sync_data: int = 0
+
+
+class RetentionWorker:
+    """Background worker enforcing data retention policies."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        interval_seconds: int | None = None,
+        batch_size: int | None = None,
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds or settings.retention_interval_seconds
+        self.batch_size = batch_size or settings.retention_batch_size
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Start the periodic retention loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def stop(self) -> None:
+        """Stop the periodic retention loop."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    async def _run_periodically(self) -> None:
+        """Run retention forever, sleeping between runs."""
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Retention run failed: {e}")
+
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self, now: datetime | None = None) -> RetentionReport:
+        """
+        Apply every retention policy once.
+
+        Args:
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Summary of what was removed
+        """
+        now = now or datetime.now(UTC)
+        report = RetentionReport()
+
+        # The lock is held by this session's transaction for the whole run
+        async with self.session_factory() as lock_session:
+            if not await try_advisory_xact_lock(lock_session, RETENTION_LOCK_ID):
+                logger.info("Retention run skipped: running in another process")
+                report.skipped = True
+                return report
+
+            await self._run_policies(now, report)
+
+        return report
+
+    async def _run_policies(self, now: datetime, report: RetentionReport) -> None:
+        """Drop expired partitions and delete expired rows."""
+        await self._maintain_command_partitions(now, report)
+
+        report.deleted_commands = await self._delete_in_chunks(
+            CommandRepository,
+            "delete_old_commands_batch",
+            cutoff=now - timedelta(days=settings.command_retention_days),
+            keep_successful=False,
+        )
+        report.deleted_sessions = await self._delete_in_chunks(
+            SessionRepository,
+            "delete_old_sessions_batch",
+            cutoff=now - timedelta(days=settings.session_retention_days),
+            keep_active=True,
+        )
+        report.deleted_sync_data = await self._delete_in_chunks(
+            SyncDataRepository,
+            "delete_old_sync_data_batch",
+            cutoff=now - timedelta(days=settings.sync_retention_days),
+        )
+
+        logger.info(
+            f"Retention run completed: "
+            f"dropped_partitions={len(report.dropped_partitions)}, "
+            f"commands={report.deleted_commands}, "
+            f"sessions={report.deleted_sessions}, "
+            f"sync_data={report.deleted_sync_data}"
+        )
+
+    async def _maintain_command_partitions(
+        self, now: datetime, report: RetentionReport
+    ) -> None:
+        """Drop expired command partitions."""
+        async with self.session_factory() as session:
+            if not await is_partitioned(session, "commands"):
+                return
+
+            report.dropped_partitions = await drop_partitions_before(
+                session,
+                "commands",
+                now - timedelta(days=settings.command_retention_days),
+                detach_only=settings.retention_detach_only,
+            )
+            await session.commit()
+
+    async def _delete_in_chunks(
+        self, repository_class: type, method: str, **kwargs: Any
+    ) -> int:
+        """Run a repository batch delete repeatedly, committing every chunk."""
+        deleted = 0
+        async with self.session_factory() as session:
+            delete_batch = getattr(repository_class(session), method)
+            while True:
+                count = await delete_batch(limit=self.batch_size, **kwargs)
+                await session.commit()
+                deleted += count
+                if count < self.batch_size:
+                    return deleted
+
+
+class PartitionWorker:
+    """Background worker pre-creating upcoming monthly partitions."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        interval_seconds: int | None = None,
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = (
+            interval_seconds or settings.partition_maintenance_interval_seconds
+        )
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Start the periodic partition maintenance loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def stop(self) -> None:
+        """Stop the periodic partition maintenance loop."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    async def _run_periodically(self) -> None:
+        """Maintain partitions forever, sleeping between runs."""
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}")
+
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self, now: datetime | None = None) -> list[str]:
+        """
+        Create the current and upcoming command partitions once.
+
+        Args:
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Names of the partitions that were created
+        """
+        async with self.session_factory() as session:
+            # Released by the commit below
+            if not await try_advisory_xact_lock(session, PARTITION_LOCK_ID):
+                logger.info("Partition maintenance skipped: running in another process")
+                return []
+
+            if not await is_partitioned(session, "commands"):
+                return []
+
+            created = await ensure_monthly_partitions(
+                session,
+                "commands",
+                months_ahead=settings.partition_premake_months,
+                now=now,
+            )
+            await session.commit()
+            return created
+
+
+# Global retention worker instance
+retention_worker = RetentionWorker()
+
+# Global partition worker instance
+partition_worker = PartitionWorker()
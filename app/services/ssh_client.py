@@ -21,6 +21,7 @@ from paramiko import (  # type: ignore[attr-defined]
 )
 
 from app.core.logging import logger
+from app.core.metrics import ssh_connect_duration, ssh_connects, track_call
 from app.models.ssh_profile import SSHKey
 
 
@@ -88,7 +89,7 @@ class SSHClientService:
                     connect_params["pkey"] = private_key
                     auth_method = "publickey"
                 except Exception as e:
-                    logger.error(f"Failed to load SSH key: {e}")
+                    logger.error("Failed to load SSH key: %s", e)
                     result["message"] = f"Failed to load SSH key: {e!s}"
                     return result
 
@@ -106,7 +107,10 @@ class SSHClientService:
 
             # Run connection test in executor to avoid blocking
             loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, lambda: client.connect(**connect_params))
+            with track_call(ssh_connects, ssh_connect_duration, "test"):
+                await loop.run_in_executor(
+                    None, lambda: client.connect(**connect_params)
+                )
 
             # Get server information
             transport = client.get_transport()
@@ -142,41 +146,41 @@ class SSHClientService:
 
             except Exception as cmd_error:
                 # Connection successful but command failed
-                logger.warning(f"SSH command test failed: {cmd_error}")
+                logger.warning("SSH command test failed: %s", cmd_error)
                 result["success"] = True  # Connection itself is successful
                 result["message"] = "Connection successful (command test failed)"
                 result["details"]["command_test"] = "failed"
                 result["details"]["command_error"] = str(cmd_error)
 
         except paramiko.AuthenticationException as e:
-            logger.warning(f"SSH authentication failed for {username}@{host}: {e}")
+            logger.warning("SSH authentication failed for %s@%s: %s", username, host, e)
             result["message"] = f"Authentication failed: {e!s}"
             result["details"]["error_type"] = "authentication"
 
         except paramiko.SSHException as e:
-            logger.warning(f"SSH connection failed for {host}: {e}")
+            logger.warning("SSH connection failed for %s: %s", host, e)
             result["message"] = f"SSH connection failed: {e!s}"
             result["details"]["error_type"] = "ssh_protocol"
 
         except socket.timeout:
-            logger.warning(f"SSH connection timeout for {host}:{port}")
+            logger.warning("SSH connection timeout for %s:%s", host, port)
             result["message"] = f"Connection timeout after {timeout} seconds"
             result["details"]["error_type"] = "timeout"
 
         except socket.gaierror as e:
-            logger.warning(f"DNS resolution failed for {host}: {e}")
+            logger.warning("DNS resolution failed for %s: %s", host, e)
             result["message"] = f"Cannot resolve hostname: {host}"
             result["details"]["error_type"] = "dns"
 
         except ConnectionRefusedError:
-            logger.warning(f"Connection refused for {host}:{port}")
+            logger.warning("Connection refused for %s:%s", host, port)
             result[
                 "message"
             ] = f"Connection refused. Is SSH server running on port {port}?"
             result["details"]["error_type"] = "connection_refused"
 
         except Exception as e:
-            logger.error(f"Unexpected error testing SSH connection: {e}")
+            logger.error("Unexpected error testing SSH connection: %s", e)
             result["message"] = f"Connection test failed: {e!s}"
             result["details"]["error_type"] = "unknown"
             result["details"]["error"] = str(e)
@@ -221,7 +225,7 @@ class SSHClientService:
             return private_key
 
         except Exception as e:
-            logger.error(f"Failed to load {key_type} key: {e}")
+            logger.error("Failed to load %s key: %s", key_type, e)
             raise Exception(
                 f"Invalid {key_type} key format or incorrect passphrase"
             ) from e
@@ -256,7 +260,7 @@ class SSHClientService:
             return result
 
         except Exception as e:
-            logger.error(f"Failed to get host key for {host}:{port}: {e}")
+            logger.error("Failed to get host key for %s:%s: %s", host, port, e)
             return None
 
     def generate_key_pair(
@@ -307,7 +311,7 @@ class SSHClientService:
             }
 
         except Exception as e:
-            logger.error(f"Failed to generate {key_type} key pair: {e}")
+            logger.error("Failed to generate %s key pair: %s", key_type, e)
             raise Exception(f"Key generation failed: {e!s}") from e
 
     def validate_public_key(self, public_key: str) -> bool:
@@ -389,5 +393,5 @@ class SSHClientService:
             return str(fingerprint)
 
         except Exception as e:
-            logger.error(f"Failed to get key fingerprint: {e}")
+            logger.error("Failed to get key fingerprint: %s", e)
             return None
@@ -0,0 +1,170 @@
+"""
+Write-behind recording of commands captured from live terminal sessions.
+
+Captured commands are buffered in memory and inserted into the database in
+bulk, either when a batch fills up or when the flush interval elapses. The
+terminal output path therefore never waits on the database and a busy
+session costs one INSERT and one commit per batch instead of per command.
+Rows are classified (command type, dangerous and sensitive flags) at flush
+time with the same rules as commands created through the API.
+"""
+
+import asyncio
+import contextlib
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.commands.service import CommandService
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.database import AsyncSessionLocal
+from app.models.command import contains_sensitive_content
+from app.repositories.command import CommandRepository
+
+from .shell_integration import CapturedCommand
+
+MAX_WORKING_DIRECTORY_LENGTH = 500
+
+
+class CommandRecorder:
+    """Buffers captured commands and flushes them to the database in bulk."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        batch_size: int | None = None,
+        flush_interval_ms: int | None = None,
+        max_pending: int | None = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.command_capture_batch_size
+        self.flush_interval = (
+            flush_interval_ms or settings.command_capture_flush_ms
+        ) / 1000
+        self._pending: deque[dict[str, Any]] = deque(
+            maxlen=max_pending or settings.command_capture_max_pending
+        )
+        self._wakeup: asyncio.Event | None = None
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.dropped = 0
+
+    @property
+    def pending_count(self) -> int:
+        """Number of captured commands waiting to be written."""
+        return len(self._pending)
+
+    def record(self, session_id: str, captured: CapturedCommand) -> None:
+        """
+        Queue a captured command for writing.
+
+        Never touches the database; must be called from the event loop.
+
+        Args:
+            session_id: Terminal session ID the command ran in
+            captured: Captured command details
+        """
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+
+        self._pending.append(self._to_record(session_id, captured))
+
+        if self._task is None or self._task.done():
+            # Created here so the event belongs to the running loop
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._flush_periodically(self._wakeup))
+        if len(self._pending) >= self.batch_size and self._wakeup:
+            self._wakeup.set()
+
+    @staticmethod
+    def _to_record(session_id: str, captured: CapturedCommand) -> dict[str, Any]:
+        """Convert a captured command into a commands row."""
+        if captured.exit_code is None:
+            status = "cancelled"
+        else:
+            status = "success" if captured.exit_code == 0 else "error"
+
+        working_directory = captured.working_directory
+        if working_directory:
+            working_directory = working_directory[:MAX_WORKING_DIRECTORY_LENGTH]
+
+        return {
+            "session_id": session_id,
+            "command": captured.command,
+            "exit_code": captured.exit_code,
+            "status": status,
+            "started_at": captured.started_at,
+            "executed_at": captured.started_at,
+            "completed_at": captured.completed_at,
+            "execution_time": captured.execution_time,
+            "working_directory": working_directory,
+        }
+
+    async def flush(self) -> int:
+        """
+        Write all pending commands, one bulk INSERT per batch.
+
+        Returns:
+            Number of commands written
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._pending:
+                batch = [
+                    self._pending.popleft()
+                    for _ in range(min(self.batch_size, len(self._pending)))
+                ]
+                try:
+                    async with self.session_factory() as session:
+                        service = CommandService(session)
+                        for record in batch:
+                            record.update(service.classify(record["command"]))
+                            record["is_sensitive"] = contains_sensitive_content(
+                                record["command"]
+                            )
+                        await CommandRepository(session).bulk_insert_commands(batch)
+                        await session.commit()
+                    written += len(batch)
+                except asyncio.CancelledError:
+                    # Keep the batch for the final flush on shutdown
+                    self._pending.extendleft(reversed(batch))
+                    raise
+                except Exception as e:
+                    logger.error(f"Failed to write {len(batch)} captured commands: {e}")
+
+        if self.dropped:
+            logger.warning(
+                f"Dropped {self.dropped} captured commands: capture queue full"
+            )
+            self.dropped = 0
+
+        return written
+
+    async def _flush_periodically(self, wakeup: asyncio.Event) -> None:
+        """Flush whenever a batch fills up or the interval elapses."""
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(wakeup.wait(), self.flush_interval)
+            wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Captured command flush failed: %s", e)
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write anything still pending."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        self._task = None
+
+        await self.flush()
+
+
+# Global command recorder instance
+command_recorder = CommandRecorder()
@@ -12,6 +12,7 @@ from datetime import datetime
 import redis.asyncio as aioredis
 from fastapi import WebSocket
 
+from app.api.sync.services.presence import device_presence
 from app.core.logging import logger
 from app.db.database import AsyncSessionLocal
 from app.repositories.session import SessionRepository
@@ -24,6 +25,7 @@ from .protocols import (
     create_status_message,
     parse_message,
 )
+from .sync_push import SyncPushSubscription
 from .terminal import TerminalSession
 
 
@@ -44,6 +46,7 @@ class Connection:
         self.connected_at = datetime.now()
         self.last_ping = datetime.now()
         self.terminal_sessions: dict[str, TerminalSession] = {}
+        self.sync_push: SyncPushSubscription | None = None
 
     async def send_message(self, message: TerminalMessage) -> bool:
         """
@@ -71,7 +74,9 @@ class Connection:
             await self.websocket.send_text(text)
             return True
         except Exception as e:
-            logger.error(f"Failed to send text on connection {self.connection_id}: {e}")
+            logger.error(
+                "Failed to send text on connection %s: %s", self.connection_id, e
+            )
             return False
 
     def add_terminal_session(self, session: TerminalSession) -> None:
@@ -140,6 +145,8 @@ class ConnectionManager:
             self.user_connections[user_id] = set()
         self.user_connections[user_id].add(connection_id)
 
+        await device_presence.heartbeat(user_id, device_id)
+
         # Log connection
         logger.info(
             f"WebSocket connected: connection_id={connection_id}, "
@@ -167,6 +174,11 @@ class ConnectionManager:
             for session in list(connection.terminal_sessions.values()):
                 await self._cleanup_terminal_session(session)
 
+            # Stop sync push
+            if connection.sync_push:
+                await connection.sync_push.stop()
+                connection.sync_push = None
+
             # Remove from user connections
             if connection.user_id in self.user_connections:
                 self.user_connections[connection.user_id].discard(connection_id)
@@ -185,10 +197,10 @@ class ConnectionManager:
             # Remove connection
             del self.connections[connection_id]
 
-            logger.info(f"WebSocket disconnected: connection_id={connection_id}")
+            logger.info("WebSocket disconnected: connection_id=%s", connection_id)
 
         except Exception as e:
-            logger.error(f"Error during disconnect cleanup: {e}")
+            logger.error("Error during disconnect cleanup: %s", e)
 
     async def handle_message(self, connection_id: str, message_data: dict) -> None:
         """
@@ -200,7 +212,7 @@ class ConnectionManager:
         """
         connection = self.connections.get(connection_id)
         if not connection:
-            logger.warning(f"Message from unknown connection: {connection_id}")
+            logger.warning("Message from unknown connection: %s", connection_id)
             return
 
         try:
@@ -209,6 +221,9 @@ class ConnectionManager:
             # Handle heartbeat messages
             if message.type == MessageType.PING:
                 connection.update_ping()
+                await device_presence.heartbeat(
+                    connection.user_id, connection.device_id
+                )
                 pong = HeartbeatMessage(type=MessageType.PONG)
                 await connection.send_message(pong)
                 return
@@ -224,15 +239,19 @@ class ConnectionManager:
                 MessageType.SIGNAL,
             ]:
                 await self._handle_terminal_message(connection, message)
+            elif message.type == MessageType.SYNC_SUBSCRIBE:
+                await self._handle_sync_subscribe(connection)
+            elif message.type == MessageType.SYNC_UNSUBSCRIBE:
+                await self._handle_sync_unsubscribe(connection)
             else:
-                logger.warning(f"Unhandled message type: {message.type}")
+                logger.warning("Unhandled message type: %s", message.type)
 
         except ValueError as e:
-            logger.warning(f"Invalid message from {connection_id}: {e}")
+            logger.warning("Invalid message from %s: %s", connection_id, e)
             error_msg = create_error_message("invalid_message", str(e))
             await connection.send_message(error_msg)
         except Exception as e:
-            logger.error(f"Error handling message from {connection_id}: {e}")
+            logger.error("Error handling message from %s: %s", connection_id, e)
             error_msg = create_error_message("message_handling_error", "Internal error")
             await connection.send_message(error_msg)
 
@@ -243,7 +262,9 @@ class ConnectionManager:
         try:
             # Type guard: ensure message.data is a dictionary
             if not isinstance(message.data, dict):
-                logger.error(f"Invalid connect message data type: {type(message.data)}")
+                logger.error(
+                    "Invalid connect message data type: %s", type(message.data)
+                )
                 error_msg = create_error_message(
                     "invalid_message_data",
                     "Connect message data must be a dictionary",
@@ -315,7 +336,7 @@ class ConnectionManager:
                 await connection.send_message(status_msg)
 
         except Exception as e:
-            logger.error(f"Failed to create terminal session: {e}")
+            logger.error("Failed to create terminal session: %s", e)
             error_msg = create_error_message(
                 "session_creation_failed",
                 "Failed to create terminal session",
@@ -363,7 +384,7 @@ class ConnectionManager:
             if isinstance(message.data, str):
                 await session.handle_input(message.data)
             else:
-                logger.warning(f"Invalid input data type: {type(message.data)}")
+                logger.warning("Invalid input data type: %s", type(message.data))
 
         elif message.type == MessageType.RESIZE:
             # Type guard for resize data
@@ -372,7 +393,7 @@ class ConnectionManager:
                 rows = message.data.get("rows", 24)
                 await session.handle_resize(cols, rows)
             else:
-                logger.warning(f"Invalid resize data type: {type(message.data)}")
+                logger.warning("Invalid resize data type: %s", type(message.data))
 
         elif message.type == MessageType.SIGNAL:
             # Type guard for signal data
@@ -380,7 +401,19 @@ class ConnectionManager:
                 signal = message.data.get("signal", "")
                 await session.handle_signal(signal)
             else:
-                logger.warning(f"Invalid signal data type: {type(message.data)}")
+                logger.warning("Invalid signal data type: %s", type(message.data))
+
+    async def _handle_sync_subscribe(self, connection: Connection) -> None:
+        """Start pushing the user's sync changes to this connection."""
+        if connection.sync_push is None:
+            connection.sync_push = SyncPushSubscription(connection)
+            await connection.sync_push.start()
+
+    async def _handle_sync_unsubscribe(self, connection: Connection) -> None:
+        """Stop pushing sync changes to this connection."""
+        if connection.sync_push is not None:
+            await connection.sync_push.stop()
+            connection.sync_push = None
 
     async def _cleanup_terminal_session(self, session: TerminalSession) -> None:
         """Clean up a terminal session."""
@@ -410,13 +443,13 @@ class ConnectionManager:
 
                 # Disconnect inactive connections
                 for connection_id in inactive_connections:
-                    logger.info(f"Cleaning up inactive connection: {connection_id}")
+                    logger.info("Cleaning up inactive connection: %s", connection_id)
                     await self.disconnect(connection_id)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in cleanup task: {e}")
+                logger.error("Error in cleanup task: %s", e)
 
     def get_connection_count(self) -> int:
         """Get total number of active connections."""
@@ -430,6 +463,10 @@ class ConnectionManager:
         """Get total number of active terminal sessions."""
         return len(self.session_connections)
 
+    def get_sync_push_count(self) -> int:
+        """Get number of connections subscribed to sync push."""
+        return sum(1 for conn in self.connections.values() if conn.sync_push)
+
 
 # Global connection manager instance
 connection_manager = ConnectionManager()
@@ -32,6 +32,11 @@ class MessageType(str, Enum):
     PING = "ping"
     PONG = "pong"
 
+    # Sync push
+    SYNC_SUBSCRIBE = "sync_subscribe"
+    SYNC_UNSUBSCRIBE = "sync_unsubscribe"
+    SYNC_CHANGES = "sync_changes"
+
 
 class TerminalMessage(BaseModel):
     """Base WebSocket terminal message."""
@@ -209,6 +214,35 @@ class HeartbeatMessage(TerminalMessage):
     )
 
 
+class SyncChangesMessage(TerminalMessage):
+    """Batch of sync item changes pushed to a subscribed device."""
+
+    type: MessageType = MessageType.SYNC_CHANGES
+    data: dict[str, Any] = Field(
+        description="Changed sync items",
+        examples=[
+            {
+                "changes": [
+                    {
+                        "sync_type": "ssh_profile",
+                        "sync_key": "ssh_profile_server1",
+                        "change_seq": 42,
+                        "version": 3,
+                        "is_deleted": False,
+                        "source_device_id": "laptop",
+                    }
+                ]
+            }
+        ],
+    )
+
+    @property
+    def changes(self) -> list[dict[str, Any]]:
+        """Get the changed items."""
+        result = self.data.get("changes", [])
+        return list(result) if isinstance(result, list) else []
+
+
 # Type alias for any parsed message
 ParsedMessage = (
     InputMessage
@@ -219,6 +253,7 @@ ParsedMessage = (
     | StatusMessage
     | ErrorMessage
     | HeartbeatMessage
+    | SyncChangesMessage
     | TerminalMessage
 )
 
@@ -253,6 +288,9 @@ def parse_message(data: dict[str, Any]) -> ParsedMessage:
         MessageType.PING: HeartbeatMessage,
         MessageType.PONG: HeartbeatMessage,
         MessageType.DISCONNECT: TerminalMessage,
+        MessageType.SYNC_SUBSCRIBE: TerminalMessage,
+        MessageType.SYNC_UNSUBSCRIBE: TerminalMessage,
+        MessageType.SYNC_CHANGES: SyncChangesMessage,
     }
 
     message_class = message_classes.get(message_type, TerminalMessage)
@@ -297,3 +335,8 @@ def create_error_message(
         session_id=session_id,
         data={"error": error, "message": message, "details": details or {}},
     )
+
+
+def create_sync_changes_message(changes: list[dict[str, Any]]) -> SyncChangesMessage:
+    """Create a sync changes message."""
+    return SyncChangesMessage(data={"changes": changes})
@@ -111,7 +111,7 @@ class PTYHandler:
                 return True
 
         except Exception as e:
-            logger.error(f"Failed to start PTY session: {e}")
+            logger.error("Failed to start PTY session: %s", e)
             await self.stop()
             return False
 
@@ -175,7 +175,7 @@ class PTYHandler:
             return True
 
         except OSError as e:
-            logger.error(f"Failed to write to PTY: {e}")
+            logger.error("Failed to write to PTY: %s", e)
             return False
 
     def resize_terminal(self, cols: int, rows: int) -> bool:
@@ -202,11 +202,11 @@ class PTYHandler:
                 if self.shell_pid:
                     os.kill(self.shell_pid, signal.SIGWINCH)
 
-            logger.debug(f"Terminal resized to {cols}x{rows}")
+            logger.debug("Terminal resized to %sx%s", cols, rows)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to resize terminal: {e}")
+            logger.error("Failed to resize terminal: %s", e)
             return False
 
     def send_signal(self, sig: str) -> bool:
@@ -235,18 +235,18 @@ class PTYHandler:
 
             signal_num = signal_map.get(sig.upper())
             if signal_num is None:
-                logger.warning(f"Unknown signal: {sig}")
+                logger.warning("Unknown signal: %s", sig)
                 return False
 
             os.kill(self.shell_pid, signal_num)
-            logger.debug(f"Sent {sig} to process {self.shell_pid}")
+            logger.debug("Sent %s to process %s", sig, self.shell_pid)
             return True
 
         except ProcessLookupError:
-            logger.warning(f"Process {self.shell_pid} not found for signal {sig}")
+            logger.warning("Process %s not found for signal %s", self.shell_pid, sig)
             return False
         except Exception as e:
-            logger.error(f"Failed to send signal {sig}: {e}")
+            logger.error("Failed to send signal %s: %s", sig, e)
             return False
 
     def _setup_child_process(self, command: str) -> NoReturn:
@@ -285,7 +285,7 @@ class PTYHandler:
                 os.execve(shell, [shell, "-l"], os.environ)
 
         except Exception as e:
-            logger.error(f"Failed to setup child process: {e}")
+            logger.error("Failed to setup child process: %s", e)
             os._exit(1)
 
     def _configure_terminal(self) -> None:
@@ -329,7 +329,7 @@ class PTYHandler:
                 termios.tcsetattr(self.slave_fd, termios.TCSANOW, attrs)
 
         except Exception as e:
-            logger.warning(f"Failed to configure terminal settings: {e}")
+            logger.warning("Failed to configure terminal settings: %s", e)
 
     async def _read_output_loop(self) -> None:
         """Continuously read output from PTY and send to callback."""
@@ -354,13 +354,13 @@ class PTYHandler:
                         logger.info("PTY process ended")
                         break
                     else:
-                        logger.error(f"PTY read error: {e}")
+                        logger.error("PTY read error: %s", e)
                         break
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Unexpected error in output loop: {e}")
+                logger.error("Unexpected error in output loop: %s", e)
                 break
 
         self._running = False
@@ -394,10 +394,10 @@ class PTYHandler:
                 output_text = data.decode("utf-8", errors="replace")
                 await self.output_callback(output_text)
             except Exception as e:
-                logger.error(f"Failed to send output via callback: {e}")
+                logger.error("Failed to send output via callback: %s", e)
 
         except Exception as e:
-            logger.error(f"Failed to process output: {e}")
+            logger.error("Failed to process output: %s", e)
 
     def _get_default_shell(self) -> str:
         """Get the default shell for the user."""
@@ -54,7 +54,7 @@ async def authenticate_websocket(
     except JWTError:
         return None
     except Exception as e:
-        logger.error(f"WebSocket authentication error: {e}")
+        logger.error("WebSocket authentication error: %s", e)
         return None
 
 
@@ -73,6 +73,7 @@ async def terminal_websocket(
     - SSH session management with PTY support
     - Terminal resizing and signal handling
     - Connection lifecycle management
+    - Push of sync changes made on the user's other devices
 
     Query Parameters:
         token: JWT authentication token (required)
@@ -129,6 +130,32 @@ async def terminal_websocket(
             "data": {"signal": "SIGINT", "key": "ctrl+c"}
         }
         ```
+
+        Sync Push (Client -> Server, then Server -> Client):
+        ```json
+        {"type": "sync_subscribe"}
+        ```
+
+        ```json
+        {
+            "type": "sync_changes",
+            "data": {
+                "changes": [
+                    {
+                        "sync_type": "ssh_profile",
+                        "sync_key": "ssh_profile_server1",
+                        "change_seq": 42,
+                        "version": 3,
+                        "is_deleted": false,
+                        "source_device_id": "laptop"
+                    }
+                ]
+            }
+        }
+        ```
+
+        Changes made by other devices are pushed in batches; the device
+        then pulls them from the sync API with its cursor.
     """
     connection_id = None
 
@@ -187,7 +214,7 @@ async def terminal_websocket(
                 except Exception:
                     break  # Connection likely broken
             except Exception as e:
-                logger.error(f"Error in WebSocket message loop {connection_id}: {e}")
+                logger.error("Error in WebSocket message loop %s: %s", connection_id, e)
                 # Try to send error message
                 try:
                     error_msg = create_error_message(
@@ -198,7 +225,7 @@ async def terminal_websocket(
                     break  # Connection likely broken
 
     except Exception as e:
-        logger.error(f"WebSocket connection error: {e}")
+        logger.error("WebSocket connection error: %s", e)
         with contextlib.suppress(Exception):
             await websocket.close(
                 code=status.WS_1011_INTERNAL_ERROR,
@@ -223,13 +250,14 @@ async def websocket_stats() -> dict:
         stats = {
             "active_connections": connection_manager.get_connection_count(),
             "active_sessions": connection_manager.get_session_count(),
+            "sync_push_connections": connection_manager.get_sync_push_count(),
             "uptime": "active",  # Could be enhanced with actual uptime tracking
         }
 
         return {"status": "success", "data": stats}
 
     except Exception as e:
-        logger.error(f"Failed to get WebSocket stats: {e}")
+        logger.error("Failed to get WebSocket stats: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get WebSocket statistics",
@@ -0,0 +1,220 @@
+"""
+Shell integration parsing for terminal output streams.
+
+Shells configured for shell integration emit OSC 133 ("FinalTerm") marks
+around each prompt and command::
+
+    ESC ] 133 ; A ST      prompt start
+    ESC ] 133 ; B ST      prompt end, command input starts
+    ESC ] 133 ; C ST      command submitted, output starts
+    ESC ] 133 ; D ; n ST  command finished with exit code n
+
+The VS Code variant (OSC 633) additionally reports the exact command line
+(``633 ; E``) and the working directory (``633 ; P ; Cwd=``); OSC 7 reports
+the working directory as a ``file://`` URL. The parser below consumes raw
+output chunks incrementally and yields a record per finished command. Marks
+are left in the stream, since terminal emulators ignore them or use them
+themselves.
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from urllib.parse import unquote, urlparse
+
+# OSC introducer and terminators (BEL or ESC \)
+OSC_START = "\x1b]"
+BEL = "\x07"
+ST = "\x1b\\"
+
+# Caps protecting against malformed or hostile streams
+MAX_PENDING_LENGTH = 4096
+MAX_COMMAND_LENGTH = 4096
+
+_ANSI_ESCAPE_RE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|[@-_])")
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")
+_VSCODE_ESCAPE_RE = re.compile(r"\\x([0-9a-fA-F]{2})|\\\\")
+
+
+@dataclass(frozen=True)
+class CapturedCommand:
+    """A command observed through shell integration marks."""
+
+    command: str
+    exit_code: int | None
+    started_at: datetime
+    completed_at: datetime
+    execution_time: float
+    working_directory: str | None = None
+
+
+def _clean_echo(text: str) -> str:
+    """Recover a command line from the terminal echo of typed input."""
+    text = _ANSI_ESCAPE_RE.sub("", text)
+
+    # Apply backspaces the way the terminal rendered them
+    if "\b" in text or "\x7f" in text:
+        chars: list[str] = []
+        for char in text:
+            if char in "\b\x7f":
+                if chars:
+                    chars.pop()
+            else:
+                chars.append(char)
+        text = "".join(chars)
+
+    return _CONTROL_RE.sub("", text.replace("\r", "").replace("\n", " ")).strip()
+
+
+def _unescape_vscode(value: str) -> str:
+    """Decode the escaping used by OSC 633 property values."""
+    return _VSCODE_ESCAPE_RE.sub(
+        lambda m: chr(int(m.group(1), 16)) if m.group(1) else "\\", value
+    )
+
+
+class ShellIntegrationParser:
+    """Incremental parser turning shell integration marks into commands."""
+
+    IDLE = "idle"
+    PROMPT = "prompt"
+    INPUT = "input"
+    RUNNING = "running"
+
+    def __init__(self) -> None:
+        self.state = self.IDLE
+        self.cwd: str | None = None
+        self._pending = ""
+        self._echo: list[str] = []
+        self._echo_length = 0
+        self._command_line: str | None = None
+        self._command: str | None = None
+        self._started_at: datetime | None = None
+        self._started_monotonic = 0.0
+        self._finished: list[CapturedCommand] = []
+
+    def feed(self, data: str) -> list[CapturedCommand]:
+        """
+        Consume a chunk of terminal output.
+
+        Args:
+            data: Raw output chunk, possibly splitting escape sequences
+
+        Returns:
+            Commands that finished within this chunk
+        """
+        if self._pending:
+            data = self._pending + data
+            self._pending = ""
+
+        # Fast path: plain output with no marks to look at
+        if OSC_START not in data and not data.endswith("\x1b"):
+            if self.state == self.INPUT:
+                self._add_echo(data)
+            return []
+
+        position = 0
+        while True:
+            start = data.find(OSC_START, position)
+            if start == -1:
+                tail = data[position:]
+                if tail.endswith("\x1b"):
+                    self._pending = "\x1b"
+                    tail = tail[:-1]
+                if self.state == self.INPUT:
+                    self._add_echo(tail)
+                break
+
+            if self.state == self.INPUT:
+                self._add_echo(data[position:start])
+
+            end, terminator = self._find_terminator(data, start + 2)
+            if end == -1:
+                # Sequence continues in the next chunk
+                if len(data) - start <= MAX_PENDING_LENGTH:
+                    self._pending = data[start:]
+                break
+
+            self._handle_osc(data[start + 2 : end])
+            position = end + len(terminator)
+
+        finished, self._finished = self._finished, []
+        return finished
+
+    @staticmethod
+    def _find_terminator(data: str, offset: int) -> tuple[int, str]:
+        """Find the earliest OSC terminator at or after offset."""
+        bel = data.find(BEL, offset)
+        st = data.find(ST, offset)
+        if bel == -1:
+            return st, ST
+        if st == -1 or bel < st:
+            return bel, BEL
+        return st, ST
+
+    def _add_echo(self, text: str) -> None:
+        """Buffer echoed command input, bounded in size."""
+        if text and self._echo_length < MAX_COMMAND_LENGTH:
+            self._echo.append(text)
+            self._echo_length += len(text)
+
+    def _handle_osc(self, body: str) -> None:
+        """Dispatch a complete OSC sequence body."""
+        ident, _, rest = body.partition(";")
+
+        if ident in ("133", "633"):
+            mark, _, args = rest.partition(";")
+            self._handle_mark(mark, args)
+        elif ident == "7" and rest:
+            path = unquote(urlparse(rest).path)
+            if path:
+                self.cwd = path
+
+    def _handle_mark(self, mark: str, args: str) -> None:
+        """Advance the command state machine for a single mark."""
+        if mark == "A":
+            self.state = self.PROMPT
+        elif mark == "B":
+            self.state = self.INPUT
+            self._echo.clear()
+            self._echo_length = 0
+            self._command_line = None
+        elif mark == "E":
+            self._command_line = _unescape_vscode(args.split(";", 1)[0])
+        elif mark == "P" and args.startswith("Cwd="):
+            self.cwd = _unescape_vscode(args[4:])
+        elif mark == "C":
+            command = self._command_line
+            if command is None:
+                command = _clean_echo("".join(self._echo))
+            self._command = command[:MAX_COMMAND_LENGTH].strip() or None
+            self._started_at = datetime.now(UTC)
+            self._started_monotonic = time.monotonic()
+            self.state = self.RUNNING
+        elif mark == "D":
+            if self.state == self.RUNNING and self._command:
+                self._finish(args)
+            self.state = self.IDLE
+            self._command = None
+
+    def _finish(self, args: str) -> None:
+        """Record the running command as finished."""
+        exit_code: int | None
+        try:
+            exit_code = int(args.split(";", 1)[0]) if args else None
+        except ValueError:
+            exit_code = None
+
+        duration = time.monotonic() - self._started_monotonic
+        started_at = self._started_at or datetime.now(UTC)
+        self._finished.append(
+            CapturedCommand(
+                command=self._command or "",
+                exit_code=exit_code,
+                started_at=started_at,
+                completed_at=started_at + timedelta(seconds=duration),
+                execution_time=duration,
+                working_directory=self.cwd,
+            )
+        )
@@ -13,6 +13,7 @@ import paramiko
 from paramiko import Channel, SSHClient
 
 from app.core.logging import logger
+from app.core.metrics import ssh_connect_duration, ssh_connects, track_call
 from app.models.ssh_profile import SSHKey, SSHProfile
 from app.services.ssh_client import SSHClientService
 
@@ -123,10 +124,11 @@ class SSHHandler:
                 raise RuntimeError("SSH client not initialized")
 
             loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: self.ssh_client.connect(**connect_params),  # type: ignore[union-attr]
-            )
+            with track_call(ssh_connects, ssh_connect_duration, "terminal"):
+                await loop.run_in_executor(
+                    None,
+                    lambda: self.ssh_client.connect(**connect_params),  # type: ignore[union-attr]
+                )
 
             # Get server information
             transport = self.ssh_client.get_transport()
@@ -154,7 +156,7 @@ class SSHHandler:
             )
             self._output_thread.start()
 
-            logger.info(f"SSH connection established: {self.ssh_profile.host}")
+            logger.info("SSH connection established: %s", self.ssh_profile.host)
 
             return {
                 "success": True,
@@ -163,7 +165,7 @@ class SSHHandler:
             }
 
         except paramiko.AuthenticationException as e:
-            logger.warning(f"SSH authentication failed: {e}")
+            logger.warning("SSH authentication failed: %s", e)
             await self.disconnect()
             return {
                 "success": False,
@@ -171,7 +173,7 @@ class SSHHandler:
                 "error": "authentication_failed",
             }
         except paramiko.SSHException as e:
-            logger.warning(f"SSH connection failed: {e}")
+            logger.warning("SSH connection failed: %s", e)
             await self.disconnect()
             return {
                 "success": False,
@@ -179,7 +181,7 @@ class SSHHandler:
                 "error": "connection_failed",
             }
         except Exception as e:
-            logger.error(f"Unexpected SSH connection error: {e}")
+            logger.error("Unexpected SSH connection error: %s", e)
             await self.disconnect()
             return {
                 "success": False,
@@ -202,7 +204,7 @@ class SSHHandler:
             try:
                 self.ssh_channel.close()
             except Exception as e:
-                logger.warning(f"Error closing SSH channel: {e}")
+                logger.warning("Error closing SSH channel: %s", e)
             self.ssh_channel = None
 
         # Close SSH client
@@ -210,10 +212,10 @@ class SSHHandler:
             try:
                 self.ssh_client.close()
             except Exception as e:
-                logger.warning(f"Error closing SSH client: {e}")
+                logger.warning("Error closing SSH client: %s", e)
             self.ssh_client = None
 
-        logger.info(f"SSH session disconnected: {self.ssh_profile.host}")
+        logger.info("SSH session disconnected: %s", self.ssh_profile.host)
 
     async def write_input(self, data: str) -> bool:
         """
@@ -234,7 +236,7 @@ class SSHHandler:
             return bool(bytes_sent and bytes_sent > 0)
 
         except Exception as e:
-            logger.error(f"Failed to send SSH input: {e}")
+            logger.error("Failed to send SSH input: %s", e)
             return False
 
     async def resize_terminal(self, cols: int, rows: int) -> bool:
@@ -258,11 +260,11 @@ class SSHHandler:
             # Resize SSH channel terminal
             self.ssh_channel.resize_pty(cols, rows)
 
-            logger.debug(f"SSH terminal resized to {cols}x{rows}")
+            logger.debug("SSH terminal resized to %sx%s", cols, rows)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to resize SSH terminal: {e}")
+            logger.error("Failed to resize SSH terminal: %s", e)
             return False
 
     def send_signal(self, signal_name: str) -> bool:
@@ -290,14 +292,14 @@ class SSHHandler:
             sequence = signal_sequences.get(signal_name.upper())
             if sequence:
                 self.ssh_channel.send(sequence)
-                logger.debug(f"Sent {signal_name} signal via key sequence")
+                logger.debug("Sent %s signal via key sequence", signal_name)
                 return True
             else:
-                logger.warning(f"No key sequence mapping for signal: {signal_name}")
+                logger.warning("No key sequence mapping for signal: %s", signal_name)
                 return False
 
         except Exception as e:
-            logger.error(f"Failed to send signal {signal_name}: {e}")
+            logger.error("Failed to send signal %s: %s", signal_name, e)
             return False
 
     async def _create_shell_channel(self) -> None:
@@ -334,7 +336,7 @@ class SSHHandler:
                                 asyncio.get_event_loop(),
                             )
                         except Exception as e:
-                            logger.error(f"Failed to process SSH output: {e}")
+                            logger.error("Failed to process SSH output: %s", e)
                     else:
                         # Channel closed
                         logger.info("SSH channel closed by remote host")
@@ -357,7 +359,7 @@ class SSHHandler:
 
             except Exception as e:
                 if self._running:  # Only log if we're supposed to be running
-                    logger.error(f"SSH output reading error: {e}")
+                    logger.error("SSH output reading error: %s", e)
                 break
 
         logger.debug("SSH output reading loop ended")
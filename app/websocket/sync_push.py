@@ -0,0 +1,122 @@
+"""
+Sync push for terminal WebSocket connections.
+
+A device that sends ``sync_subscribe`` on its terminal WebSocket is told
+about committed changes to its user's sync items as they happen instead of
+polling the sync endpoint. Notifications arrive through the worker's shared
+pub/sub router and are coalesced per connection: changes to the same item
+collapse into the latest one, and a batch is sent once the debounce window
+closes or enough changes are pending. Changes made by the device itself are
+not echoed back.
+"""
+
+import asyncio
+import contextlib
+from typing import TYPE_CHECKING, Any
+
+from app.api.sync.services.pubsub_manager import PubSubManager
+from app.core.config import settings
+from app.core.logging import logger
+
+from .protocols import create_sync_changes_message
+
+if TYPE_CHECKING:
+    from .manager import Connection
+
+
+class SyncPushSubscription:
+    """Batches sync change notifications for one connection."""
+
+    def __init__(
+        self,
+        connection: "Connection",
+        pubsub_manager: PubSubManager | None = None,
+        debounce_seconds: float | None = None,
+        max_batch: int | None = None,
+    ):
+        self.connection = connection
+        self.pubsub_manager = pubsub_manager or PubSubManager()
+        self.debounce_seconds = (
+            debounce_seconds
+            if debounce_seconds is not None
+            else settings.sync_push_debounce_ms / 1000
+        )
+        self.max_batch = max_batch or settings.sync_push_max_batch
+
+        # (sync_type, sync_key) -> latest change
+        self._pending: dict[tuple[str, str], dict[str, Any]] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._flush_now = asyncio.Event()
+
+        # Metrics
+        self.batches_sent = 0
+        self.changes_sent = 0
+
+    async def start(self) -> None:
+        """Start receiving the user's sync notifications."""
+        await self.pubsub_manager.subscribe_user_sync(
+            self.connection.user_id, self.on_message
+        )
+
+    async def stop(self) -> None:
+        """Stop receiving notifications and drop anything still pending."""
+        await self.pubsub_manager.close()
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flush_task
+        self._flush_task = None
+        self._pending.clear()
+
+    def on_message(self, message: dict[str, Any]) -> None:
+        """Queue the changes of a pub/sub message (router listener)."""
+        if message.get("type") != "sync_changes":
+            return
+
+        for change in message.get("changes", []):
+            if change.get("source_device_id") == self.connection.device_id:
+                continue
+            self._pending[(change.get("sync_type"), change.get("sync_key"))] = change
+
+        if not self._pending:
+            return
+        if len(self._pending) >= self.max_batch:
+            self._flush_now.set()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_pending())
+
+    async def _flush_pending(self) -> None:
+        """Send batches until nothing is pending."""
+        while self._pending:
+            # Wait out the debounce window unless a full batch is waiting
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._flush_now.wait(), self.debounce_seconds)
+            self._flush_now.clear()
+            await self.flush()
+
+    async def flush(self) -> bool:
+        """
+        Send every pending change in one message.
+
+        Returns:
+            False if the send failed
+        """
+        if not self._pending:
+            return True
+
+        changes = sorted(
+            self._pending.values(), key=lambda change: change.get("change_seq", 0)
+        )
+        self._pending.clear()
+
+        sent = await self.connection.send_message(create_sync_changes_message(changes))
+        if sent:
+            self.batches_sent += 1
+            self.changes_sent += len(changes)
+        else:
+            logger.debug(
+                "Dropped %d sync changes for connection %s",
+                len(changes),
+                self.connection.connection_id,
+            )
+        return sent
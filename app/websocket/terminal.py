@@ -10,16 +10,20 @@ from typing import TYPE_CHECKING
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.logging import logger
+from app.repositories.base import unit_of_work
 from app.repositories.session import SessionRepository
 from app.repositories.ssh_profile import SSHProfileRepository
 
+from .command_recorder import command_recorder
 from .protocols import (
     create_error_message,
     create_output_message,
     create_status_message,
 )
 from .pty_handler import PTYHandler
+from .shell_integration import ShellIntegrationParser
 from .ssh_handler import SSHHandler
 
 if TYPE_CHECKING:
@@ -70,11 +74,18 @@ class TerminalSession:
         # Terminal configuration
         self.rows = 24
         self.cols = 80
+        # Resized since the size was last written to the database
+        self._size_changed = False
 
         # Database models
         self.db_session: Session | None = None
         self.ssh_profile: SSHProfile | None = None
 
+        # Command capture from shell integration marks
+        self.shell_parser = (
+            ShellIntegrationParser() if settings.command_capture_enabled else None
+        )
+
     async def start(self) -> bool:
         """
         Start the terminal session.
@@ -89,7 +100,7 @@ class TerminalSession:
                 self.db_session = await session_repo.get(self.session_id)
 
                 if not self.db_session:
-                    logger.error(f"Session not found: {self.session_id}")
+                    logger.error("Session not found: %s", self.session_id)
                     return False
 
                 # Get terminal dimensions
@@ -104,7 +115,7 @@ class TerminalSession:
                 return await self._start_pty_session()
 
         except Exception as e:
-            logger.error(f"Failed to start terminal session {self.session_id}: {e}")
+            logger.error("Failed to start terminal session %s: %s", self.session_id, e)
             await self._send_error("session_start_failed", str(e))
             return False
 
@@ -121,21 +132,28 @@ class TerminalSession:
             await self.pty_handler.stop()
             self.pty_handler = None
 
-        # Update database session
+        # End the database session, with the final terminal size, in one commit
         if self.db_session and self.db:
             try:
-                session_repo = SessionRepository(self.db)
-                self.db_session.end_session()
-                await session_repo.update(
-                    self.db_session,  # Pass the session object instead of just ID
-                    is_active=False,
-                    ended_at=datetime.now(),
+                size = (
+                    {"terminal_cols": self.cols, "terminal_rows": self.rows}
+                    if self._size_changed
+                    else {}
                 )
-                await self.db.commit()
+                async with unit_of_work(self.db):
+                    session_repo = SessionRepository(self.db)
+                    self.db_session.end_session()
+                    await session_repo.update(
+                        self.db_session,  # Pass the session object instead of just ID
+                        is_active=False,
+                        ended_at=datetime.now(),
+                        **size,
+                    )
+                self._size_changed = False
             except Exception as e:
-                logger.error(f"Failed to update session in database: {e}")
+                logger.error("Failed to update session in database: %s", e)
 
-        logger.info(f"Terminal session stopped: {self.session_id}")
+        logger.info("Terminal session stopped: %s", self.session_id)
 
     async def handle_input(self, data: str) -> None:
         """
@@ -165,7 +183,7 @@ class TerminalSession:
                 )
 
         except Exception as e:
-            logger.error(f"Failed to handle input in session {self.session_id}: {e}")
+            logger.error("Failed to handle input in session %s: %s", self.session_id, e)
             await self._send_error("input_error", str(e))
 
     async def handle_resize(self, cols: int, rows: int) -> None:
@@ -190,18 +208,9 @@ class TerminalSession:
             elif self.pty_handler:
                 success = self.pty_handler.resize_terminal(cols, rows)
 
-            # Update database
-            if self.db_session and self.db:
-                try:
-                    session_repo = SessionRepository(self.db)
-                    await session_repo.update(
-                        self.db_session,  # Pass the session object instead of just ID
-                        terminal_cols=cols,
-                        terminal_rows=rows,
-                    )
-                    await self.db.commit()
-                except Exception as e:
-                    logger.warning(f"Failed to update terminal size in database: {e}")
+            # Resizes arrive in bursts while a window is dragged; the final
+            # size is written when the session ends instead of once per event
+            self._size_changed = True
 
             if success:
                 logger.debug(
@@ -211,7 +220,9 @@ class TerminalSession:
                 await self._send_error("resize_failed", "Failed to resize terminal")
 
         except Exception as e:
-            logger.error(f"Failed to handle resize in session {self.session_id}: {e}")
+            logger.error(
+                "Failed to handle resize in session %s: %s", self.session_id, e
+            )
             await self._send_error("resize_error", str(e))
 
     async def handle_signal(self, signal_name: str) -> None:
@@ -233,14 +244,18 @@ class TerminalSession:
                 success = self.pty_handler.send_signal(signal_name)
 
             if success:
-                logger.debug(f"Signal {signal_name} sent to session {self.session_id}")
+                logger.debug(
+                    "Signal %s sent to session %s", signal_name, self.session_id
+                )
             else:
                 logger.warning(
                     f"Failed to send signal {signal_name} to session {self.session_id}"
                 )
 
         except Exception as e:
-            logger.error(f"Failed to handle signal in session {self.session_id}: {e}")
+            logger.error(
+                "Failed to handle signal in session %s: %s", self.session_id, e
+            )
 
     async def _start_ssh_session(self) -> bool:
         """Start an SSH terminal session."""
@@ -289,15 +304,15 @@ class TerminalSession:
 
             # Update database session with SSH details
             if self.db_session:
-                session_repo = SessionRepository(self.db)
-                await session_repo.update(
-                    self.db_session,  # Pass the session object instead of just ID
-                    ssh_host=self.ssh_profile.host,
-                    ssh_port=self.ssh_profile.port,
-                    ssh_username=self.ssh_profile.username,
-                    session_type="ssh",
-                )
-                await self.db.commit()
+                async with unit_of_work(self.db):
+                    session_repo = SessionRepository(self.db)
+                    await session_repo.update(
+                        self.db_session,  # Pass the session object instead of just ID
+                        ssh_host=self.ssh_profile.host,
+                        ssh_port=self.ssh_profile.port,
+                        ssh_username=self.ssh_profile.username,
+                        session_type="ssh",
+                    )
 
             self._running = True
 
@@ -308,11 +323,11 @@ class TerminalSession:
                 connect_result.get("server_info", {}),
             )
 
-            logger.info(f"SSH session started: {self.session_id}")
+            logger.info("SSH session started: %s", self.session_id)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to start SSH session {self.session_id}: {e}")
+            logger.error("Failed to start SSH session %s: %s", self.session_id, e)
             await self._send_error("ssh_session_failed", str(e))
             return False
 
@@ -338,11 +353,11 @@ class TerminalSession:
             # Send success status
             await self._send_status("connected", "Terminal session started")
 
-            logger.info(f"PTY session started: {self.session_id}")
+            logger.info("PTY session started: %s", self.session_id)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to start PTY session {self.session_id}: {e}")
+            logger.error("Failed to start PTY session %s: %s", self.session_id, e)
             await self._send_error("pty_session_failed", str(e))
             return False
 
@@ -364,8 +379,15 @@ class TerminalSession:
             if self.db_session:
                 self.db_session.update_activity()
 
+                # Record finished commands (write-behind, no DB work here)
+                if self.shell_parser:
+                    for captured in self.shell_parser.feed(data):
+                        command_recorder.record(self.session_id, captured)
+
         except Exception as e:
-            logger.error(f"Failed to handle output in session {self.session_id}: {e}")
+            logger.error(
+                "Failed to handle output in session %s: %s", self.session_id, e
+            )
 
     async def _send_status(
         self,
@@ -380,7 +402,7 @@ class TerminalSession:
             )
             await self.connection.send_message(status_msg)
         except Exception as e:
-            logger.error(f"Failed to send status message: {e}")
+            logger.error("Failed to send status message: %s", e)
 
     async def _send_error(self, error: str, message: str) -> None:
         """Send error message to client."""
@@ -388,7 +410,7 @@ class TerminalSession:
             error_msg = create_error_message(error, message, session_id=self.session_id)
             await self.connection.send_message(error_msg)
         except Exception as e:
-            logger.error(f"Failed to send error message: {e}")
+            logger.error("Failed to send error message: %s", e)
 
     @property
     def is_running(self) -> bool:
@@ -2,36 +2,51 @@
 Main FastAPI application for DevPocket API.
 """
 
+import secrets
 from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import partial
 
 import redis.asyncio as aioredis
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app.api.admin import router as admin_router
 from app.api.ai import router as ai_router
 from app.api.commands import router as commands_router
 from app.api.profile import router as profile_router
 from app.api.sessions import router as sessions_router
 from app.api.ssh import router as ssh_router
 from app.api.sync import router as sync_router
+from app.api.sync.services.presence import device_presence
+from app.api.sync.services.pubsub_manager import pubsub_router
+from app.auth.attempt_tracker import auth_attempts
+from app.auth.password_hasher import password_hasher
+from app.auth.revocation import revocation_list
 from app.auth.router import router as auth_router
 from app.auth.security import set_redis_client
 from app.core.config import settings
 from app.core.logging import log_error, logger
+from app.core.metrics import instrument_redis, metrics
+from app.core.principal_cache import principal_cache
 from app.db.database import (
     check_database_connection,
     db_manager,
     init_database,
 )
+from app.db.query_insights import query_insights
 from app.middleware import (
     AuthenticationMiddleware,
+    MetricsMiddleware,
     RateLimitMiddleware,
     SecurityHeadersMiddleware,
     setup_cors,
 )
+from app.middleware.rate_limit import rate_limiter
+from app.services.retention import partition_worker, retention_worker
 from app.websocket import websocket_router
+from app.websocket.command_recorder import command_recorder
 from app.websocket.manager import connection_manager
 
 
@@ -61,6 +76,8 @@ async def lifespan(app: FastAPI):
             max_connections=20,
         )
 
+        instrument_redis(app.state.redis)
+
         # Test Redis connection
         await app.state.redis.ping()
         logger.info("Redis connection established")
@@ -71,10 +88,39 @@ async def lifespan(app: FastAPI):
         # Set Redis client for WebSocket connection manager
         connection_manager.redis = app.state.redis
 
+        # Listen for principal cache invalidations from other workers
+        await principal_cache.start(app.state.redis)
+
+        # One shared pub/sub subscription for sync and device notifications
+        await pubsub_router.start(app.state.redis)
+
+        # Track device heartbeats in Redis and trim stale ones
+        await device_presence.start(app.state.redis)
+
+        # Share rate limits and failed-login counters across workers
+        if settings.rate_limit_backend == "redis":
+            rate_limiter.set_redis_client(app.state.redis)
+            auth_attempts.set_redis_client(app.state.redis)
+
+        # Load the token revocation filter and follow new revocations
+        await revocation_list.start(app.state.redis)
+
+        # Capture plans of sampled slow queries off the request path
+        if query_insights.enabled:
+            await query_insights.start(partial(db_manager.acquire, read_only=True))
+
         # Initialize database tables if needed
         if settings.app_debug:
             await init_database()
 
+        # Keep upcoming command partitions in place, independent of retention
+        await partition_worker.start()
+
+        # Start data retention worker
+        if settings.retention_enabled:
+            await retention_worker.start()
+            logger.info("Retention worker started")
+
         logger.info("Application startup completed successfully")
 
     except Exception as e:
@@ -90,11 +136,36 @@ async def lifespan(app: FastAPI):
         # Stop WebSocket connection manager background tasks
         await connection_manager.stop_background_tasks()
 
+        # Write any captured commands still queued
+        await command_recorder.stop()
+
+        # Stop data retention and partition workers
+        await retention_worker.stop()
+        await partition_worker.stop()
+
+        # Stop principal cache invalidation listener
+        await principal_cache.stop()
+
+        # Close the shared sync pub/sub subscription
+        await pubsub_router.stop()
+
+        # Stop trimming device heartbeats
+        await device_presence.stop()
+
+        # Stop following token revocations
+        await revocation_list.stop()
+
         # Close Redis connection
         if hasattr(app.state, "redis"):
             await app.state.redis.close()
             logger.info("Redis connection closed")
 
+        # Stop password hashing workers
+        password_hasher.shutdown()
+
+        # Stop capturing slow-query plans
+        await query_insights.stop()
+
         # Close database connections
         await db_manager.disconnect()
 
@@ -169,6 +240,10 @@ def setup_middleware(app: FastAPI) -> None:
             ],
         )
 
+    # Metrics middleware (outermost, so latency covers the whole stack)
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+
     logger.info("Middleware configured successfully")
 
 
@@ -266,6 +341,28 @@ def setup_routes(app: FastAPI) -> None:
                 },
             )
 
+    if settings.metrics_enabled:
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics_endpoint(request: Request):
+            """Metrics in the Prometheus text exposition format."""
+            if not settings.metrics_token:
+                if not settings.app_debug:
+                    raise HTTPException(status_code=404, detail="Not Found")
+            elif not secrets.compare_digest(
+                request.headers.get("authorization", ""),
+                f"Bearer {settings.metrics_token}",
+            ):
+                raise HTTPException(
+                    status_code=401,
+                    detail="Invalid metrics token",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+
+            return PlainTextResponse(
+                metrics.render(), media_type="text/plain; version=0.0.4"
+            )
+
     # Include authentication routes
     app.include_router(auth_router)
 
@@ -276,6 +373,7 @@ def setup_routes(app: FastAPI) -> None:
     app.include_router(ai_router)
     app.include_router(sync_router)
     app.include_router(profile_router)
+    app.include_router(admin_router)
 
     # Include WebSocket router
     app.include_router(websocket_router)
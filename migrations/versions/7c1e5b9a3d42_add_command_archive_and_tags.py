@@ -0,0 +1,53 @@
+"""add command archive and tags
+
+Revision ID: 7c1e5b9a3d42
+Revises: 546754fe9bea
+Create Date: 2025-08-20 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1e5b9a3d42"
+down_revision: Union[str, None] = "546754fe9bea"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    """Check if a column exists in a table."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def upgrade() -> None:
+    """Add archive flag and tags to commands (idempotent)."""
+    if not column_exists("commands", "is_archived"):
+        op.add_column(
+            "commands",
+            sa.Column(
+                "is_archived",
+                sa.Boolean(),
+                nullable=False,
+                server_default="false",
+            ),
+        )
+        op.create_index(
+            op.f("ix_commands_is_archived"), "commands", ["is_archived"]
+        )
+
+    if not column_exists("commands", "tags"):
+        op.add_column("commands", sa.Column("tags", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove archive flag and tags from commands."""
+    op.drop_column("commands", "tags")
+    op.drop_index(op.f("ix_commands_is_archived"), table_name="commands")
+    op.drop_column("commands", "is_archived")
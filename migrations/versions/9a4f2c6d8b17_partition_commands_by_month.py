@@ -0,0 +1,141 @@
+"""partition commands by month
+
+Revision ID: 9a4f2c6d8b17
+Revises: 7c1e5b9a3d42
+Create Date: 2025-08-22 10:00:00.000000
+
+Converts ``commands`` into a table range-partitioned on ``created_at`` with
+one partition per month and a DEFAULT partition. Partitioned tables require
+the partition key in every unique constraint, so the primary key becomes
+``(id, created_at)``; ``id`` stays a random UUID and is still unique in
+practice. No other table references ``commands``, so no foreign keys need
+to change. Future partitions are created by PartitionWorker
+(app/services/retention.py).
+
+"""
+
+from datetime import UTC, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4f2c6d8b17"
+down_revision: Union[str, None] = "7c1e5b9a3d42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMAKE_MONTHS = 3
+
+
+def is_partitioned(table_name: str) -> bool:
+    """Check if a table is already partitioned."""
+    bind = op.get_bind()
+    return bool(
+        bind.execute(
+            sa.text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = :table AND pg_table_is_visible(c.oid))"
+            ),
+            {"table": table_name},
+        ).scalar()
+    )
+
+
+def table_indexes(table_name: str) -> list[str]:
+    """Get CREATE INDEX statements for a table's non-constraint indexes."""
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            "SELECT indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = :table "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint)"
+        ),
+        {"table": table_name},
+    )
+    return [row[0] for row in rows]
+
+
+def month_start(value: datetime) -> datetime:
+    """Get the first instant of the month containing value (UTC)."""
+    value = value.astimezone(UTC) if value.tzinfo else value.replace(tzinfo=UTC)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Shift a month-start datetime by a number of months."""
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def upgrade() -> None:
+    """Convert commands into a monthly range-partitioned table (idempotent)."""
+    if is_partitioned("commands"):
+        return
+
+    bind = op.get_bind()
+    indexes = table_indexes("commands")
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM commands")).scalar()
+
+    op.execute("ALTER TABLE commands RENAME TO commands_unpartitioned")
+    op.execute(
+        "ALTER TABLE commands_unpartitioned "
+        "RENAME CONSTRAINT commands_pkey TO commands_unpartitioned_pkey"
+    )
+    op.execute(
+        "CREATE TABLE commands (LIKE commands_unpartitioned "
+        "INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER TABLE commands ADD PRIMARY KEY (id, created_at)")
+    op.execute(
+        "ALTER TABLE commands ADD CONSTRAINT commands_session_id_fkey "
+        "FOREIGN KEY (session_id) REFERENCES sessions (id) ON DELETE CASCADE"
+    )
+
+    # One partition per month from the oldest row to a few months ahead
+    current = month_start(datetime.now(UTC))
+    month = month_start(oldest) if oldest else current
+    last = add_months(current, PREMAKE_MONTHS)
+    while month <= last:
+        upper = add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE commands_p{month.year:04d}{month.month:02d} "
+            f"PARTITION OF commands FOR VALUES "
+            f"FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+    op.execute("CREATE TABLE commands_default PARTITION OF commands DEFAULT")
+
+    op.execute("INSERT INTO commands SELECT * FROM commands_unpartitioned")
+    op.execute("DROP TABLE commands_unpartitioned")
+
+    # Recreate secondary indexes on the parent; they cascade to partitions
+    for indexdef in indexes:
+        op.execute(indexdef)
+
+
+def downgrade() -> None:
+    """Convert commands back into a regular table."""
+    if not is_partitioned("commands"):
+        return
+
+    indexes = table_indexes("commands")
+
+    op.execute("ALTER TABLE commands RENAME TO commands_partitioned")
+    op.execute(
+        "CREATE TABLE commands (LIKE commands_partitioned "
+        "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute("INSERT INTO commands SELECT * FROM commands_partitioned")
+    op.execute("DROP TABLE commands_partitioned CASCADE")
+    op.execute("ALTER TABLE commands ADD CONSTRAINT commands_pkey PRIMARY KEY (id)")
+    op.execute(
+        "ALTER TABLE commands ADD CONSTRAINT commands_session_id_fkey "
+        "FOREIGN KEY (session_id) REFERENCES sessions (id) ON DELETE CASCADE"
+    )
+
+    for indexdef in indexes:
+        op.execute(indexdef.replace("ON ONLY ", "ON "))
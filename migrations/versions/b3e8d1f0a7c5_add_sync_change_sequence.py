@@ -0,0 +1,101 @@
+"""add sync change sequence
+
+Revision ID: b3e8d1f0a7c5
+Revises: 9a4f2c6d8b17
+Create Date: 2025-08-25 10:00:00.000000
+
+Adds a per-user change sequence for delta sync. ``sync_sequences`` holds
+each user's counter and ``sync_data.change_seq`` the position of an item's
+latest change. Existing rows are numbered per user in ``last_modified_at``
+order and the counters start after them.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e8d1f0a7c5"
+down_revision: Union[str, None] = "9a4f2c6d8b17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    """Check if a column exists in a table."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists."""
+    bind = op.get_bind()
+    return sa.inspect(bind).has_table(table_name)
+
+
+def upgrade() -> None:
+    """Add the change sequence and backfill it (idempotent)."""
+    if not table_exists("sync_sequences"):
+        op.create_table(
+            "sync_sequences",
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column(
+                "last_value", sa.BigInteger(), nullable=False, server_default="0"
+            ),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("user_id"),
+        )
+
+    if not column_exists("sync_data", "change_seq"):
+        op.add_column(
+            "sync_data",
+            sa.Column(
+                "change_seq", sa.BigInteger(), nullable=False, server_default="0"
+            ),
+        )
+
+        # Number existing changes per user in modification order
+        op.execute(
+            """
+            UPDATE sync_data SET change_seq = numbered.seq
+            FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY user_id ORDER BY last_modified_at, id
+                ) AS seq
+                FROM sync_data
+            ) AS numbered
+            WHERE sync_data.id = numbered.id
+            """
+        )
+        op.execute(
+            """
+            INSERT INTO sync_sequences (user_id, last_value)
+            SELECT user_id, max(change_seq) FROM sync_data GROUP BY user_id
+            ON CONFLICT (user_id) DO UPDATE SET last_value = EXCLUDED.last_value
+            """
+        )
+
+        op.create_index(
+            "idx_sync_data_user_change_seq",
+            "sync_data",
+            ["user_id", "change_seq"],
+            unique=True,
+        )
+        op.create_index(
+            "idx_sync_data_user_modified",
+            "sync_data",
+            ["user_id", "last_modified_at"],
+        )
+
+
+def downgrade() -> None:
+    """Remove the change sequence."""
+    op.drop_index("idx_sync_data_user_modified", table_name="sync_data")
+    op.drop_index("idx_sync_data_user_change_seq", table_name="sync_data")
+    op.drop_column("sync_data", "change_seq")
+    op.drop_table("sync_sequences")
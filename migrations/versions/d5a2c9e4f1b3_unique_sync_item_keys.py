@@ -0,0 +1,50 @@
+"""unique sync item keys
+
+Revision ID: d5a2c9e4f1b3
+Revises: b3e8d1f0a7c5
+Create Date: 2025-08-26 10:00:00.000000
+
+Adds a unique index on ``sync_data (user_id, sync_type, sync_key)`` so bulk
+sync can write with ``INSERT .. ON CONFLICT DO UPDATE``. Duplicate items
+left by the old read-then-write path are removed first, keeping the most
+recently changed one.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a2c9e4f1b3"
+down_revision: Union[str, None] = "b3e8d1f0a7c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Deduplicate sync items and add the unique index."""
+    op.execute(
+        """
+        DELETE FROM sync_data
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY user_id, sync_type, sync_key
+                    ORDER BY change_seq DESC, last_modified_at DESC
+                ) AS position
+                FROM sync_data
+            ) AS ranked
+            WHERE ranked.position > 1
+        )
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_sync_data_user_type_key "
+        "ON sync_data (user_id, sync_type, sync_key)"
+    )
+
+
+def downgrade() -> None:
+    """Remove the unique index."""
+    op.drop_index("uq_sync_data_user_type_key", table_name="sync_data")
@@ -0,0 +1,41 @@
+"""add sync delta chain
+
+Revision ID: e7b4f2a9c6d1
+Revises: d5a2c9e4f1b3
+Create Date: 2025-08-27 10:00:00.000000
+
+Adds ``sync_data.deltas``, the short chain of JSON patches between an
+item's recent versions. Existing items start without a chain, so devices
+receive their full document until the next change.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b4f2a9c6d1"
+down_revision: Union[str, None] = "d5a2c9e4f1b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    """Check if a column exists in a table."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def upgrade() -> None:
+    """Add the delta chain column (idempotent)."""
+    if not column_exists("sync_data", "deltas"):
+        op.add_column("sync_data", sa.Column("deltas", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove the delta chain column."""
+    op.drop_column("sync_data", "deltas")
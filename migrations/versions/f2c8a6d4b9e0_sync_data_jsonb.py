@@ -0,0 +1,68 @@
+"""sync data jsonb
+
+Revision ID: f2c8a6d4b9e0
+Revises: e7b4f2a9c6d1
+Create Date: 2025-08-28 10:00:00.000000
+
+Stores sync documents as JSONB so content filters run in Postgres:
+
+- ``data``, ``conflict_data`` and ``deltas`` become JSONB. JSON ``null``
+  in the nullable columns becomes SQL NULL, which is how the model now
+  writes "no value".
+- ``idx_sync_data_data_gin`` (GIN, ``jsonb_path_ops``) serves ``@>``
+  containment and ``@?``/``@@`` JSON path lookups on ``data``.
+- ``idx_sync_data_open_conflicts`` is a partial index over unresolved
+  conflicts for conflict reports.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c8a6d4b9e0"
+down_revision: Union[str, None] = "e7b4f2a9c6d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Convert sync documents to JSONB and index them."""
+    op.execute(
+        """
+        ALTER TABLE sync_data
+            ALTER COLUMN data TYPE JSONB USING data::jsonb,
+            ALTER COLUMN conflict_data TYPE JSONB
+                USING NULLIF(conflict_data::jsonb, 'null'::jsonb),
+            ALTER COLUMN deltas TYPE JSONB
+                USING NULLIF(deltas::jsonb, 'null'::jsonb)
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_sync_data_data_gin
+        ON sync_data USING gin (data jsonb_path_ops)
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_sync_data_open_conflicts
+        ON sync_data (user_id, sync_type)
+        WHERE conflict_data IS NOT NULL AND resolved_at IS NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    """Return sync documents to JSON."""
+    op.execute("DROP INDEX IF EXISTS idx_sync_data_open_conflicts")
+    op.execute("DROP INDEX IF EXISTS idx_sync_data_data_gin")
+    op.execute(
+        """
+        ALTER TABLE sync_data
+            ALTER COLUMN data TYPE JSON USING data::json,
+            ALTER COLUMN conflict_data TYPE JSON USING conflict_data::json,
+            ALTER COLUMN deltas TYPE JSON USING deltas::json
+        """
+    )
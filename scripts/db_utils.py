@@ -4,6 +4,7 @@ Database utilities for DevPocket API.
 """
 
 import asyncio
+import json
 import os
 import sys
 from pathlib import Path
@@ -164,6 +165,89 @@ async def reset_database():
     return False
 
 
+async def show_query_insights(limit: int = 20, order_by: str = "total"):
+    """Print statement statistics collected by a running API server."""
+    import httpx
+
+    api_url = os.getenv("API_URL", f"http://localhost:{settings.app_port}")
+    token = os.getenv("ADMIN_TOKEN")
+    if not token:
+        logger.error("Set ADMIN_TOKEN to an access token of an admin user")
+        return False
+
+    try:
+        async with httpx.AsyncClient(base_url=api_url, timeout=10.0) as client:
+            response = await client.get(
+                "/api/admin/db/queries",
+                params={"limit": limit, "order_by": order_by},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            response.raise_for_status()
+    except Exception as e:
+        logger.error(f"Failed to fetch query statistics: {e}")
+        return False
+
+    insights = response.json()
+    if not insights["enabled"]:
+        print("Query insights are disabled (set QUERY_INSIGHTS_ENABLED=true)")
+
+    print(
+        f"{'id':<12}  {'calls':>8}  {'slow':>6}  {'total ms':>10}  "
+        f"{'mean ms':>9}  {'p95 ms':>9}  {'max ms':>9}  statement"
+    )
+    for statement in insights["statements"]:
+        p95 = statement["p95_ms"] if statement["p95_ms"] is not None else 0
+        print(
+            f"{statement['fingerprint_id']:<12}  {statement['calls']:>8}  "
+            f"{statement['slow_calls']:>6}  {statement['total_ms']:>10.1f}  "
+            f"{statement['mean_ms']:>9.2f}  {p95:>9.2f}  "
+            f"{statement['max_ms']:>9.2f}  {statement['fingerprint'][:80]}"
+        )
+
+    if insights["slow_queries"]:
+        print(f"\nSlow queries (>= {insights['threshold_ms']} ms), newest first:")
+        for query in insights["slow_queries"]:
+            print(
+                f"  {query['captured_at']}  {query['duration_ms']:>9.1f} ms  "
+                f"{query['fingerprint_id']}  {query['fingerprint'][:80]}"
+            )
+
+    for statement in insights["statements"]:
+        if statement["plan"]:
+            plan = statement["plan"]["plan"]
+            print(
+                f"\nPlan of {statement['fingerprint_id']} "
+                f"({statement['plan']['duration_ms']} ms when sampled, "
+                f"{plan.get('Execution Time')} ms under EXPLAIN):"
+            )
+            print(json.dumps(plan["Plan"], indent=2))
+
+    return True
+
+
+async def explain_query(query: str):
+    """Print the EXPLAIN (ANALYZE, BUFFERS) plan of a query; nothing is kept."""
+    try:
+        conn = await asyncpg.connect(settings.database_url)
+        try:
+            transaction = conn.transaction()
+            await transaction.start()
+            try:
+                rows = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {query}")
+            finally:
+                await transaction.rollback()
+        finally:
+            await conn.close()
+
+        for row in rows:
+            print(row[0])
+        return True
+
+    except Exception as e:
+        logger.error(f"EXPLAIN failed: {e}")
+        return False
+
+
 async def main():
     """Main entry point for database utilities."""
     if len(sys.argv) < 2:
@@ -180,11 +264,17 @@ Commands:
   test       Test database connection
   health     Check database health
   reset      Reset database (drop, create, init)
+  queries    Show query statistics of a running API server
+             [limit] [total|mean|max|calls|slow]
+             (needs ADMIN_TOKEN; API_URL defaults to localhost)
+  explain    Show the EXPLAIN (ANALYZE, BUFFERS) plan of a query
 
 Examples:
   python scripts/db_utils.py create
   python scripts/db_utils.py init
   python scripts/db_utils.py health
+  ADMIN_TOKEN=... python scripts/db_utils.py queries 20 mean
+  python scripts/db_utils.py explain "SELECT * FROM sessions WHERE is_active"
 """
         )
         return 1
@@ -208,6 +298,15 @@ Examples:
             print(f"❌ Database health: {result}")
     elif command == "reset":
         success = await reset_database()
+    elif command == "queries":
+        limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+        order_by = sys.argv[3] if len(sys.argv) > 3 else "total"
+        success = await show_query_insights(limit, order_by)
+    elif command == "explain":
+        if len(sys.argv) < 3:
+            print("❌ Usage: python scripts/db_utils.py explain <query>")
+            return 1
+        success = await explain_query(sys.argv[2])
     else:
         print(f"❌ Unknown command: {command}")
         return 1
@@ -3,6 +3,7 @@ Global test configuration and fixtures for DevPocket API tests.
 """
 
 import asyncio
+import contextlib
 import os
 import sys
 
@@ -22,7 +23,7 @@ import redis.asyncio as aioredis  # noqa: E402
 from fastapi import FastAPI  # noqa: E402
 from fastapi.testclient import TestClient  # noqa: E402
 from httpx import AsyncClient  # noqa: E402
-from sqlalchemy import text  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
 from sqlalchemy.orm import sessionmaker  # noqa: E402
 from sqlalchemy.pool import StaticPool  # noqa: E402
@@ -31,7 +32,7 @@ from app.auth.security import (  # noqa: E402
     create_access_token,
     set_redis_client,
 )
-from app.db.database import get_db  # noqa: E402
+from app.db.database import get_db, get_read_db  # noqa: E402
 from app.models.base import Base  # noqa: E402
 from app.models.user import User  # noqa: E402
 from app.repositories.user import UserRepository  # noqa: E402
@@ -269,6 +270,35 @@ async def test_session(test_db_engine) -> AsyncGenerator[AsyncSession, None]:
             await connection.close()
 
 
+@pytest.fixture
+def count_queries(test_db_engine):
+    """
+    Count the statements sent to the test database.
+
+    Usage::
+
+        with count_queries() as statements:
+            await repository.create(...)
+        assert len(statements) == 1
+    """
+
+    @contextlib.contextmanager
+    def counter() -> Generator[list[str], None, None]:
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        sync_engine = test_db_engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+
+    return counter
+
+
 @pytest_asyncio.fixture
 async def test_redis() -> AsyncGenerator[aioredis.Redis, None]:
     """Create test Redis client."""
@@ -388,6 +418,7 @@ async def app(test_session, mock_redis) -> FastAPI:
         yield test_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     app.state.redis = mock_redis
 
     # Set Redis client for auth module
@@ -624,6 +655,9 @@ def cleanup_rate_limiting():
         # Clear the global rate limit store before test
         rate_limit_store._store.clear()
         rate_limit_store._last_cleanup = 0
+
+        from app.auth.attempt_tracker import auth_attempt_store
+        auth_attempt_store.reset()
     except Exception:
         pass
     
@@ -635,6 +669,9 @@ def cleanup_rate_limiting():
         # Clear the global rate limit store after test
         rate_limit_store._store.clear()
         rate_limit_store._last_cleanup = 0
+
+        from app.auth.attempt_tracker import auth_attempt_store
+        auth_attempt_store.reset()
     except Exception:
         # Ignore cleanup errors
         pass
@@ -653,6 +690,13 @@ def setup_test_environment(monkeypatch):
     import app.auth.security as auth_security
     auth_security._redis_client = None  # Reset Redis client
 
+    from app.auth.revocation import revocation_list
+    from app.auth.token_verifier import token_verifier
+    from app.core.principal_cache import principal_cache
+    principal_cache.clear()
+    revocation_list.reset()
+    token_verifier.clear()
+
 
 # Pytest markers for test categorization
 pytest_plugins = ["pytest_asyncio"]
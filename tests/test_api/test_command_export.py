@@ -0,0 +1,173 @@
+"""
+Tests for the streaming command export pipeline.
+"""
+
+import csv
+import gzip
+import io
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.commands.export import (
+    EXPORT_COLUMNS,
+    CommandExporter,
+    CSVEncoder,
+    NDJSONEncoder,
+    XMLEncoder,
+)
+from app.api.commands.schemas import CommandExportRequest, OutputFormat
+
+
+def _make_row(index: int) -> tuple:
+    """Build a row in EXPORT_COLUMNS order."""
+    return (
+        uuid4(),
+        uuid4(),
+        f'echo "line {index}"',
+        "success",
+        0,
+        "other",
+        "/home/user",
+        False,
+        datetime(2025, 1, 1, 12, 0, index % 60),
+        datetime(2025, 1, 1, 12, 0, index % 60),
+        0.25,
+    )
+
+
+@asynccontextmanager
+async def _fake_session():
+    yield AsyncMock()
+
+
+def _exporter_with_rows(rows: list[tuple], **kwargs):
+    """Create an exporter whose repository streams the given rows."""
+
+    async def fake_stream(*_args, **_kwargs):
+        for row in rows:
+            yield row
+
+    exporter = CommandExporter(session_factory=_fake_session, **kwargs)
+    patcher = patch(
+        "app.api.commands.export.CommandRepository.stream_user_commands_for_export",
+        side_effect=fake_stream,
+    )
+    return exporter, patcher
+
+
+async def _collect(exporter: CommandExporter, request: CommandExportRequest) -> bytes:
+    return b"".join([chunk async for chunk in exporter.stream("user-1", request)])
+
+
+class TestExportEncoders:
+    """Encoder output format tests."""
+
+    def test_ndjson_encoder_escapes_quotes(self):
+        encoder = NDJSONEncoder(["command"])
+        line = encoder.encode({"command": 'echo "hi"'})
+
+        assert line.endswith("\n")
+        assert json.loads(line) == {"command": 'echo "hi"'}
+
+    def test_csv_encoder_header_and_rows(self):
+        encoder = CSVEncoder(["command", "exit_code"])
+        text = encoder.header() + encoder.encode({"command": "a,b", "exit_code": None})
+
+        rows = list(csv.reader(io.StringIO(text)))
+        assert rows == [["command", "exit_code"], ["a,b", ""]]
+
+    def test_xml_encoder_escapes_markup(self):
+        encoder = XMLEncoder(["command"])
+        text = (
+            encoder.header() + encoder.encode({"command": "a < b"}) + encoder.footer()
+        )
+
+        assert "a &lt; b" in text
+        assert text.rstrip().endswith("</commands>")
+
+
+class TestCommandExporter:
+    """Export link and streaming tests."""
+
+    def test_export_token_round_trip(self):
+        exporter = CommandExporter()
+        request = CommandExportRequest(format=OutputFormat.CSV, max_commands=5)
+
+        token, expires_at = exporter.create_export_token("user-1", "exp-1", request)
+        loaded = exporter.load_export_request(token, "exp-1", "user-1")
+
+        assert loaded == request
+        assert expires_at is not None
+
+    def test_export_token_rejects_other_user(self):
+        exporter = CommandExporter()
+        token, _ = exporter.create_export_token(
+            "user-1", "exp-1", CommandExportRequest()
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            exporter.load_export_request(token, "exp-1", "user-2")
+        assert exc_info.value.status_code == 404
+
+    def test_export_token_rejects_garbage(self):
+        with pytest.raises(HTTPException):
+            CommandExporter().load_export_request("not-a-token", "exp-1", "user-1")
+
+    @pytest.mark.asyncio
+    async def test_stream_ndjson_uncompressed(self):
+        rows = [_make_row(i) for i in range(3)]
+        exporter, patcher = _exporter_with_rows(rows)
+        request = CommandExportRequest(format=OutputFormat.JSON, compress=False)
+
+        with patcher:
+            data = await _collect(exporter, request)
+
+        records = [json.loads(line) for line in data.decode().splitlines()]
+        assert len(records) == 3
+        assert records[0]["command"] == 'echo "line 0"'
+        assert records[0]["duration_ms"] == 250
+        assert records[0]["id"] == str(rows[0][0])
+
+    @pytest.mark.asyncio
+    async def test_stream_csv_gzip_in_small_chunks(self):
+        rows = [_make_row(i) for i in range(500)]
+        exporter, patcher = _exporter_with_rows(rows, chunk_size=1024)
+        request = CommandExportRequest(format=OutputFormat.CSV, compress=True)
+
+        with patcher:
+            chunks = [chunk async for chunk in exporter.stream("user-1", request)]
+
+        assert len(chunks) > 1
+        text = gzip.decompress(b"".join(chunks)).decode()
+        parsed = list(csv.reader(io.StringIO(text)))
+        assert parsed[0][0] == "id"
+        assert len(parsed) == 501
+        assert len(parsed[0]) == len(EXPORT_COLUMNS)
+
+    @pytest.mark.asyncio
+    async def test_stream_empty_export_still_has_header(self):
+        exporter, patcher = _exporter_with_rows([])
+        request = CommandExportRequest(format=OutputFormat.XML, compress=False)
+
+        with patcher:
+            data = await _collect(exporter, request)
+
+        assert b"<commands>" in data
+        assert b"</commands>" in data
+
+    def test_filename_and_media_type(self):
+        exporter = CommandExporter()
+        request = CommandExportRequest(format=OutputFormat.CSV, compress=True)
+
+        assert exporter.filename("abc", request) == "commands-abc.csv.gz"
+        assert exporter.media_type(request) == "application/gzip"
+
+        request = CommandExportRequest(format=OutputFormat.JSON, compress=False)
+        assert exporter.filename("abc", request) == "commands-abc.ndjson"
+        assert exporter.media_type(request) == "application/x-ndjson"
@@ -0,0 +1,78 @@
+"""
+Tests for single-pass frequent-command template mining.
+"""
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.api.commands.service import CommandService, command_template
+
+
+def _cmd(command, session_id="s1", exit_code=0, duration_ms=100, minutes_ago=0):
+    return SimpleNamespace(
+        command=command,
+        session_id=session_id,
+        exit_code=exit_code,
+        duration_ms=duration_ms,
+        executed_at=datetime.now(UTC) - timedelta(minutes=minutes_ago),
+    )
+
+
+@pytest.fixture
+def command_service():
+    with patch("app.api.commands.service.CommandRepository"), patch(
+        "app.api.commands.service.SessionRepository"
+    ):
+        return CommandService(AsyncMock())
+
+
+@pytest.mark.unit
+class TestCommandTemplates:
+    """Template normalization and mining tests."""
+
+    def test_command_template_normalizes_variable_parts(self):
+        assert command_template("ls /home/user/documents") == "ls /path"
+        assert command_template("kill -9 12345") == "kill -N N"
+        assert command_template("ls /a/b") == command_template("ls /c")
+
+    def test_analyze_accumulates_in_one_pass(self, command_service):
+        commands = [
+            _cmd("ls /home/a", "s1", 0, 100, minutes_ago=5),
+            _cmd("ls /var/log", "s2", 1, 300, minutes_ago=1),
+            _cmd("ls /home/a", "s2", 0, None, minutes_ago=3),
+            _cmd("git status", "s1"),
+        ]
+
+        with patch.object(
+            command_service, "_matches_pattern", side_effect=AssertionError
+        ):
+            result = command_service._analyze_command_patterns(commands, min_usage=2)
+
+        assert list(result) == ["ls /path"]
+        data = result["ls /path"]
+        assert data["count"] == 3
+        assert data["sessions_used"] == 2
+        assert data["variations"] == ["ls /home/a", "ls /var/log"]
+        assert data["average_duration"] == 200
+        assert round(data["success_rate"], 2) == 66.67
+        assert data["last_used"] == commands[1].executed_at
+
+    @pytest.mark.asyncio
+    async def test_get_frequent_commands_uses_mined_sessions(self, command_service):
+        command_service.command_repo.get_user_commands_since = AsyncMock(
+            return_value=[
+                _cmd("cd /srv/app", "s1"),
+                _cmd("cd /srv/web", "s2"),
+                _cmd("cd /tmp", "s3"),
+            ]
+        )
+
+        response = await command_service.get_frequent_commands("user-1", min_usage=3)
+
+        assert len(response.commands) == 1
+        assert response.commands[0].command_template == "cd /path"
+        assert response.commands[0].sessions_used == 3
+        assert response.total_analyzed == 3
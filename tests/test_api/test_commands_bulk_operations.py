@@ -0,0 +1,174 @@
+"""
+Tests for set-based bulk command operations.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from app.api.commands.schemas import BulkCommandOperation
+from app.api.commands.service import CommandService
+
+
+@pytest.mark.unit
+class TestBulkCommandOperations:
+    """Bulk delete/archive/tag/reclassify tests."""
+
+    @pytest_asyncio.fixture
+    async def mock_command_repo(self):
+        return AsyncMock()
+
+    @pytest_asyncio.fixture
+    async def command_service(self, mock_command_repo):
+        with patch(
+            "app.api.commands.service.CommandRepository",
+            return_value=mock_command_repo,
+        ), patch("app.api.commands.service.SessionRepository"):
+            return CommandService(AsyncMock())
+
+    @staticmethod
+    def _owned(*ids, command="ls -la"):
+        return [SimpleNamespace(id=i, command=command) for i in ids]
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_uses_one_ownership_query(
+        self, command_service, mock_command_repo
+    ):
+        ids = [uuid4() for _ in range(1000)]
+        mock_command_repo.get_owned_commands.return_value = self._owned(*ids)
+
+        response = await command_service.bulk_command_operation(
+            "user-1",
+            BulkCommandOperation(command_ids=[str(i) for i in ids], operation="delete"),
+        )
+
+        assert response.success_count == 1000
+        assert response.error_count == 0
+        mock_command_repo.get_owned_commands.assert_awaited_once()
+        mock_command_repo.bulk_delete_commands.assert_awaited_once_with(ids)
+        command_service.session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_reports_missing_and_invalid_ids(
+        self, command_service, mock_command_repo
+    ):
+        owned_id, missing_id = uuid4(), uuid4()
+        mock_command_repo.get_owned_commands.return_value = self._owned(owned_id)
+
+        response = await command_service.bulk_command_operation(
+            "user-1",
+            BulkCommandOperation(
+                command_ids=[str(owned_id), "not-a-uuid", str(missing_id)],
+                operation="delete",
+            ),
+        )
+
+        assert response.success_count == 1
+        assert response.error_count == 2
+        assert [r["status"] for r in response.results] == [
+            "success",
+            "error",
+            "error",
+        ]
+        assert response.results[1]["error"] == "Invalid command ID"
+        assert response.results[2]["error"] == "Command not found"
+
+    @pytest.mark.asyncio
+    async def test_bulk_archive_updates_flag(self, command_service, mock_command_repo):
+        ids = [uuid4(), uuid4()]
+        mock_command_repo.get_owned_commands.return_value = self._owned(*ids)
+
+        response = await command_service.bulk_command_operation(
+            "user-1",
+            BulkCommandOperation(
+                command_ids=[str(i) for i in ids], operation="archive"
+            ),
+        )
+
+        assert response.success_count == 2
+        mock_command_repo.bulk_update_commands.assert_awaited_once_with(
+            ids, {"is_archived": True}
+        )
+
+    @pytest.mark.asyncio
+    async def test_bulk_tag_requires_tags(self, command_service, mock_command_repo):
+        command_id = uuid4()
+
+        response = await command_service.bulk_command_operation(
+            "user-1",
+            BulkCommandOperation(command_ids=[str(command_id)], operation="tag"),
+        )
+
+        assert response.error_count == 1
+        assert "tags" in response.results[0]["error"]
+        mock_command_repo.get_owned_commands.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_bulk_tag_sets_deduplicated_tags(
+        self, command_service, mock_command_repo
+    ):
+        command_id = uuid4()
+        mock_command_repo.get_owned_commands.return_value = self._owned(command_id)
+
+        await command_service.bulk_command_operation(
+            "user-1",
+            BulkCommandOperation(
+                command_ids=[str(command_id)],
+                operation="tag",
+                parameters={"tags": ["deploy", "prod", "deploy"]},
+            ),
+        )
+
+        mock_command_repo.bulk_update_commands.assert_awaited_once_with(
+            [command_id], {"tags": ["deploy", "prod"]}
+        )
+
+    @pytest.mark.asyncio
+    async def test_bulk_reclassify_sets_types(self, command_service, mock_command_repo):
+        git_id, file_id = uuid4(), uuid4()
+        mock_command_repo.get_owned_commands.return_value = [
+            SimpleNamespace(id=git_id, command="git status"),
+            SimpleNamespace(id=file_id, command="ls -la"),
+        ]
+
+        response = await command_service.bulk_command_operation(
+            "user-1",
+            BulkCommandOperation(
+                command_ids=[str(git_id), str(file_id)], operation="reclassify"
+            ),
+        )
+
+        assert response.success_count == 2
+        mock_command_repo.bulk_set_command_types.assert_awaited_once_with(
+            {git_id: "git", file_id: "file"}
+        )
+
+    @pytest.mark.asyncio
+    async def test_unsupported_operation_fails_every_id(
+        self, command_service, mock_command_repo
+    ):
+        response = await command_service.bulk_command_operation(
+            "user-1",
+            BulkCommandOperation(command_ids=[str(uuid4())], operation="explode"),
+        )
+
+        assert response.error_count == 1
+        assert "Unsupported operation" in response.results[0]["error"]
+        mock_command_repo.get_owned_commands.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_database_error_rolls_back(self, command_service, mock_command_repo):
+        mock_command_repo.get_owned_commands.side_effect = Exception("db down")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await command_service.bulk_command_operation(
+                "user-1",
+                BulkCommandOperation(command_ids=[str(uuid4())], operation="delete"),
+            )
+
+        assert exc_info.value.status_code == 500
+        command_service.session.rollback.assert_awaited_once()
@@ -0,0 +1,165 @@
+"""
+Tests for failed-login tracking and account lockout.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import status
+
+from app.auth.attempt_tracker import AttemptStore, AuthAttemptTracker
+from app.auth.security import hash_password
+from tests.factories import VerifiedUserFactory
+
+
+class TestAttemptStore:
+    """In-memory counter tests."""
+
+    def test_lock_engages_once_at_limit(self):
+        store = AttemptStore(max_keys=100)
+
+        results = [
+            store.record_failure("pair", "account", "lock", 900, 3, 600)
+            for _ in range(4)
+        ]
+
+        assert [r.account_failures for r in results] == [1, 2, 3, 4]
+        assert [r.newly_locked for r in results] == [False, False, True, False]
+        assert not results[1].is_locked
+        assert 0 < results[3].lockout_seconds <= 600
+
+    def test_counters_expire_with_window(self):
+        store = AttemptStore(max_keys=100)
+
+        with patch("app.auth.attempt_tracker.time.time") as now:
+            now.return_value = 1000.0
+            store.record_failure("pair", "account", "lock", 60, 5, 60)
+            now.return_value = 1061.0
+            result = store.record_failure("pair", "account", "lock", 60, 5, 60)
+
+        assert result.account_failures == 1
+
+    def test_memory_is_bounded(self):
+        store = AttemptStore(max_keys=10)
+
+        for i in range(100):
+            store.record_failure(f"pair:{i}", f"account:{i}", f"lock:{i}", 60, 5, 60)
+
+        assert len(store._store) == 10
+
+
+class TestAuthAttemptTracker:
+    """Backend selection and fallback."""
+
+    @pytest.mark.asyncio
+    async def test_uses_redis_script(self):
+        redis = MagicMock()
+        script = AsyncMock(return_value=[2, 5, 900, 1])
+        redis.register_script.return_value = script
+        tracker = AuthAttemptTracker(AttemptStore(max_keys=100))
+        tracker.set_redis_client(redis)
+
+        result = await tracker.record_failure("10.0.0.1", "User@Example.com")
+
+        assert result.newly_locked and result.lockout_seconds == 900
+        keys = script.await_args.kwargs["keys"]
+        assert keys == [
+            "authattempt:pair:10.0.0.1:user@example.com",
+            "authattempt:account:user@example.com",
+            "authattempt:lock:user@example.com",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_memory_on_redis_error(self):
+        redis = MagicMock()
+        redis.register_script.return_value = AsyncMock(side_effect=ConnectionError)
+        memory = AttemptStore(max_keys=100)
+        tracker = AuthAttemptTracker(memory)
+        tracker.set_redis_client(redis)
+
+        result = await tracker.record_failure("10.0.0.1", "user")
+
+        assert result.account_failures == 1
+        assert memory.failures("account:user") == 1
+
+    @pytest.mark.asyncio
+    async def test_pair_limit_throttles_one_client_only(self):
+        tracker = AuthAttemptTracker(AttemptStore(max_keys=100))
+
+        with patch("app.auth.attempt_tracker.settings.auth_max_pair_failures", 2):
+            for _ in range(2):
+                await tracker.record_failure("10.0.0.1", "user")
+
+            assert await tracker.is_throttled("10.0.0.1", "user")
+            assert not await tracker.is_throttled("10.0.0.2", "user")
+            assert not await tracker.is_throttled("10.0.0.1", "other")
+
+
+@pytest.mark.auth
+@pytest.mark.api
+class TestLoginLockout:
+    """Lockout through the login endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_lock_is_written_once(self, async_client, test_session):
+        user = VerifiedUserFactory()
+        user.password_hash = hash_password("SecurePass123!")
+        test_session.add(user)
+        await test_session.commit()
+
+        login_data = {"username": user.email, "password": "wrong_password"}
+        # Let one client reach the account limit instead of its pair limit
+        with patch(
+            "app.auth.router.UserRepository.update", new_callable=AsyncMock
+        ) as update, patch(
+            "app.auth.router.check_rate_limit", return_value=True
+        ), patch(
+            "app.auth.attempt_tracker.settings.auth_max_pair_failures", 10
+        ):
+            for _ in range(7):
+                response = await async_client.post(
+                    "/api/auth/login",
+                    data=login_data,
+                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                )
+                assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        update.assert_awaited_once()
+        locked_user = update.await_args.args[0]
+        assert locked_user.failed_login_attempts == 5
+        assert locked_user.is_locked()
+
+    @pytest.mark.asyncio
+    async def test_failing_client_is_throttled_without_locking(
+        self, async_client, test_session
+    ):
+        user = VerifiedUserFactory()
+        user.password_hash = hash_password("SecurePass123!")
+        test_session.add(user)
+        await test_session.commit()
+
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        with patch(
+            "app.auth.router.UserRepository.update", new_callable=AsyncMock
+        ) as update, patch(
+            "app.auth.router.check_rate_limit", return_value=True
+        ), patch(
+            "app.auth.attempt_tracker.settings.auth_max_pair_failures", 3
+        ):
+            for _ in range(3):
+                response = await async_client.post(
+                    "/api/auth/login",
+                    data={"username": user.email, "password": "wrong_password"},
+                    headers=headers,
+                )
+                assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+            # Even the right password is refused for this client now
+            response = await async_client.post(
+                "/api/auth/login",
+                data={"username": user.email, "password": "SecurePass123!"},
+                headers=headers,
+            )
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        update.assert_not_awaited()
@@ -16,9 +16,15 @@ from app.auth.dependencies import (
     get_optional_current_user,
     get_token_from_request,
     get_user_from_token,
+    require_admin,
     require_subscription_tier,
 )
-from app.auth.security import create_access_token, set_redis_client
+from app.auth.security import (
+    blacklist_token,
+    create_access_token,
+    set_redis_client,
+)
+from app.models.user import UserRole
 from tests.factories import (
     PremiumUserFactory,
     UserFactory,
@@ -159,8 +165,8 @@ class TestCurrentUser:
 
         token = create_access_token({"sub": user.id})
 
-        # Use the stateful mock by setting the blacklist value
-        await mock_redis.set(f"blacklist:{token}", "blacklisted")
+        # Revocations are keyed by the token's jti
+        await blacklist_token(token)
 
         with pytest.raises(AuthenticationError, match="Token has been revoked"):
             await get_current_user(test_session, token)
@@ -357,6 +363,30 @@ class TestSubscriptionTiers:
             await require_subscription_tier("pro", free_user)
 
 
+@pytest.mark.auth
+@pytest.mark.unit
+class TestAdminRole:
+    """Test admin role requirement."""
+
+    @pytest.mark.asyncio
+    async def test_require_admin_allows_admin(self):
+        """Test admin user is allowed."""
+        user = VerifiedUserFactory()
+        user.role = UserRole.ADMIN
+
+        assert await require_admin(user) == user
+
+    @pytest.mark.asyncio
+    async def test_require_admin_rejects_user(self):
+        """Test regular user is rejected."""
+        user = VerifiedUserFactory()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await require_admin(user)
+
+        assert exc_info.value.status_code == 403
+
+
 @pytest.mark.auth
 @pytest.mark.unit
 class TestUserFromToken:
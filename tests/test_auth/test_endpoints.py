@@ -8,6 +8,7 @@ from unittest.mock import AsyncMock, patch
 import pytest
 from fastapi import status
 
+from app.auth.attempt_tracker import auth_attempts
 from app.auth.security import create_access_token, create_refresh_token, hash_password
 from tests.factories import UserFactory, VerifiedUserFactory
 
@@ -316,9 +317,10 @@ class TestLoginEndpoint:
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
-        # Check that failed attempts were incremented
+        # Check that failed attempts were counted without touching the row
+        assert await auth_attempts.failures(str(user.id)) == 1
         await test_session.refresh(user)
-        assert user.failed_login_attempts == 1
+        assert user.failed_login_attempts == 0
 
 
 @pytest.mark.auth
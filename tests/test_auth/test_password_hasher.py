@@ -0,0 +1,103 @@
+"""
+Tests for the off-loop password hashing pool.
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+
+from app.auth.password_hasher import PasswordHasher
+from app.auth.security import pwd_context
+
+
+@pytest.fixture
+def hasher():
+    password_hasher = PasswordHasher(max_workers=2, max_queue=4)
+    yield password_hasher
+    password_hasher.shutdown()
+
+
+class TestPasswordHasher:
+    """Hashing, verification and pool behaviour tests."""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self, hasher):
+        hashed = await hasher.hash("S3cure-password!")
+
+        assert hashed != "S3cure-password!"
+        assert await hasher.verify("S3cure-password!", hashed)
+        assert not await hasher.verify("wrong-password", hashed)
+        assert hasher.stats()["completed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_verify_malformed_hash_returns_false(self, hasher):
+        assert await hasher.verify_and_update("password", "not-a-hash") == (
+            False,
+            None,
+        )
+
+    @pytest.mark.asyncio
+    async def test_rehash_when_cost_increases(self, hasher):
+        weak_hash = bcrypt.using(rounds=4).hash("Upgrade-me-123")
+
+        valid, new_hash = await hasher.verify_and_update("Upgrade-me-123", weak_hash)
+
+        assert valid
+        assert new_hash is not None
+        assert not pwd_context.needs_update(new_hash)
+        assert pwd_context.verify("Upgrade-me-123", new_hash)
+
+    @pytest.mark.asyncio
+    async def test_current_hash_is_not_rehashed(self, hasher):
+        hashed = await hasher.hash("Already-current-1")
+
+        assert await hasher.verify_and_update("Already-current-1", hashed) == (
+            True,
+            None,
+        )
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        hasher = PasswordHasher(max_workers=1, max_queue=1)
+
+        def slow_hash(password: str) -> str:
+            time.sleep(0.2)
+            return f"hashed:{password}"
+
+        with patch("app.auth.password_hasher._hash", slow_hash):
+            results = await asyncio.gather(
+                *(hasher.hash(f"pw{i}") for i in range(3)), return_exceptions=True
+            )
+        hasher.shutdown()
+
+        rejected = [r for r in results if isinstance(r, HTTPException)]
+        assert len(rejected) == 1
+        assert rejected[0].status_code == 503
+        assert hasher.stats()["rejected"] == 1
+        assert hasher.stats()["completed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_hashing_does_not_block_event_loop(self, hasher):
+        def slow_hash(password: str) -> str:
+            time.sleep(0.3)
+            return password
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        with patch("app.auth.password_hasher._hash", slow_hash):
+            await hasher.hash("pw")
+        task.cancel()
+
+        # A blocked loop would tick at most once during the 300 ms hash
+        assert ticks >= 10
@@ -0,0 +1,162 @@
+"""
+Tests for the authenticated-principal cache.
+"""
+
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.auth.dependencies import get_current_user
+from app.auth.security import blacklist_token, create_access_token, set_redis_client
+from app.core.principal_cache import PrincipalCache, principal_cache, token_key
+from app.repositories.user import UserRepository
+from tests.factories import VerifiedUserFactory
+
+
+def _claims(user_id: str = "user-1", exp: float | None = None) -> dict:
+    return {"sub": user_id, "exp": exp or time.time() + 3600}
+
+
+class TestPrincipalCache:
+    """LRU, expiry and invalidation tests."""
+
+    def test_store_and_get_claims(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=30)
+        cache.store_claims("token-a", _claims())
+
+        entry = cache.get("token-a")
+
+        assert entry is not None
+        assert entry.user_id == "user-1"
+        assert cache.get("token-b") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        cache = PrincipalCache(max_entries=2, ttl_seconds=30)
+        cache.store_claims("token-a", _claims("a"))
+        cache.store_claims("token-b", _claims("b"))
+        cache.get("token-a")
+        cache.store_claims("token-c", _claims("c"))
+
+        assert cache.get("token-a") is not None
+        assert cache.get("token-b") is None
+        assert cache.get("token-c") is not None
+
+    def test_entry_never_outlives_token(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=30)
+        cache.store_claims("expired", _claims(exp=time.time() - 1))
+        cache.store_claims("expiring", _claims(exp=time.time() + 0.01))
+
+        time.sleep(0.02)
+
+        assert cache.get("expired") is None
+        assert cache.get("expiring") is None
+
+    def test_disabled_with_zero_ttl(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=0)
+        cache.store_claims("token-a", _claims())
+
+        assert cache.get("token-a") is None
+
+    def test_invalidation_messages(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=30)
+        cache.store_claims("token-a", _claims("user-1"))
+        cache.store_claims("token-b", _claims("user-1"))
+        cache.store_claims("token-c", _claims("user-2"))
+
+        cache.handle_message("user:user-1")
+        assert cache.get("token-a") is None
+        assert cache.get("token-b") is None
+        assert cache.get("token-c") is not None
+
+        cache.handle_message(f"token:{token_key('token-c')}")
+        assert cache.get("token-c") is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_publishes(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=30, channel="test")
+        cache.redis = AsyncMock()
+        cache.store_claims("token-a", _claims("user-1"))
+
+        await cache.invalidate_user("user-1")
+        await cache.invalidate_token("token-b")
+
+        assert cache.get("token-a") is None
+        assert [c.args for c in cache.redis.publish.await_args_list] == [
+            ("test", "user:user-1"),
+            ("test", f"token:{token_key('token-b')}"),
+        ]
+
+
+@pytest.mark.auth
+class TestCurrentUserCaching:
+    """get_current_user integration with the principal cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_request_skips_redis_and_database(
+        self, test_session, mock_redis
+    ):
+        set_redis_client(mock_redis)
+        user = VerifiedUserFactory()
+        test_session.add(user)
+        await test_session.commit()
+        token = create_access_token({"sub": str(user.id)})
+
+        first = await get_current_user(test_session, token)
+        test_session.expunge_all()
+
+        with (
+            patch(
+                "app.auth.dependencies.is_token_blacklisted", new=AsyncMock()
+            ) as blacklisted,
+            patch.object(UserRepository, "get_by_id", new=AsyncMock()) as get_by_id,
+        ):
+            second = await get_current_user(test_session, token)
+
+        blacklisted.assert_not_awaited()
+        get_by_id.assert_not_awaited()
+        assert second.id == first.id
+        assert second.email == user.email
+        assert second in test_session
+
+        # The rebuilt user is a normal persistent instance
+        second.display_name = "Cached"
+        await test_session.flush()
+        test_session.expunge_all()
+        stored = await UserRepository(test_session).get_by_id(user.id)
+        assert stored.display_name == "Cached"
+
+    @pytest.mark.asyncio
+    async def test_user_update_invalidates_cache(self, test_session, mock_redis):
+        set_redis_client(mock_redis)
+        user = VerifiedUserFactory()
+        test_session.add(user)
+        await test_session.commit()
+        token = create_access_token({"sub": str(user.id)})
+
+        await get_current_user(test_session, token)
+        await UserRepository(test_session).update(str(user.id), is_active=False)
+
+        # Evicted only once the change is committed
+        assert principal_cache.get(token) is not None
+        await test_session.commit()
+
+        entry = principal_cache.get(token)
+        assert entry is None
+        refreshed = await get_current_user(test_session, token)
+        assert refreshed.is_active is False
+
+    @pytest.mark.asyncio
+    async def test_blacklisted_token_is_evicted(self, test_session, mock_redis):
+        set_redis_client(mock_redis)
+        user = VerifiedUserFactory()
+        test_session.add(user)
+        await test_session.commit()
+        token = create_access_token({"sub": str(user.id)})
+
+        await get_current_user(test_session, token)
+        await blacklist_token(token)
+
+        assert principal_cache.get(token) is None
@@ -0,0 +1,189 @@
+"""
+Tests for jti-based token revocation and the local revocation filter.
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.auth.revocation import BloomFilter, RevocationList
+from app.auth.security import (
+    blacklist_token,
+    create_access_token,
+    decode_token,
+    is_token_blacklisted,
+    is_token_blacklisted_sync,
+    set_redis_client,
+    verify_token,
+)
+
+
+def _stream_redis(entries: list[tuple[str, dict]]) -> AsyncMock:
+    """Redis mock whose revocation stream holds the given entries."""
+    redis = AsyncMock()
+    redis.xrange.side_effect = [entries, []]
+    redis.exists.return_value = 1
+    return redis
+
+
+class TestBloomFilter:
+    """Bloom filter sizing and accuracy tests."""
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+        assert bloom.is_full
+
+    def test_false_positive_rate_near_target(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+
+        assert false_positives / 10000 < 0.03
+
+
+class TestRevocationList:
+    """Filter-first revocation checks."""
+
+    @pytest.mark.asyncio
+    async def test_sync_loads_live_entries_only(self):
+        now = time.time()
+        revocations = RevocationList(capacity=100, error_rate=0.001, stream="s")
+        revocations.redis = _stream_redis(
+            [
+                ("1-0", {"jti": "live", "exp": str(int(now + 3600))}),
+                ("2-0", {"jti": "expired", "exp": str(int(now - 10))}),
+            ]
+        )
+
+        assert await revocations.sync() == 1
+        assert revocations.synced
+        assert revocations.redis.xrange.await_args_list[1].kwargs["min"] == "(2-0"
+
+    @pytest.mark.asyncio
+    async def test_not_revoked_needs_no_redis(self):
+        revocations = RevocationList(capacity=100, error_rate=0.001, stream="s")
+        revocations.redis = _stream_redis(
+            [("1-0", {"jti": "revoked", "exp": str(int(time.time() + 3600))})]
+        )
+        await revocations.sync()
+
+        assert await revocations.is_revoked("never-revoked") is False
+        assert revocations.is_revoked_sync("never-revoked") is False
+        revocations.redis.exists.assert_not_awaited()
+
+        assert await revocations.is_revoked("revoked") is True
+        assert revocations.is_revoked_sync("revoked") is True
+
+    @pytest.mark.asyncio
+    async def test_filter_hit_is_confirmed_and_remembered(self):
+        revocations = RevocationList(capacity=100, error_rate=0.001, stream="s")
+        revocations.redis = _stream_redis([])
+        await revocations.sync()
+        # Simulate a false positive
+        revocations._filter.add("looks-revoked")
+        revocations.redis.exists.return_value = 0
+
+        assert await revocations.is_revoked("looks-revoked") is False
+        assert revocations.is_revoked_sync("looks-revoked") is False
+        assert revocations.stats()["false_positives"] == 1
+        revocations.redis.exists.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_resync_forgets_confirmed_negatives(self):
+        revocations = RevocationList(capacity=100, error_rate=0.001, stream="s")
+        redis = AsyncMock()
+        redis.xrange.side_effect = [
+            [],
+            [("1-0", {"jti": "jti-1", "exp": str(int(time.time() + 3600))})],
+            [],
+        ]
+        tailing, drop, resynced = asyncio.Event(), asyncio.Event(), asyncio.Event()
+
+        async def xread(*args, **kwargs):
+            if not tailing.is_set():
+                tailing.set()
+                await drop.wait()
+                raise ConnectionError("connection lost")
+            resynced.set()
+            await asyncio.Event().wait()
+
+        redis.xread.side_effect = xread
+
+        with patch("app.auth.revocation.asyncio.sleep", AsyncMock()):
+            await revocations.start(redis)
+            await asyncio.wait_for(tailing.wait(), 1)
+
+            # A false positive confirmed as not revoked
+            revocations._filter.add("jti-1")
+            redis.exists.return_value = 0
+            assert await revocations.is_revoked("jti-1") is False
+
+            # Revoked elsewhere while this worker's listener is down
+            redis.exists.return_value = 1
+            drop.set()
+            await asyncio.wait_for(resynced.wait(), 1)
+
+            assert revocations.is_revoked_sync("jti-1") is True
+            assert await revocations.is_revoked("jti-1") is True
+            await revocations.stop()
+
+    @pytest.mark.asyncio
+    async def test_unsynced_falls_back_to_redis(self):
+        revocations = RevocationList(capacity=100, error_rate=0.001, stream="s")
+        revocations.redis = AsyncMock()
+        revocations.redis.exists.return_value = 1
+
+        assert await revocations.is_revoked("some-jti") is True
+        revocations.redis.exists.assert_awaited_once_with("blacklist:jti:some-jti")
+
+    @pytest.mark.asyncio
+    async def test_revoke_writes_key_and_stream(self):
+        revocations = RevocationList(capacity=100, error_rate=0.001, stream="s")
+        revocations.redis = AsyncMock()
+        expires_at = time.time() + 60
+
+        await revocations.revoke("jti-1", expires_at)
+
+        key, ttl, _ = revocations.redis.setex.await_args.args
+        assert key == "blacklist:jti:jti-1"
+        assert 0 < ttl <= 60
+        stream, fields = revocations.redis.xadd.await_args.args
+        assert stream == "s"
+        assert fields["jti"] == "jti-1"
+        assert revocations.is_revoked_sync("jti-1") is True
+
+
+@pytest.mark.auth
+class TestTokenRevocation:
+    """Security helpers keyed by jti."""
+
+    def test_tokens_carry_unique_jti(self):
+        first = decode_token(create_access_token({"sub": "user"}))
+        second = decode_token(create_access_token({"sub": "user"}))
+
+        assert first["jti"] and first["jti"] != second["jti"]
+
+    @pytest.mark.asyncio
+    async def test_sync_and_async_checks_agree(self, mock_redis):
+        set_redis_client(mock_redis)
+        token = create_access_token({"sub": "user"})
+        other = create_access_token({"sub": "user"})
+
+        await blacklist_token(token)
+
+        assert await is_token_blacklisted(token) is True
+        assert is_token_blacklisted_sync(token) is True
+        assert verify_token(token) is None
+
+        assert await is_token_blacklisted(other) is False
+        assert is_token_blacklisted_sync(other) is False
+        assert verify_token(other) is not None
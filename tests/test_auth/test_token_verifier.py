@@ -0,0 +1,90 @@
+"""
+Tests for the JWT verification service.
+"""
+
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from jose import JWTError, jwt
+from jose.exceptions import ExpiredSignatureError
+
+from app.auth.security import create_access_token, decode_token
+from app.auth.token_verifier import JoseBackend, TokenVerifier
+from app.core.config import settings
+
+
+@pytest.fixture
+def verifier():
+    return TokenVerifier(backend="jose", cache_size=100)
+
+
+@pytest.mark.auth
+class TestTokenVerifier:
+    """Claims caching and backend behaviour."""
+
+    def test_repeat_verification_hits_cache(self, verifier):
+        token = create_access_token({"sub": "user-1"})
+
+        with patch.object(
+            JoseBackend, "decode", wraps=verifier.backend.decode
+        ) as backend_decode:
+            first = verifier.decode(token)
+            second = verifier.decode(token)
+
+        assert first == second
+        assert first["sub"] == "user-1"
+        backend_decode.assert_called_once()
+        assert verifier.stats()["hits"] == 1
+
+    def test_returned_claims_are_copies(self, verifier):
+        token = create_access_token({"sub": "user-1"})
+
+        verifier.decode(token)["sub"] = "tampered"
+
+        assert verifier.decode(token)["sub"] == "user-1"
+
+    def test_cached_claims_expire_with_token(self, verifier):
+        token = create_access_token({"sub": "user-1"}, timedelta(seconds=60))
+        verifier.decode(token)
+
+        with patch("app.auth.token_verifier.time.time", return_value=time.time() + 120):
+            assert verifier.cached_claims(token) is None
+            with pytest.raises(ExpiredSignatureError):
+                verifier.decode(token)
+
+        assert verifier.stats()["entries"] == 0
+
+    def test_invalid_tokens_are_not_cached(self, verifier):
+        forged = jwt.encode(
+            {"sub": "user-1", "exp": int(time.time()) + 60},
+            "x" * 32,
+            algorithm=settings.jwt_algorithm,
+        )
+
+        for _ in range(2):
+            with pytest.raises(JWTError):
+                verifier.decode(forged)
+
+        assert verifier.stats()["entries"] == 0
+
+    def test_lru_is_bounded(self):
+        verifier = TokenVerifier(backend="jose", cache_size=2)
+        for i in range(3):
+            verifier.decode(create_access_token({"sub": f"user-{i}"}))
+
+        assert verifier.stats()["entries"] == 2
+
+    def test_pyjwt_backend_matches_jose(self):
+        pytest.importorskip("jwt")
+        token = create_access_token({"sub": "user-1"})
+
+        claims = TokenVerifier(backend="pyjwt", cache_size=0).decode(token)
+
+        assert claims == TokenVerifier(backend="jose", cache_size=0).decode(token)
+
+    def test_decode_token_uses_shared_verifier(self):
+        token = create_access_token({"sub": "user-1"})
+
+        assert decode_token(token) == decode_token(token)
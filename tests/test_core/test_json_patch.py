@@ -0,0 +1,74 @@
+"""
+Tests for the JSON Patch helpers.
+"""
+
+import pytest
+
+from app.core.json_patch import apply_patch, make_patch
+
+
+class TestMakePatch:
+    """Diffing documents into patches."""
+
+    def test_equal_documents(self):
+        assert make_patch({"a": 1}, {"a": 1}) == []
+
+    def test_field_level_operations(self):
+        old = {"theme": "dark", "font": {"size": 12, "family": "mono"}, "x": 1}
+        new = {"theme": "dark", "font": {"size": 14, "family": "mono"}, "y": [1]}
+
+        patch = make_patch(old, new)
+
+        assert patch == [
+            {"op": "remove", "path": "/x"},
+            {"op": "replace", "path": "/font/size", "value": 14},
+            {"op": "add", "path": "/y", "value": [1]},
+        ]
+        assert apply_patch(old, patch) == new
+
+    def test_keys_are_escaped(self):
+        old = {"a/b": 1, "c~d": 1}
+        new = {"a/b": 2, "c~d": 2}
+
+        patch = make_patch(old, new)
+
+        assert [op["path"] for op in patch] == ["/a~1b", "/c~0d"]
+        assert apply_patch(old, patch) == new
+
+    def test_non_object_root_is_replaced(self):
+        assert make_patch([1], [2]) == [{"op": "replace", "path": "", "value": [2]}]
+
+
+class TestApplyPatch:
+    """Applying patches."""
+
+    def test_source_document_is_not_modified(self):
+        doc = {"a": {"b": 1}}
+        apply_patch(doc, [{"op": "replace", "path": "/a/b", "value": 2}])
+        assert doc == {"a": {"b": 1}}
+
+    def test_array_operations(self):
+        doc = {"hosts": ["a", "b"]}
+        patch = [
+            {"op": "add", "path": "/hosts/-", "value": "c"},
+            {"op": "add", "path": "/hosts/0", "value": "z"},
+            {"op": "remove", "path": "/hosts/1"},
+            {"op": "test", "path": "/hosts/0", "value": "z"},
+        ]
+
+        assert apply_patch(doc, patch) == {"hosts": ["z", "b", "c"]}
+
+    @pytest.mark.parametrize(
+        "operation",
+        [
+            {"op": "move", "path": "/a", "from": "/b"},
+            {"op": "replace", "path": "/missing", "value": 1},
+            {"op": "remove", "path": "/a/b/c"},
+            {"op": "add", "path": "no-slash", "value": 1},
+            {"op": "replace", "path": "/a"},
+            {"op": "test", "path": "/a", "value": 2},
+        ],
+    )
+    def test_invalid_operations(self, operation):
+        with pytest.raises(ValueError):
+            apply_patch({"a": 1}, [operation])
@@ -0,0 +1,131 @@
+"""
+Tests for the logging pipeline.
+"""
+
+import json
+import logging
+import queue
+import sys
+
+from app.core.logging import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    log_request,
+)
+
+
+def _record(message: str, *args, level: int = logging.WARNING, created: float = 0.0):
+    record = logging.makeLogRecord(
+        {
+            "name": "devpocket.test",
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            "msg": message,
+            "args": args,
+        }
+    )
+    record.created = created
+    return record
+
+
+class TestJsonFormatter:
+    """Records are encoded as real JSON."""
+
+    def test_quotes_and_extra_fields(self):
+        record = _record('Bad input "%s"', 'a"b')
+        record.user_id = "user-1"
+
+        payload = json.loads(JsonFormatter().format(record))
+
+        assert payload["message"] == 'Bad input "a"b"'
+        assert payload["level"] == "WARNING"
+        assert payload["logger"] == "devpocket.test"
+        assert payload["user_id"] == "user-1"
+
+    def test_exception_included(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.makeLogRecord(
+                {"msg": "failed", "exc_info": sys.exc_info()}
+            )
+
+        payload = json.loads(JsonFormatter().format(record))
+
+        assert "ValueError: boom" in payload["exc_info"]
+
+
+class TestSamplingFilter:
+    """Hot messages are rate limited per template."""
+
+    def test_burst_then_suppressed(self):
+        sampling = SamplingFilter(burst=3, interval=10.0)
+
+        allowed = [sampling.filter(_record("Read error: %s", i)) for i in range(10)]
+
+        assert allowed == [True] * 3 + [False] * 7
+
+    def test_templates_sampled_separately(self):
+        sampling = SamplingFilter(burst=1, interval=10.0)
+
+        assert sampling.filter(_record("Read error: %s", 1))
+        assert sampling.filter(_record("Write error: %s", 1))
+        assert not sampling.filter(_record("Read error: %s", 2))
+
+    def test_suppressed_count_reported_next_window(self):
+        sampling = SamplingFilter(burst=1, interval=10.0)
+        for i in range(5):
+            sampling.filter(_record("Read error: %s", i, created=1.0))
+
+        record = _record("Read error: %s", 5, created=12.0)
+
+        assert sampling.filter(record)
+        assert record.suppressed == 4
+
+    def test_critical_never_sampled(self):
+        sampling = SamplingFilter(burst=1, interval=10.0)
+
+        assert all(
+            sampling.filter(_record("Down", level=logging.CRITICAL)) for _ in range(5)
+        )
+
+
+class TestNonBlockingQueueHandler:
+    """The queue handler never blocks the caller."""
+
+    def test_full_queue_drops_records(self):
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=2))
+
+        for i in range(5):
+            handler.handle(_record("Message %s", i))
+
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+
+    def test_message_merged_before_enqueue(self):
+        handler = NonBlockingQueueHandler(queue.Queue())
+
+        handler.handle(_record("Session %s closed", "abc"))
+        record = handler.queue.get_nowait()
+
+        assert record.msg == "Session abc closed"
+        assert record.args is None
+
+
+class TestEventHelpers:
+    """Event helpers attach their fields as structured data."""
+
+    def test_log_request_attaches_event(self):
+        handler = NonBlockingQueueHandler(queue.Queue())
+        request_logger = logging.getLogger("devpocket.requests")
+        request_logger.addHandler(handler)
+        try:
+            log_request("GET", "/api/ping", 200, 0.0125, user_id="user-1")
+        finally:
+            request_logger.removeHandler(handler)
+
+        record = handler.queue.get_nowait()
+        assert record.msg == "GET /api/ping - 200 - 0.013s - User: user-1"
+        assert record.event["user_id"] == "user-1"
+        assert record.event["status_code"] == 200
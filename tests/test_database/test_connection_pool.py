@@ -0,0 +1,104 @@
+"""
+Tests for the shared database connection pool.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.metrics import (
+    db_pool_acquire_duration,
+    db_pool_connections,
+    db_pool_timeouts,
+)
+from app.db import database
+from app.db.database import DatabaseManager, create_database_engine
+
+
+@pytest.fixture
+def database_url(test_db_engine):
+    return test_db_engine.url.render_as_string(hide_password=False)
+
+
+@pytest.fixture
+async def pool_engine(database_url):
+    engine = create_database_engine(database_url, "test")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.database
+class TestInstrumentedPool:
+    """Pool metrics recorded on checkout and return."""
+
+    @pytest.mark.asyncio
+    async def test_checkout_metrics(self, pool_engine):
+        waits = db_pool_acquire_duration.count("test")
+
+        async with pool_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            assert db_pool_connections.value("test", "in_use") == 1
+
+        assert db_pool_acquire_duration.count("test") == waits + 1
+        assert db_pool_connections.value("test", "in_use") == 0
+        assert db_pool_connections.value("test", "idle") == 1
+
+    @pytest.mark.asyncio
+    async def test_checkout_timeout_is_counted(self, database_url):
+        with (
+            patch.object(settings, "db_pool_size", 1),
+            patch.object(settings, "db_max_overflow", 0),
+            patch.object(settings, "db_pool_timeout", 0.1),
+        ):
+            engine = create_database_engine(database_url, "tiny")
+        timeouts = db_pool_timeouts.value("tiny")
+
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+                with pytest.raises(Exception, match="QueuePool limit"):
+                    await engine.connect().start()
+        finally:
+            await engine.dispose()
+
+        assert db_pool_timeouts.value("tiny") == timeouts + 1
+
+    @pytest.mark.asyncio
+    async def test_pgbouncer_mode_disables_statement_cache(self, database_url):
+        with patch.object(settings, "db_pgbouncer_mode", True):
+            engine = create_database_engine(database_url, "pgbouncer")
+
+        try:
+            async with engine.connect() as connection:
+                for _ in range(2):
+                    result = await connection.execute(text("SELECT 1"))
+                    assert result.scalar() == 1
+                raw = await connection.get_raw_connection()
+                assert raw.dbapi_connection._prepared_statement_cache is None
+        finally:
+            await engine.dispose()
+
+
+@pytest.mark.database
+class TestDatabaseManager:
+    """Raw asyncpg access through the shared pool."""
+
+    @pytest.mark.asyncio
+    async def test_raw_queries_share_the_pool(self, pool_engine):
+        manager = DatabaseManager()
+
+        with (
+            patch.object(database, "engine", pool_engine),
+            patch.object(database, "read_engine", pool_engine),
+        ):
+            rows = await manager.execute_query("SELECT $1::int AS n", 7)
+            replica_rows = await manager.execute_query("SELECT 1 AS n", read_only=True)
+            stats = manager.pool_stats()
+
+        assert rows == [{"n": 7}]
+        assert replica_rows == [{"n": 1}]
+        assert list(stats) == ["test"]
+        assert stats["test"]["in_use"] == 0
+        assert stats["test"]["idle"] == 1
@@ -0,0 +1,181 @@
+"""
+Tests for monthly range partition management.
+"""
+
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.database import try_advisory_xact_lock
+from app.db.partitions import (
+    add_months,
+    drop_partitions_before,
+    ensure_monthly_partitions,
+    is_partitioned,
+    list_partitions,
+    month_start,
+    parse_partition_bound,
+    partition_name,
+)
+
+
+class TestPartitionHelpers:
+    """Pure date and naming helper tests."""
+
+    def test_month_start_and_add_months(self):
+        start = month_start(datetime(2025, 12, 17, 15, 30, tzinfo=UTC))
+
+        assert start == datetime(2025, 12, 1, tzinfo=UTC)
+        assert add_months(start, 1) == datetime(2026, 1, 1, tzinfo=UTC)
+        assert add_months(start, -12) == datetime(2024, 12, 1, tzinfo=UTC)
+
+    def test_partition_name(self):
+        assert (
+            partition_name("commands", datetime(2025, 3, 1, tzinfo=UTC))
+            == "commands_p202503"
+        )
+
+    def test_parse_partition_bound(self):
+        lower, upper = parse_partition_bound(
+            "FOR VALUES FROM ('2025-01-01 00:00:00+00') TO ('2025-02-01 00:00:00+00')"
+        )
+
+        assert lower == datetime(2025, 1, 1, tzinfo=UTC)
+        assert upper == datetime(2025, 2, 1, tzinfo=UTC)
+        assert parse_partition_bound("DEFAULT") == (None, None)
+
+
+@pytest.mark.database
+class TestPartitionManagement:
+    """Partition DDL tests against a scratch partitioned table."""
+
+    TABLE = "retention_probe"
+
+    @pytest.fixture
+    async def probe_table(self, test_session):
+        await test_session.execute(
+            text(
+                f"CREATE TABLE {self.TABLE} (id int, created_at timestamptz NOT NULL) "
+                "PARTITION BY RANGE (created_at)"
+            )
+        )
+        await test_session.execute(
+            text(f"CREATE TABLE {self.TABLE}_default PARTITION OF {self.TABLE} DEFAULT")
+        )
+        return test_session
+
+    @pytest.mark.asyncio
+    async def test_is_partitioned(self, probe_table):
+        assert await is_partitioned(probe_table, self.TABLE)
+        assert not await is_partitioned(probe_table, "users")
+
+    @pytest.mark.asyncio
+    async def test_ensure_monthly_partitions_is_idempotent(self, probe_table):
+        now = datetime(2025, 11, 15, tzinfo=UTC)
+
+        created = await ensure_monthly_partitions(
+            probe_table, self.TABLE, months_ahead=2, now=now
+        )
+        again = await ensure_monthly_partitions(
+            probe_table, self.TABLE, months_ahead=2, now=now
+        )
+
+        assert created == [
+            f"{self.TABLE}_p202511",
+            f"{self.TABLE}_p202512",
+            f"{self.TABLE}_p202601",
+        ]
+        assert again == []
+        partitions = await list_partitions(probe_table, self.TABLE)
+        assert [p.name for p in partitions][-1] == f"{self.TABLE}_default"
+
+    @pytest.mark.asyncio
+    async def test_ensure_moves_rows_out_of_default_partition(self, probe_table):
+        await probe_table.execute(
+            text(
+                f"INSERT INTO {self.TABLE} VALUES "
+                "(1, '2025-11-20T00:00:00+00:00'), (2, '2026-03-05T00:00:00+00:00')"
+            )
+        )
+
+        created = await ensure_monthly_partitions(
+            probe_table,
+            self.TABLE,
+            months_ahead=0,
+            now=datetime(2025, 11, 1, tzinfo=UTC),
+        )
+
+        assert created == ["retention_probe_p202511"]
+        moved = await probe_table.execute(
+            text("SELECT id FROM retention_probe_p202511")
+        )
+        assert moved.scalars().all() == [1]
+        left = await probe_table.execute(text(f"SELECT id FROM {self.TABLE}_default"))
+        assert left.scalars().all() == [2]
+
+    @pytest.mark.asyncio
+    async def test_drop_partitions_before_keeps_boundary_month(self, probe_table):
+        await ensure_monthly_partitions(
+            probe_table,
+            self.TABLE,
+            months_ahead=3,
+            now=datetime(2025, 1, 1, tzinfo=UTC),
+        )
+        await probe_table.execute(
+            text(
+                f"INSERT INTO {self.TABLE} VALUES "
+                "(1, '2025-01-10'), (2, '2025-02-10'), (3, '2025-03-10')"
+            )
+        )
+
+        dropped = await drop_partitions_before(
+            probe_table, self.TABLE, datetime(2025, 3, 5, tzinfo=UTC)
+        )
+
+        assert dropped == [f"{self.TABLE}_p202501", f"{self.TABLE}_p202502"]
+        remaining = await probe_table.execute(text(f"SELECT id FROM {self.TABLE}"))
+        assert [row[0] for row in remaining] == [3]
+
+    @pytest.mark.asyncio
+    async def test_detach_only_keeps_table(self, probe_table):
+        await ensure_monthly_partitions(
+            probe_table,
+            self.TABLE,
+            months_ahead=0,
+            now=datetime(2025, 1, 1, tzinfo=UTC),
+        )
+
+        detached = await drop_partitions_before(
+            probe_table,
+            self.TABLE,
+            datetime(2025, 6, 1, tzinfo=UTC),
+            detach_only=True,
+        )
+
+        assert detached == [f"{self.TABLE}_p202501"]
+        exists = await probe_table.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"),
+            {"name": f"{self.TABLE}_p202501"},
+        )
+        assert exists.scalar()
+
+    @pytest.mark.asyncio
+    async def test_advisory_lock_admits_one_session(self, test_db_engine):
+        # Two real connections; the shared test engine has only one
+        engine = create_async_engine(
+            test_db_engine.url.render_as_string(hide_password=False),
+            poolclass=NullPool,
+        )
+        try:
+            async with AsyncSession(engine) as first, AsyncSession(engine) as second:
+                assert await try_advisory_xact_lock(first, 4242)
+                assert not await try_advisory_xact_lock(second, 4242)
+
+                # Released when the holder's transaction ends
+                await first.rollback()
+                assert await try_advisory_xact_lock(second, 4242)
+        finally:
+            await engine.dispose()
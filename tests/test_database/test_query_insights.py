@@ -0,0 +1,177 @@
+"""
+Tests for per-statement query statistics and slow-query plans.
+"""
+
+import contextlib
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+
+from app.db import database
+from app.db import query_insights as query_insights_module
+from app.db.database import create_database_engine
+from app.db.query_insights import (
+    QueryInsights,
+    fingerprint,
+    fingerprint_id,
+    is_explainable,
+)
+
+USERS_BY_ID = "SELECT users.id FROM users WHERE users.id = $1::UUID"
+
+
+class TestFingerprint:
+    """Statements differing only in values share a fingerprint."""
+
+    def test_placeholders_and_literals(self):
+        assert (
+            fingerprint(
+                "SELECT *  FROM t\n WHERE a = $1 AND b = 'x''y' AND c > 10 LIMIT 5"
+            )
+            == "SELECT * FROM t WHERE a = ? AND b = ? AND c > ? LIMIT ?"
+        )
+
+    def test_value_lists_collapse(self):
+        short = "SELECT id FROM t WHERE id IN ($1, $2)"
+        long = "SELECT id FROM t WHERE id IN ($1, $2, $3, $4, $5)"
+
+        assert fingerprint(short) == fingerprint(long)
+        assert fingerprint(short) == "SELECT id FROM t WHERE id IN (...)"
+
+    def test_multi_row_inserts_collapse(self):
+        assert (
+            fingerprint("INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4), ($5, $6)")
+            == "INSERT INTO t (a, b) VALUES (...)"
+        )
+
+    def test_identifiers_keep_digits(self):
+        assert fingerprint("SELECT col1, t2.x FROM t2") == "SELECT col1, t2.x FROM t2"
+
+
+class TestQueryInsights:
+    """Statistics, slow-query flagging and explain sampling."""
+
+    def test_statement_statistics(self):
+        insights = QueryInsights(enabled=True, threshold_ms=100, sample_rate=0)
+
+        insights.record("SELECT * FROM t WHERE id = $1", (1,), 0.010)
+        insights.record("SELECT * FROM t WHERE id = $1", (2,), 0.030)
+        insights.record("SELECT * FROM t WHERE id = $1", (3,), 0.250)
+        insights.record("UPDATE t SET a = $1", ("x",), 0.001)
+
+        snapshot = insights.snapshot()
+        statement = snapshot["statements"][0]
+        assert statement["fingerprint"] == "SELECT * FROM t WHERE id = ?"
+        assert statement["fingerprint_id"] == fingerprint_id(statement["fingerprint"])
+        assert statement["calls"] == 3
+        assert statement["slow_calls"] == 1
+        assert statement["total_ms"] == pytest.approx(290)
+        assert statement["max_ms"] == pytest.approx(250)
+        assert 25 <= statement["p50_ms"] <= 35
+        assert [q["duration_ms"] for q in snapshot["slow_queries"]] == [250]
+
+        by_calls = insights.snapshot(limit=1, order_by="calls")["statements"]
+        assert [s["operation"] for s in by_calls] == ["SELECT"]
+
+        insights.reset()
+        assert insights.snapshot()["statements"] == []
+
+    def test_fingerprints_are_bounded(self):
+        insights = QueryInsights(enabled=True, threshold_ms=100, sample_rate=0)
+
+        with patch.object(query_insights_module, "MAX_FINGERPRINTS", 2):
+            for table in ("a", "b", "c", "d"):
+                insights.record(f"SELECT * FROM {table}", (), 0.001)
+
+        calls = {
+            s["fingerprint"]: s["calls"] for s in insights.snapshot()["statements"]
+        }
+        assert calls == {"SELECT * FROM a": 1, "SELECT * FROM b": 1, "(other)": 2}
+
+    @pytest.mark.asyncio
+    async def test_only_slow_reads_are_sampled(self):
+        insights = QueryInsights(enabled=True, threshold_ms=100, sample_rate=1)
+        insights._queue = query_insights_module.asyncio.Queue()
+
+        insights.record("SELECT * FROM t", (), 0.001)
+        insights.record("UPDATE t SET a = $1", ("x",), 0.5)
+        insights.record("INSERT INTO t VALUES ($1)", (1,), 0.5, executemany=True)
+        insights.record("SELECT * FROM t WHERE a = $1", ("x",), 0.5)
+
+        assert insights._queue.qsize() == 1
+        key, statement, parameters, _ = insights._queue.get_nowait()
+        assert key == "SELECT * FROM t WHERE a = ?"
+        assert parameters == ("x",)
+
+    @pytest.mark.asyncio
+    async def test_locking_reads_are_never_explained(self):
+        insights = QueryInsights(enabled=True, threshold_ms=100, sample_rate=1)
+        insights._queue = query_insights_module.asyncio.Queue()
+        insights._acquire = contextlib.nullcontext
+
+        for clause in ("FOR UPDATE", "for no key update", "FOR SHARE", "FOR KEY SHARE"):
+            statement = f"SELECT * FROM sync_data WHERE id = $1 {clause}"
+            insights.record(statement, (1,), 0.5)
+            assert not is_explainable(statement)
+            with pytest.raises(ValueError):
+                await insights.explain(statement, (1,))
+
+        assert insights._queue.empty()
+        assert is_explainable("SELECT * FROM t WHERE note = $1")
+
+
+@pytest.mark.database
+class TestSlowQueryPlans:
+    """Sampled slow SELECTs are explained in the background."""
+
+    @pytest.fixture
+    def acquire(self, test_db_engine):
+        @contextlib.asynccontextmanager
+        async def acquire():
+            async with test_db_engine.connect() as connection:
+                raw_connection = await connection.get_raw_connection()
+                yield raw_connection.driver_connection
+
+        return acquire
+
+    @pytest.mark.asyncio
+    async def test_plan_is_captured(self, acquire):
+        insights = QueryInsights(enabled=True, threshold_ms=0, sample_rate=1)
+        await insights.start(acquire)
+        try:
+            insights.record(USERS_BY_ID, (uuid4(),), 0.5)
+            await insights.drain()
+        finally:
+            await insights.stop()
+
+        statement = insights.snapshot()["statements"][0]
+        plan = statement["plan"]
+        assert plan["duration_ms"] == 500
+        assert "Execution Time" in plan["plan"]
+        assert "Shared Hit Blocks" in plan["plan"]["Plan"]
+
+    @pytest.mark.asyncio
+    async def test_engine_statements_are_recorded(self, test_db_engine):
+        insights = QueryInsights(enabled=True, threshold_ms=0, sample_rate=0)
+        engine = create_database_engine(
+            test_db_engine.url.render_as_string(hide_password=False), "insights"
+        )
+
+        try:
+            with patch.object(database, "query_insights", insights):
+                async with engine.connect() as connection:
+                    for value in (1, 2):
+                        await connection.execute(
+                            text("SELECT CAST(:n AS INTEGER)"), {"n": value}
+                        )
+        finally:
+            await engine.dispose()
+
+        statements = insights.snapshot()["statements"]
+        select = next(
+            s for s in statements if s["fingerprint"].startswith("SELECT CAST")
+        )
+        assert select["calls"] == 2
+        assert select["slow_calls"] == 2
@@ -0,0 +1,3 @@
+"""
+Middleware tests for DevPocket API.
+"""
@@ -0,0 +1,91 @@
+"""
+Tests for the ASGI middleware stack and the shared request context.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.testclient import TestClient
+
+from app.auth.security import create_access_token
+from app.middleware import (
+    AuthenticationMiddleware,
+    RateLimitMiddleware,
+    SecurityHeadersMiddleware,
+)
+from app.middleware.context import get_request_context
+from app.middleware.rate_limit import RateLimitConfig, rate_limit_store
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping(request: Request):
+        context = request.state.context
+        return {
+            "user_id": request.state.user_id if context.is_authenticated else None,
+            "same_context": context is get_request_context(request.scope),
+        }
+
+    @app.get("/api/auth/login")
+    async def login():
+        return {"ok": True}
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket):
+        await websocket.accept()
+        await websocket.send_json({"state": sorted(websocket.scope.get("state", {}))})
+        await websocket.close()
+
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(RateLimitMiddleware, enabled=True)
+    app.add_middleware(AuthenticationMiddleware)
+    return app
+
+
+@pytest.fixture
+def client():
+    rate_limit_store.reset()
+    with TestClient(_build_app()) as test_client:
+        yield test_client
+
+
+class TestASGIMiddlewareStack:
+    """Behaviour of the pure ASGI middleware layers."""
+
+    def test_context_is_shared_with_routes(self, client):
+        token = create_access_token({"sub": "user-1", "email": "u@example.com"})
+
+        response = client.get("/api/ping", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+        assert response.json() == {"user_id": "user-1", "same_context": True}
+        assert response.headers["x-ratelimit-limit"]
+
+    def test_precomputed_headers_per_route_class(self, client):
+        api = client.get("/api/ping")
+        login = client.get("/api/auth/login")
+
+        assert api.headers["x-frame-options"] == "DENY"
+        assert api.headers["cache-control"].startswith("no-cache")
+        assert "x-robots-tag" not in api.headers
+        assert login.headers["x-auth-service"] == "DevPocket"
+        assert login.headers["x-robots-tag"].startswith("noindex")
+
+    def test_rate_limited_response_is_json(self, client):
+        with patch.dict(RateLimitConfig.DEFAULT_LIMITS, {"api": 1}):
+            client.get("/api/ping")
+            response = client.get("/api/ping")
+
+        assert response.status_code == 429
+        assert response.json()["error"]["code"] == 429
+        assert response.headers["retry-after"]
+
+    def test_websocket_scopes_pass_through(self, client):
+        with client.websocket_connect("/ws") as websocket:
+            message = websocket.receive_json()
+
+        # No middleware built a request context for the upgrade
+        assert "context" not in message["state"]
@@ -0,0 +1,166 @@
+"""
+Tests for the metrics core and the request metrics middleware.
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from app.core.metrics import (
+    EXPORT_BUCKETS,
+    Histogram,
+    MetricsRegistry,
+    _bucket_index,
+    _bucket_upper_bound,
+    http_request_duration,
+    http_requests,
+    metrics,
+    websocket_connections,
+    websocket_frames,
+)
+from app.middleware import MetricsMiddleware
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.websocket("/ws/{room}")
+    async def ws(websocket: WebSocket, room: str):
+        await websocket.accept()
+        message = await websocket.receive_text()
+        await websocket.send_text(f"{room}:{message}")
+        await websocket.receive_text()
+        await websocket.close()
+
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+@pytest.fixture
+def client():
+    metrics.clear()
+    with TestClient(_build_app()) as test_client:
+        yield test_client
+    metrics.clear()
+
+
+class TestHistogram:
+    """Log-linear histogram buckets and export."""
+
+    def test_buckets_bound_their_values(self):
+        for microseconds in (0, 1, 7, 15, 16, 100, 1_000, 123_456, 10_000_000):
+            index = _bucket_index(microseconds)
+            assert microseconds / 1_000_000 < _bucket_upper_bound(index)
+            if index:
+                assert microseconds / 1_000_000 >= _bucket_upper_bound(index - 1)
+
+    def test_relative_error_stays_small(self):
+        for microseconds in (1_000, 54_321, 2_000_000):
+            upper = _bucket_upper_bound(_bucket_index(microseconds)) * 1_000_000
+            assert (upper - microseconds) / microseconds <= 0.125
+
+    def test_quantile(self):
+        histogram = Histogram("test_seconds", "Test")
+        for _ in range(99):
+            histogram.observe(0.001)
+        histogram.observe(0.5)
+
+        assert histogram.count() == 100
+        assert histogram.quantile(0.5) == pytest.approx(0.001, rel=0.125)
+        assert histogram.quantile(1.0) == pytest.approx(0.5, rel=0.125)
+        assert histogram.quantile(0.5, "missing") is None
+
+    def test_prometheus_rendering(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("op_seconds", "Op latency", ("op",))
+        counter = registry.counter("ops_total", "Ops", ("op",))
+        histogram.observe(0.003, "read")
+        histogram.observe(120.0, "read")
+        counter.inc('say "hi"')
+
+        text = registry.render()
+
+        assert "# TYPE op_seconds histogram" in text
+        assert 'op_seconds_bucket{op="read",le="0.0025"} 0' in text
+        assert 'op_seconds_bucket{op="read",le="0.005"} 1' in text
+        assert f'op_seconds_bucket{{op="read",le="{EXPORT_BUCKETS[-1]}"}} 1' in text
+        assert 'op_seconds_bucket{op="read",le="+Inf"} 2' in text
+        assert 'op_seconds_count{op="read"} 2' in text
+        assert 'ops_total{op="say \\"hi\\""} 1' in text
+
+    def test_worker_label_carries_process_id(self):
+        registry = MetricsRegistry(worker_label="worker")
+        registry.counter("ops_total", "Ops", ("op",)).inc("read")
+        registry.histogram("op_seconds", "Op latency").observe(0.003)
+
+        text = registry.render()
+
+        worker = f'worker="{os.getpid()}"'
+        assert f'ops_total{{{worker},op="read"}} 1' in text
+        assert f'op_seconds_bucket{{{worker},le="+Inf"}} 1' in text
+        assert f"op_seconds_count{{{worker}}} 1" in text
+
+    def test_duplicate_names_rejected(self):
+        registry = MetricsRegistry()
+        registry.counter("dup_total", "Dup")
+        with pytest.raises(ValueError):
+            registry.counter("dup_total", "Dup")
+
+
+class TestMetricsMiddleware:
+    """Request metrics are labelled by route template."""
+
+    def test_http_requests_use_route_template(self, client):
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/missing")
+
+        assert http_requests.value("GET", "/items/{item_id}", 200) == 2
+        assert http_requests.value("GET", "unmatched", 404) == 1
+        assert http_request_duration.count("GET", "/items/{item_id}") == 2
+
+    def test_websocket_frames_counted(self, client):
+        with client.websocket_connect("/ws/lobby") as websocket:
+            websocket.send_text("hello")
+            assert websocket.receive_text() == "lobby:hello"
+            assert websocket_connections.value("/ws/{room}") == 1
+            websocket.send_text("bye")
+            with pytest.raises(WebSocketDisconnect):
+                websocket.receive_text()
+
+        assert websocket_frames.value("/ws/{room}", "in") == 2
+        assert websocket_frames.value("/ws/{room}", "out") == 1
+        assert websocket_connections.value("/ws/{room}") == 0
+
+
+class TestMetricsEndpoint:
+    """The application's /metrics endpoint is not public."""
+
+    @pytest.fixture
+    def api_client(self, app):
+        return TestClient(app)
+
+    def test_requires_token(self, api_client):
+        with patch("main.settings.metrics_token", "scrape-secret"):
+            missing = api_client.get("/metrics")
+            wrong = api_client.get("/metrics", headers={"Authorization": "Bearer nope"})
+            ok = api_client.get(
+                "/metrics", headers={"Authorization": "Bearer scrape-secret"}
+            )
+
+        assert missing.status_code == wrong.status_code == 401
+        assert ok.status_code == 200
+        assert "# TYPE http_requests_total counter" in ok.text
+
+    def test_disabled_without_token_outside_debug(self, api_client):
+        with patch("main.settings.metrics_token", ""), patch(
+            "main.settings.app_debug", False
+        ):
+            assert api_client.get("/metrics").status_code == 404
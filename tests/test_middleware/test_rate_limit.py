@@ -0,0 +1,96 @@
+"""
+Tests for the rate limit stores and limiter.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.middleware.rate_limit import (
+    RateLimiter,
+    RateLimitStore,
+    RedisRateLimitStore,
+)
+
+
+class TestRateLimitStore:
+    """In-memory sliding window counter tests."""
+
+    def test_limit_within_window(self):
+        store = RateLimitStore(max_keys=100)
+
+        with patch("app.middleware.rate_limit.time.time", return_value=1000.0):
+            results = [store.add_request("ip:1", window=60, limit=3) for _ in range(4)]
+
+        assert results == [(True, 1, 2), (True, 2, 1), (True, 3, 0), (False, 3, 0)]
+
+    def test_previous_window_is_weighted(self):
+        store = RateLimitStore(max_keys=100)
+
+        with patch("app.middleware.rate_limit.time.time") as now:
+            now.return_value = 1200.0
+            for _ in range(10):
+                store.add_request("ip:1", window=60, limit=10)
+
+            # A quarter into the next window, 75% of the old count remains
+            now.return_value = 1275.0
+            assert store.add_request("ip:1", window=60, limit=10) == (True, 8, 2)
+
+            # Two windows later everything has expired
+            now.return_value = 1400.0
+            assert store.add_request("ip:1", window=60, limit=10) == (True, 1, 9)
+
+    def test_rejected_request_consumes_no_quota(self):
+        store = RateLimitStore(max_keys=100)
+        checks = [("ip:1", 60, 100), ("user:1", 60, 1)]
+
+        with patch("app.middleware.rate_limit.time.time", return_value=1000.0):
+            assert [r[0] for r in store.add_requests(checks)] == [True, True]
+            results = store.add_requests(checks)
+
+        assert [r[0] for r in results] == [False, False]
+        assert results[0][1] == 1
+
+    def test_keys_are_bounded(self):
+        store = RateLimitStore(max_keys=2)
+
+        for i in range(5):
+            store.add_request(f"ip:{i}", window=60, limit=10)
+
+        assert list(store._store) == ["ip:3", "ip:4"]
+
+
+class TestRedisRateLimiter:
+    """Redis store and fallback tests."""
+
+    @pytest.mark.asyncio
+    async def test_checks_run_in_one_script_call(self):
+        redis = MagicMock()
+        script = AsyncMock(return_value=[1, 5, 2])
+        redis.register_script.return_value = script
+        store = RedisRateLimitStore(redis, prefix="rl")
+
+        with patch("app.middleware.rate_limit.time.time", return_value=6030.0):
+            results = await store.add_requests(
+                [("ip:1", 60, 100), ("user:1", 3600, 10)]
+            )
+
+        # Every key the script touches is passed in KEYS
+        script.assert_awaited_once_with(
+            keys=["rl:ip:1:100", "rl:ip:1:99", "rl:user:1:1", "rl:user:1:0"],
+            args=[6030.0, 60, 100, 3600, 10],
+        )
+        assert results == [(True, 5, 95), (True, 2, 8)]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_memory_on_redis_error(self):
+        redis = MagicMock()
+        redis.register_script.return_value = AsyncMock(
+            side_effect=ConnectionError("down")
+        )
+        limiter = RateLimiter(RateLimitStore(max_keys=100))
+        limiter.set_redis_client(redis)
+
+        [result] = await limiter.add_requests([("ip:1", 60, 10)])
+
+        assert result == (True, 1, 9)
@@ -0,0 +1,111 @@
+"""
+Tests for compiled security header bundles.
+"""
+
+import pytest
+
+from app.middleware.security import (
+    HeaderBundle,
+    PrefixTrie,
+    SecurityHeadersMiddleware,
+)
+
+
+async def _noop_app(scope, receive, send):
+    pass
+
+
+@pytest.fixture
+def middleware():
+    return SecurityHeadersMiddleware(_noop_app)
+
+
+class TestPrefixTrie:
+    """Longest-prefix and exact path resolution."""
+
+    def test_longest_prefix_and_exact_match(self):
+        trie = PrefixTrie()
+        trie.insert("/api/", "api")
+        trie.insert("/api/auth/", "auth")
+        trie.insert("/api/auth/login", "login", exact=True)
+
+        assert trie.lookup("/api/ssh/hosts", "default") == "api"
+        assert trie.lookup("/api/auth/me", "default") == "auth"
+        assert trie.lookup("/api/auth/login", "default") == "login"
+        assert trie.lookup("/api/auth/login/extra", "default") == "auth"
+        assert trie.lookup("/health", "default") == "default"
+
+
+class TestHeaderBundles:
+    """Route class selection and header application."""
+
+    @pytest.mark.parametrize(
+        "path,route_class",
+        [
+            ("/", "default"),
+            ("/docs/oauth2-redirect", "docs"),
+            ("/redoc", "docs"),
+            ("/static/app.css", "static"),
+            ("/api/ssh/profiles", "api"),
+            ("/api/auth/me", "auth"),
+            ("/api/auth/register", "auth_sensitive"),
+        ],
+    )
+    def test_route_classes(self, middleware, path, route_class):
+        assert middleware.bundle_for_path(path).route_class == route_class
+
+    def test_bundles_are_immutable_raw_bytes(self, middleware):
+        bundle = middleware.bundle_for_path("/api/auth/login")
+
+        assert isinstance(bundle.headers, tuple)
+        assert all(
+            isinstance(name, bytes) and isinstance(value, bytes)
+            for name, value in bundle.headers
+        )
+        assert (b"x-robots-tag", b"noindex, nofollow, noarchive, nosnippet") in (
+            bundle.headers
+        )
+        with pytest.raises(AttributeError):
+            bundle.headers = ()
+
+    def test_apply_without_conflicts_extends(self, middleware):
+        bundle: HeaderBundle = middleware.bundle_for_path("/api/ssh/profiles")
+        headers = [(b"content-type", b"application/json")]
+
+        bundle.apply(headers)
+
+        assert headers == [(b"content-type", b"application/json"), *bundle.headers]
+
+    def test_apply_keeps_existing_values(self, middleware):
+        bundle = middleware.bundle_for_path("/api/auth/me")
+        headers = [
+            (b"cache-control", b"max-age=60"),
+            (b"x-auth-service", b"other"),
+        ]
+
+        bundle.apply(headers)
+        names = [name for name, _ in headers]
+
+        assert (b"cache-control", b"max-age=60") in headers
+        assert names.count(b"cache-control") == 1
+        assert b"pragma" not in names
+        assert (b"x-auth-service", b"DevPocket") in headers
+        assert names.count(b"x-auth-service") == 1
+
+    @pytest.mark.asyncio
+    async def test_websocket_accept_gets_upgrade_bundle(self, middleware):
+        async def app(scope, receive, send):
+            await send({"type": "websocket.accept"})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        middleware.app = app
+        await middleware({"type": "websocket", "path": "/ws/terminal"}, None, send)
+
+        names = {name for name, _ in sent[0]["headers"]}
+        assert b"x-content-type-options" in names
+        assert b"x-api-version" in names
+        assert b"content-security-policy" not in names
@@ -0,0 +1,107 @@
+"""
+Middleware overhead benchmark.
+
+Drives a trivial endpoint through the middleware stack and reports
+requests/sec and p99 latency. "before" wraps the endpoint in three
+BaseHTTPMiddleware layers that do no work of their own - the floor cost of
+the old stack - while "after" runs the real pure-ASGI authentication, rate
+limit and security header middleware.
+"""
+
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware import (
+    AuthenticationMiddleware,
+    RateLimitMiddleware,
+    SecurityHeadersMiddleware,
+)
+from app.middleware.rate_limit import rate_limit_store
+
+REQUESTS = 2000
+CONCURRENCY = 20
+
+
+class PassThroughMiddleware(BaseHTTPMiddleware):
+    """BaseHTTPMiddleware that only forwards the request."""
+
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def _trivial_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def _before_app() -> FastAPI:
+    app = _trivial_app()
+    for _ in range(3):
+        app.add_middleware(PassThroughMiddleware)
+    return app
+
+
+def _after_app() -> FastAPI:
+    app = _trivial_app()
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(RateLimitMiddleware, enabled=True)
+    app.add_middleware(AuthenticationMiddleware)
+    return app
+
+
+async def _drive(app: FastAPI) -> dict[str, float]:
+    """Send REQUESTS requests with CONCURRENCY workers and collect latencies."""
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    # Spread requests over many client IPs so rate limiting never rejects
+    remaining = iter(range(REQUESTS))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def worker():
+            for i in remaining:
+                headers = {"X-Forwarded-For": f"10.0.{i % 250}.{i % 200}"}
+                sent = time.perf_counter()
+                response = await client.get("/health/ping", headers=headers)
+                latencies.append(time.perf_counter() - sent)
+                assert response.status_code == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests_per_second": REQUESTS / elapsed,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+class TestMiddlewareBenchmark:
+    """Compare BaseHTTPMiddleware layering with the pure ASGI stack."""
+
+    def test_trivial_endpoint_throughput(self, benchmark):
+        """The ASGI stack serves a trivial endpoint at least as fast."""
+        rate_limit_store.reset()
+        before = asyncio.run(_drive(_before_app()))
+        after = benchmark.pedantic(
+            lambda: asyncio.run(_drive(_after_app())), rounds=1, iterations=1
+        )
+
+        benchmark.extra_info.update(
+            {f"before_{key}": value for key, value in before.items()}
+            | {f"after_{key}": value for key, value in after.items()}
+        )
+
+        # The real stack does more work than empty layers, yet should not be
+        # meaningfully slower than BaseHTTPMiddleware's per-layer overhead
+        assert after["requests_per_second"] >= before["requests_per_second"] * 0.8
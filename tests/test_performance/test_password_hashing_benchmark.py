@@ -0,0 +1,80 @@
+"""
+Login-storm benchmark for off-loop password hashing.
+
+Simulates a burst of concurrent logins while a terminal session echoes
+keystrokes, and reports login throughput together with echo latency. With
+hashing inline on the event loop every echo waits behind the whole storm;
+with the hashing pool echo latency stays close to the tick interval.
+"""
+
+import asyncio
+import time
+
+from app.auth.password_hasher import PasswordHasher
+from app.auth.security import pwd_context
+
+LOGINS = 8
+ECHO_INTERVAL = 0.005
+PASSWORD = "Benchmark-password-1"
+
+
+async def _login_storm(verify) -> dict[str, float]:
+    """Run concurrent logins while measuring simulated terminal echo latency."""
+    hashed = pwd_context.hash(PASSWORD)
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    async def terminal_echo():
+        while not done.is_set():
+            sent = time.perf_counter()
+            await asyncio.sleep(ECHO_INTERVAL)
+            latencies.append(time.perf_counter() - sent - ECHO_INTERVAL)
+
+    echo_task = asyncio.create_task(terminal_echo())
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify(PASSWORD, hashed) for _ in range(LOGINS)))
+    elapsed = time.perf_counter() - started
+
+    done.set()
+    await echo_task
+    assert all(results)
+
+    latencies.sort()
+    return {
+        "logins_per_second": LOGINS / elapsed,
+        "echo_p50_ms": latencies[len(latencies) // 2] * 1000,
+        "echo_max_ms": latencies[-1] * 1000,
+    }
+
+
+class TestPasswordHashingBenchmark:
+    """Compare inline hashing with the off-loop hashing pool."""
+
+    def test_login_storm_with_hashing_pool(self, benchmark):
+        """Logins on the pool keep terminal echo responsive."""
+
+        async def inline_verify(password: str, hashed: str) -> bool:
+            return pwd_context.verify(password, hashed)
+
+        hasher = PasswordHasher(max_workers=4, max_queue=LOGINS)
+        try:
+            pooled = benchmark.pedantic(
+                lambda: asyncio.run(_login_storm(hasher.verify)),
+                rounds=1,
+                iterations=1,
+            )
+        finally:
+            hasher.shutdown()
+        inline = asyncio.run(_login_storm(inline_verify))
+
+        benchmark.extra_info.update(
+            {f"pool_{key}": value for key, value in pooled.items()}
+            | {f"inline_{key}": value for key, value in inline.items()}
+        )
+
+        # Inline hashing stalls echo for at least one full hash; the pool
+        # keeps the worst-case echo delay well below that.
+        assert pooled["echo_max_ms"] < inline["echo_max_ms"]
+        assert pooled["logins_per_second"] >= inline["logins_per_second"] * 0.8
@@ -75,7 +75,7 @@ class TestBaseRepository:
 
             mock_session.add.assert_called_once_with(mock_instance)
             mock_session.flush.assert_called_once()
-            mock_session.refresh.assert_called_once_with(mock_instance)
+            mock_session.refresh.assert_not_called()
             assert result == mock_instance
 
     @pytest.mark.asyncio
@@ -88,7 +88,7 @@ class TestBaseRepository:
 
         mock_session.add.assert_called_once_with(mock_instance)
         mock_session.flush.assert_called_once()
-        mock_session.refresh.assert_called_once_with(mock_instance)
+        mock_session.refresh.assert_not_called()
         assert result == mock_instance
 
     @pytest.mark.asyncio
@@ -267,7 +267,7 @@ class TestBaseRepository:
         result = await repository.update("test-id", name="new_name", value=100)
 
         assert result == mock_instance
-        mock_session.refresh.assert_called_once_with(mock_instance)
+        mock_session.refresh.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_update_by_id_not_found(self, repository, mock_session):
@@ -313,7 +313,7 @@ class TestBaseRepository:
                 assert result == mock_instance
                 mock_setattr.assert_called()
                 mock_session.flush.assert_called_once()
-                mock_session.refresh.assert_called_once_with(mock_instance)
+                mock_session.refresh.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_update_by_instance_protected_fields(self, repository, mock_session):
@@ -478,7 +478,7 @@ class TestBaseRepository:
             assert result == mock_instances
             mock_session.add_all.assert_called_once_with(mock_instances)
             mock_session.flush.assert_called_once()
-            assert mock_session.refresh.call_count == 2
+            mock_session.refresh.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_bulk_create_empty_list(self, repository, mock_session):
@@ -497,13 +497,13 @@ class TestBaseRepository:
         ]
         
         mock_result = MagicMock()
-        mock_result.rowcount = 1
+        mock_result.rowcount = 2
         mock_session.execute.return_value = mock_result
 
         result = await repository.bulk_update(updates)
 
         assert result == 2  # Two successful updates
-        assert mock_session.execute.call_count == 2
+        mock_session.execute.assert_called_once()  # One UPDATE ... FROM VALUES
 
     @pytest.mark.asyncio
     async def test_bulk_update_missing_id_field(self, repository, mock_session):
@@ -0,0 +1,141 @@
+"""
+Round-trip counts of BaseRepository writes.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.repositories.base import BaseRepository, unit_of_work
+from app.repositories.user import UserRepository
+
+
+def _user_data(index: int) -> dict:
+    return {
+        "username": f"roundtrip{index}",
+        "email": f"roundtrip{index}@example.com",
+        "hashed_password": "hashed_password_123",
+    }
+
+
+@pytest.mark.database
+class TestRepositoryRoundTrips:
+    """Each write costs a single statement, without post-write refreshes."""
+
+    @pytest.fixture
+    async def repository(self, test_session):
+        return BaseRepository(User, test_session)
+
+    @pytest.mark.asyncio
+    async def test_create_returns_server_defaults(self, repository, count_queries):
+        with count_queries() as statements:
+            user = await repository.create(**_user_data(1))
+
+        assert len(statements) == 1
+        assert "RETURNING" in statements[0]
+        assert user.created_at is not None
+        assert user.subscription_tier == "free"
+
+    @pytest.mark.asyncio
+    async def test_update_by_instance(self, repository, count_queries):
+        user = await repository.create(**_user_data(1))
+
+        with count_queries() as statements:
+            await repository.update(user, display_name="Round Trip")
+            assert user.updated_at is not None
+
+        assert len(statements) == 1
+        assert statements[0].startswith("UPDATE")
+
+    @pytest.mark.asyncio
+    async def test_update_by_id(self, repository, count_queries):
+        user = await repository.create(**_user_data(1))
+
+        with count_queries() as statements:
+            updated = await repository.update(user.id, display_name="Round Trip")
+
+        assert len(statements) == 1
+        assert updated is user
+        assert user.display_name == "Round Trip"
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_is_one_statement(self, repository, count_queries):
+        with count_queries() as statements:
+            users = await repository.bulk_create([_user_data(i) for i in range(50)])
+
+        assert len(statements) == 1
+        assert all(user.created_at is not None for user in users)
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_is_one_statement(
+        self, repository, test_session, count_queries
+    ):
+        users = await repository.bulk_create([_user_data(i) for i in range(3)])
+
+        with count_queries() as statements:
+            updated = await repository.bulk_update(
+                [
+                    {"id": str(user.id), "display_name": f"User {i}"}
+                    for i, user in enumerate(users)
+                ]
+            )
+
+        assert updated == 3
+        assert len(statements) == 1
+        assert [user.display_name for user in users] == ["User 0", "User 1", "User 2"]
+
+        # The loaded instances match what was written
+        user_id = users[1].id
+        test_session.expire_all()
+        assert await repository.get_by_id(user_id) is users[1]
+        assert users[1].display_name == "User 1"
+
+    @pytest.mark.asyncio
+    async def test_user_with_settings_has_no_reads(self, test_session, count_queries):
+        repository = UserRepository(test_session)
+
+        with count_queries() as statements:
+            user = await repository.create_user_with_settings(
+                "settings@example.com", "settings", "hashed_password_123"
+            )
+
+        assert [statement.split()[0] for statement in statements] == [
+            "INSERT",
+            "INSERT",
+        ]
+        assert user.settings.terminal_theme == "dark"
+
+
+class TestUnitOfWork:
+    """Nested units of work commit once."""
+
+    @pytest.fixture
+    def session(self):
+        session = MagicMock(spec=AsyncSession)
+        session.info = {}
+        session.commit = AsyncMock()
+        session.rollback = AsyncMock()
+        return session
+
+    @pytest.mark.asyncio
+    async def test_outermost_unit_commits(self, session):
+        async with unit_of_work(session):
+            async with unit_of_work(session):
+                pass
+            session.commit.assert_not_called()
+
+        session.commit.assert_called_once()
+        session.rollback.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_error_rolls_back(self, session):
+        with pytest.raises(RuntimeError):
+            async with unit_of_work(session):
+                async with unit_of_work(session):
+                    raise RuntimeError("write failed")
+
+        session.commit.assert_not_called()
+        session.rollback.assert_called_once()
+        assert session.info["unit_of_work_depth"] == 0
@@ -0,0 +1,136 @@
+"""
+Database tests for set-based CommandRepository bulk and export helpers.
+"""
+
+from uuid import uuid4
+
+import pytest
+
+from app.models.command import Command
+from app.models.session import Session
+from app.models.user import User
+from app.repositories.command import CommandRepository
+
+
+@pytest.mark.database
+class TestCommandRepositoryBulk:
+    """Bulk operation tests against a real database."""
+
+    @pytest.fixture
+    async def command_repository(self, test_session):
+        return CommandRepository(test_session)
+
+    async def _create_user_with_commands(self, test_session, name: str, count: int):
+        user = User(
+            username=name,
+            email=f"{name}@example.com",
+            hashed_password="hashed_password_123",
+        )
+        test_session.add(user)
+        await test_session.flush()
+
+        session = Session(
+            user_id=user.id, device_id=f"{name}-device", device_type="web"
+        )
+        test_session.add(session)
+        await test_session.flush()
+
+        commands = [
+            Command(session_id=session.id, command=f"git status {i}", exit_code=0)
+            for i in range(count)
+        ]
+        test_session.add_all(commands)
+        await test_session.flush()
+        return user, commands
+
+    @pytest.mark.asyncio
+    async def test_get_owned_commands_filters_other_users(
+        self, test_session, command_repository
+    ):
+        owner, own_commands = await self._create_user_with_commands(
+            test_session, "bulkowner", 3
+        )
+        _, other_commands = await self._create_user_with_commands(
+            test_session, "bulkother", 2
+        )
+
+        rows = await command_repository.get_owned_commands(
+            owner.id, [c.id for c in own_commands + other_commands] + [uuid4()]
+        )
+
+        assert {row.id for row in rows} == {c.id for c in own_commands}
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_in_chunks(self, test_session, command_repository):
+        owner, commands = await self._create_user_with_commands(
+            test_session, "bulkdelete", 5
+        )
+
+        deleted = await command_repository.bulk_delete_commands(
+            [c.id for c in commands[:4]], chunk_size=2
+        )
+
+        assert deleted == 4
+        assert await command_repository.count_user_commands(owner.id) == 1
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_and_set_types(self, test_session, command_repository):
+        _, commands = await self._create_user_with_commands(
+            test_session, "bulkupdate", 3
+        )
+        ids = [c.id for c in commands]
+
+        assert (
+            await command_repository.bulk_update_commands(
+                ids, {"is_archived": True, "tags": ["ops"]}
+            )
+            == 3
+        )
+        assert (
+            await command_repository.bulk_set_command_types(
+                {ids[0]: "git", ids[1]: "file"}
+            )
+            == 2
+        )
+
+        test_session.expire_all()
+        refreshed = {c.id: c for c in await command_repository.get_all(limit=10)}
+        assert all(refreshed[i].is_archived for i in ids)
+        assert refreshed[ids[0]].tags == ["ops"]
+        assert refreshed[ids[0]].command_type == "git"
+        assert refreshed[ids[1]].command_type == "file"
+
+    @pytest.mark.asyncio
+    async def test_stream_and_count_for_export(self, test_session, command_repository):
+        owner, commands = await self._create_user_with_commands(
+            test_session, "bulkexport", 4
+        )
+
+        total = await command_repository.count_user_commands_for_export(owner.id)
+        rows = [
+            row
+            async for row in command_repository.stream_user_commands_for_export(
+                owner.id, ["id", "command"], limit=3, batch_size=2
+            )
+        ]
+
+        assert total == 4
+        assert len(rows) == 3
+        assert {row.id for row in rows} <= {c.id for c in commands}
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_commands(self, test_session, command_repository):
+        owner, _ = await self._create_user_with_commands(test_session, "bulkinsert", 0)
+        session = Session(user_id=owner.id, device_id="capture", device_type="web")
+        test_session.add(session)
+        await test_session.flush()
+
+        inserted = await command_repository.bulk_insert_commands(
+            [
+                {"session_id": session.id, "command": f"make {i}", "status": "success"}
+                for i in range(3)
+            ]
+        )
+
+        assert inserted == 3
+        assert await command_repository.count_user_commands(owner.id) == 3
@@ -0,0 +1,166 @@
+"""
+Database tests for set-based sync ingestion.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.api.sync.services.settings_sync import SettingsSyncService
+from app.api.sync.services.ssh_sync import SSHProfileSyncService
+from app.models.user import User
+from app.repositories.sync import SyncDataRepository
+
+
+@contextmanager
+def count_statements(session):
+    """Count the SQL statements a session sends."""
+    statements: list[str] = []
+    engine = session.bind.engine.sync_engine
+
+    def before_cursor_execute(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.database
+class TestSyncRepositoryBulk:
+    """Bulk upsert tests against a real database."""
+
+    @pytest.fixture
+    async def sync_repository(self, test_session):
+        return SyncDataRepository(test_session)
+
+    @pytest.fixture
+    async def user(self, test_session):
+        user = User(
+            username="bulksync",
+            email="bulksync@example.com",
+            hashed_password="hashed_password_123",
+        )
+        test_session.add(user)
+        await test_session.flush()
+        return user
+
+    @staticmethod
+    def _items(count: int, suffix: str = "") -> list[dict]:
+        return [
+            {
+                "sync_type": "commands",
+                "sync_key": f"key-{i}",
+                "data": {"command": f"ls {i}{suffix}"},
+            }
+            for i in range(count)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_initial_sync_takes_few_round_trips(
+        self, test_session, sync_repository, user
+    ):
+        with count_statements(test_session) as statements:
+            items = await sync_repository.bulk_sync_create(
+                str(user.id), self._items(500), "device-1", "web"
+            )
+
+        assert len(items) == 500
+        assert len(statements) <= 5
+        assert sorted(item.change_seq for item in items) == list(range(1, 501))
+
+    @pytest.mark.asyncio
+    async def test_resync_updates_existing_items(
+        self, test_session, sync_repository, user
+    ):
+        await sync_repository.bulk_sync_create(
+            str(user.id), self._items(3), "device-1", "web"
+        )
+
+        items = await sync_repository.bulk_sync_create(
+            str(user.id), self._items(3, " -la"), "device-1", "web"
+        )
+
+        assert {item.version for item in items} == {2}
+        assert {item.data["command"] for item in items} == {
+            "ls 0 -la",
+            "ls 1 -la",
+            "ls 2 -la",
+        }
+        assert sorted(item.change_seq for item in items) == [4, 5, 6]
+        assert len(await sync_repository.get_changes_after(user.id, 0, 10)) == 3
+
+    @pytest.mark.asyncio
+    async def test_duplicate_keys_in_batch_keep_last(
+        self, test_session, sync_repository, user
+    ):
+        items = await sync_repository.bulk_sync_create(
+            str(user.id),
+            [
+                {"sync_type": "commands", "sync_key": "dup", "data": {"n": 1}},
+                {"sync_type": "commands", "sync_key": "dup", "data": {"n": 2}},
+            ],
+            "device-1",
+            "web",
+        )
+
+        assert [item.data for item in items] == [{"n": 2}]
+
+    @pytest.mark.asyncio
+    async def test_recent_change_from_other_device_conflicts(
+        self, test_session, sync_repository, user
+    ):
+        await sync_repository.bulk_sync_create(
+            str(user.id), self._items(1), "device-1", "web"
+        )
+
+        items = await sync_repository.bulk_sync_create(
+            str(user.id), self._items(1, " -la"), "device-2", "ios"
+        )
+
+        assert items[0].has_conflict
+        assert items[0].data == {"command": "ls 0"}
+        assert items[0].conflict_data["conflicting_data"] == {"command": "ls 0 -la"}
+
+    @pytest.mark.asyncio
+    async def test_settings_conflicts_are_not_written(
+        self, test_session, sync_repository, user
+    ):
+        service = SettingsSyncService(test_session)
+        await service.sync_settings(user.id, {"terminal_theme": "dark"})
+
+        result = await service.sync_settings(
+            user.id, {"terminal_theme": "light", "terminal_font_size": 14}
+        )
+
+        assert result.updated_settings == ["terminal_font_size"]
+        assert result.conflicts[0]["local_value"] == "dark"
+        assert result.conflicts[0]["remote_value"] == "light"
+        stored = await sync_repository.get_sync_items_by_keys(
+            user.id,
+            [
+                ("user_setting", f"user_setting_{user.id}_terminal_theme"),
+                ("user_setting", f"user_setting_{user.id}_terminal_font_size"),
+            ],
+        )
+        assert {key: item.data["value"] for (_, key), item in stored.items()} == {
+            f"user_setting_{user.id}_terminal_theme": "dark",
+            f"user_setting_{user.id}_terminal_font_size": 14,
+        }
+
+    @pytest.mark.asyncio
+    async def test_ssh_profiles_synced_in_one_batch(self, test_session, user):
+        service = SSHProfileSyncService(test_session)
+        profiles = [
+            {"name": f"server{i}", "host": f"host{i}.example.com", "port": 22}
+            for i in range(50)
+        ]
+
+        with count_statements(test_session) as statements:
+            result = await service.sync_profiles(user.id, profiles)
+
+        assert result.synced_count == 50
+        assert len(statements) <= 5
@@ -0,0 +1,158 @@
+"""
+Database tests for the sync change sequence and cursor paging.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.sync.schemas import SyncDataRequest, SyncDataType
+from app.api.sync.service import SyncService, decode_sync_cursor, encode_sync_cursor
+from app.models.user import User
+from app.repositories.sync import SyncDataRepository
+
+
+@pytest.mark.database
+class TestSyncChangeSequence:
+    """Change sequence assignment and paging against a real database."""
+
+    @pytest.fixture
+    async def sync_repository(self, test_session):
+        return SyncDataRepository(test_session)
+
+    async def _create_user(self, test_session, name: str) -> User:
+        user = User(
+            username=name,
+            email=f"{name}@example.com",
+            hashed_password="hashed_password_123",
+        )
+        test_session.add(user)
+        await test_session.flush()
+        return user
+
+    async def _write_items(self, sync_repository, user: User, count: int):
+        return [
+            await sync_repository.create_or_update_sync_item(
+                str(user.id), "commands", f"key-{i}", {"i": i}, "device-1", "web"
+            )
+            for i in range(count)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_writes_take_next_sequence_per_user(
+        self, test_session, sync_repository
+    ):
+        user = await self._create_user(test_session, "seqowner")
+        other = await self._create_user(test_session, "seqother")
+
+        items = await self._write_items(sync_repository, user, 3)
+        other_items = await self._write_items(sync_repository, other, 1)
+
+        assert [item.change_seq for item in items] == [1, 2, 3]
+        assert other_items[0].change_seq == 1
+
+        # An update moves the item to the end of the user's sequence
+        items[0].update_data({"i": "changed"}, "device-1", "web")
+        await test_session.flush()
+        assert items[0].change_seq == 4
+
+    @pytest.mark.asyncio
+    async def test_pages_resume_after_last_change(self, test_session, sync_repository):
+        user = await self._create_user(test_session, "seqpager")
+        items = await self._write_items(sync_repository, user, 5)
+
+        first = await sync_repository.get_changes_after(user.id, 0, limit=2)
+        second = await sync_repository.get_changes_after(
+            user.id, first[-1].change_seq, limit=2
+        )
+
+        assert [item.sync_key for item in first] == ["key-0", "key-1"]
+        assert [item.sync_key for item in second] == ["key-2", "key-3"]
+
+        # A change to an already-pulled item shows up after the cursor
+        items[0].mark_as_deleted("device-2", "web")
+        await test_session.flush()
+        rest = await sync_repository.get_changes_after(
+            user.id, second[-1].change_seq, limit=10
+        )
+        assert [item.sync_key for item in rest] == ["key-4", "key-0"]
+
+    @pytest.mark.asyncio
+    async def test_sync_data_pages_by_cursor(self, test_session, sync_repository):
+        user = await self._create_user(test_session, "seqservice")
+        await self._write_items(sync_repository, user, 3)
+        service = SyncService(test_session)
+
+        def request(cursor=None):
+            return SyncDataRequest(
+                data_types=[SyncDataType.COMMANDS],
+                device_id="device-2",
+                device_name="Laptop",
+                cursor=cursor,
+                limit=2,
+            )
+
+        first = await service.sync_data(user, request())
+        second = await service.sync_data(user, request(first.next_cursor))
+        empty = await service.sync_data(user, request(second.next_cursor))
+
+        assert first.has_more is True
+        assert [item["sync_key"] for item in first.data["commands"]] == [
+            "key-0",
+            "key-1",
+        ]
+        assert second.has_more is False
+        assert [item["sync_key"] for item in second.data["commands"]] == ["key-2"]
+        assert empty.total_items == 0
+        assert empty.next_cursor == second.next_cursor
+
+    @pytest.mark.asyncio
+    async def test_empty_first_pull_resumes_from_latest_change(
+        self, test_session, sync_repository
+    ):
+        user = await self._create_user(test_session, "seqsince")
+        await self._write_items(sync_repository, user, 3)
+        service = SyncService(test_session)
+
+        empty = await service.sync_data(
+            user,
+            SyncDataRequest(
+                data_types=[SyncDataType.ALL],
+                device_id="device-2",
+                device_name="Laptop",
+                last_sync_timestamp=datetime.now(UTC) + timedelta(hours=1),
+            ),
+        )
+
+        assert empty.total_items == 0
+        assert decode_sync_cursor(empty.next_cursor) == 3
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_rejected(self, test_session):
+        user = await self._create_user(test_session, "seqbadcursor")
+        service = SyncService(test_session)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.sync_data(
+                user,
+                SyncDataRequest(
+                    data_types=[SyncDataType.ALL],
+                    device_id="device-1",
+                    device_name="Phone",
+                    cursor="not-a-cursor",
+                ),
+            )
+
+        assert exc_info.value.status_code == 400
+
+
+class TestSyncCursor:
+    """Opaque cursor encoding."""
+
+    def test_round_trip(self):
+        assert decode_sync_cursor(encode_sync_cursor(12345)) == 12345
+
+    def test_malformed_cursor(self):
+        with pytest.raises(ValueError):
+            decode_sync_cursor("not-a-cursor")
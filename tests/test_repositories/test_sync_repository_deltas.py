@@ -0,0 +1,146 @@
+"""
+Database tests for sync item patch chains and field-level updates.
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.sync.schemas import SyncDataRequest, SyncDataType, SyncPatchRequest
+from app.api.sync.service import SyncService
+from app.models.sync import SYNC_DELTA_CHAIN_LENGTH
+from app.models.user import User
+from app.repositories.sync import SyncDataRepository
+
+PROFILE = {
+    "host": "server.example.com",
+    "port": 22,
+    "username": "deploy",
+    "description": "x" * 500,
+}
+
+
+@pytest.mark.database
+class TestSyncDeltas:
+    """Patch chains kept on sync items."""
+
+    @pytest.fixture
+    async def sync_repository(self, test_session):
+        return SyncDataRepository(test_session)
+
+    @pytest.fixture
+    async def user(self, test_session):
+        user = User(
+            username="deltasync",
+            email="deltasync@example.com",
+            hashed_password="hashed_password_123",
+        )
+        test_session.add(user)
+        await test_session.flush()
+        return user
+
+    async def _write(self, sync_repository, user, data):
+        items = await sync_repository.bulk_sync_create(
+            str(user.id),
+            [{"sync_type": "ssh_profiles", "sync_key": "server", "data": data}],
+            "device-1",
+            "web",
+        )
+        return items[0]
+
+    @pytest.mark.asyncio
+    async def test_bulk_writes_extend_the_chain(self, sync_repository, user):
+        await self._write(sync_repository, user, PROFILE)
+        await self._write(sync_repository, user, {**PROFILE, "port": 2222})
+        item = await self._write(
+            sync_repository, user, {**PROFILE, "port": 2222, "username": "root"}
+        )
+
+        assert item.version == 3
+        assert item.patch_since(1) == [
+            {"op": "replace", "path": "/port", "value": 2222},
+            {"op": "replace", "path": "/username", "value": "root"},
+        ]
+        assert item.patch_since(3) == []
+
+    @pytest.mark.asyncio
+    async def test_chain_is_bounded(self, sync_repository, user):
+        item = await self._write(sync_repository, user, {"n": 0})
+        for n in range(1, SYNC_DELTA_CHAIN_LENGTH + 3):
+            item.update_data({"n": n}, "device-1", "web")
+
+        assert len(item.deltas) == SYNC_DELTA_CHAIN_LENGTH
+        assert item.patch_since(1) is None
+        assert item.patch_since(item.version - 1) == [
+            {"op": "replace", "path": "/n", "value": SYNC_DELTA_CHAIN_LENGTH + 2}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_sync_data_returns_patches_for_known_versions(
+        self, test_session, sync_repository, user
+    ):
+        await self._write(sync_repository, user, PROFILE)
+        await self._write(sync_repository, user, {**PROFILE, "port": 2222})
+
+        def request(known_versions):
+            return SyncDataRequest(
+                data_types=[SyncDataType.SSH_PROFILES],
+                device_id="device-2",
+                device_name="Phone",
+                known_versions=known_versions,
+            )
+
+        service = SyncService(test_session)
+        patched = await service.sync_data(user, request({"server": 1}))
+        full = await service.sync_data(user, request(None))
+
+        item = patched.data["ssh_profiles"][0]
+        assert item["base_version"] == 1
+        assert item["patch"] == [{"op": "replace", "path": "/port", "value": 2222}]
+        assert "data" not in item
+        assert full.data["ssh_profiles"][0]["data"]["port"] == 2222
+
+    @pytest.mark.asyncio
+    async def test_patch_sync_item(self, test_session, sync_repository, user):
+        await self._write(sync_repository, user, PROFILE)
+        service = SyncService(test_session)
+
+        result = await service.patch_sync_item(
+            user,
+            "ssh_profiles",
+            "server",
+            SyncPatchRequest(
+                base_version=1,
+                patch=[{"op": "replace", "path": "/port", "value": 2200}],
+                device_id="device-2",
+            ),
+        )
+
+        assert result.version == 2
+        item = await sync_repository.get_sync_item(user.id, "ssh_profiles", "server")
+        assert item.data == {**PROFILE, "port": 2200}
+        assert item.source_device_id == "device-2"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("base_version", "patch", "status_code"),
+        [
+            (2, [{"op": "replace", "path": "/port", "value": 1}], 409),
+            (1, [{"op": "replace", "path": "/missing", "value": 1}], 422),
+        ],
+    )
+    async def test_patch_sync_item_rejected(
+        self, test_session, sync_repository, user, base_version, patch, status_code
+    ):
+        await self._write(sync_repository, user, PROFILE)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await SyncService(test_session).patch_sync_item(
+                user,
+                "ssh_profiles",
+                "server",
+                SyncPatchRequest(
+                    base_version=base_version, patch=patch, device_id="device-2"
+                ),
+            )
+
+        assert exc_info.value.status_code == status_code
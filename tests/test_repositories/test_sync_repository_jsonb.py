@@ -0,0 +1,131 @@
+"""
+Database tests for content queries on JSONB sync documents.
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app.models.user import User
+from app.repositories.sync import SyncDataRepository
+
+
+@pytest.mark.database
+class TestSyncRepositoryJsonb:
+    """Containment, JSON path and conflict queries run in Postgres."""
+
+    @pytest.fixture
+    async def sync_repository(self, test_session):
+        return SyncDataRepository(test_session)
+
+    @pytest.fixture
+    async def user(self, test_session):
+        user = User(
+            username="jsonbsync",
+            email="jsonbsync@example.com",
+            hashed_password="hashed_password_123",
+        )
+        test_session.add(user)
+        await test_session.flush()
+        return user
+
+    @pytest.fixture
+    async def profiles(self, sync_repository, user):
+        rows = [
+            ("web", {"host": "web.example.com", "port": 22}),
+            ("web-alt", {"host": "web.example.com", "port": 2222}),
+            ("db", {"host": "db.example.com", "port": 22}),
+        ]
+        result = await sync_repository.bulk_upsert_sync_items(
+            user.id,
+            [
+                {
+                    "sync_type": "ssh_profile",
+                    "sync_key": key,
+                    "data": data,
+                    "source_device_id": "device-1",
+                    "source_device_type": "web",
+                }
+                for key, data in rows
+            ],
+        )
+        return {item.sync_key: item for item in result.written}
+
+    @pytest.mark.asyncio
+    async def test_profiles_for_host(self, sync_repository, user, profiles):
+        profiles["web-alt"].mark_as_deleted("device-1", "web")
+
+        items = await sync_repository.get_ssh_profiles_for_host(
+            user.id, "web.example.com"
+        )
+
+        assert [item.sync_key for item in items] == ["web"]
+
+    @pytest.mark.asyncio
+    async def test_json_path_predicate(self, sync_repository, user, profiles):
+        items = await sync_repository.find_by_data(
+            user.id, json_path="$.port != 22", sync_type="ssh_profile"
+        )
+
+        assert [item.sync_key for item in items] == ["web-alt"]
+
+    @pytest.mark.asyncio
+    async def test_changes_filtered_by_content(self, sync_repository, user, profiles):
+        changes = await sync_repository.get_changes_after(
+            user.id, 0, 10, data_contains={"host": "db.example.com"}
+        )
+
+        assert [item.sync_key for item in changes] == ["db"]
+
+    @pytest.mark.asyncio
+    async def test_containment_uses_gin_index(self, test_session, user, profiles):
+        await test_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+        plan = await test_session.execute(
+            text(
+                "EXPLAIN SELECT id FROM sync_data "
+                """WHERE data @> '{"host": "db.example.com"}'"""
+            )
+        )
+
+        assert "idx_sync_data_data_gin" in "\n".join(row[0] for row in plan)
+
+    @pytest.mark.asyncio
+    async def test_conflict_report(self, test_session, sync_repository, user):
+        await sync_repository.bulk_sync_create(
+            str(user.id),
+            [
+                {
+                    "sync_type": "settings",
+                    "sync_key": "prefs",
+                    "data": {"theme": "dark", "font": 12, "bell": True},
+                }
+            ],
+            "device-1",
+            "web",
+        )
+        await sync_repository.bulk_sync_create(
+            str(user.id),
+            [
+                {
+                    "sync_type": "settings",
+                    "sync_key": "prefs",
+                    "data": {"theme": "light", "font": 12, "tabs": 4},
+                }
+            ],
+            "device-2",
+            "ios",
+        )
+
+        report = await sync_repository.get_conflict_report(user.id)
+
+        assert len(report) == 1
+        assert report[0]["sync_key"] == "prefs"
+        assert report[0]["source_device_id"] == "device-1"
+        assert report[0]["changed_fields"] == ["bell", "tabs", "theme"]
+        assert report[0]["conflict_created_at"]
+
+        # Resolved conflicts are stored as SQL NULL and drop out of the report
+        item = (await sync_repository.get_conflicted_items(str(user.id)))[0]
+        item.resolve_conflict({"theme": "light"}, "device-2", "ios")
+        await test_session.flush()
+        assert await sync_repository.get_conflict_report(user.id) == []
@@ -0,0 +1,183 @@
+"""
+Tests for the data retention worker.
+"""
+
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.retention import (
+    PARTITION_LOCK_ID,
+    RETENTION_LOCK_ID,
+    PartitionWorker,
+    RetentionWorker,
+)
+
+
+def _worker(session: AsyncMock, batch_size: int = 100) -> RetentionWorker:
+    @asynccontextmanager
+    async def session_factory():
+        yield session
+
+    return RetentionWorker(
+        session_factory=session_factory, interval_seconds=60, batch_size=batch_size
+    )
+
+
+@pytest.fixture(autouse=True)
+def lock():
+    with patch(
+        "app.services.retention.try_advisory_xact_lock", AsyncMock(return_value=True)
+    ) as try_lock:
+        yield try_lock
+
+
+@pytest.mark.unit
+class TestRetentionWorker:
+    """Retention policy tests with mocked repositories."""
+
+    @pytest.fixture
+    def session(self):
+        return AsyncMock()
+
+    @pytest.fixture
+    def repositories(self):
+        with patch("app.services.retention.CommandRepository") as commands, patch(
+            "app.services.retention.SessionRepository"
+        ) as sessions, patch("app.services.retention.SyncDataRepository") as sync:
+            commands.return_value.delete_old_commands_batch = AsyncMock(
+                side_effect=[100, 100, 7]
+            )
+            sessions.return_value.delete_old_sessions_batch = AsyncMock(return_value=3)
+            sync.return_value.delete_old_sync_data_batch = AsyncMock(return_value=0)
+            yield commands, sessions, sync
+
+    @pytest.mark.asyncio
+    async def test_unpartitioned_falls_back_to_chunked_deletes(
+        self, session, repositories
+    ):
+        commands, sessions, _ = repositories
+        now = datetime(2025, 6, 1, tzinfo=UTC)
+
+        with patch(
+            "app.services.retention.is_partitioned", AsyncMock(return_value=False)
+        ), patch("app.services.retention.drop_partitions_before") as drop:
+            report = await _worker(session).run_once(now=now)
+
+        drop.assert_not_called()
+        assert report.deleted_commands == 207
+        assert report.deleted_sessions == 3
+        assert report.deleted_sync_data == 0
+
+        batch = commands.return_value.delete_old_commands_batch
+        assert batch.await_count == 3
+        assert batch.await_args.kwargs["limit"] == 100
+        assert batch.await_args.kwargs["keep_successful"] is False
+        assert batch.await_args.kwargs["cutoff"] < now
+        assert sessions.return_value.delete_old_sessions_batch.await_args.kwargs[
+            "keep_active"
+        ]
+        # One commit per chunk: 3 command chunks, 1 session chunk, 1 sync chunk
+        assert session.commit.await_count == 5
+
+    @pytest.mark.asyncio
+    async def test_partitioned_drops_expired_partitions_first(
+        self, session, repositories
+    ):
+        now = datetime(2025, 6, 1, tzinfo=UTC)
+        ensure = AsyncMock(return_value=["commands_p202509"])
+        drop = AsyncMock(return_value=["commands_p202501", "commands_p202502"])
+
+        with patch(
+            "app.services.retention.is_partitioned", AsyncMock(return_value=True)
+        ), patch("app.services.retention.ensure_monthly_partitions", ensure), patch(
+            "app.services.retention.drop_partitions_before", drop
+        ), patch(
+            "app.services.retention.settings.command_retention_days", 90
+        ):
+            report = await _worker(session).run_once(now=now)
+
+        # Partitions are created by the partition worker, not with the drops
+        ensure.assert_not_called()
+        assert report.dropped_partitions == ["commands_p202501", "commands_p202502"]
+        assert drop.await_args.args[1] == "commands"
+        assert drop.await_args.args[2] == now - timedelta(days=90)
+        # Rows left in the boundary month are still removed in chunks
+        assert report.deleted_commands == 207
+
+    @pytest.mark.asyncio
+    async def test_run_skipped_while_another_process_holds_the_lock(
+        self, session, repositories, lock
+    ):
+        commands, _, _ = repositories
+        lock.return_value = False
+
+        with patch("app.services.retention.is_partitioned") as partitioned:
+            report = await _worker(session).run_once()
+
+        assert report.skipped
+        assert lock.await_args.args[1] == RETENTION_LOCK_ID
+        partitioned.assert_not_called()
+        commands.return_value.delete_old_commands_batch.assert_not_awaited()
+        session.commit.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self, session):
+        worker = _worker(session)
+
+        with patch.object(worker, "run_once", AsyncMock()) as run_once:
+            await worker.start()
+            await worker.start()
+            await worker.stop()
+
+        assert run_once.await_count <= 1
+        assert worker._task.done()
+
+
+@pytest.mark.unit
+class TestPartitionWorker:
+    """Partition maintenance tests with mocked partition helpers."""
+
+    @pytest.mark.asyncio
+    async def test_creates_upcoming_partitions(self):
+        session = AsyncMock()
+
+        @asynccontextmanager
+        async def session_factory():
+            yield session
+
+        now = datetime(2025, 6, 1, tzinfo=UTC)
+        ensure = AsyncMock(return_value=["commands_p202509"])
+
+        with patch(
+            "app.services.retention.is_partitioned", AsyncMock(return_value=True)
+        ), patch("app.services.retention.ensure_monthly_partitions", ensure), patch(
+            "app.services.retention.settings.partition_premake_months", 3
+        ):
+            created = await PartitionWorker(session_factory=session_factory).run_once(
+                now=now
+            )
+
+        assert created == ["commands_p202509"]
+        assert ensure.await_args.kwargs == {"months_ahead": 3, "now": now}
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_skipped_while_another_process_holds_the_lock(self, lock):
+        session = AsyncMock()
+
+        @asynccontextmanager
+        async def session_factory():
+            yield session
+
+        lock.return_value = False
+        ensure = AsyncMock()
+
+        with patch("app.services.retention.ensure_monthly_partitions", ensure):
+            created = await PartitionWorker(session_factory=session_factory).run_once()
+
+        assert created == []
+        assert lock.await_args.args[1] == PARTITION_LOCK_ID
+        ensure.assert_not_awaited()
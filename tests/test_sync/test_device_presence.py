@@ -0,0 +1,152 @@
+"""
+Tests for per-device presence tracking.
+"""
+
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.api.sync.services import presence as presence_module
+from app.api.sync.services.presence import (
+    PRESENCE_TRIM_LOCK_KEY,
+    DevicePresence,
+    presence_key,
+)
+from app.api.sync.services.pubsub_manager import PubSubManager
+
+USER = "user-1"
+
+
+@pytest.fixture(params=["memory", pytest.param("redis", marks=pytest.mark.redis)])
+def presence(request):
+    presence = DevicePresence(window_seconds=300, retention_seconds=3600)
+    if request.param == "redis":
+        presence.redis = request.getfixturevalue("test_redis")
+    return presence
+
+
+class TestDevicePresence:
+    """Heartbeats, range queries and trimming."""
+
+    @pytest.mark.asyncio
+    async def test_devices_age_out_independently(self, presence):
+        now = time.time()
+        await presence.heartbeat(USER, "laptop", at=now - 600)
+        await presence.heartbeat(USER, "phone", at=now - 10)
+        # The phone staying active must not keep the laptop present
+        await presence.heartbeat(USER, "phone", at=now)
+
+        assert await presence.active_devices(USER) == ["phone"]
+        assert await presence.count_active(USER) == 1
+        assert await presence.active_devices(USER, within_seconds=900) == [
+            "laptop",
+            "phone",
+        ]
+        assert await presence.count_active(USER, within_seconds=900) == 2
+
+    @pytest.mark.asyncio
+    async def test_multi_user_lookup(self, presence):
+        await presence.heartbeat(USER, "laptop")
+        await presence.heartbeat("user-2", "tablet")
+
+        devices = await presence.active_devices_many([USER, "user-2", "user-3"])
+
+        assert devices == {USER: ["laptop"], "user-2": ["tablet"], "user-3": []}
+
+    @pytest.mark.asyncio
+    async def test_trim_removes_stale_heartbeats(self, presence):
+        now = time.time()
+        await presence.heartbeat(USER, "old", at=now - 7200)
+        await presence.heartbeat(USER, "new", at=now)
+        await presence.heartbeat("user-2", "old", at=now - 7200)
+
+        assert await presence.trim([USER]) == 1
+        assert await presence.trim() == 1
+        assert await presence.active_devices_many(
+            [USER, "user-2"], within_seconds=86400
+        ) == {USER: ["new"], "user-2": []}
+
+    @pytest.mark.asyncio
+    async def test_trim_visits_every_user_across_batches(self, presence, monkeypatch):
+        monkeypatch.setattr(presence_module, "PRESENCE_TRIM_BATCH_SIZE", 2)
+        stale = time.time() - 7200
+        for index in range(5):
+            # Equal scores exercise the cursor's tie handling
+            await presence.heartbeat(f"user-{index}", "old", at=stale)
+            await presence.heartbeat(f"user-{index}", "new")
+
+        assert await presence.trim() == 5
+
+    @pytest.mark.asyncio
+    async def test_redis_key_expires_after_retention(self, presence):
+        if presence.redis is None:
+            pytest.skip("Redis backend only")
+
+        await presence.heartbeat(USER, "laptop")
+
+        ttl = await presence.redis.ttl(presence_key(USER))
+        assert 0 < ttl <= presence.retention_seconds
+
+
+class _ReorderingIndex:
+    """Sorted-set stand-in that re-scores a user after the first page."""
+
+    def __init__(self, scores: dict[str, float]):
+        self.scores = scores
+        self.pages = 0
+
+    async def zrangebyscore(self, key, low, high, start, num, withscores):
+        low = float(low)
+        rows = sorted(
+            ((member, score) for member, score in self.scores.items() if score >= low),
+            key=lambda row: (row[1], row[0]),
+        )[start : start + num]
+        self.pages += 1
+        if self.pages == 1:
+            # A heartbeat moves an already visited user to the end
+            self.scores[rows[0][0]] = 100.0
+        return rows
+
+
+class TestPresenceIndexWalk:
+    """The full trim pages by score and runs in one worker per interval."""
+
+    @pytest.mark.asyncio
+    async def test_reordering_heartbeat_does_not_skip_users(self, monkeypatch):
+        monkeypatch.setattr(presence_module, "PRESENCE_TRIM_BATCH_SIZE", 2)
+        index = _ReorderingIndex({f"user-{n}": float(n % 3) for n in range(7)})
+
+        visited = [
+            user_id
+            async for batch in DevicePresence._scan_index(index)
+            for user_id in batch
+        ]
+
+        assert set(visited) == set(index.scores)
+
+    @pytest.mark.asyncio
+    async def test_periodic_trim_skips_when_another_worker_holds_the_lock(self):
+        presence = DevicePresence(trim_interval_seconds=600)
+        presence.redis = AsyncMock()
+        presence.redis.set.return_value = None
+
+        assert await presence._claim_trim(presence.redis) is False
+        presence.redis.set.assert_awaited_once_with(
+            PRESENCE_TRIM_LOCK_KEY, "1", nx=True, ex=600
+        )
+
+
+class TestPubSubManagerPresence:
+    """PubSubManager device activity goes through presence."""
+
+    @pytest.mark.asyncio
+    async def test_register_and_cleanup(self, presence):
+        manager = PubSubManager(presence=presence)
+        await presence.heartbeat(USER, "stale", at=time.time() - 7200)
+
+        await manager.register_device_activity(USER, "phone")
+
+        assert await manager.get_active_devices(USER) == ["phone"]
+        assert await manager.cleanup_inactive_devices(USER) == 1
+        assert await presence.count_active(USER, within_seconds=86400) == 1
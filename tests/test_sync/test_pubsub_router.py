@@ -0,0 +1,152 @@
+"""
+Tests for the shared sync pub/sub router.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.api.sync.services.pubsub_manager import PubSubManager, PubSubRouter
+
+
+class FakePubSub:
+    """Pub/sub connection that replays queued pattern messages."""
+
+    def __init__(self, messages: list[dict]):
+        self.messages = messages
+        self.patterns: tuple[str, ...] = ()
+
+    async def psubscribe(self, *patterns: str) -> None:
+        self.patterns = patterns
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+        await asyncio.Event().wait()
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakeRedis:
+    def __init__(self, messages: list[dict]):
+        self.messages = messages
+        self.connections: list[FakePubSub] = []
+
+    def pubsub(self) -> FakePubSub:
+        connection = FakePubSub(self.messages)
+        self.connections.append(connection)
+        return connection
+
+
+class TestPubSubRouter:
+    """In-memory routing of pattern subscription messages."""
+
+    @pytest.fixture
+    def router(self):
+        return PubSubRouter()
+
+    @pytest.mark.asyncio
+    async def test_subscriptions_are_reference_counted(self, router):
+        received = []
+        channel = "sync:user:1"
+
+        router.subscribe(channel, received.append)
+        router.subscribe(channel, received.append)
+        router.unsubscribe(channel, received.append)
+        await router.dispatch(channel, json.dumps({"n": 1}))
+
+        router.unsubscribe(channel, received.append)
+        await router.dispatch(channel, json.dumps({"n": 2}))
+
+        assert received == [{"n": 1}]
+        assert router.listener_count(channel) == 0
+        assert router.stats()["channels"] == 0
+
+    @pytest.mark.asyncio
+    async def test_dispatch_fans_out_to_sync_and_async_listeners(self, router):
+        received = []
+
+        async def async_listener(message):
+            received.append(("async", message["n"]))
+
+        def failing_listener(message):
+            raise RuntimeError("listener failed")
+
+        router.subscribe("sync:user:1", received.append)
+        router.subscribe("sync:user:1", failing_listener)
+        router.subscribe("sync:user:1", async_listener)
+        router.subscribe("sync:user:2", received.append)
+
+        delivered = await router.dispatch("sync:user:1", json.dumps({"n": 1}))
+
+        assert delivered == 3
+        assert received == [{"n": 1}, ("async", 1)]
+
+    @pytest.mark.asyncio
+    async def test_unwatched_channels_are_ignored(self, router):
+        assert await router.dispatch("sync:user:3", "not json") == 0
+        assert router.stats()["received"] == 1
+
+    @pytest.mark.asyncio
+    async def test_one_connection_routes_pattern_messages(self, router):
+        received = []
+        router.subscribe("sync:user:1", received.append)
+        redis = FakeRedis(
+            [
+                {"type": "psubscribe", "channel": "sync:*", "data": 1},
+                {
+                    "type": "pmessage",
+                    "pattern": "sync:*",
+                    "channel": "sync:user:1",
+                    "data": json.dumps({"type": "sync_update"}),
+                },
+                {
+                    "type": "pmessage",
+                    "pattern": "sync:*",
+                    "channel": "sync:user:2",
+                    "data": json.dumps({"type": "sync_update"}),
+                },
+            ]
+        )
+
+        await router.start(redis)
+        await router.start(redis)
+        for _ in range(10):
+            if received:
+                break
+            await asyncio.sleep(0)
+        await router.stop()
+
+        assert received == [{"type": "sync_update"}]
+        assert len(redis.connections) == 1
+        assert redis.connections[0].patterns == ("sync:*", "device:*")
+
+
+class TestPubSubManagerRouting:
+    """PubSubManager subscriptions go through the shared router."""
+
+    @pytest.mark.asyncio
+    async def test_managers_share_router_and_release_their_listeners(self):
+        router = PubSubRouter()
+        first = PubSubManager(router=router)
+        second = PubSubManager(router=router)
+        first_received, second_received = [], []
+
+        await first.subscribe_user_sync("user-1", first_received.append)
+        await second.subscribe_user_sync("user-1", second_received.append)
+        await first.subscribe_device_channel(
+            "user-1", "device-1", first_received.append
+        )
+        await first.close()
+
+        await router.dispatch("sync:user:1", json.dumps({"n": 0}))
+        await router.dispatch("sync:user:user-1", json.dumps({"n": 1}))
+
+        assert first_received == []
+        assert second_received == [{"n": 1}]
+        assert router.stats()["channels"] == 1
+
+        await second.unsubscribe_user_sync("user-1")
+        assert router.listener_count("sync:user:user-1") == 0
@@ -0,0 +1,70 @@
+"""
+Tests for sync response compression.
+"""
+
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+from starlette.requests import Request
+
+from app.api.sync import compression
+from app.api.sync.compression import json_response, negotiate_encoding
+from app.api.sync.schemas import MessageResponse
+
+
+def _request(accept_encoding: str | None) -> Request:
+    headers = []
+    if accept_encoding is not None:
+        headers.append((b"accept-encoding", accept_encoding.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestNegotiateEncoding:
+    """Accept-Encoding negotiation."""
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            ("", None),
+            ("gzip", "gzip"),
+            ("br, gzip;q=0.5", "gzip"),
+            ("gzip;q=0", None),
+            ("*", "gzip"),
+            ("identity", None),
+        ],
+    )
+    def test_gzip_only(self, header, expected):
+        with patch.object(compression, "zstandard", None):
+            assert negotiate_encoding(header) == expected
+
+    def test_zstd_preferred_when_available(self):
+        with patch.object(compression, "zstandard", object()):
+            assert negotiate_encoding("gzip, zstd") == "zstd"
+            assert negotiate_encoding("gzip, zstd;q=0.5") == "gzip"
+
+
+class TestJsonResponse:
+    """Size threshold and encoding of sync responses."""
+
+    def test_large_response_is_compressed(self):
+        model = MessageResponse(message="x" * 4096)
+
+        with patch.object(compression, "zstandard", None):
+            response = json_response(_request("gzip"), model)
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert json.loads(gzip.decompress(response.body)) == model.model_dump(
+            mode="json"
+        )
+
+    @pytest.mark.parametrize("accept_encoding", ["gzip", None])
+    def test_small_or_unaccepted_response_is_plain(self, accept_encoding):
+        model = MessageResponse(message="x" * (10 if accept_encoding else 4096))
+
+        response = json_response(_request(accept_encoding), model)
+
+        assert "content-encoding" not in response.headers
+        assert json.loads(response.body) == model.model_dump(mode="json")
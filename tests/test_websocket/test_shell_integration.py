@@ -0,0 +1,208 @@
+"""
+Tests for shell-integration command capture and write-behind recording.
+"""
+
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.websocket.command_recorder import CommandRecorder
+from app.websocket.shell_integration import CapturedCommand, ShellIntegrationParser
+from app.websocket.terminal import TerminalSession
+
+
+def osc(body: str, terminator: str = "\x07") -> str:
+    return f"\x1b]{body}{terminator}"
+
+
+def _captured(command: str = "ls", exit_code: int | None = 0) -> CapturedCommand:
+    now = datetime.now(UTC)
+    return CapturedCommand(
+        command=command,
+        exit_code=exit_code,
+        started_at=now,
+        completed_at=now,
+        execution_time=0.5,
+        working_directory="/home/user",
+    )
+
+
+class TestShellIntegrationParser:
+    """OSC 133 / 633 parsing tests."""
+
+    def test_captures_echoed_command_and_exit_code(self):
+        parser = ShellIntegrationParser()
+        stream = (
+            osc("7;file://host/home/user/my%20project")
+            + osc("133;A")
+            + "$ "
+            + osc("133;B")
+            + "git stauts\b\b\btus\r\n"
+            + osc("133;C")
+            + "On branch main\r\n"
+            + osc("133;D;1", "\x1b\\")
+        )
+
+        commands = parser.feed(stream)
+
+        assert len(commands) == 1
+        assert commands[0].command == "git status"
+        assert commands[0].exit_code == 1
+        assert commands[0].working_directory == "/home/user/my project"
+        assert commands[0].execution_time >= 0
+
+    def test_prefers_explicit_command_line(self):
+        parser = ShellIntegrationParser()
+        stream = (
+            osc("633;B")
+            + "\x1b[32mecho\x1b[0m a"
+            + osc("633;P;Cwd=/srv/app")
+            + osc("633;E;echo a\\x3bb")
+            + osc("633;C")
+            + osc("633;D;0")
+        )
+
+        [command] = parser.feed(stream)
+
+        assert command.command == "echo a;b"
+        assert command.working_directory == "/srv/app"
+
+    def test_marks_split_across_chunks(self):
+        parser = ShellIntegrationParser()
+        stream = osc("133;B") + "make test" + osc("133;C") + "ok\n" + osc("133;D;0")
+
+        commands = []
+        for i in range(0, len(stream), 3):
+            commands.extend(parser.feed(stream[i : i + 3]))
+
+        assert [c.command for c in commands] == ["make test"]
+        assert commands[0].exit_code == 0
+
+    def test_ignores_plain_output_and_empty_commands(self):
+        parser = ShellIntegrationParser()
+
+        assert parser.feed("just some output\r\n") == []
+        assert parser.feed(osc("133;B") + "\r\n" + osc("133;C") + osc("133;D;0")) == []
+        # D without a preceding C (e.g. Ctrl+C at the prompt) records nothing
+        assert parser.feed(osc("133;B") + "abc" + osc("133;D;130")) == []
+
+
+class TestCommandRecorder:
+    """Write-behind queue tests."""
+
+    @pytest.fixture
+    def db(self):
+        session = AsyncMock()
+
+        @asynccontextmanager
+        async def session_factory():
+            yield session
+
+        return session, session_factory
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_in_batches_with_one_commit_each(self, db):
+        session, session_factory = db
+        recorder = CommandRecorder(
+            session_factory=session_factory, batch_size=2, flush_interval_ms=60000
+        )
+
+        with patch(
+            "app.websocket.command_recorder.CommandRepository"
+        ) as repository_class:
+            repository_class.return_value.bulk_insert_commands = AsyncMock()
+            for i in range(5):
+                recorder.record("session-1", _captured(f"cmd {i}", exit_code=i % 2))
+            written = await recorder.flush()
+            await recorder.stop()
+
+        assert written == 5
+        bulk_insert = repository_class.return_value.bulk_insert_commands
+        assert [len(c.args[0]) for c in bulk_insert.await_args_list] == [2, 2, 1]
+        assert session.commit.await_count == 3
+
+        first = bulk_insert.await_args_list[0].args[0][0]
+        assert first["session_id"] == "session-1"
+        assert first["status"] == "success"
+        assert bulk_insert.await_args_list[0].args[0][1]["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_flush_classifies_commands(self, db):
+        _, session_factory = db
+        recorder = CommandRecorder(session_factory=session_factory)
+
+        with patch(
+            "app.websocket.command_recorder.CommandRepository"
+        ) as repository_class:
+            repository_class.return_value.bulk_insert_commands = AsyncMock()
+            recorder.record("session-1", _captured("git status"))
+            recorder.record("session-1", _captured("rm -rf /tmp/build"))
+            recorder.record("session-1", _captured("export AWS_SECRET=abc123"))
+            recorder.record("session-1", _captured("mysql -uroot -pS3cret app"))
+            await recorder.stop()
+
+        (
+            git,
+            rm,
+            export,
+            mysql,
+        ) = repository_class.return_value.bulk_insert_commands.await_args.args[0]
+        assert (git["command_type"], git["is_dangerous"]) == ("git", False)
+        assert (rm["command_type"], rm["is_dangerous"]) == ("file", True)
+        assert not git["is_sensitive"] and not rm["is_sensitive"]
+        assert export["is_sensitive"] and mysql["is_sensitive"]
+
+    @pytest.mark.asyncio
+    async def test_record_does_not_touch_database(self, db):
+        session, session_factory = db
+        recorder = CommandRecorder(
+            session_factory=session_factory, batch_size=100, flush_interval_ms=60000
+        )
+
+        recorder.record("session-1", _captured(exit_code=None))
+
+        assert recorder.pending_count == 1
+        session.commit.assert_not_awaited()
+        await recorder.stop()
+        assert recorder.pending_count == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_oldest(self, db):
+        _, session_factory = db
+        recorder = CommandRecorder(
+            session_factory=session_factory,
+            batch_size=100,
+            flush_interval_ms=60000,
+            max_pending=2,
+        )
+
+        for i in range(3):
+            recorder.record("session-1", _captured(f"cmd {i}"))
+
+        assert recorder.pending_count == 2
+        assert recorder.dropped == 1
+        with patch("app.websocket.command_recorder.CommandRepository"):
+            await recorder.stop()
+
+
+class TestTerminalCapture:
+    """Terminal output wiring tests."""
+
+    @pytest.mark.asyncio
+    async def test_handle_output_records_finished_commands(self):
+        connection = MagicMock()
+        connection.send_message = AsyncMock()
+        terminal = TerminalSession("session-1", connection)
+        terminal.db_session = MagicMock()
+
+        with patch("app.websocket.terminal.command_recorder") as recorder:
+            await terminal._handle_output(osc("133;B") + "pwd" + osc("133;C"))
+            await terminal._handle_output("/root\r\n" + osc("133;D;0"))
+
+        recorder.record.assert_called_once()
+        session_id, captured = recorder.record.call_args.args
+        assert session_id == "session-1"
+        assert captured.command == "pwd"
+        assert connection.send_message.await_count == 2
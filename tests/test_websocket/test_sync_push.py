@@ -0,0 +1,160 @@
+"""
+Tests for sync push over the terminal WebSocket.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import WebSocket
+
+from app.api.sync.services.pubsub_manager import (
+    PubSubManager,
+    PubSubRouter,
+    pubsub_router,
+)
+from app.api.sync.services.settings_sync import SettingsSyncService
+from app.models.user import User
+from app.websocket.manager import Connection, ConnectionManager
+from app.websocket.protocols import MessageType
+from app.websocket.sync_push import SyncPushSubscription
+
+
+def _change(key: str, seq: int, device: str = "laptop") -> dict:
+    return {
+        "sync_type": "ssh_profile",
+        "sync_key": key,
+        "change_seq": seq,
+        "version": 1,
+        "is_deleted": False,
+        "source_device_id": device,
+    }
+
+
+def _message(*changes: dict) -> dict:
+    return {"type": "sync_changes", "user_id": "user-1", "changes": list(changes)}
+
+
+@pytest.fixture
+def connection():
+    websocket = MagicMock(spec=WebSocket)
+    websocket.send_json = AsyncMock()
+    return Connection(websocket, "conn-1", "user-1", "phone")
+
+
+def _sent_changes(connection: Connection) -> list[list[str]]:
+    return [
+        [change["sync_key"] for change in call.args[0]["data"]["changes"]]
+        for call in connection.websocket.send_json.call_args_list
+    ]
+
+
+class TestSyncPushSubscription:
+    """Per-connection batching of sync change notifications."""
+
+    @pytest.fixture
+    def router(self):
+        return PubSubRouter()
+
+    @pytest.mark.asyncio
+    async def test_changes_are_coalesced_into_one_batch(self, connection, router):
+        push = SyncPushSubscription(
+            connection, PubSubManager(router=router), debounce_seconds=0.01
+        )
+        await push.start()
+
+        await router.dispatch("sync:user:user-1", _message(_change("b", 2)))
+        await router.dispatch(
+            "sync:user:user-1",
+            _message(_change("a", 3), _change("b", 4), _change("own", 5, "phone")),
+        )
+        await asyncio.sleep(0.05)
+
+        assert _sent_changes(connection) == [["a", "b"]]
+        sent = connection.websocket.send_json.call_args.args[0]
+        assert sent["type"] == MessageType.SYNC_CHANGES
+        assert sent["data"]["changes"][1]["change_seq"] == 4
+        await push.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_batch_skips_debounce(self, connection, router):
+        push = SyncPushSubscription(
+            connection, PubSubManager(router=router), debounce_seconds=10, max_batch=2
+        )
+        await push.start()
+
+        await router.dispatch(
+            "sync:user:user-1", _message(_change("a", 1), _change("b", 2))
+        )
+        await asyncio.sleep(0.01)
+
+        assert _sent_changes(connection) == [["a", "b"]]
+        await push.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_releases_listener(self, connection, router):
+        push = SyncPushSubscription(
+            connection, PubSubManager(router=router), debounce_seconds=10
+        )
+        await push.start()
+        await router.dispatch("sync:user:user-1", _message(_change("a", 1)))
+
+        await push.stop()
+
+        assert router.listener_count("sync:user:user-1") == 0
+        connection.websocket.send_json.assert_not_called()
+
+
+class TestConnectionManagerSyncPush:
+    """sync_subscribe / sync_unsubscribe messages."""
+
+    @pytest.mark.asyncio
+    async def test_subscribe_and_unsubscribe(self, connection):
+        manager = ConnectionManager()
+        manager.connections[connection.connection_id] = connection
+
+        await manager.handle_message("conn-1", {"type": "sync_subscribe"})
+        await manager.handle_message("conn-1", {"type": "sync_subscribe"})
+
+        assert manager.get_sync_push_count() == 1
+        assert pubsub_router.listener_count("sync:user:user-1") == 1
+
+        await manager.handle_message("conn-1", {"type": "sync_unsubscribe"})
+
+        assert manager.get_sync_push_count() == 0
+        assert pubsub_router.listener_count("sync:user:user-1") == 0
+
+
+@pytest.mark.database
+class TestCommittedChangesArePublished:
+    """Committed sync writes reach local listeners."""
+
+    @pytest.mark.asyncio
+    async def test_commit_publishes_changes(self, test_session):
+        user = User(
+            username="syncpush",
+            email="syncpush@example.com",
+            hashed_password="hashed_password_123",
+        )
+        test_session.add(user)
+        await test_session.flush()
+
+        received = []
+        channel = f"sync:user:{user.id}"
+        pubsub_router.subscribe(channel, received.append)
+        try:
+            await SettingsSyncService(test_session).sync_settings(
+                user.id, {"terminal_theme": "dark"}
+            )
+            for _ in range(10):
+                if received:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            pubsub_router.unsubscribe(channel, received.append)
+
+        assert received[0]["type"] == "sync_changes"
+        assert [change["sync_key"] for change in received[0]["changes"]] == [
+            f"user_setting_{user.id}_terminal_theme"
+        ]
+        assert received[0]["changes"][0]["version"] == 1